@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+快照恢复一致性检查 - 中途写快照后在新进程中恢复，结果必须与不中断的运行完全一致
+
+1. 分析后端：AS_CHECKPOINT_PATH/AS_CHECKPOINT_AT 在指定tick写快照，
+   AS_RESUME_FROM 从快照继续，比较 "all passes finished" 行
+2. htsimpy：4条TCP流共享瓶颈队列，在仿真中途写快照，比较最终各流的
+   cwnd/ssthresh/last_acked 和结束时间；每条流都必须有数据被确认
+
+用法:
+    python examples/checkpoint_resume_check.py [-w workload] [-g 8] [-g_p_s 8] [--at 1000000]
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(ROOT)
+
+
+def run_analytical(args, workdir: str, env_extra: dict) -> str:
+    """运行分析后端，返回完成时间行"""
+    env = dict(os.environ, **env_extra)
+    cmd = [sys.executable, os.path.join(ROOT, "main.py"), "-w", args.workload,
+           "-g", str(args.gpus), "-g_p_s", str(args.gpus_per_server), "-r", "checkpoint_check"]
+    out = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True).stdout
+    lines = [l for l in out.splitlines() if "all passes finished" in l]
+    return lines[-1] if lines else "<no result>"
+
+
+def check_analytical(args, workdir: str) -> bool:
+    ckpt = os.path.join(workdir, "analytical.ckpt")
+    baseline = run_analytical(args, workdir, {})
+    saved = run_analytical(args, workdir, {"AS_CHECKPOINT_PATH": ckpt,
+                                           "AS_CHECKPOINT_AT": str(args.at)})
+    resumed = run_analytical(args, workdir, {"AS_RESUME_FROM": ckpt})
+    ok = "<no result>" != baseline == saved == resumed
+    print(f"analytical  baseline: {baseline}")
+    print(f"analytical  resumed:  {resumed}  -> {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+
+def htsim_scenario(mode: str, ckpt: str, split: int) -> None:
+    """htsimpy子进程: full 不中断运行, save 在 split 写快照后继续, resume 从快照继续"""
+    import random
+    from network_frontend.htsimpy.core.eventlist import EventList
+    from network_frontend.htsimpy.core.checkpoint import save_checkpoint, load_checkpoint
+
+    eventlist = EventList()
+    if mode == "resume":
+        srcs = load_checkpoint(ckpt).roots
+    else:
+        from network_frontend.htsimpy.core.network import Packet
+        from network_frontend.htsimpy.core.route import Route
+        from network_frontend.htsimpy.core.pipe import Pipe
+        from network_frontend.htsimpy.queues.base_queue import Queue
+        from network_frontend.htsimpy.protocols.tcp import TcpSrc, TcpSink, TcpRtxTimerScanner
+
+        random.seed(1)
+        eventlist.set_endtime(10**11)
+        scanner = TcpRtxTimerScanner(10**9, eventlist)
+        # 瓶颈缓冲能放下4条流的初始窗口（各 10 个 MSS）。缓冲更小时后启动的流整个初始窗口被丢，
+        # 单个乱序包触发不了快速重传，而最小 RTO 250ms（建立连接前 3s）超过仿真时长，这些流一直不动
+        bottleneck = Queue(10**9, Packet.data_packet_size() * 40, eventlist)
+        pipe = Pipe(10**7, eventlist)
+        srcs = []
+        for i in range(4):
+            src, sink = TcpSrc(None, None, eventlist), TcpSink()
+            out = Route()
+            for hop in (bottleneck, pipe, sink):
+                out.push_back(hop)
+            back = Route()
+            for hop in (Queue(10**10, 1500 * 100, eventlist), Pipe(10**7, eventlist), src):
+                back.push_back(hop)
+            src.connect(out, back, sink, i * 1000)
+            scanner.registerTcp(src)
+            srcs.append(src)
+        if mode == "save":
+            while eventlist.now() < split and eventlist.do_next_event():
+                pass
+            save_checkpoint(ckpt, srcs)
+
+    while eventlist.do_next_event():
+        pass
+    state = [(s._cwnd, s._ssthresh, s._last_acked) for s in srcs]
+    print(f"RESULT {eventlist.now()} {state}")
+
+
+def run_htsim(mode: str, workdir: str, split: int) -> str:
+    ckpt = os.path.join(workdir, "htsim.ckpt")
+    cmd = [sys.executable, os.path.abspath(__file__), "--htsim-child", mode, ckpt, str(split)]
+    out = subprocess.run(cmd, cwd=workdir, capture_output=True, text=True).stdout
+    lines = [l for l in out.splitlines() if l.startswith("RESULT")]
+    return lines[-1] if lines else "<no result>"
+
+
+def check_htsim(workdir: str) -> bool:
+    split = 3 * 10**10
+    baseline = run_htsim("full", workdir, split)
+    saved = run_htsim("save", workdir, split)
+    resumed = run_htsim("resume", workdir, split)
+    ok = "<no result>" != baseline == saved == resumed
+    print(f"htsimpy     baseline: {baseline}")
+    print(f"htsimpy     resumed:  {resumed}  -> {'OK' if ok else 'MISMATCH'}")
+    if baseline != "<no result>":
+        # last_acked 为 1 表示该流只确认了初始序号，没有传输任何数据
+        stalled = [i for i, (_, _, last_acked) in enumerate(ast.literal_eval(baseline.split(" ", 2)[2]))
+                   if last_acked <= 1]
+        if stalled:
+            print(f"htsimpy     flows without progress: {stalled}")
+            ok = False
+    return ok
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--htsim-child":
+        htsim_scenario(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description="Checkpoint/resume consistency check")
+    parser.add_argument("-w", "--workload", default=os.path.join(ROOT, "examples", "microAllReduce.txt"))
+    parser.add_argument("-g", "--gpus", type=int, default=8)
+    parser.add_argument("-g_p_s", "--gpus-per-server", type=int, default=8)
+    parser.add_argument("--at", type=int, default=1000000, help="Analytical checkpoint tick")
+    args = parser.parse_args()
+    args.workload = os.path.abspath(args.workload)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        ok = check_analytical(args, workdir)
+        ok = check_htsim(workdir) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+集合通信代价模型检查 - 闭式完成时间与包级仿真时间对比
+
+对环形 (Ring) 和减半加倍 (HalvingDoubling) AllReduce：
+1. 用 system.collective 中的算法对象取出 get_cost_model_terms()（轮数、每个节点发送字节数），
+   由 CollectiveCostModel.phase_time() 得到闭式完成时间
+2. 按同一算法对象的步骤（轮数、每轮消息大小、对端）在 HTSimPyFabric（FatTree 上的
+   TCP 包级仿真）上逐步收发，每个 rank 本步的发送和接收都完成后进入下一步，得到仿真完成时间
+
+代价模型假设每个节点一条链路、网络内部无争用，因此 FatTree 取 k = 2n，使所有 rank
+挂在同一个 ToR 下。跨 pod 时 ECMP 路径冲突和丢包重传会使仿真时间远大于闭式时间，
+这部分不在代价模型的适用范围内。alpha 用同一 ToR 下一个 MTU 消息的实测完成时间标定，
+BW 取链路速率，g 取 0。每个规模打印两者及比值，比值偏离 1 超过 --tolerance 时以非零状态退出。
+
+用法:
+    python examples/collective_cost_model_check.py [-n 8] [--sizes 1048576,4194304,16777216] [--tolerance 0.1]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from system.AstraNetworkAPI import SimRequest, TimeSpec
+from system.common import ComType, InjectionPolicy
+from system.collective.cost_model import CollectiveCostModel
+from system.collective.halving_doubling import HalvingDoubling
+from system.collective.ring import Ring
+from system.topology.ring_topology import RingTopology
+from network_frontend.htsimpy.api.config_parser import HTSimPyConfig, LinkSpeed
+from network_frontend.htsimpy.api.htsimpy_network import HTSimPyFabric, HTSimPyNetwork
+from network_frontend.htsimpy.core.eventlist import EventList
+
+LINKS = {10: LinkSpeed.SPEED_10G, 25: LinkSpeed.SPEED_25G, 40: LinkSpeed.SPEED_40G,
+         100: LinkSpeed.SPEED_100G, 400: LinkSpeed.SPEED_400G}
+
+
+def ring_schedule(algorithm: Ring, rank: int):
+    """环形 AllReduce 每步的 (发往, 接收自, 字节数)：stream_count 步，每步 msg_size 字节"""
+    n = algorithm.nodes_in_ring
+    right, left = (rank + 1) % n, (rank - 1) % n
+    return [(right, left, algorithm.msg_size)] * algorithm.stream_count
+
+
+def halving_doubling_schedule(algorithm: HalvingDoubling, rank: int):
+    """减半加倍 AllReduce 每步的 (发往, 接收自, 字节数)：Reduce-Scatter 距离和数据逐步减半，All-Gather 反向加倍"""
+    n = algorithm.nodes_in_ring
+    steps = algorithm.stream_count // 2
+    reduce_scatter = [(rank ^ (n >> (k + 1)), algorithm.data_size >> (k + 1)) for k in range(steps)]
+    return [(peer, peer, chunk) for peer, chunk in reduce_scatter + reduce_scatter[::-1]]
+
+
+def build_ring(n: int, size: int) -> Ring:
+    topology = RingTopology(RingTopology.Dimension.NA, 0, n, 0, 1)
+    return Ring(ComType.All_Reduce, 0, 0, topology, size, RingTopology.Direction.Clockwise,
+                InjectionPolicy.Normal, False)
+
+
+def build_halving_doubling(n: int, size: int) -> HalvingDoubling:
+    topology = RingTopology(RingTopology.Dimension.NA, 0, n, 0, 1)
+    return HalvingDoubling(ComType.All_Reduce, 0, 0, topology, size, False)
+
+
+# 名称 -> (建立算法对象, 由算法对象得到某个 rank 的步骤表)
+ALGORITHMS = {
+    "ring": (build_ring, ring_schedule),
+    "halvingDoubling": (build_halving_doubling, halving_doubling_schedule),
+}
+
+
+class StepRank:
+    """一个 rank 上按步骤收发的状态"""
+
+    def __init__(self, ni: HTSimPyNetwork, schedule, done: list):
+        self.ni = ni
+        self.schedule = schedule
+        self.done = done
+        self.step = 0
+        self.pending = 0
+
+    def start_step(self, _=None) -> None:
+        if self.step == len(self.schedule):
+            self.done.append(self.ni.sim_get_time().time_val)
+            return
+        me = self.ni.rank
+        dst, src, count = self.schedule[self.step]
+        self.pending = 2
+        self.ni.sim_recv(None, count, 0, src, self.step, SimRequest(src, me, self.step),
+                         self.finish_one, None)
+        self.ni.sim_send(None, count, 0, dst, self.step, SimRequest(me, dst, self.step),
+                         self.finish_one, None)
+
+    def finish_one(self, _) -> None:
+        self.pending -= 1
+        if self.pending == 0:
+            self.step += 1
+            self.ni.sim_schedule(TimeSpec(time_val=0), self.start_step, None)
+
+
+def simulate(n: int, config: HTSimPyConfig, schedules) -> float:
+    """在新的 fabric 上运行各 rank 的步骤表，返回最后一个 rank 的完成时间（纳秒）"""
+    EventList.reset()
+    fabric = HTSimPyFabric(n, config)
+    done = []
+    ranks = [StepRank(HTSimPyNetwork(r, fabric), schedules[r], done) for r in range(n)]
+    for rank in ranks:
+        rank.ni.sim_schedule(TimeSpec(time_val=0), rank.start_step, None)
+    fabric.run()
+    stats = fabric.stats()
+    assert len(done) == n, f"only {len(done)}/{n} ranks finished"
+    assert stats["unmatched_sends"] == 0 and stats["unmatched_recvs"] == 0
+    return max(done)
+
+
+def calibrate_alpha(n: int, config: HTSimPyConfig) -> float:
+    """rank 0 与 rank n-1 之间一个 MTU 消息的完成时间（纳秒），作为每轮的固定开销"""
+    far = n - 1
+    schedules = [[] for _ in range(n)]
+    schedules[0] = [(far, far, config.mtu)]
+    schedules[far] = [(0, 0, config.mtu)]
+    return simulate(n, config, schedules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Closed-form collective cost model vs packet-level simulation")
+    parser.add_argument("-n", "--ranks", type=int, default=8, help="Number of ranks (power of two)")
+    parser.add_argument("--sizes", type=str, default="1048576,4194304,16777216",
+                        help="Comma separated AllReduce sizes (bytes)")
+    parser.add_argument("--link", type=int, default=100, choices=sorted(LINKS), help="Link speed (Gb/s)")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative difference between simulated and closed-form time")
+    args = parser.parse_args()
+    n = args.ranks
+    if n < 2 or n & (n - 1):
+        parser.error("--ranks must be a power of two")
+
+    # k = 2n：所有 rank 挂在同一个 ToR 下，任意置换流量都不争用链路
+    config = HTSimPyConfig(link_speed=LINKS[args.link], queue_size=1000, fat_tree_k=2 * n)
+    alpha = calibrate_alpha(n, config)
+    bw = config.get_link_speed_bps() / 8 / 1e9  # GB/s = 字节/纳秒
+    model = CollectiveCostModel(alpha, 0.0, [bw])
+    print(f"ranks={n} link={args.link}Gb/s alpha={alpha:.0f}ns BW={bw:.1f}GB/s")
+
+    ok = True
+    for size in (int(s) for s in args.sizes.split(",")):
+        for name, (build, schedule) in ALGORITHMS.items():
+            algorithm = build(n, size)
+            rounds, total_bytes = algorithm.get_cost_model_terms()
+            closed = model.phase_time(rounds, total_bytes, 0)
+            simulated = simulate(n, config, [schedule(algorithm, r) for r in range(n)])
+            ratio = simulated / closed
+            passed = abs(ratio - 1) <= args.tolerance
+            ok = ok and passed
+            status = "OK" if passed else "MISMATCH"
+            print(f"{name:16s} size={size:>10d} rounds={rounds:3d} bytes/node={total_bytes:>12.0f} "
+                  f"closed={closed:>10d}ns simulated={simulated:>10.0f}ns ratio={ratio:.2f} {status}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
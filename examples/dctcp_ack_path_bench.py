@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+DCTCP ACK路径基准 - 逐ACK计算 vs 按观察窗口批量计算
+
+对比两种 DCTCPSrc:
+1. legacy: 旧实现（本文件中的参考实现，与修改前的 receivePacket/deflate_window 相同），
+   每个ACK做乘法判断窗口结束，并在同一个方法里更新α和收缩窗口
+2. new:    DCTCPSrc，每个ACK只做整数计数，α的EWMA和窗口收缩每个观察窗口算一次
+
+两个场景，每个场景分别用普通对象和 FlowStateTable 运行:
+- dumbbell: --flows 条 DCTCP 流共享一个 ECN 瓶颈队列
+- fattree:  k 元 FatTree（ECN 队列）上 --flows 条随机主机对之间的 DCTCP 流
+记录每条流每个ACK之后的 (时间, cwnd, ssthresh, alfa)，检查两种实现的轨迹完全一致。
+
+ECNQueue 通过包的 ECN 属性打标记，TcpSink 把 0x08 回显成 ACK 上的 0x40，而
+DCTCPSrc 检查 ECN_ECHO；本基准给 TcpPacket 设置 ECN 属性，并在反向路由上把
+回显标志翻译成 ECN_ECHO，让ECN路径真正被覆盖。
+
+最后用合成ACK单独计时 DCTCP 的逐ACK开销（不含 TcpSrc.receivePacket 和方法调用本身）。
+
+用法:
+    python examples/dctcp_ack_path_bench.py [--flows 16] [--end-ms 50] [-k 4] [--acks 1000000] [--cwnd 32]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from network_frontend.htsimpy.core.eventlist import EventList
+from network_frontend.htsimpy.core.logger.core import Logged, LoggedManager
+from network_frontend.htsimpy.core.network import PacketSink
+from network_frontend.htsimpy.core.pipe import Pipe
+from network_frontend.htsimpy.core.route import Route
+from network_frontend.htsimpy.datacenter import FatTreeTopology
+from network_frontend.htsimpy.datacenter.constants import QueueType
+from network_frontend.htsimpy.packets.tcp_packet import TcpAck, TcpPacket
+from network_frontend.htsimpy.protocols import (
+    DCTCPSink, DCTCPSrc, ECN_ECHO, FlowStateTable, TcpRtxTimerScanner, TcpSrc,
+)
+from network_frontend.htsimpy.queues.base_queue import Queue
+from network_frontend.htsimpy.queues.ecn_queue import ECNQueue
+
+LINK_BPS = 10**10
+RTT_PS = 10**7
+PKT = 9000
+# TcpSink 检查的 CE 标志和它在 ACK 上回显的标志
+ECN_CE = 0x08
+SINK_ECHO = 0x40
+
+
+class LegacyDCTCPSrc(DCTCPSrc):
+    """修改前的 DCTCPSrc.deflate_window() 和 receivePacket()"""
+
+    def deflate_window(self) -> None:
+        self._pkts_seen = 0
+        self._pkts_marked = 0
+        if self._mSrc is None:
+            self._ssthresh = max(self._cwnd // 2, 2 * self._mss)
+        else:
+            self._ssthresh = self._mSrc.deflate_window(self._cwnd, self._mss)
+        self._past_cwnd = self._cwnd
+
+    def receivePacket(self, pkt) -> None:
+        self._pkts_seen += 1
+        if hasattr(pkt, 'flags') and (pkt.flags() & ECN_ECHO):
+            self._pkts_marked += 1
+            if self._ssthresh > self._cwnd:
+                self._ssthresh = self._cwnd
+        if self._pkts_seen * self._mss >= self._past_cwnd:
+            if self._pkts_seen > 0:
+                f = self._pkts_marked / self._pkts_seen
+            else:
+                f = 0.0
+            self._alfa = (15.0 / 16.0) * self._alfa + (1.0 / 16.0) * f
+            self._pkts_seen = 0
+            self._pkts_marked = 0
+            if self._alfa > 0:
+                self._cwnd = int(self._cwnd * (1 - self._alfa / 2))
+                if self._cwnd < self._mss:
+                    self._cwnd = self._mss
+                self._ssthresh = self._cwnd
+            self._past_cwnd = self._cwnd
+        # 跳过 DCTCPSrc 的新实现，直接到 TcpSrc
+        super(DCTCPSrc, self).receivePacket(pkt)
+
+
+class _Traced:
+    """每个ACK之后记录 (时间, cwnd, ssthresh, alfa)"""
+
+    def receivePacket(self, pkt) -> None:
+        super().receivePacket(pkt)
+        self.trace.append((self._eventlist.now(), self._cwnd, self._ssthresh, self._alfa))
+
+
+class TracedDCTCPSrc(_Traced, DCTCPSrc):
+    pass
+
+
+class TracedLegacyDCTCPSrc(_Traced, LegacyDCTCPSrc):
+    pass
+
+
+class _NullTcp(TcpSrc):
+    """
+    代替 TcpSrc.receivePacket，只留下 DCTCP 自己的逐ACK工作
+
+    窗口固定为 --cwnd 个包（每次收缩后恢复），观察窗口的长度与真实流相近。
+    """
+
+    cwnd = 32 * PKT
+
+    def receivePacket(self, pkt) -> None:
+        self._cwnd = self.cwnd
+
+
+class IsolatedDCTCPSrc(DCTCPSrc, _NullTcp):
+    pass
+
+
+class IsolatedLegacyDCTCPSrc(LegacyDCTCPSrc, _NullTcp):
+    pass
+
+
+class IsolatedDispatch(DCTCPSrc, _NullTcp):
+    """只有方法调用和 super() 转发，作为扣除的基线"""
+
+    def receivePacket(self, pkt) -> None:
+        super(DCTCPSrc, self).receivePacket(pkt)
+
+
+class EcnEcho(PacketSink):
+    """反向路由上的一跳: 把 TcpSink 回显的标志翻译成 ECN_ECHO"""
+
+    def receivePacket(self, pkt, previousHop=None) -> None:
+        if pkt._flags & SINK_ECHO:
+            pkt.set_flags(pkt._flags | ECN_ECHO)
+        pkt.sendOn()
+
+    def nodename(self) -> str:
+        return "ecn_echo"
+
+
+def fresh_eventlist() -> EventList:
+    # EventList 是单例；清空 ID 映射，释放上一次运行的组件
+    EventList.reset()
+    Logged._logged_manager = LoggedManager()
+    gc.collect()
+    return EventList()
+
+
+def route(*hops) -> Route:
+    r = Route()
+    for hop in hops:
+        r.push_back(hop)
+    return r
+
+
+def simulate(eventlist, srcs) -> float:
+    start = time.time()
+    # TcpSrc 每次超时重传都打印一行
+    with contextlib.redirect_stdout(io.StringIO()):
+        while eventlist.do_next_event():
+            pass
+    return time.time() - start
+
+
+def dumbbell(cls, use_table: bool, args):
+    """返回 (每流轨迹, 墙钟时间)"""
+    random.seed(args.seed)
+    eventlist = fresh_eventlist()
+    eventlist.set_endtime(args.end_ms * 10**9)
+    table = FlowStateTable() if use_table else None
+    scanner = TcpRtxTimerScanner(10**9, eventlist)
+    bottleneck = ECNQueue(LINK_BPS, PKT * 100, eventlist, marking_threshold=PKT * 20)
+    srcs = []
+    for i in range(args.flows):
+        src, sink = cls(None, None, eventlist, flow_table=table), DCTCPSink()
+        src.trace = []
+        out = route(Queue(LINK_BPS, PKT * 100, eventlist), Pipe(RTT_PS // 4, eventlist),
+                    bottleneck, Pipe(RTT_PS // 4, eventlist), sink)
+        back = route(Queue(LINK_BPS, PKT * 100, eventlist), Pipe(RTT_PS // 2, eventlist),
+                     EcnEcho(), src)
+        src.connect(out, back, sink, i * 10**6)
+        scanner.registerTcp(src)
+        srcs.append(src)
+    wall = simulate(eventlist, srcs)
+    return [s.trace for s in srcs], wall
+
+
+def fattree(cls, use_table: bool, args):
+    """返回 (每流轨迹, 墙钟时间)"""
+    random.seed(args.seed)
+    eventlist = fresh_eventlist()
+    eventlist.set_endtime(args.end_ms * 10**9)
+    k = args.k
+    for tier in range(3):
+        FatTreeTopology.set_tier_parameters(tier, k // 2, k // 2 if tier < 2 else k,
+                                            PKT * 60, PKT * 60, 1, LINK_BPS, 1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        topo = FatTreeTopology(k ** 3 // 4, LINK_BPS, PKT * 60, None, eventlist, None,
+                               QueueType.ECN)
+    hosts = topo.no_of_nodes()
+    rng = random.Random(args.seed)
+    table = FlowStateTable() if use_table else None
+    scanner = TcpRtxTimerScanner(10**9, eventlist)
+    # 主机发送端的 FairPriorityQueue 换成普通 Queue，其余各跳用拓扑的 ECN 队列
+    nics = [Queue(LINK_BPS, PKT * 100, eventlist) for _ in range(hosts)]
+    srcs = []
+    for i in range(args.flows):
+        a, b = rng.sample(range(hosts), 2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            paths = topo.get_bidir_paths(a, b, True)
+        path = paths[rng.randrange(len(paths))]
+        src, sink = cls(None, None, eventlist, flow_table=table), DCTCPSink()
+        src.trace = []
+        out = route(nics[a], *path._sinklist[1:], sink)
+        back = route(nics[b], *path.reverse()._sinklist[1:], EcnEcho(), src)
+        src.connect(out, back, sink, rng.randrange(10**8))
+        scanner.registerTcp(src)
+        srcs.append(src)
+    wall = simulate(eventlist, srcs)
+    return [s.trace for s in srcs], wall
+
+
+def ack_cost(cls, acks: int, marked: float, cwnd: int) -> float:
+    """合成ACK的每ACK耗时（纳秒）"""
+    _NullTcp.cwnd = cwnd * PKT
+    src = cls(None, None, fresh_eventlist())
+    rng = random.Random(1)
+    pkts = []
+    for _ in range(1000):
+        ack = TcpAck.newpkt(src._flow, Route(), 0, 1, 0)
+        ack.set_flags(ECN_ECHO if rng.random() < marked else 0)
+        pkts.append(ack)
+    receive = src.receivePacket
+    start = time.perf_counter()
+    for _ in range(acks // len(pkts)):
+        for ack in pkts:
+            receive(ack)
+    return (time.perf_counter() - start) / acks * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DCTCP ACK path benchmark")
+    parser.add_argument("--flows", type=int, default=16)
+    parser.add_argument("--end-ms", type=int, default=50)
+    parser.add_argument("-k", type=int, default=4, help="Fat-tree arity")
+    parser.add_argument("--acks", type=int, default=1000000, help="Synthetic ACKs for timing")
+    parser.add_argument("--marked", type=float, default=0.1, help="Marked fraction of synthetic ACKs")
+    parser.add_argument("--cwnd", type=int, default=32, help="Window of the synthetic flow (packets)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # ECNQueue 按包的 ECN 属性打标记，TcpSink 检查 0x08
+    TcpPacket.ECN = ECN_CE
+
+    ok = True
+    for name, scenario in (("dumbbell", dumbbell), ("fattree", fattree)):
+        for use_table in (False, True):
+            legacy, legacy_wall = scenario(TracedLegacyDCTCPSrc, use_table, args)
+            new, new_wall = scenario(TracedDCTCPSrc, use_table, args)
+            acks = sum(len(t) for t in new)
+            cuts = sum(1 for t in new for a, b in zip(t, t[1:]) if b[1] < a[1])
+            same = legacy == new
+            ok = ok and same and acks > 0 and cuts > 0
+            label = "table" if use_table else "plain"
+            print(f"{name:8} {label}: {acks:7d} ACKs, {cuts:5d} cwnd cuts, "
+                  f"legacy {legacy_wall:6.2f} s, new {new_wall:6.2f} s, "
+                  f"cwnd trajectories identical: {same}")
+
+    costs = {}
+    for name, cls in (("dispatch", IsolatedDispatch), ("legacy", IsolatedLegacyDCTCPSrc),
+                      ("new", IsolatedDCTCPSrc)):
+        costs[name] = min(ack_cost(cls, args.acks, args.marked, args.cwnd) for _ in range(3))
+    legacy_ns = costs["legacy"] - costs["dispatch"]
+    new_ns = costs["new"] - costs["dispatch"]
+    print(f"DCTCP per-ACK work ({args.marked:.0%} marked, cwnd {args.cwnd} packets, "
+          f"excluding {costs['dispatch']:.0f} ns call overhead): legacy {legacy_ns:6.1f} ns, "
+          f"new {new_ns:6.1f} ns ({legacy_ns / max(new_ns, 1e-9):.1f}x)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Sys事件队列基准测试 - 堆序 EventQueue vs 旧的 dict-of-lists 事件表
+
+1. 端到端：生成 --layers 层的合成工作负载（每层都有前向/输入梯度/权重梯度计算，
+   每 --comm-every 层一个小 ALLREDUCE），在分析后端上运行；每层产生多个 Sys 事件
+   （Workload_Wait、General 等），事件注册和分发是主要负载。分别用两种事件表运行，
+   每种在单独的子进程中（分析后端的单例不能在同一进程中重建）:
+   - legacy: 旧实现（本文件中的参考实现）: dict 按 tick 存列表，注册时写 INFO 日志，
+     分发时复制当前 tick 的列表，分发期间登记到同一 tick 的事件被丢弃，只分发恰好
+     等于当前 tick 的桶
+   - heap:   system.event_queue.EventQueue
+   打印 AnaSim.Run 的耗时、分发的事件数、事件/秒和结束 tick，并检查两次运行分发的
+   事件数和结束 tick 一致
+2. 队列本身：在单个队列上重复注册/分发，比较两种实现的纯数据结构吞吐
+
+用法:
+    python examples/event_queue_benchmark.py [--layers 2000] [--comm-every 4] [-g 8]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from system.callable import Callable
+from system.common import EventType
+from system.event_queue import EventQueue
+from system.mock_nccl_log import MockNcclLog, NcclLogLevel
+
+
+class LegacyEventQueue:
+    """修改前 Sys.event_queue 的 dict-of-lists，接口与 EventQueue 相同"""
+
+    def __init__(self, preallocate: int = 0):
+        self.buckets: Dict[int, List[Tuple]] = {}
+        self.events_dispatched = 0
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def __contains__(self, tick: int) -> bool:
+        return tick in self.buckets
+
+    def push(self, tick, callable_obj, event, data) -> bool:
+        # 旧 try_register_event 每次注册都写一条 INFO 日志
+        log = MockNcclLog.getInstance()
+        log.writeLog(NcclLogLevel.INFO, f"try_register_event EventType {event} at tick {tick}")
+        first = tick not in self.buckets
+        if first:
+            self.buckets[tick] = []
+        self.buckets[tick].append((callable_obj, event, data))
+        return first
+
+    def next_tick(self):
+        return min(self.buckets) if self.buckets else None
+
+    def dispatch(self, tick) -> int:
+        if tick not in self.buckets:
+            return 0
+        events_to_process = self.buckets[tick][:]
+        for callable_obj, event, call_data in events_to_process:
+            try:
+                callable_obj.call(event, call_data)
+            except Exception as e:
+                print(f"Warning! a callable is removed before call: {e}")
+        if tick in self.buckets:
+            del self.buckets[tick]
+        self.events_dispatched += len(events_to_process)
+        return len(events_to_process)
+
+
+class CountingCallable(Callable):
+    """只计数的回调对象"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def call(self, event_type, data):
+        self.calls += 1
+
+
+def write_workload(path: str, layers: int, comm_every: int, gpus: int) -> None:
+    """写出合成工作负载: 每层三段计算，每 comm_every 层一个 64KB ALLREDUCE"""
+    lines = [f"HYBRID_TRANSFORMER_FWD_IN_BCKWD model_parallel_NPU_group: {gpus} ep: 1 pp: 1 "
+             f"vpp: 8 ga: 1 all_gpus: {gpus} checkpoints: 0 checkpoint_initiates: 0",
+             str(layers)]
+    for i in range(layers):
+        comm = "ALLREDUCE 65536" if comm_every and i % comm_every == 0 else "NONE 0"
+        lines.append(f"layer{i} -1 1000 {comm} 1000 NONE 0 1000 NONE 0 1")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def run_analytical(mode: str, workload: str, gpus: int, gpus_per_server: int) -> None:
+    """子进程: 用指定事件表运行分析后端，最后一行打印结果"""
+    import system.sys as sys_module
+    from network_frontend.analytical.analytical_astra import main as analytical_main
+    from network_frontend.analytical.ana_sim import AnaSim
+
+    if mode == "legacy":
+        sys_module.EventQueue = LegacyEventQueue
+
+    args = argparse.Namespace(
+        workload=workload, gpus=gpus, result="event_queue_benchmark",
+        gpus_per_server=gpus_per_server, gpu_type="A100", comm_scale=1.0)
+
+    # 只统计AnaSim.Run的耗时，不含Sys初始化和工作负载解析
+    run = AnaSim.Run
+    timings = []
+    end_tick = []
+
+    def timed_run(*a, **kw):
+        start = time.perf_counter()
+        run(*a, **kw)
+        timings.append(time.perf_counter() - start)
+        end_tick.append(AnaSim._tick)
+
+    AnaSim.Run = timed_run
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytical_main(args)
+    finally:
+        AnaSim.Run = run
+    events = sum(s.event_queue.events_dispatched
+                 for s in sys_module.Sys.all_generators if s is not None)
+    print(f"RESULT {events} {sum(timings)} {end_tick[-1]}", flush=True)
+    # 跳过解释器退出时 Workload/CSVWriter 的析构输出
+    os._exit(0)
+
+
+def bench_analytical(args) -> bool:
+    """在子进程中分别用两种事件表运行，比较结果"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workload = os.path.join(tmp, "synthetic.txt")
+        write_workload(workload, args.layers, args.comm_every, args.gpus)
+        for mode in ("legacy", "heap"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run", mode, "-w", workload,
+                 "-g", str(args.gpus), "-g_p_s", str(args.gpus_per_server)],
+                cwd=tmp, capture_output=True, text=True)
+            line = [l for l in out.stdout.splitlines() if l.startswith("RESULT ")]
+            if not line:
+                print(f"{mode}: run failed\n{out.stderr[-2000:]}")
+                return False
+            _, events, elapsed, end = line[-1].split()
+            results[mode] = (int(events), float(elapsed), int(end))
+            events, elapsed, end = results[mode]
+            print(f"analytical {mode:>6} ({args.layers} layers, {args.gpus} NPUs): "
+                  f"{events} events in {elapsed:.3f} s, {events / elapsed:,.0f} events/s, "
+                  f"end tick {end}")
+    legacy, heap = results["legacy"], results["heap"]
+    same = legacy[0] == heap[0] and legacy[2] == heap[2]
+    print(f"  same events and end tick: {same}, "
+          f"AnaSim.Run {legacy[1] / max(heap[1], 1e-9):.2f}x faster")
+    return same
+
+
+def bench_queue(queue_cls, rounds: int, events_per_tick: int) -> float:
+    """在单个队列上测量注册+分发的吞吐（事件/秒）"""
+    queue = queue_cls()
+    target = CountingCallable()
+
+    start = time.perf_counter()
+    for tick in range(rounds):
+        for _ in range(events_per_tick):
+            queue.push(tick, target, EventType.General, None)
+        queue.dispatch(tick)
+    elapsed = time.perf_counter() - start
+
+    total = rounds * events_per_tick
+    assert target.calls == total
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sys event queue benchmark")
+    parser.add_argument("--layers", type=int, default=2000)
+    parser.add_argument("--comm-every", type=int, default=4,
+                        help="One ALLREDUCE every N layers, 0 for none")
+    parser.add_argument("-g", "--gpus", type=int, default=8)
+    parser.add_argument("-g_p_s", "--gpus-per-server", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=100000)
+    parser.add_argument("--events-per-tick", type=int, default=8)
+    parser.add_argument("-w", "--workload", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--run", choices=("legacy", "heap"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_analytical(args.run, args.workload, args.gpus, args.gpus_per_server)
+        return
+
+    ok = bench_analytical(args)
+    rates = {}
+    for name, cls in (("legacy", LegacyEventQueue), ("heap", EventQueue)):
+        # 旧实现注册时取 MockNcclLog 单例，未设置日志文件时会打印提示
+        with contextlib.redirect_stdout(io.StringIO()):
+            rates[name] = bench_queue(cls, args.rounds, args.events_per_tick)
+        print(f"{name:>6} queue push+dispatch: {rates[name]:,.0f} events/s")
+    print(f"  queue alone {rates['heap'] / rates['legacy']:.2f}x faster")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+列式流状态表检查 - TcpSrc/DCTCPSrc/MPTCP 接入 FlowStateTable 前后结果一致，并对比内存与扫描开销
+
+1. 一致性: TCP、DCTCP 流共享一个 ECN 瓶颈队列，另有一个 COUPLED_INC 的 MPTCP 连接
+   的两条子流各走一个瓶颈，分别用普通对象和流状态表各跑一次，
+   比较结束时间、事件数和每条流的最终状态，以及 MPTCP 的 a 参数和总窗口
+2. 内存: tracemalloc 统计创建 --flows 个 TcpSrc 的新增内存（每流字节数）
+3. 重传扫描: --flows 条流登记到 TcpRtxTimerScanner，其中 --due 条流的定时器到期，
+   计时第一次扫描事件
+4. 分组聚合: --flows/2 个双子流 MPTCP 连接，逐连接 compute_* 与
+   FlowStateTable.group_* 的耗时和结果
+5. 逐包开销: 第 1 步两次仿真的墙钟时间之比
+
+用法:
+    python examples/flow_state_table_check.py [--flows 100000] [--end-ms 200]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from network_frontend.htsimpy.core.eventlist import EventList
+from network_frontend.htsimpy.core.logger.core import Logged, LoggedManager
+from network_frontend.htsimpy.core.pipe import Pipe
+from network_frontend.htsimpy.core.route import Route
+from network_frontend.htsimpy.protocols import (
+    COUPLED_INC, DCTCPSrc, DCTCPSink, FlowStateTable,
+    MultipathTcpSink, MultipathTcpSrc, TcpRtxTimerScanner, TcpSink, TcpSrc,
+)
+from network_frontend.htsimpy.protocols import multipath_tcp
+from network_frontend.htsimpy.protocols.multipath_tcp import A_SCALE, CppCompatibleRandom
+from network_frontend.htsimpy.queues.base_queue import Queue
+from network_frontend.htsimpy.queues.ecn_queue import ECNQueue
+
+LINK_BPS = 10**10
+RTT_PS = 10**7
+STATE = ("_highest_sent", "_last_acked", "_cwnd", "_ssthresh", "_rtt", "_rto", "_mdev",
+         "_drops", "_dupacks", "_in_fast_recovery", "_RFC2988_RTO_timeout")
+
+
+def fresh_eventlist() -> EventList:
+    # EventList 是单例；清空 ID 映射，释放上一次运行的组件
+    EventList.reset()
+    Logged._logged_manager = LoggedManager()
+    gc.collect()
+    return EventList()
+
+
+def route(*hops) -> Route:
+    r = Route()
+    for hop in hops:
+        r.push_back(hop)
+    return r
+
+
+def connect(src, sink, bottleneck, eventlist, start):
+    out = route(Queue(LINK_BPS, 1500 * 100, eventlist), Pipe(RTT_PS // 4, eventlist),
+                bottleneck, Pipe(RTT_PS // 4, eventlist), sink)
+    back = route(Queue(LINK_BPS, 1500 * 100, eventlist), Pipe(RTT_PS // 2, eventlist), src)
+    src.connect(out, back, sink, start)
+
+
+def dumbbell(use_table: bool, flows: int, end_ms: int):
+    """返回 (结束时间, 事件数, 每流状态, MPTCP 聚合, 墙钟时间)"""
+    random.seed(1)
+    # COUPLED_INC 的取整用模块级随机数生成器，两次运行必须从相同状态开始
+    multipath_tcp._cpp_random = CppCompatibleRandom(1)
+    eventlist = fresh_eventlist()
+    eventlist.set_endtime(end_ms * 10**9)
+    table = FlowStateTable() if use_table else None
+    scanner = TcpRtxTimerScanner(10**9, eventlist)
+    shared = ECNQueue(LINK_BPS // 4, 1500 * 60, eventlist, marking_threshold=1500 * 20)
+    srcs = []
+    for i in range(flows):
+        if i % 2:
+            src, sink = DCTCPSrc(None, None, eventlist, flow_table=table), DCTCPSink()
+        else:
+            src, sink = TcpSrc(None, None, eventlist, flow_table=table), TcpSink()
+        connect(src, sink, shared, eventlist, i * 10**6)
+        scanner.registerTcp(src)
+        srcs.append(src)
+
+    mptcp = MultipathTcpSrc(COUPLED_INC, eventlist, flow_table=table)
+    mptcp_sink = MultipathTcpSink(eventlist)
+    for bps in (LINK_BPS // 8, LINK_BPS // 16):
+        src, sink = TcpSrc(None, None, eventlist, flow_table=table), TcpSink()
+        mptcp.addSubflow(src)
+        mptcp_sink.addSubflow(sink)
+        connect(src, sink, Queue(bps, 1500 * 30, eventlist), eventlist, 0)
+        scanner.registerTcp(src)
+        srcs.append(src)
+    mptcp.connect(mptcp_sink)
+
+    events = 0
+    start = time.time()
+    # TcpSrc 每次超时重传都打印一行
+    with contextlib.redirect_stdout(io.StringIO()):
+        while eventlist.do_next_event():
+            events += 1
+    wall = time.time() - start
+    state = [tuple(getattr(s, f) for f in STATE) + (getattr(s, "_alfa", None),) for s in srcs]
+    coupled = (mptcp.compute_a_scaled(), mptcp.compute_total_window(), mptcp.compute_total_bytes())
+    if table is not None:
+        group = mptcp.flow_group()
+        vector = (table.group_a_scaled(A_SCALE)[group], int(table.group_total_window()[group]),
+                  int(table.group_total_bytes()[group]))
+        if vector != coupled:
+            print(f"  group aggregates {vector} != per-connection {coupled}")
+            coupled = None
+    return eventlist.now(), events, state, coupled, wall
+
+
+def check_identical(args) -> bool:
+    plain = dumbbell(False, args.dumbbell_flows, args.end_ms)
+    columnar = dumbbell(True, args.dumbbell_flows, args.end_ms)
+    ok = plain[:4] == columnar[:4]
+    print(f"dumbbell: {args.dumbbell_flows} TCP/DCTCP flows + 2 MPTCP subflows, "
+          f"end {plain[0]} ps, {plain[1]} events")
+    print(f"  final state {'identical' if ok else 'MISMATCH'}; "
+          f"wall {plain[4]:.2f}s plain vs {columnar[4]:.2f}s table "
+          f"({columnar[4] / max(plain[4], 1e-9):.2f}x per event)")
+    if plain[1] != columnar[1]:
+        print(f"  events {plain[1]} vs {columnar[1]}")
+    return ok
+
+
+def measure_memory(flows: int, use_table: bool):
+    eventlist = fresh_eventlist()
+    tracemalloc.start()
+    table = FlowStateTable(flows) if use_table else None
+    srcs = [TcpSrc(None, None, eventlist, flow_table=table) for _ in range(flows)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / flows, eventlist, srcs
+
+
+def scan_time(eventlist, srcs, due: int):
+    """
+    第一次扫描在 period 时刻，due 条流的定时器在此之前到期；
+    返回 (第一次扫描耗时, 到期流数, 紧接着再扫描一次的耗时)。
+    第一次扫描包含登记变化后重建行号的开销，第二次没有到期的流。
+    """
+    period = 10**9
+    scanner = TcpRtxTimerScanner(period, eventlist)
+    stride = max(1, len(srcs) // due)
+    for i, src in enumerate(srcs):
+        src._highest_sent = 1500
+        src._RFC2988_RTO_timeout = period - 1 if i % stride == 0 else period * 10
+        scanner.registerTcp(src)
+    start = time.time()
+    eventlist.do_next_event()
+    first = time.time() - start
+    fired = sum(src._rtx_timeout_pending for src in srcs)
+    start = time.time()
+    scanner.do_next_event()
+    return first, fired, time.time() - start
+
+
+def check_scale(args) -> bool:
+    results = {}
+    for use_table in (False, True):
+        label = "table" if use_table else "plain"
+        per_flow, eventlist, srcs = measure_memory(args.flows, use_table)
+        first, fired, steady = scan_time(eventlist, srcs, args.due)
+        results[label] = (per_flow, fired, steady)
+        print(f"{label:>6}: {per_flow:7.0f} B/flow, rtx scan of {args.flows} flows: "
+              f"first {first * 1e3:7.1f} ms ({fired} due), next {steady * 1e3:7.1f} ms")
+        del srcs
+    ok = results["plain"][1] == results["table"][1]
+    print(f"  memory {results['table'][0] / results['plain'][0]:.2f}x, "
+          f"steady-state scan {results['plain'][2] / max(results['table'][2], 1e-9):.1f}x faster")
+    return ok
+
+
+def check_groups(args) -> bool:
+    eventlist = fresh_eventlist()
+    table = FlowStateTable(args.flows)
+    rng = random.Random(args.seed)
+    conns = []
+    for _ in range(args.flows // 2):
+        mptcp = MultipathTcpSrc(COUPLED_INC, eventlist, flow_table=table)
+        for _ in range(2):
+            sub = TcpSrc(None, None, eventlist, flow_table=table)
+            sub._cwnd = rng.randrange(1500, 1500 * 200)
+            sub._ssthresh = rng.randrange(1500, 1500 * 200)
+            sub._in_fast_recovery = rng.random() < 0.1
+            sub._rtt = rng.randrange(10**6, 10**9)
+            sub._last_acked = rng.randrange(1 << 40)
+            mptcp.addSubflow(sub)
+        conns.append(mptcp)
+
+    start = time.time()
+    loop = ([m.compute_total_window() for m in conns], [m.compute_total_bytes() for m in conns],
+            [m.compute_a_scaled() for m in conns])
+    loop_time = time.time() - start
+    start = time.time()
+    vector = (table.group_total_window().tolist(), table.group_total_bytes().tolist(),
+              table.group_a_scaled(A_SCALE))
+    vector_time = time.time() - start
+    ok = loop == vector
+    print(f"groups: {len(conns)} MPTCP connections, per-connection {loop_time * 1e3:.1f} ms, "
+          f"vectorized {vector_time * 1e3:.1f} ms, results {'identical' if ok else 'MISMATCH'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar flow state table check")
+    parser.add_argument("--flows", type=int, default=100000)
+    parser.add_argument("--due", type=int, default=100, help="Flows whose RTO has expired in the scan")
+    parser.add_argument("--dumbbell-flows", type=int, default=8)
+    parser.add_argument("--end-ms", type=int, default=200, help="Dumbbell simulated time (ms)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    ok = check_identical(args)
+    ok = check_scale(args) and ok
+    ok = check_groups(args) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
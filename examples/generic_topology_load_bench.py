@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+GenericTopology 加载基准 - 文本解析 vs 编译后的二进制拓扑文件
+
+生成一个叶脊（leaf-spine）拓扑文本文件: --leaves 个叶交换机、--spines 个脊交换机、
+每个叶交换机 --hosts 台主机，每条链路一对队列+管道；每台主机到 --peers 个随机
+目的主机各有经过每个脊交换机的一条路由。依次计时:
+1. text:     关闭缓存，仅解析文本
+2. compile:  解析文本并写出编译文件（第一次加载）
+3. compiled: 内存映射编译文件，一遍构造对象（之后的加载）
+并检查三次加载得到的主机、交换机、队列、管道（名称和参数）以及每条路由的
+元素序列和跳数完全一致。
+
+用法:
+    python examples/generic_topology_load_bench.py [--leaves 64] [--spines 16] [--hosts 16] [--peers 4]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from network_frontend.htsimpy.core.eventlist import EventList
+from network_frontend.htsimpy.core.logger.core import Logged, LoggedManager
+from network_frontend.htsimpy.datacenter import CompiledTopology, GenericTopology
+
+
+def fresh_eventlist() -> EventList:
+    # EventList 是单例；清空 ID 映射，释放上一次运行的组件
+    EventList.reset()
+    Logged._logged_manager = LoggedManager()
+    gc.collect()
+    return EventList()
+
+
+def write_topology(path: str, args) -> int:
+    """写出拓扑文本文件，返回链路数"""
+    rng = random.Random(args.seed)
+    hosts = args.leaves * args.hosts
+    lines = ["# leaf-spine topology for generic_topology_load_bench"]
+    links = 0
+
+    def link(name, rate):
+        nonlocal links
+        links += 1
+        lines.append(f"queue q_{name} {rate} 100KB")
+        lines.append(f"pipe p_{name} 1us")
+
+    for h in range(hosts):
+        lines.append(f"host h{h}")
+    for leaf in range(args.leaves):
+        lines.append(f"switch leaf{leaf}")
+    for spine in range(args.spines):
+        lines.append(f"switch spine{spine}")
+    for h in range(hosts):
+        link(f"h{h}_up", "100Gbps")
+        link(f"h{h}_down", "100Gbps")
+    for leaf in range(args.leaves):
+        for spine in range(args.spines):
+            link(f"l{leaf}_s{spine}", "400Gbps")
+            link(f"s{spine}_l{leaf}", "400Gbps")
+    for h in range(hosts):
+        src_leaf = h // args.hosts
+        for dst in rng.sample([d for d in range(hosts) if d // args.hosts != src_leaf], args.peers):
+            dst_leaf = dst // args.hosts
+            for spine in range(args.spines):
+                lines.append(f"route h{h} h{dst} q_h{h}_up p_h{h}_up leaf{src_leaf} "
+                             f"q_l{src_leaf}_s{spine} p_l{src_leaf}_s{spine} spine{spine} "
+                             f"q_s{spine}_l{dst_leaf} p_s{spine}_l{dst_leaf} leaf{dst_leaf} "
+                             f"q_h{dst}_down p_h{dst}_down")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return links
+
+
+def snapshot(topo: GenericTopology):
+    """按名称和参数描述拓扑，路由元素用对象在拓扑中的序号表示"""
+    index = {}
+    for kind, objs in (("host", topo._hosts), ("switch", topo._switches),
+                       ("queue", topo._queues), ("pipe", topo._pipes)):
+        for i, obj in enumerate(objs):
+            index[id(obj)] = (kind, i)
+    objects = ([(h._nodename, h.get_host_id()) for h in topo._hosts],
+               [s._name for s in topo._switches],
+               [(type(q).__name__, q._name, q._bitrate, q._maxsize) for q in topo._queues],
+               [(p._name, p._delay) for p in topo._pipes])
+    routes = {key: [([index[id(e)] for e in r._sinklist], r.hop_count()) for r in rs]
+              for key, rs in topo._routes.items()}
+    return objects, routes
+
+
+def timed_load(path: str, use_cache: bool):
+    topo = GenericTopology(None, fresh_eventlist(), use_cache=use_cache)
+    start = time.time()
+    ok = topo.load(path)
+    elapsed = time.time() - start
+    return ok, elapsed, snapshot(topo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GenericTopology load benchmark")
+    parser.add_argument("--leaves", type=int, default=64)
+    parser.add_argument("--spines", type=int, default=16)
+    parser.add_argument("--hosts", type=int, default=16, help="Hosts per leaf")
+    parser.add_argument("--peers", type=int, default=4, help="Destinations per host")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leaf_spine.topo")
+        links = write_topology(path, args)
+        size = os.path.getsize(path)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            text = timed_load(path, use_cache=False)
+            first = timed_load(path, use_cache=True)
+            compiled = timed_load(path, use_cache=True)
+        cache_size = os.path.getsize(CompiledTopology.cache_path(path))
+
+    routes = sum(len(rs) for rs in text[2][1].values())
+    print(f"{links} links, {routes} routes: text file {size / 1e6:.1f} MB, "
+          f"compiled file {cache_size / 1e6:.1f} MB")
+    print(f"  text:     {text[1]:7.2f} s")
+    print(f"  compile:  {first[1]:7.2f} s (text + write compiled file)")
+    print(f"  compiled: {compiled[1]:7.2f} s ({text[1] / max(compiled[1], 1e-9):.1f}x faster than text)")
+    ok = text[0] and first[0] and compiled[0] and text[2] == first[2] == compiled[2]
+    print(f"  topologies identical: {ok}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+并行仿真一致性检查 - FatTree 按 pod 分区，1/2/4/8 个工作进程的结果必须与串行运行完全一致
+
+k 元 FatTree 上每个主机向下一个 pod 的对应主机发一条 TCP 流（全部跨 pod），
+交换机队列使用确定性的 FIFO 队列。先在子进程中用同一个建图函数做串行运行
+（装上 CanonicalScheduler 后 while EventList.do_next_event()，不经过
+run_parallel），再用各进程数并行运行，
+比较各流最终的 last_acked/cwnd/ssthresh、各队列丢包数和结束时间，并打印每种
+进程数的窗口数、跨分区包数、墙钟时间和关键路径（各窗口最慢进程的 CPU 时间
+之和，即每个进程独占一个核时的运行时间）。加速比相对串行运行的墙钟时间和
+事件循环 CPU 时间；核数少于进程数时只有关键路径有意义。
+
+--scenario bulk 用 10us 链路延迟（前瞻量）和 2MB 的流，每个窗口的事件多，
+屏障同步和邮箱序列化的开销被摊薄。
+
+用法:
+    python examples/pdes_fat_tree_check.py [--scenario check|bulk] [-k 8] [--workers 1 2 4 8]
+                                           [--flowsize 100000] [--latency 1000000]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from network_frontend.htsimpy.core.eventlist import EventList
+from network_frontend.htsimpy.core.route import Route
+from network_frontend.htsimpy.core.pdes import CanonicalScheduler, WorkerContext, run_parallel
+from network_frontend.htsimpy.datacenter.constants import QueueType
+from network_frontend.htsimpy.datacenter.fat_tree_partition import pod_partition
+from network_frontend.htsimpy.datacenter.fat_tree_topology import FatTreeTopology
+from network_frontend.htsimpy.protocols.tcp import TcpSrc, TcpSink, TcpRtxTimerScanner
+from network_frontend.htsimpy.queues.base_queue import Queue
+
+LINK_SPEED = 10**10
+QUEUE_BYTES = 100 * 1500
+
+
+def make_build(k: int, flowsize: int, endtime: int, latency: int):
+    def build(workers):
+        # 只在子进程中调用: 丢掉 TcpSrc 超时重传时打印的状态
+        sys.stdout = open(os.devnull, "w")
+        eventlist = EventList()
+        eventlist.set_endtime(endtime)
+        for tier in range(3):
+            FatTreeTopology.set_tier_parameters(tier, k // 2, k // 2 if tier < 2 else k,
+                                                QUEUE_BYTES, QUEUE_BYTES, 1, LINK_SPEED, 1)
+        topo = FatTreeTopology(k ** 3 // 4, LINK_SPEED, QUEUE_BYTES, None, eventlist, None,
+                               QueueType.UNDEFINED, latency=latency,
+                               sender_queue_type=QueueType.PRIORITY)
+        partition = pod_partition(topo, workers)
+        hosts = k ** 3 // 4
+        hosts_per_pod = k * k // 4
+
+        # 主机发送队列替换为 FIFO，归主机所在的分区
+        host_queues = []
+        for h in range(hosts):
+            q = Queue(LINK_SPEED, 1500 * 1000, eventlist)
+            partition.assign(q, partition.owner(topo.get_host(h)))
+            host_queues.append(q)
+
+        srcs, sinks = [], []
+        for i in range(hosts):
+            dst = (i + hosts_per_pod) % hosts
+            paths = topo.get_bidir_paths(i, dst, True)
+            path = paths[i % len(paths)]
+            src, sink = TcpSrc(None, None, eventlist), TcpSink()
+            src.set_flowsize(flowsize)
+            out = Route()
+            out.push_back(host_queues[i])
+            for j in range(1, path.size()):
+                out.push_back(path.at(j))
+            out.push_back(sink)
+            rev = path.reverse()
+            back = Route()
+            back.push_back(host_queues[dst])
+            for j in range(1, rev.size()):
+                back.push_back(rev.at(j))
+            back.push_back(src)
+            src.connect(out, back, sink, 0)
+            partition.assign(src, partition.owner(topo.get_host(i)))
+            partition.assign(sink, partition.owner(topo.get_host(dst)))
+            srcs.append(src)
+            sinks.append(sink)
+
+        # 超时扫描器每个分区一个，只扫描本分区的流；最后创建，不改变其他组件的 ID 顺序
+        for w in range(workers):
+            scanner = TcpRtxTimerScanner(10**8, eventlist)
+            partition.assign(scanner, w)
+            for src in srcs:
+                if partition.owner(src) == w:
+                    scanner.registerTcp(src)
+
+        queues = [obj for obj in partition.objects() if isinstance(obj, Queue)]
+        return partition, (srcs, queues)
+    return build
+
+
+def collect(roots, ctx):
+    srcs, queues = roots
+    flows = {i: (s._last_acked, s._cwnd, s._ssthresh) for i, s in enumerate(srcs) if ctx.owns(s)}
+    drops = {q._name: q._num_drops for q in queues if ctx.owns(q) and q._num_drops}
+    return flows, drops
+
+
+def merge(results):
+    flows, drops = {}, {}
+    for worker_flows, worker_drops in results:
+        flows.update(worker_flows)
+        drops.update(worker_drops)
+    return sorted(flows.items()), sorted(drops.items())
+
+
+def serial_main(build, results) -> None:
+    EventList.reset()
+    CanonicalScheduler().install(EventList)
+    partition, roots = build(1)
+    events = 0
+    start = time.process_time()
+    while EventList.do_next_event():
+        events += 1
+    cpu = time.process_time() - start
+    results.put((EventList.now(), events, cpu, collect(roots, WorkerContext(0, 1, partition))))
+
+
+def run_serial(build):
+    """在子进程中做普通的串行运行，不影响之后 fork 出的工作进程"""
+    ctx = mp.get_context("fork")
+    results = ctx.SimpleQueue()
+    start = time.time()
+    proc = ctx.Process(target=serial_main, args=(build, results))
+    proc.start()
+    now, events, cpu, value = results.get()
+    proc.join()
+    elapsed = time.time() - start
+    return (now,) + merge([value]), events, cpu, elapsed
+
+
+def run(build, workers: int):
+    start = time.time()
+    result = run_parallel(build, workers, collect)
+    elapsed = time.time() - start
+    return (result.now,) + merge(result.results), result, elapsed
+
+
+# 预设场景: check 为一致性检查；bulk 每个窗口的事件多，屏障和邮箱的开销被摊薄，
+# 用来看并行的收益
+SCENARIOS = {
+    "check": dict(k=8, flowsize=100000, endtime=5 * 10**9, latency=10**6),
+    "bulk": dict(k=8, flowsize=2 * 10**6, endtime=20 * 10**9, latency=10 * 10**6),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitioned parallel run consistency check")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="check")
+    parser.add_argument("-k", type=int, help="Fat-tree arity (k pods)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--flowsize", type=int)
+    parser.add_argument("--endtime", type=int, help="Simulation end (ps)")
+    parser.add_argument("--latency", type=int, help="Link latency (ps), the lookahead")
+    args = parser.parse_args()
+    for name, value in SCENARIOS[args.scenario].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+
+    build = make_build(args.k, args.flowsize, args.endtime, args.latency)
+    reference, events, serial_cpu, serial = run_serial(build)
+    print(f"serial:    events={events} end={reference[0]} wall={serial:.2f}s "
+          f"event loop={serial_cpu:.2f}s")
+    ok = True
+    for workers in args.workers:
+        outcome, result, elapsed = run(build, workers)
+        same = outcome == reference
+        ok = ok and same
+        critical = result.critical_path
+        print(f"workers={workers}: events={result.events} windows={result.windows} "
+              f"cross-partition packets={result.messages} end={result.now} "
+              f"wall={elapsed:.2f}s ({serial / elapsed:.2f}x) "
+              f"critical path={critical:.2f}s ({serial_cpu / max(critical, 1e-9):.2f}x) "
+              f"-> {'OK' if same else 'MISMATCH'}")
+    done = sum(1 for _, (acked, _, _) in reference[1] if acked >= args.flowsize)
+    print(f"{done}/{len(reference[1])} flows complete, {len(reference[2])} queues dropped packets, "
+          f"{os.cpu_count()} CPUs")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
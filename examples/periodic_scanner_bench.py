@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+周期扫描器基准 - FirstFit 与 SubflowControl 的向量化扫描 vs 逐流扫描
+
+k 元 FatTree 上生成 --flows 条 TCP 流（FirstFit）和 --flows/2 个单子流 MPTCP 连接
+（SubflowControl），运行 --scans 个扫描周期:
+- FirstFit: 每个周期只有 --active 比例的流越过阈值（分配路径），其余流没有进展
+  （已分配的在下一周期释放）
+- SubflowControl: 每个周期所有连接都有进展，只有 --active 比例的连接停滞
+  （低于阈值，增加子流直到 max_subflows）
+
+对比三种扫描:
+1. legacy: 旧实现的逐流循环（本文件中的参考实现，与修改前的 run() 相同）
+2. plain:  新实现，源端为普通对象（字节数逐流读取，阈值比较向量化）
+3. table:  新实现，源端接入 FlowStateTable（字节数也向量化读取）
+打印每次扫描的平均耗时（不含驱动流进展的时间），并检查三种方式
+每个周期后的分配标志、路由、队列分配数和子流选择完全一致。
+
+用法:
+    python examples/periodic_scanner_bench.py [--flows 100000] [--scans 10] [--active 0.01] [-k 8]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from network_frontend.htsimpy.core.eventlist import EventList
+from network_frontend.htsimpy.core.logger.core import Logged, LoggedManager
+from network_frontend.htsimpy.datacenter import FirstFit, SubflowControl, FatTreeTopology
+from network_frontend.htsimpy.datacenter.constants import QueueType
+from network_frontend.htsimpy.protocols import (
+    COUPLED_INC, FlowStateTable, MultipathTcpSrc, TcpSink, TcpSrc,
+)
+from network_frontend.htsimpy.queues.base_queue import BaseQueue
+
+LINK_SPEED = 10**10
+QUEUE_BYTES = 100 * 1500
+SCAN_PERIOD = 10**10  # 10ms
+
+
+def legacy_firstfit_run(ff: FirstFit, allocations: dict) -> None:
+    """修改前的 FirstFit.run()，队列分配数记在 allocations 中"""
+    for tcp_src, flow_entry in ff.flow_counters.items():
+        delta = tcp_src._last_acked - flow_entry.byte_counter
+        if flow_entry.allocated and delta < ff.threshold:
+            flow_entry.allocated = 0
+            if flow_entry.route:
+                for i in range(1, len(flow_entry.route._sinklist), 2):
+                    element = flow_entry.route._sinklist[i]
+                    if isinstance(element, BaseQueue) and element in allocations:
+                        allocations[element] -= 1
+    for tcp_src, flow_entry in ff.flow_counters.items():
+        current_counter = tcp_src._last_acked
+        delta = current_counter - flow_entry.byte_counter
+        flow_entry.byte_counter = current_counter
+        if delta < 0:
+            flow_entry.byte_counter = 0
+            delta = current_counter
+        if not flow_entry.allocated and delta > ff.threshold:
+            best_route_idx, best_cost = -1, 10000000
+            paths = ff.net_paths[flow_entry.src][flow_entry.dest]
+            for p, route in enumerate(paths):
+                current_cost = 0
+                for i in range(1, len(route._sinklist), 2):
+                    element = route._sinklist[i]
+                    if isinstance(element, BaseQueue):
+                        current_cost = max(current_cost, allocations.get(element, 0))
+                if current_cost < best_cost:
+                    best_cost, best_route_idx = current_cost, p
+            if best_route_idx >= 0:
+                flow_entry.allocated = 1
+                new_route = paths[best_route_idx]
+                tcp_src.replace_route(new_route)
+                flow_entry.route = new_route
+                for i in range(1, len(new_route._sinklist), 2):
+                    element = new_route._sinklist[i]
+                    if isinstance(element, BaseQueue):
+                        allocations[element] = allocations.get(element, 0) + 1
+
+
+def legacy_subflow_run(ctrl: SubflowControl) -> None:
+    """修改前的 SubflowControl.run()"""
+    ctrl._total_scans += 1
+    for mtcp, entry in ctrl._flow_counters.items():
+        current_counter = mtcp.compute_total_bytes()
+        delta = current_counter - entry.byte_counter
+        counts = entry.byte_counter != 0
+        entry.byte_counter = current_counter
+        if (counts and delta < ctrl._threshold and len(entry.subflows) < ctrl._max_subflows and
+                len(entry.subflows) < len(ctrl._net_paths.get(entry.src, {}).get(entry.dest, []))):
+            ctrl._add_new_subflow(mtcp, entry)
+            ctrl._counters.column("subflows")[entry._counter_row] = len(entry.subflows)
+
+
+def fresh_eventlist() -> EventList:
+    # EventList 是单例；清空 ID 映射，释放上一次运行的组件
+    EventList.reset()
+    Logged._logged_manager = LoggedManager()
+    gc.collect()
+    return EventList()
+
+
+def build_paths(k: int, flows: int, seed: int):
+    """返回 (主机数, 每条流的 (src, dst), (src, dst) -> 路径列表)"""
+    eventlist = fresh_eventlist()
+    for tier in range(3):
+        FatTreeTopology.set_tier_parameters(tier, k // 2, k // 2 if tier < 2 else k,
+                                            QUEUE_BYTES, QUEUE_BYTES, 1, LINK_SPEED, 1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        topo = FatTreeTopology(k ** 3 // 4, LINK_SPEED, QUEUE_BYTES, None, eventlist, None,
+                               QueueType.UNDEFINED)
+    hosts = topo.no_of_nodes()
+    rng = random.Random(seed)
+    peers = [rng.sample([d for d in range(hosts) if d != h], 2) for h in range(hosts)]
+    pairs = []
+    for _ in range(flows):
+        src = rng.randrange(hosts)
+        pairs.append((src, rng.choice(peers[src])))
+    with contextlib.redirect_stdout(io.StringIO()):
+        paths = {pair: topo.get_bidir_paths(pair[0], pair[1], False) for pair in set(pairs)}
+    return hosts, pairs, paths
+
+
+def run_firstfit(mode: str, args, hosts, pairs, paths):
+    eventlist = fresh_eventlist()
+    table = FlowStateTable(len(pairs)) if mode == "table" else None
+    net_paths = [[[] for _ in range(hosts)] for _ in range(hosts)]
+    for (src, dst), routes in paths.items():
+        net_paths[src][dst] = routes
+    ff = FirstFit(SCAN_PERIOD, eventlist, net_paths)
+    srcs = []
+    for src, dst in pairs:
+        tcp = TcpSrc(None, None, eventlist, flow_table=table)
+        tcp._route = paths[(src, dst)][0]
+        ff.add_flow(src, dst, tcp)
+        srcs.append(tcp)
+
+    rng = random.Random(args.seed)
+    allocations = {}
+    elapsed = 0.0
+    history = []
+    for _ in range(args.scans):
+        for i in rng.sample(range(len(srcs)), int(len(srcs) * args.active)):
+            srcs[i]._last_acked += 2 * ff.threshold
+        start = time.time()
+        if mode == "legacy":
+            legacy_firstfit_run(ff, allocations)
+        else:
+            ff.run()
+        elapsed += time.time() - start
+        loads = allocations if mode == "legacy" else ff.path_allocations
+        entries = ff.flow_counters.values()
+        history.append(([(e.allocated, id(e.route)) for e in entries],
+                         sorted((id(q), n) for q, n in loads.items() if n)))
+    return elapsed / args.scans, history
+
+
+def run_subflow_control(mode: str, args, hosts, pairs, paths):
+    eventlist = fresh_eventlist()
+    conns = pairs[:len(pairs) // 2]
+    table = FlowStateTable(4 * len(conns)) if mode == "table" else None
+    net_paths = {}
+    for (src, dst), routes in paths.items():
+        net_paths.setdefault(src, {})[dst] = routes
+
+    def tcp_generator(src, dst, name):
+        return TcpSrc(None, None, eventlist, flow_table=table), TcpSink()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ctrl = SubflowControl(SCAN_PERIOD, None, eventlist, net_paths, tcp_generator=tcp_generator)
+    mptcps = []
+    for src, dst in conns:
+        mptcp = MultipathTcpSrc(COUPLED_INC, eventlist, flow_table=table)
+        sub = TcpSrc(None, None, eventlist, flow_table=table)
+        sub._last_acked = 1
+        mptcp.addSubflow(sub)
+        ctrl.add_flow(src, dst, mptcp)
+        ctrl.add_subflow(mptcp, 0)
+        mptcps.append(mptcp)
+
+    rng = random.Random(args.seed)
+    stalled = set(rng.sample(range(len(mptcps)), int(len(mptcps) * args.active)))
+    random.seed(args.seed)
+    elapsed = 0.0
+    history = []
+    for _ in range(args.scans):
+        if table is not None:
+            # 所有子流前进一个阈值，停滞连接的子流退回原值
+            last_acked = table.column("last_acked")
+            before = {i: [s._last_acked for s in mptcps[i]._subflows] for i in stalled}
+            last_acked += ctrl.get_threshold()
+            for i, values in before.items():
+                for sub, value in zip(mptcps[i]._subflows, values):
+                    sub._last_acked = value
+        else:
+            for i, mptcp in enumerate(mptcps):
+                if i not in stalled:
+                    for sub in mptcp._subflows:
+                        sub._last_acked += ctrl.get_threshold()
+        start = time.time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == "legacy":
+                legacy_subflow_run(ctrl)
+            else:
+                ctrl.run()
+        elapsed += time.time() - start
+        history.append([list(e.subflows) for e in ctrl._flow_counters.values()])
+    return elapsed / args.scans, history, ctrl.get_stats()["total_subflows_added"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Periodic scanner benchmark")
+    parser.add_argument("-k", type=int, default=8, help="Fat-tree arity")
+    parser.add_argument("--flows", type=int, default=100000)
+    parser.add_argument("--scans", type=int, default=10)
+    parser.add_argument("--active", type=float, default=0.01,
+                        help="Fraction of flows crossing the threshold per scan")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    hosts, pairs, paths = build_paths(args.k, args.flows, args.seed)
+    print(f"k={args.k} hosts={hosts} flows={len(pairs)} pairs={len(paths)} scans={args.scans}")
+
+    results = {}
+    for mode in ("legacy", "plain", "table"):
+        results[mode] = run_firstfit(mode, args, hosts, pairs, paths)
+        print(f"FirstFit       {mode:>6}: {results[mode][0] * 1e3:8.2f} ms/scan")
+    ok = results["plain"][1] == results["legacy"][1] == results["table"][1]
+    print(f"  allocations identical: {ok}")
+
+    results = {}
+    for mode in ("legacy", "plain", "table"):
+        results[mode] = run_subflow_control(mode, args, hosts, pairs, paths)
+        print(f"SubflowControl {mode:>6}: {results[mode][0] * 1e3:8.2f} ms/scan "
+              f"({results[mode][2]} subflows added)")
+    same = results["plain"][1] == results["legacy"][1] == results["table"][1]
+    print(f"  subflow choices identical: {same}")
+    sys.exit(0 if ok and same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+路由驻留对比 - 每条流各自拷贝路由 vs 共享驻留路由
+
+k 元 FatTree 上每个主机随机选 peers 个目的主机，生成 N 条流，
+路径计算完成后按三种方式为每条流建立去程/回程路由:
+1. copy:   按 (src, dst) 缓存 get_bidir_paths 的结果，每条流逐跳拷贝并追加自己的端点
+2. shared: get_shared_paths 返回驻留的不可变路由，流的端点用 with_destination 追加
+3. shared+port: 端点为每主机一个的端口（如 HTSimPyFabric），所有流共用同一对路由
+
+打印建立时间、tracemalloc 统计的新增内存和不同路由对象数，并检查
+三种方式得到的跳序列完全一致。
+
+用法:
+    python examples/route_interning_bench.py [-k 8] [--flows 100000] [--peers 8]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from network_frontend.htsimpy.core.eventlist import EventList
+from network_frontend.htsimpy.core.network import PacketSink
+from network_frontend.htsimpy.core.route import Route
+from network_frontend.htsimpy.datacenter.constants import QueueType
+from network_frontend.htsimpy.datacenter.fat_tree_topology import FatTreeTopology
+
+LINK_SPEED = 10**10
+QUEUE_BYTES = 100 * 1500
+
+
+class Endpoint(PacketSink):
+    """流端点（只用于建立路由）"""
+
+    def __init__(self, name: str):
+        super().__init__()
+        self._name = name
+
+    def receivePacket(self, pkt, previousHop=None) -> None:
+        pkt.free()
+
+    def nodename(self) -> str:
+        return self._name
+
+
+def build_topology(k: int) -> FatTreeTopology:
+    for tier in range(3):
+        FatTreeTopology.set_tier_parameters(tier, k // 2, k // 2 if tier < 2 else k,
+                                            QUEUE_BYTES, QUEUE_BYTES, 1, LINK_SPEED, 1)
+    return FatTreeTopology(k ** 3 // 4, LINK_SPEED, QUEUE_BYTES, None, EventList(), None,
+                           QueueType.UNDEFINED)
+
+
+def build_copy(topo, flows, ends, pair_paths):
+    routes = []
+    for i, (src, dst, choice) in enumerate(flows):
+        paths = pair_paths[(src, dst)]
+        path = paths[choice % len(paths)]
+        out = Route()
+        for hop in path:
+            out.push_back(hop)
+        out.push_back(ends[i][1])
+        back = Route()
+        for hop in path.reverse():
+            back.push_back(hop)
+        back.push_back(ends[i][0])
+        routes.append((out, back))
+    return routes
+
+
+def build_shared(topo, flows, ends, pair_paths):
+    routes = []
+    for i, (src, dst, choice) in enumerate(flows):
+        paths = topo.get_shared_paths(src, dst, True)
+        path = paths[choice % len(paths)]
+        routes.append((path.with_destination(ends[i][1]), path.reverse().with_destination(ends[i][0])))
+    return routes
+
+
+def build_shared_ports(topo, flows, ports, pair_paths):
+    routes = []
+    for src, dst, choice in flows:
+        paths = topo.get_shared_paths(src, dst, True)
+        path = paths[choice % len(paths)]
+        routes.append((path.with_destination(ports[dst]), path.reverse().with_destination(ports[src])))
+    return routes
+
+
+def measure(label, fn, *args):
+    tracemalloc.start()
+    start = time.time()
+    routes = fn(*args)
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    objects = len({id(r) for pair in routes for r in pair})
+    print(f"{label:>12}: {elapsed:6.2f}s  peak {peak / 2**20:7.1f} MiB  route objects {objects}")
+    return routes
+
+
+def hop_ids(route, ends_map):
+    return [ends_map.get(id(hop), id(hop)) for hop in route]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route interning benchmark")
+    parser.add_argument("-k", type=int, default=8, help="Fat-tree arity")
+    parser.add_argument("--flows", type=int, default=100000)
+    parser.add_argument("--peers", type=int, default=8, help="Destinations per host")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    topo = build_topology(args.k)
+    hosts = topo.no_of_nodes()
+    rng = random.Random(args.seed)
+    peers = [rng.sample([d for d in range(hosts) if d != h], args.peers) for h in range(hosts)]
+    flows = []
+    for _ in range(args.flows):
+        src = rng.randrange(hosts)
+        flows.append((src, rng.choice(peers[src]), rng.randrange(1 << 16)))
+    ends = [(Endpoint(f"src{i}"), Endpoint(f"sink{i}")) for i in range(len(flows))]
+    ports = [Endpoint(f"port{h}") for h in range(hosts)]
+    pairs = sorted({f[:2] for f in flows})
+    print(f"k={args.k} hosts={hosts} flows={len(flows)} pairs={len(pairs)}")
+
+    # 路径计算两种方式相同，不计入对比
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pair_paths = {pair: topo.get_bidir_paths(pair[0], pair[1], True) for pair in pairs}
+        for src, dst in pairs:
+            topo.get_shared_paths(src, dst, True)
+    print(f"path discovery for {len(pairs)} pairs (twice): {time.time() - start:.2f}s")
+
+    copied = measure("copy", build_copy, topo, flows, ends, pair_paths)
+    shared = measure("shared", build_shared, topo, flows, ends, pair_paths)
+    ported = measure("shared+port", build_shared_ports, topo, flows, ports, pair_paths)
+    table = topo.route_table()
+    print(f"route table: {len(table)} interned paths, {table.derived_count()} derived routes")
+
+    # 端点不同，比较时把端点映射到 (流号, 方向) / 主机号
+    ends_map = {id(e): (i, d) for i, pair in enumerate(ends) for d, e in enumerate(pair)}
+    port_map = {id(p): h for h, p in enumerate(ports)}
+    ok = True
+    for i, ((co, cb), (so, sb), (po, pb)) in enumerate(zip(copied, shared, ported)):
+        src, dst, _ = flows[i]
+        if hop_ids(co, ends_map) != hop_ids(so, ends_map) or hop_ids(cb, ends_map) != hop_ids(sb, ends_map):
+            ok = False
+        if list(po)[:-1] != list(co)[:-1] or port_map[id(po.back())] != dst or port_map[id(pb.back())] != src:
+            ok = False
+    print("hop sequences identical" if ok else "MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
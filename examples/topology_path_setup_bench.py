@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+路径建立基准 - DragonFly / BCube / VL2 / CamCube 在置换和全互联流量下的建路时间
+
+每种拓扑按主机规模（默认约 1k 和 10k）构建一次，分别计时:
+1. build:       拓扑构建
+2. permutation: 随机置换矩阵，每个主机一条流，各调用一次 get_bidir_paths
+3. all-to-all:  全互联矩阵；规模大时只取 --a2a-sources 个源主机的整行
+打印每种矩阵的耗时、每秒建立的路径数，以及路径模板缓存的条目数和命中率。
+--cache 0 关闭模板缓存（每次调用都重新生成模板），用于对比。
+
+CamCube 的最短路径数随距离组合爆炸，用 --camcube-paths 限制每对主机的路径数。
+
+用法:
+    python examples/topology_path_setup_bench.py [--sizes 1000 10000] [--a2a-sources 16]
+        [--topologies dragonfly bcube vl2 camcube] [--camcube-paths 16] [--cache N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from network_frontend.htsimpy.core.eventlist import EventList
+from network_frontend.htsimpy.core.logger.core import Logged, LoggedManager
+from network_frontend.htsimpy.datacenter.bcube_topology import BCubeTopology
+from network_frontend.htsimpy.datacenter.camcube_topology import CamCubeTopology
+from network_frontend.htsimpy.datacenter.dragon_fly_topology import DragonFlyTopology
+from network_frontend.htsimpy.datacenter.vl2_topology import VL2Topology
+
+
+def dragonfly(hosts, args):
+    # N = 2h^2 (2h^2 + 1)，取最接近目标规模的 h
+    h = min(range(1, 16), key=lambda h: abs(2 * h * h * (2 * h * h + 1) - hosts))
+    return DragonFlyTopology(None, EventList(), p=h, a=2 * h, h=h)
+
+
+def bcube(hosts, args):
+    # 两层 BCube (K=1)，n^2 个服务器
+    n = 2
+    while n * n < hosts:
+        n += 1
+    return BCubeTopology(None, EventList(), no_of_nodes=n * n, ports_per_switch=n, no_of_levels=1)
+
+
+def vl2(hosts, args):
+    # 默认每个 ToR 20 台服务器
+    return VL2Topology(None, EventList(), nt=max(1, (hosts + 19) // 20), ns=20)
+
+
+def camcube(hosts, args):
+    k = 2
+    while k ** 3 < hosts:
+        k += 1
+    return CamCubeTopology(k, None, EventList(), max_paths=args.camcube_paths)
+
+
+TOPOLOGIES = {"dragonfly": dragonfly, "bcube": bcube, "vl2": vl2, "camcube": camcube}
+
+
+def permutation(n, rng):
+    dests = list(range(n))
+    while True:
+        rng.shuffle(dests)
+        if all(s != d for s, d in enumerate(dests)):
+            return list(enumerate(dests))
+
+
+def all_to_all(n, sources, rng):
+    rows = range(n) if sources <= 0 or sources >= n else sorted(rng.sample(range(n), sources))
+    return [(s, d) for s in rows for d in range(n) if s != d]
+
+
+def setup(topo, pairs):
+    """为每对主机建立路径，返回 (耗时, 路径数, 跳数)"""
+    paths = hops = 0
+    start = time.time()
+    for src, dst in pairs:
+        for route in topo.get_bidir_paths(src, dst, False):
+            paths += 1
+            hops += route.size()
+    return time.time() - start, paths, hops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Topology path setup benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Target host counts")
+    parser.add_argument("--topologies", nargs="+", default=list(TOPOLOGIES), choices=list(TOPOLOGIES))
+    parser.add_argument("--a2a-sources", type=int, default=16,
+                        help="Source hosts of the all-to-all matrix (0 = every host)")
+    parser.add_argument("--camcube-paths", type=int, default=16, help="Paths kept per CamCube pair")
+    parser.add_argument("--cache", type=int, default=None, help="Template cache capacity (0 disables)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for name in args.topologies:
+        for size in args.sizes:
+            # 每个拓扑用新的事件表（EventList 是单例），并清空 ID 映射，
+            # 释放上一个拓扑的队列（VL2 每条路径新建一个馈送队列）
+            EventList.reset()
+            Logged._logged_manager = LoggedManager()
+            start = time.time()
+            with contextlib.redirect_stdout(io.StringIO()):
+                topo = TOPOLOGIES[name](size, args)
+            build = time.time() - start
+            n = topo.no_of_nodes()
+            if args.cache is not None:
+                topo.path_templates().capacity = args.cache
+            rng = random.Random(args.seed)
+            print(f"{name} hosts={n}: build {build:.2f}s")
+            for label, pairs in (("permutation", permutation(n, rng)),
+                                 ("all-to-all", all_to_all(n, args.a2a_sources, rng))):
+                templates = topo.path_templates()
+                hits, misses = templates.hits, templates.misses
+                elapsed, paths, hops = setup(topo, pairs)
+                hits, misses = templates.hits - hits, templates.misses - misses
+                print(f"  {label:>11}: {len(pairs):8d} pairs {paths:9d} paths {elapsed:7.2f}s "
+                      f"({paths / max(elapsed, 1e-9):9.0f} paths/s, {hops / max(paths, 1):.1f} hops/path) "
+                      f"templates {len(templates)} hit rate {hits / max(hits + misses, 1):.2f}")
+
+
+if __name__ == "__main__":
+    main()
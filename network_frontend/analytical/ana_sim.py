@@ -55,16 +55,22 @@ class AnaSim:
         return float(cls._tick)
     
     @classmethod
-    def Run(cls) -> None:
+    def Run(cls, until: Optional[int] = None) -> None:
         """
         Run the simulation until all tasks are completed.
         Corresponds to void AnaSim::Run() in C++
         
         The simulation processes all scheduled tasks in chronological order.
+        
+        Args:
+            until: If given, pause before the first task scheduled after this
+                tick, leaving it queued (e.g. to take a checkpoint)
         """
         cls._running = True
         
         while cls._call_list and cls._running:
+            if until is not None and cls._call_list[0].time > until:
+                break
             # Get the next task (earliest time)
             calltask = heapq.heappop(cls._call_list)
             
@@ -135,9 +141,60 @@ class AnaSim:
         """
         return cls._running
     
+    @classmethod
+    def save_checkpoint(cls, path: str, roots: Any = None, meta: Optional[dict] = None) -> None:
+        """
+        Write the pending tasks, the current tick and the system state to path.
+        
+        Uses the htsimpy checkpoint format. Everything reachable from the
+        queued tasks (Sys instances, streams, workload) is saved along with
+        the registered static state and the RNG state.
+        
+        Args:
+            path: Checkpoint file path
+            roots: Extra objects to get back from load_checkpoint
+            meta: Extra picklable information
+        """
+        from network_frontend.htsimpy.core.checkpoint import save_checkpoint
+        _register_checkpoint_statics()
+        save_checkpoint(path, roots, meta, now=cls._tick)
+    
+    @classmethod
+    def load_checkpoint(cls, path: str):
+        """
+        Restore a checkpoint written by save_checkpoint; continue with Run().
+        
+        Returns:
+            Checkpoint: The loaded checkpoint (roots, meta, version)
+        """
+        from network_frontend.htsimpy.core.checkpoint import load_checkpoint
+        return load_checkpoint(path)
+    
     @classmethod
     def reset(cls) -> None:
         """
         Reset the simulation to initial state.
         """
-        cls.Destroy()
\ No newline at end of file
+        cls.Destroy()
+
+
+def _register_checkpoint_statics() -> None:
+    """Register the class-level state of the analytical run for checkpoints"""
+    from network_frontend.htsimpy.core.checkpoint import register_static
+    from system.sys import Sys
+    from system.scheduling.offline_greedy import OfflineGreedy
+    from system.dataset import DataSet
+    from system.param_parser import UserParam
+    from system.mock_nccl_log import MockNcclLog
+    from . import analytical_astra
+
+    register_static(AnaSim, "_call_list", "_tick")
+    register_static(Sys, "g_sys_inCriticalSection", "offset", "all_generators")
+    register_static(OfflineGreedy, "chunk_schedule", "schedule_consumer", "global_chunk_size",
+                    "schedule_memo", "memo_hits", "memo_misses")
+    register_static(DataSet, "id_auto_increment")
+    register_static(UserParam, "_instance")
+    # The log file itself is reopened in append mode after a restore
+    register_static(MockNcclLog, "LOG_PATH", "_log_name", "_log_level", "_show_detailed_info")
+    register_static(analytical_astra, "receiver_pending_queue", "expeRecvHash", "recvHash",
+                    "sentHash", "nodeHash")
@@ -39,9 +39,25 @@ local_rank: int = 0
 workloads: List[str] = []
 physical_dims: List[List[int]] = []
 
+def resume(path: str) -> int:
+    """从快照恢复并运行到结束，对应 AS_RESUME_FROM"""
+    checkpoint = AnaSim.load_checkpoint(path)
+    print(f"SimAI resume Analytical from tick {checkpoint.now}: {path}")
+    AnaSim.Run()
+    AnaSim.Stop()
+    AnaSim.Destroy()
+    print("SimAI-Analytical finished.")
+    return 0
+
+
 def main(args) -> int:
     """主函数，使用 argparse 解析的参数对象"""
     
+    # AS_RESUME_FROM=<快照路径> 时跳过初始化，直接从快照继续
+    resume_path = os.getenv("AS_RESUME_FROM")
+    if resume_path:
+        return resume(resume_path)
+    
     # 获取参数实例
     param = UserParam.getInstance()
     
@@ -99,7 +115,6 @@ def main(args) -> int:
     
     # 设置日志文件名 - 对应C++版本的日志设置，使用output文件夹
     from system.mock_nccl_log import MockNcclLog, NcclLogLevel
-    import os
     from datetime import datetime
     
     # 确保output目录存在
@@ -154,7 +169,12 @@ def main(args) -> int:
     systems.workload.fire()
     print("SimAI begin run Analytical")
     
-    # 运行分析模拟
+    # 运行分析模拟；AS_CHECKPOINT_PATH 设置时先运行到 AS_CHECKPOINT_AT 写快照再继续
+    checkpoint_path = os.getenv("AS_CHECKPOINT_PATH")
+    if checkpoint_path:
+        AnaSim.Run(until=int(os.getenv("AS_CHECKPOINT_AT", "0")))
+        AnaSim.save_checkpoint(checkpoint_path)
+        print(f"SimAI checkpoint written at tick {AnaSim._tick}: {checkpoint_path}")
     AnaSim.Run()
     AnaSim.Stop()
     AnaSim.Destroy()
@@ -29,7 +29,7 @@ from .core.logger import Logger
 from .queues.fifo_queue import FIFOQueue
 
 # API interface
-from .api.htsimpy_network import HTSimPyNetwork
+from .api.htsimpy_network import HTSimPyNetwork, HTSimPyFabric
 from .api.config_parser import HTSimPyConfig
 
 __all__ = [
@@ -43,5 +43,5 @@ __all__ = [
     'FIFOQueue',
     
     # API interface
-    'HTSimPyNetwork', 'HTSimPyConfig',
+    'HTSimPyNetwork', 'HTSimPyFabric', 'HTSimPyConfig',
 ]
\ No newline at end of file
@@ -8,10 +8,11 @@ This module contains the API interfaces for integrating HTSimPy with SimAI:
 - flow_generator.py: 流量生成器
 """
 
-from .htsimpy_network import HTSimPyNetwork
+from .htsimpy_network import HTSimPyNetwork, HTSimPyFabric
 from .config_parser import HTSimPyConfig
 
 __all__ = [
     'HTSimPyNetwork',
+    'HTSimPyFabric',
     'HTSimPyConfig',
 ]
\ No newline at end of file
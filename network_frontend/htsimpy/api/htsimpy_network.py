@@ -1,279 +1,510 @@
 """
-HTSimPyNetwork - Main Network API Implementation
+HTSimPyNetwork - 基于 htsimpy 包级仿真的 AstraNetworkAPI 后端
 
-对应文件: 无直接对应，这是SimAI集成的API接口
-功能: 实现AstraNetworkAPI接口，提供与SimAI系统的标准接口
+对应文件: 无直接对应，参照 SimAI ns3 后端 (AstraSimNetwork.cc / entry.h) 的收发匹配逻辑
+功能: 把 SimAI 的 sim_send/sim_recv 映射为数据中心拓扑上的 htsimpy TCP 流，
+      sim_schedule 映射到共享的 EventList
 
 主要类:
-- HTSimPyNetwork: 主要网络API实现类
+- HTSimPyFabric: 所有 rank 共享的网络（拓扑、网卡队列、路由缓存、收发匹配表、批量调度）
+- HTSimPyNetwork: 每个 rank 一个的 AstraNetworkAPI 实现
 
 接口对应关系:
-- AstraNetworkAPI -> HTSimPyNetwork
-- sim_send() -> sim_send()
-- sim_recv() -> sim_recv()
-- sim_schedule() -> sim_schedule()
+- AstraNetworkAPI::sim_send()     -> HTSimPyFabric.send()，每条消息一对 TcpSrc/TcpSink
+- AstraNetworkAPI::sim_recv()     -> HTSimPyFabric.recv()，与 ns3 的 expeRecvHash/recvHash 匹配相同
+- AstraNetworkAPI::sim_schedule() -> HTSimPyFabric.schedule()
+- notify_receiver_receive_data / notify_sender_sending_finished -> 接收端/发送端完成回调
+
+时间单位: SimAI 侧为纳秒，EventList 为皮秒。
+
+批量化:
+- 回调和注入由 fabric 这一个 EventSource 承担，自己维护 (时间, 序号) 堆，
+  每个不同的时间戳只向 EventList 注册一次事件
+- 同一时刻发出的所有 sim_send 在该时刻的一次注入事件中统一启动
+- 路由按 (src, dst) 缓存并驻留为不可变的 InternedRoute，去程/回程以主机端口
+  （按流 ID 分发）结尾，同一对 rank 之间的所有消息共用同一对路由对象
 """
 
-from typing import Optional, Any, Callable
-from ..core.eventlist import EventList
-from ..core.config import SimulationConfig
-from ..core.logger import Logger
+import contextlib
+import heapq
+import io
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from system.AstraNetworkAPI import (
+    AstraNetworkAPI, BackendType, SimComm, SimRequest, TimeSpec, TimeType
+)
+from system.rank_equivalence import RankEquivalence
+from ..core.eventlist import EventList, EventSource
+from ..core.network import PacketSink
+from ..core.route import InternedRoute, RouteInterner
+from ..datacenter.constants import QueueType
+from ..datacenter.fat_tree_topology import FatTreeTopology
+from ..protocols.tcp import TcpSrc, TcpSink, TcpRtxTimerScanner
+from ..queues.base_queue import Queue
+from .config_parser import HTSimPyConfig
+
+# 皮秒/纳秒
+PS_PER_NS = 1000
+
+# 重传定时器扫描周期 10ms，对应 htsim main 中的 timeFromMs(10)
+RTX_SCAN_PERIOD = 10 * 10**9
+
+# 网卡发送队列大小（字节）
+NIC_QUEUE_BYTES = 1500 * 1000
+
+MatchKey = Tuple[int, Tuple[int, int]]  # (tag, (src, dst))
+
 
+class _Task:
+    """收发登记项 - 对应 ns3 后端的 task1"""
 
-class HTSimPyNetwork:
+    __slots__ = ("src", "dest", "count", "type", "fun_arg", "msg_handler")
+
+    def __init__(self, src: int, dest: int, count: int, type_: int,
+                 fun_arg: Any, msg_handler: Optional[Callable[[Any], None]]):
+        self.src = src
+        self.dest = dest
+        self.count = count
+        self.type = type_  # 0 发送, 1 接收
+        self.fun_arg = fun_arg
+        self.msg_handler = msg_handler
+
+
+class _Message:
+    """一次 sim_send 对应的消息"""
+
+    __slots__ = ("src", "dst", "size", "tag", "flow_tag", "start")
+
+    def __init__(self, src: int, dst: int, size: int, tag: int, flow_tag: Any, start: int):
+        self.src = src
+        self.dst = dst
+        self.size = size
+        self.tag = tag
+        self.flow_tag = flow_tag
+        self.start = start  # 注入时刻（皮秒）
+
+
+class _HostPort(PacketSink):
     """
-    HTSimPy网络后端 - 继承AstraNetworkAPI
-    
-    提供与SimAI系统的标准接口
+    主机端口 - 缓存路由的终点
+
+    去程路由在目的主机的端口结束，回程路由在源主机的端口结束，
+    端口按包所属流的 ID 把数据包交给 TcpSink、把 ACK 交给 TcpSrc。
+    流结束后注销，迟到的重传包直接释放。
     """
-    
-    def __init__(self, config: Optional[SimulationConfig] = None):
-        """
-        初始化HTSimPy网络
-        
-        Args:
-            config: 仿真配置
-        """
-        self._config = config or SimulationConfig()
-        self._eventlist = EventList.get_instance()
-        self._network = None  # Network class not implemented yet
-        self._logger = Logger()
-        self._initialized = False
-    
-    def get_backend_type(self) -> str:
-        """
-        获取后端类型
-        
-        Returns:
-            后端类型字符串
-        """
-        return "HTSimPy"
-    
-    def initialize(self) -> bool:
-        """
-        初始化网络仿真
-        
-        Returns:
-            如果初始化成功返回True，否则返回False
-        """
-        if self._initialized:
-            return True
-        
-        try:
-            # TODO: 实现网络初始化逻辑
-            # self._network = Network()  # TODO: Implement Network class
-            pass
-            self._initialized = True
-            return True
-        except Exception as e:
-            self._logger.error("HTSimPy", f"Failed to initialize network: {e}")
-            return False
-    
-    def finalize(self) -> None:
-        """
-        清理网络仿真资源
-        """
-        if self._initialized:
-            # TODO: 实现清理逻辑
-            self._initialized = False
-    
-    def sim_send(self, src: int, dst: int, tag: int, data: bytes, 
-                 callback: Optional[Callable] = None) -> bool:
-        """
-        对应 AstraNetworkAPI::sim_send()
-        发送数据
-        
-        Args:
-            src: 源节点ID
-            dst: 目标节点ID
-            tag: 消息标签
-            data: 要发送的数据
-            callback: 完成回调函数
-            
-        Returns:
-            如果成功发送返回True，否则返回False
-        """
-        if not self._initialized:
-            return False
-        
-        try:
-            # TODO: 实现数据发送逻辑
-            self._logger.info("HTSimPy", f"Send data from {src} to {dst}, size={len(data)}")
-            return True
-        except Exception as e:
-            self._logger.error("HTSimPy", f"Failed to send data: {e}")
-            return False
-    
-    def sim_recv(self, src: int, dst: int, tag: int, 
-                 callback: Optional[Callable] = None) -> bool:
-        """
-        对应 AstraNetworkAPI::sim_recv()
-        接收数据
-        
-        Args:
-            src: 源节点ID
-            dst: 目标节点ID
-            tag: 消息标签
-            callback: 完成回调函数
-            
-        Returns:
-            如果成功注册接收返回True，否则返回False
-        """
-        if not self._initialized:
-            return False
-        
-        try:
-            # TODO: 实现数据接收逻辑
-            self._logger.info("HTSimPy", f"Register receive from {src} to {dst}")
-            return True
-        except Exception as e:
-            self._logger.error("HTSimPy", f"Failed to register receive: {e}")
-            return False
-    
-    def sim_schedule(self, time: int, callback: Callable, *args, **kwargs) -> bool:
-        """
-        对应 AstraNetworkAPI::sim_schedule()
-        调度事件
-        
-        Args:
-            time: 调度时间
-            callback: 回调函数
-            *args: 位置参数
-            **kwargs: 关键字参数
-            
-        Returns:
-            如果成功调度返回True，否则返回False
-        """
-        if not self._initialized:
-            return False
-        
-        try:
-            # TODO: 实现事件调度逻辑
-            self._logger.info("HTSimPy", f"Schedule event at time {time}")
-            return True
-        except Exception as e:
-            self._logger.error("HTSimPy", f"Failed to schedule event: {e}")
-            return False
-    
-    def sim_barrier(self, callback: Optional[Callable] = None) -> bool:
-        """
-        对应 AstraNetworkAPI::sim_barrier()
-        同步屏障
-        
-        Args:
-            callback: 完成回调函数
-            
-        Returns:
-            如果成功设置屏障返回True，否则返回False
-        """
-        if not self._initialized:
-            return False
-        
-        try:
-            # TODO: 实现同步屏障逻辑
-            self._logger.info("HTSimPy", "Set barrier")
-            return True
-        except Exception as e:
-            self._logger.error("HTSimPy", f"Failed to set barrier: {e}")
-            return False
-    
-    def sim_wait(self, callback: Optional[Callable] = None) -> bool:
+
+    def __init__(self, host: int):
+        super().__init__()
+        self._nodename = f"hostport({host})"
+        self._targets: Dict[int, PacketSink] = {}
+
+    def attach(self, flow_id: int, target: PacketSink) -> None:
+        self._targets[flow_id] = target
+
+    def detach(self, flow_id: int) -> None:
+        self._targets.pop(flow_id, None)
+
+    def receivePacket(self, pkt, previousHop=None) -> None:
+        target = self._targets.get(pkt.flow().flow_id())
+        if target is None:
+            pkt.free()
+            return
+        target.receivePacket(pkt)
+
+    def nodename(self) -> str:
+        return self._nodename
+
+
+class _MessageSrc(TcpSrc):
+    """消息发送端 - 全部数据被确认时通知 fabric（C++ TcpSrc 在此处没有回调）"""
+
+    def __init__(self, fabric: 'HTSimPyFabric', message: _Message):
+        super().__init__(None, None, fabric.eventlist())
+        self._fabric = fabric
+        self._message = message
+        self._done = False
+
+    def receivePacket(self, pkt) -> None:
+        super().receivePacket(pkt)
+        if not self._done and self._last_acked >= self._flow_size:
+            self._done = True
+            self._fabric._sender_finished(self)
+
+
+class _MessageSink(TcpSink):
+    """消息接收端 - 收齐全部数据时通知 fabric"""
+
+    def __init__(self, fabric: 'HTSimPyFabric', message: _Message):
+        super().__init__()
+        self._fabric = fabric
+        self._message = message
+        self._done = False
+
+    def receivePacket(self, pkt) -> None:
+        super().receivePacket(pkt)
+        if not self._done and self._cumulative_ack >= self._src._flow_size:
+            self._done = True
+            self._fabric._receiver_finished(self._message)
+
+
+class _RtxScanner(TcpRtxTimerScanner):
+    """
+    重传定时器扫描器 - 只扫描未完成的流
+
+    最后一条流结束时取消下一次扫描，仿真在所有消息完成后自然结束。
+    """
+
+    # 消息流不使用共享流状态表，_tcps 是字典，始终逐个调用重传钩子
+    _rows = False
+
+    def __init__(self, scanPeriod: int, eventlist):
+        # 不调用 TcpRtxTimerScanner.__init__，第一条流登记时才开始扫描
+        EventSource.__init__(self, eventlist, "RtxScanner")
+        self._scanPeriod = scanPeriod
+        self._tcps = {}  # TcpSrc -> None，保持登记顺序
+        self._next_scan: Optional[int] = None
+
+    def registerTcp(self, tcpsrc: TcpSrc) -> None:
+        self._tcps[tcpsrc] = None
+        if self._next_scan is None:
+            self._next_scan = self._eventlist.now() + self._scanPeriod
+            self._eventlist.source_is_pending(self, self._next_scan)
+
+    def unregisterTcp(self, tcpsrc: TcpSrc) -> None:
+        self._tcps.pop(tcpsrc, None)
+        if not self._tcps and self._next_scan is not None:
+            self._eventlist.cancel_pending_source_by_time(self, self._next_scan)
+            self._next_scan = None
+
+    def do_next_event(self) -> None:
+        super().do_next_event()
+        self._next_scan = self._eventlist.now() + self._scanPeriod
+
+
+def fat_tree_for(hosts: int, config: HTSimPyConfig, eventlist: EventList) -> FatTreeTopology:
+    """
+    按配置建立能容纳 hosts 个主机的最小 FatTree（k 不小于 config.fat_tree_k）
+
+    交换机队列为确定性的 FIFO 队列，大小为 queue_size 个 MTU。
+    """
+    k = max(2, config.fat_tree_k + config.fat_tree_k % 2)
+    while k ** 3 // 4 < hosts:
+        k += 2
+    speed = config.get_link_speed_bps()
+    queue_bytes = config.queue_size * config.mtu
+    for tier in range(3):
+        FatTreeTopology.set_tier_parameters(tier, k // 2, k // 2 if tier < 2 else k,
+                                            queue_bytes, queue_bytes, 1, speed, 1)
+    return FatTreeTopology(k ** 3 // 4, speed, queue_bytes, None, eventlist, None,
+                           QueueType.UNDEFINED, latency=config.link_delay * PS_PER_NS)
+
+
+class HTSimPyFabric(EventSource):
+    """
+    所有 rank 共享的 htsimpy 网络
+
+    rank i 对应拓扑中的主机 i。拓扑需提供 get_bidir_paths(src, dst, reverse)，
+    路径第 0 跳（主机发送队列）替换为本对象的网卡 FIFO 队列。
+
+    给出 rank_equivalence 时只有各等价类的代表 rank 有 HTSimPyNetwork，
+    到达非代表 rank 的消息按 RankEquivalence.mirror() 镜像到代表上匹配，
+    与 ns3 后端的 AS_RANK_DEDUP 相同；适用范围见 RankEquivalence 的说明。
+    """
+
+    def __init__(self, ranks: int, config: Optional[HTSimPyConfig] = None,
+                 topology: Any = None, eventlist: Optional[EventList] = None,
+                 nic_queue_bytes: int = NIC_QUEUE_BYTES,
+                 rank_equivalence: Optional[RankEquivalence] = None):
         """
-        对应 AstraNetworkAPI::sim_wait()
-        等待操作完成
-        
         Args:
-            callback: 完成回调函数
-            
-        Returns:
-            如果成功等待返回True，否则返回False
+            ranks: rank 数
+            config: 拓扑配置，topology 为 None 时用于建立 FatTree
+            topology: 已建好的拓扑，需提供 get_bidir_paths()
+            eventlist: 事件调度器，默认全局单例
+            nic_queue_bytes: 网卡发送队列大小（字节）
+            rank_equivalence: 对称 rank 等价类，None 表示模拟全部 rank
         """
-        if not self._initialized:
-            return False
-        
+        eventlist = eventlist or EventList.get_the_event_list()
+        super().__init__(eventlist, "htsimpy_fabric")
+        self._config = config or HTSimPyConfig()
+        self._ranks = ranks
+        self._topology = topology if topology is not None else fat_tree_for(ranks, self._config, eventlist)
+        link_speed = getattr(self._topology, "_link_speed", self._config.get_link_speed_bps())
+        self._nics = [Queue(link_speed, nic_queue_bytes, eventlist) for _ in range(ranks)]
+        self._ports = [_HostPort(h) for h in range(ranks)]
+        self._scanner = _RtxScanner(RTX_SCAN_PERIOD, eventlist)
+        self._rank_equivalence = rank_equivalence
+
+        # (src, dst) -> (去程, 回程)，路由驻留在拓扑的路由表中
+        self._routes: Dict[Tuple[int, int], Tuple[InternedRoute, InternedRoute]] = {}
+        route_table = getattr(self._topology, "route_table", None)
+        self._route_table = route_table() if route_table else RouteInterner()
+
+        # 收发匹配表，对应 ns3 后端的 sentHash/recvHash/expeRecvHash/receiver_pending_queue
+        self.sentHash: Dict[MatchKey, _Task] = {}
+        self.recvHash: Dict[MatchKey, int] = {}
+        self.expeRecvHash: Dict[MatchKey, _Task] = {}
+        self.receiver_pending_queue: Dict[Tuple[Tuple[int, int], int], Any] = {}
+
+        # 回调堆 (时间, 序号, 函数, 参数)；已向 EventList 注册的时间戳
+        self._callbacks: List[Tuple[int, int, Callable[[Any], None], Any]] = []
+        self._seq = 0
+        self._armed: set = set()
+        self._in_event = False
+        # 当前时刻待注入的消息
+        self._injections: List[_Message] = []
+
+        self._stats = {"messages": 0, "injection_events": 0, "callbacks": 0,
+                       "wakeups": 0, "route_hits": 0, "route_misses": 0, "bytes": 0,
+                       "mirrored": 0}
+
+    # ------------------------------------------------------------------
+    # 调度
+
+    def schedule(self, delay_ps: int, fn: Callable[[Any], None], arg: Any) -> None:
+        """delay_ps 皮秒后调用 fn(arg)；同一时刻的回调按调度顺序执行"""
+        when = self._eventlist.now() + max(0, delay_ps)
+        self._seq += 1
+        heapq.heappush(self._callbacks, (when, self._seq, fn, arg))
+        self._wake_at(when)
+
+    def _wake_at(self, when: int) -> None:
+        if when in self._armed:
+            return
+        if self._in_event and when == self._eventlist.now():
+            return  # 当前事件结束前会处理
+        self._armed.add(when)
+        self._eventlist.source_is_pending(self, when)
+
+    def do_next_event(self) -> None:
+        now = self._eventlist.now()
+        self._armed.discard(now)
+        self._stats["wakeups"] += 1
+        self._in_event = True
         try:
-            # TODO: 实现等待逻辑
-            self._logger.info("HTSimPy", "Wait for completion")
-            return True
-        except Exception as e:
-            self._logger.error("HTSimPy", f"Failed to wait: {e}")
-            return False
-    
-    def get_sim_time(self) -> int:
-        """
-        获取当前仿真时间
-        
-        Returns:
-            当前仿真时间（皮秒）
-        """
-        if not self._initialized:
-            return 0
-        
-        return self._eventlist.now()
-    
-    def run_simulation(self, duration: Optional[int] = None) -> bool:
+            callbacks = self._callbacks
+            while callbacks and callbacks[0][0] <= now:
+                _, _, fn, arg = heapq.heappop(callbacks)
+                self._stats["callbacks"] += 1
+                fn(arg)
+            if self._injections:
+                self._inject()
+        finally:
+            self._in_event = False
+
+    # ------------------------------------------------------------------
+    # 路由与注入
+
+    def routes(self, src: int, dst: int) -> Tuple[InternedRoute, InternedRoute]:
+        """(src, dst) 的去程/回程路由，首次使用时建立并缓存"""
+        pair = self._routes.get((src, dst))
+        if pair is not None:
+            self._stats["route_hits"] += 1
+            return pair
+        self._stats["route_misses"] += 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            paths = self._topology.get_bidir_paths(src, dst, True)
+        path = paths[(src * 31 + dst) % len(paths)]
+        rev = path.reverse()
+        table = self._route_table
+        back = table.intern((self._nics[dst],) + tuple(rev)[1:] + (self._ports[src],))
+        out = table.intern((self._nics[src],) + tuple(path)[1:] + (self._ports[dst],), back)
+        pair = self._routes[(src, dst)] = (out, back)
+        return pair
+
+    def _inject(self) -> None:
+        """启动当前时刻积累的全部消息，对应 TcpSrc::connect() 但不为每条流单独调度开始事件"""
+        batch, self._injections = self._injections, []
+        self._stats["injection_events"] += 1
+        now = self._eventlist.now()
+        for message in batch:
+            message.start = now
+            if message.src == message.dst:
+                self._receiver_finished(message)
+                self._notify_sender(message)
+                continue
+            out, back = self.routes(message.src, message.dst)
+            src = _MessageSrc(self, message)
+            sink = _MessageSink(self, message)
+            src.set_flowsize(message.size)
+            src._route = out
+            src._sink = sink
+            src._flow.set_id(src.get_id())
+            sink.connect(src, back)
+            flow_id = src._flow.flow_id()
+            self._ports[message.dst].attach(flow_id, sink)
+            self._ports[message.src].attach(flow_id, src)
+            self._scanner.registerTcp(src)
+            src.startflow()
+
+    def _sender_finished(self, src: _MessageSrc) -> None:
+        message = src._message
+        flow_id = src._flow.flow_id()
+        self._ports[message.dst].detach(flow_id)
+        self._ports[message.src].detach(flow_id)
+        self._scanner.unregisterTcp(src)
+        self._notify_sender(message)
+
+    # ------------------------------------------------------------------
+    # 收发，对应 ns3 后端的 sim_send/sim_recv 和 entry.h 中的通知函数
+
+    def send(self, src: int, dst: int, count: int, tag: int, request: SimRequest,
+             msg_handler: Optional[Callable[[Any], None]], fun_arg: Any) -> None:
+        """登记发送并把消息加入当前时刻的注入批次"""
+        self.sentHash[(tag, (src, dst))] = _Task(src, dst, count, 0, fun_arg, msg_handler)
+        flow_tag = request.flowTag if request is not None else None
+        self._injections.append(_Message(src, dst, count, tag, flow_tag, 0))
+        self._stats["messages"] += 1
+        self._stats["bytes"] += count
+        self._wake_at(self._eventlist.now())
+
+    def recv(self, src: int, dst: int, count: int, tag: int,
+             msg_handler: Optional[Callable[[Any], None]], fun_arg: Any) -> None:
+        """登记接收；数据已先到达时立即回调"""
+        t = _Task(src, dst, count, 1, fun_arg, msg_handler)
+        if hasattr(fun_arg, "flowTag"):
+            tag = fun_arg.flowTag.tag_id
+        key = (tag, (src, dst))
+        arrived = self.recvHash.get(key)
+        if arrived is None:
+            if key not in self.expeRecvHash:
+                self.expeRecvHash[key] = t
+            return
+        if arrived < t.count:
+            del self.recvHash[key]
+            t.count -= arrived
+            self.expeRecvHash[key] = t
+            return
+        if arrived == t.count:
+            del self.recvHash[key]
+        else:
+            self.recvHash[key] = arrived - t.count
+        pending = self.receiver_pending_queue.pop(((dst, src), tag), None)
+        if pending is not None and hasattr(fun_arg, "flowTag"):
+            fun_arg.flowTag = pending
+        if t.msg_handler:
+            t.msg_handler(t.fun_arg)
+
+    def _receiver_finished(self, message: _Message) -> None:
+        """对应 notify_receiver_receive_data()"""
+        src, dst = message.src, message.dst
+        if self._rank_equivalence is not None and not self._rank_equivalence.is_representative(dst):
+            # 流模型的 flow tag 带原始发送端和流 ID，镜像后接收端会用错，见 RankEquivalence.can_mirror()
+            if message.flow_tag is not None and message.flow_tag.current_flow_id != -1:
+                raise ValueError("messages of an NCCL flow model cannot be mirrored")
+            src, dst = self._rank_equivalence.mirror(src, dst)
+            self._stats["mirrored"] += 1
+        key = (message.tag, (src, dst))
+        size = message.size
+        t = self.expeRecvHash.get(key)
+        if t is None:
+            self.receiver_pending_queue[((dst, src), message.tag)] = message.flow_tag
+            self.recvHash[key] = self.recvHash.get(key, 0) + size
+            return
+        if size < t.count:
+            t.count -= size
+            return
+        del self.expeRecvHash[key]
+        if size > t.count:
+            self.recvHash[key] = size - t.count
+        if message.flow_tag is not None and hasattr(t.fun_arg, "flowTag"):
+            t.fun_arg.flowTag = message.flow_tag
+        if t.msg_handler:
+            t.msg_handler(t.fun_arg)
+
+    def _notify_sender(self, message: _Message) -> None:
+        """对应 notify_sender_sending_finished()"""
+        key = (message.tag, (message.src, message.dst))
+        t = self.sentHash.get(key)
+        if t is None or t.count != message.size:
+            return
+        del self.sentHash[key]
+        if message.flow_tag is not None and hasattr(t.fun_arg, "flowTag"):
+            t.fun_arg.flowTag = message.flow_tag
+        if t.msg_handler:
+            t.msg_handler(t.fun_arg)
+
+    # ------------------------------------------------------------------
+
+    def run(self, until: Optional[int] = None) -> int:
+        """运行到没有事件（或仿真时间达到 until 皮秒），返回结束时间"""
+        eventlist = self._eventlist
+        while eventlist.do_next_event():
+            if until is not None and eventlist.now() >= until:
+                break
+        return eventlist.now()
+
+    def stats(self) -> Dict[str, int]:
+        """消息数、注入事件数、路由缓存命中等统计"""
+        stats = dict(self._stats)
+        stats["routes"] = len(self._routes)
+        stats["unmatched_sends"] = len(self.sentHash)
+        stats["unmatched_recvs"] = len(self.expeRecvHash)
+        return stats
+
+    def ranks(self) -> int:
+        return self._ranks
+
+    def topology(self) -> Any:
+        return self._topology
+
+    def config(self) -> HTSimPyConfig:
+        return self._config
+
+
+class HTSimPyNetwork(AstraNetworkAPI):
+    """
+    HTSimPy网络后端 - 继承AstraNetworkAPI
+
+    每个 rank 一个实例，共享同一个 HTSimPyFabric。
+    """
+
+    def __init__(self, rank: int, fabric: HTSimPyFabric):
         """
-        运行仿真
-        
         Args:
-            duration: 仿真持续时间，如果为None则使用配置中的时间
-            
-        Returns:
-            如果仿真成功完成返回True，否则返回False
-        """
-        if not self._initialized:
-            return False
-        
-        try:
-            if duration is None:
-                duration = self._config.simulation_time
-            
-            # TODO: 实现仿真运行逻辑
-            self._logger.info("HTSimPy", f"Run simulation for {duration} picoseconds")
-            return True
-        except Exception as e:
-            self._logger.error("HTSimPy", f"Failed to run simulation: {e}")
-            return False
-    
-    def get_stats(self) -> dict:
-        """
-        获取仿真统计信息
-        
-        Returns:
-            统计信息字典
+            rank: 本地 rank
+            fabric: 共享网络
         """
-        if not self._initialized:
-            return {}
-        
-        # TODO: 实现统计信息收集
-        return {
-            'backend_type': self.get_backend_type(),
-            'sim_time': self.get_sim_time(),
-            'initialized': self._initialized,
-        }
-    
-    @property
-    def config(self) -> SimulationConfig:
-        """获取仿真配置"""
-        return self._config
-    
-    @property
-    def eventlist(self) -> EventList:
-        """获取事件列表"""
-        return self._eventlist
-    
-    @property
-    def network(self) -> Optional[Any]:
-        """获取网络实例"""
-        return self._network
-    
-    def __str__(self) -> str:
-        """字符串表示"""
-        return (f"HTSimPyNetwork(initialized={self._initialized}, "
-                f"sim_time={self.get_sim_time()})")
-    
+        super().__init__(rank)
+        self.fabric = fabric
+        self.npu_offset = 0
+
+    def get_backend_type(self) -> BackendType:
+        """获取后端类型"""
+        return BackendType.HTSimPy
+
+    def sim_comm_size(self, comm: SimComm, size: List[int]) -> int:
+        size[:] = [self.fabric.ranks()]
+        return 0
+
+    def sim_finish(self) -> int:
+        return 0
+
+    def sim_time_resolution(self) -> float:
+        return 0.0
+
+    def sim_init(self, MEM: Any) -> int:
+        return 0
+
+    def sim_get_time(self) -> TimeSpec:
+        """当前时间（纳秒）"""
+        return TimeSpec(TimeType.NS, self.fabric.eventlist().now() / PS_PER_NS)
+
+    def sim_schedule(self, delta: TimeSpec, fun_ptr: Callable[[Any], None], fun_arg: Any) -> None:
+        """delta（纳秒）后调用 fun_ptr(fun_arg)"""
+        self.fabric.schedule(int(round(delta.time_val * PS_PER_NS)), fun_ptr, fun_arg)
+
+    def sim_send(self, buffer: Any, count: int, type_: int, dst: int, tag: int,
+                 request: SimRequest, msg_handler: Callable[[Any], None], fun_arg: Any) -> int:
+        """向 dst 发送 count 字节，发送端全部数据被确认后调用 msg_handler(fun_arg)"""
+        self.fabric.send(self.rank, dst + self.npu_offset, count, tag, request, msg_handler, fun_arg)
+        return 0
+
+    def sim_recv(self, buffer: Any, count: int, type_: int, src: int, tag: int,
+                 request: SimRequest, msg_handler: Callable[[Any], None], fun_arg: Any) -> int:
+        """从 src 接收 count 字节，收齐后调用 msg_handler(fun_arg)"""
+        self.fabric.recv(src + self.npu_offset, self.rank, count, tag, msg_handler, fun_arg)
+        return 0
+
     def __repr__(self) -> str:
-        """详细字符串表示"""
-        return (f"HTSimPyNetwork(config={self._config}, "
-                f"initialized={self._initialized}, "
-                f"network={self._network is not None})")
\ No newline at end of file
+        return f"HTSimPyNetwork(rank={self.rank}, ranks={self.fabric.ranks()})"
@@ -11,22 +11,30 @@ This module contains the core components that correspond to the main htsim C++ f
 - config.py: 对应 config.h (配置定义)
 - logger.py: 对应 loggers.h/cpp (日志系统)
 - circular_buffer.py: 对应 circular_buffer.h (循环缓冲区)
+- event_profiler.py: 事件循环按事件源剖析 (无C++对应)
+- checkpoint.py: 仿真状态快照与恢复 (无C++对应)
+- pdes.py: 按分区的保守并行仿真 (无C++对应)
 """
 
 from .eventlist import EventList, EventSource, TriggerTarget
 from .network import Packet, PacketSink, PacketFlow, DataReceiver
 from .packet import PacketType, PacketDirection, PacketPriority
-from .route import Route
+from .route import Route, InternedRoute, RouteInterner
 from .routetable import RouteTable
 from .config import SimulationConfig
 from .logger import Logger, Logged, LoggedManager
 from .pipe import Pipe
 from .circular_buffer import CircularBuffer
+from .event_profiler import EventProfiler
+from .checkpoint import save_checkpoint, load_checkpoint, register_static, CheckpointError
+from .pdes import Partition, CanonicalScheduler, run_parallel, PdesError
 
 __all__ = [
     'EventList', 'EventSource', 'TriggerTarget',
     'Packet', 'PacketSink', 'PacketFlow', 'DataReceiver',
     'PacketType', 'PacketDirection', 'PacketPriority',
-    'Route', 'RouteTable', 'SimulationConfig', 'Logger', 'Logged', 'LoggedManager',
-    'Pipe', 'CircularBuffer',
+    'Route', 'InternedRoute', 'RouteInterner', 'RouteTable', 'SimulationConfig', 'Logger', 'Logged', 'LoggedManager',
+    'Pipe', 'CircularBuffer', 'EventProfiler',
+    'save_checkpoint', 'load_checkpoint', 'register_static', 'CheckpointError',
+    'Partition', 'CanonicalScheduler', 'run_parallel', 'PdesError',
 ]
\ No newline at end of file
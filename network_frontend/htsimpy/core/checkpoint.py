@@ -0,0 +1,194 @@
+"""
+Checkpoint - 仿真状态快照与恢复
+
+htsim C++ 中没有对应实现。把一次仿真的完整状态写入带版本号的文件:
+- EventList 的挂起事件（按时间的事件源表、触发器、当前时间、结束时间）
+- 所有已注册组件: Logged 管理器记录了每个 EventSource/队列/管道，
+  组件之间的引用（路由、流、包）随之一并序列化
+- 各类的静态成员（流ID计数器、Logged ID 等），通过 register_static 登记
+- random 与 numpy 全局随机数状态
+- 调用方传入的 roots（拓扑、源列表等驱动脚本需要继续使用的对象）
+
+恢复后可直接继续 `while EventList.do_next_event()`，也可以在加载后修改
+参数，从同一个预热好的快照分叉出多个变体。
+
+文件格式: CHECKPOINT_MAGIC + 4字节小端版本号 + gzip 压缩的 pickle 载荷
+（直方图、未用的缓冲区大多为零，压缩后体积很小）。
+组件中若持有 lambda、打开的文件等不可序列化对象，保存时抛出 CheckpointError。
+"""
+
+import gzip
+import importlib
+import os
+import pickle
+import random
+import struct
+import sys
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .eventlist import EventList
+from .logger.core import Logged
+from .network import Packet, PacketFlow
+
+CHECKPOINT_MAGIC = b"HTSIMPY-CKPT\n"
+CHECKPOINT_VERSION = 1
+
+# 组件图（包链表、环形队列）可能很深，序列化时临时提高递归上限
+PICKLE_RECURSION_LIMIT = 50000
+
+
+class CheckpointError(RuntimeError):
+    """快照无法写入或读取"""
+
+
+# (模块名, 类限定名或 None 表示模块本身) -> 需要保存的属性名
+_static_registry: Dict[Tuple[str, Optional[str]], Tuple[str, ...]] = {}
+
+
+def register_static(owner, *names: str) -> None:
+    """
+    登记需要随快照保存的类静态成员或模块全局变量
+
+    Args:
+        owner: 类或模块
+        names: 属性名
+    """
+    if isinstance(owner, types.ModuleType):
+        key = (owner.__name__, None)
+    else:
+        key = (owner.__module__, owner.__qualname__)
+    existing = _static_registry.get(key, ())
+    _static_registry[key] = existing + tuple(n for n in names if n not in existing)
+
+
+def _resolve(key: Tuple[str, Optional[str]]):
+    module_name, qualname = key
+    owner = importlib.import_module(module_name)
+    if qualname is not None:
+        for part in qualname.split("."):
+            owner = getattr(owner, part)
+    return owner
+
+
+def capture_statics() -> Dict[Tuple[str, Optional[str]], Dict[str, Any]]:
+    """读取所有已登记的静态成员"""
+    state = {}
+    for key, names in _static_registry.items():
+        owner = _resolve(key)
+        state[key] = {name: getattr(owner, name) for name in names if hasattr(owner, name)}
+    return state
+
+
+def restore_statics(state: Dict[Tuple[str, Optional[str]], Dict[str, Any]]) -> None:
+    """写回静态成员；所属模块会按需导入，恢复进程无需事先登记"""
+    for key, values in state.items():
+        owner = _resolve(key)
+        for name, value in values.items():
+            setattr(owner, name, value)
+
+
+# htsimpy 核心的静态状态
+register_static(EventList, "_endtime", "_lasteventtime", "_pending_triggers",
+                "_pending_by_time", "_sorted_times")
+register_static(Logged, "LASTIDNUM", "_logged_manager")
+register_static(PacketFlow, "_max_flow_id")
+register_static(Packet, "_data_packet_size", "_packet_size_fixed", "_defaultFlow")
+
+
+class Checkpoint:
+    """已加载的快照"""
+
+    def __init__(self, version: int, now: int, roots: Any, meta: Dict[str, Any]):
+        self.version = version
+        self.now = now      # 快照时刻的仿真时间
+        self.roots = roots  # 保存时传入的对象
+        self.meta = meta    # 保存时传入的附加信息
+
+
+def _with_recursion_limit(fn, *args):
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, PICKLE_RECURSION_LIMIT))
+    try:
+        return fn(*args)
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def save_checkpoint(path: str, roots: Any = None, meta: Optional[Dict[str, Any]] = None,
+                    now: Optional[int] = None) -> None:
+    """
+    把当前仿真状态写入 path
+
+    先写临时文件再原子替换，抢占发生在写入过程中也不会破坏已有快照。
+
+    Args:
+        path: 快照文件路径
+        roots: 恢复后需要拿回的对象（拓扑、源列表等），与组件图共享引用
+        meta: 附加信息（参数、迭代号等），需可序列化
+        now: 记录的仿真时间，默认 EventList.now()（其他引擎传入自己的时钟）
+    """
+    payload = {
+        "now": EventList.now() if now is None else now,
+        "statics": capture_statics(),
+        "random": random.getstate(),
+        "numpy": np.random.get_state(),
+        "roots": roots,
+        "meta": dict(meta or {}),
+    }
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(CHECKPOINT_MAGIC)
+            f.write(struct.pack("<I", CHECKPOINT_VERSION))
+            with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=1) as z:
+                _with_recursion_limit(pickle.dump, payload, z, pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise CheckpointError(f"Simulation state is not serializable: {e}") from e
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint_version(path: str) -> int:
+    """读取并校验文件头，返回版本号"""
+    with open(path, "rb") as f:
+        return _read_header(f)
+
+
+def _read_header(f) -> int:
+    magic = f.read(len(CHECKPOINT_MAGIC))
+    if magic != CHECKPOINT_MAGIC:
+        raise CheckpointError("Not an htsimpy checkpoint file")
+    (version,) = struct.unpack("<I", f.read(4))
+    if version > CHECKPOINT_VERSION:
+        raise CheckpointError(
+            f"Checkpoint version {version} is newer than supported version {CHECKPOINT_VERSION}")
+    return version
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """
+    从 path 恢复仿真状态，覆盖当前进程中的 EventList、静态成员和随机数状态
+
+    Returns:
+        Checkpoint，roots 为保存时传入的对象
+    """
+    with open(path, "rb") as f:
+        version = _read_header(f)
+        with gzip.GzipFile(fileobj=f, mode="rb") as z:
+            payload = _with_recursion_limit(pickle.load, z)
+
+    restore_statics(payload["statics"])
+    random.setstate(payload["random"])
+    np.random.set_state(payload["numpy"])
+    # EventList 通过 __reduce__ 恢复为本进程的单例
+    EventList.get_the_event_list()
+    return Checkpoint(version, payload["now"], payload["roots"], payload["meta"])
+
+
+def registered_statics() -> List[Tuple[str, Optional[str], Tuple[str, ...]]]:
+    """已登记的静态状态（调试用）"""
+    return [(module, qualname, names) for (module, qualname), names in _static_registry.items()]
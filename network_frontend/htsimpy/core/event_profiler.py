@@ -0,0 +1,261 @@
+"""
+EventProfiler - 事件循环按事件源的性能剖析
+
+htsim C++ 中没有对应实现。启用后替换 EventList 的 do_next_event /
+source_is_pending / cancel_* 类方法，按事件源类和实例统计:
+- 事件数
+- 累计墙钟时间 (perf_counter_ns)
+- 同一事件源同时挂起的事件数峰值
+
+关闭时恢复原始类方法，事件循环中不留任何额外分支，因此没有开销。
+外部剖析器（cProfile 等）会严重拖慢事件循环并扭曲比例，这里只在每个事件
+前后各取一次时钟。
+
+用法:
+    profiler = EventList.enable_profiling()
+    while EventList.do_next_event():
+        pass
+    EventList.disable_profiling()
+    print(profiler.report_table())
+    profiler.write_json("profile.json")
+
+或设置环境变量 AS_HTSIM_PROFILE=<json路径>，在首次创建 EventList 时自动启用，
+进程退出时打印表格并写出 JSON。
+"""
+
+import atexit
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+# 环境变量: 设置为 JSON 输出路径即启用剖析
+PROFILE_ENV = "AS_HTSIM_PROFILE"
+
+
+class SourceStats:
+    """单个事件源（或事件源类）的统计"""
+
+    __slots__ = ("name", "kind", "events", "wall_ns", "pending", "peak_pending")
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.events = 0
+        self.wall_ns = 0
+        self.pending = 0       # 当前挂起的事件数
+        self.peak_pending = 0  # 挂起事件数峰值
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "class": self.kind,
+            "events": self.events,
+            "wall_time_s": self.wall_ns / 1e9,
+            "mean_ns": self.wall_ns / self.events if self.events else 0.0,
+            "peak_pending": self.peak_pending,
+        }
+
+
+class EventProfiler:
+    """
+    按事件源统计事件数、墙钟时间和挂起事件峰值
+
+    统计以实例为单位保存（持有实例引用，避免 id 复用导致混淆），
+    按类汇总在导出时计算。触发器 (TriggerTarget) 同样按实例统计。
+    """
+
+    def __init__(self):
+        self._stats: Dict[int, SourceStats] = {}
+        self._sources: Dict[int, object] = {}  # 保持实例存活，使 id 不被复用
+        self.total_events = 0
+        self.total_wall_ns = 0
+        self.peak_pending = 0  # 整个事件表的挂起事件峰值
+        self._pending = 0
+        self._start_ns = time.perf_counter_ns()
+        self._stop_ns: Optional[int] = None
+
+    def stats_for(self, src) -> SourceStats:
+        """获取（必要时创建）事件源的统计项"""
+        key = id(src)
+        stats = self._stats.get(key)
+        if stats is None:
+            # Logged 的名字（对应 C++ Logged::str()），触发器等无名对象用 repr
+            name = getattr(src, "_name", None) or repr(src)
+            stats = SourceStats(str(name), type(src).__name__)
+            self._stats[key] = stats
+            self._sources[key] = src
+        return stats
+
+    # ---- 由 EventList 包装方法调用 ----
+
+    def record_event(self, src, elapsed_ns: int) -> None:
+        stats = self.stats_for(src)
+        stats.events += 1
+        stats.wall_ns += elapsed_ns
+        self.total_events += 1
+        self.total_wall_ns += elapsed_ns
+
+    def record_scheduled(self, src) -> None:
+        stats = self.stats_for(src)
+        stats.pending += 1
+        if stats.pending > stats.peak_pending:
+            stats.peak_pending = stats.pending
+        self._pending += 1
+        if self._pending > self.peak_pending:
+            self.peak_pending = self._pending
+
+    def record_unscheduled(self, src) -> None:
+        stats = self._stats.get(id(src))
+        if stats is not None and stats.pending > 0:
+            stats.pending -= 1
+            self._pending -= 1
+
+    def is_pending(self, src) -> bool:
+        stats = self._stats.get(id(src))
+        return stats is not None and stats.pending > 0
+
+    def stop(self) -> None:
+        if self._stop_ns is None:
+            self._stop_ns = time.perf_counter_ns()
+
+    # ---- 导出 ----
+
+    def by_instance(self) -> List[SourceStats]:
+        """按累计时间降序排列的实例统计"""
+        return sorted(self._stats.values(), key=lambda s: s.wall_ns, reverse=True)
+
+    def by_class(self) -> List[SourceStats]:
+        """按类汇总，峰值取各实例峰值的最大值"""
+        classes: Dict[str, SourceStats] = {}
+        for stats in self._stats.values():
+            agg = classes.get(stats.kind)
+            if agg is None:
+                agg = classes[stats.kind] = SourceStats(stats.kind, stats.kind)
+            agg.events += stats.events
+            agg.wall_ns += stats.wall_ns
+            agg.peak_pending = max(agg.peak_pending, stats.peak_pending)
+        return sorted(classes.values(), key=lambda s: s.wall_ns, reverse=True)
+
+    def to_dict(self, top: Optional[int] = None) -> dict:
+        end = self._stop_ns if self._stop_ns is not None else time.perf_counter_ns()
+        instances = self.by_instance()
+        if top is not None:
+            instances = instances[:top]
+        return {
+            "total_events": self.total_events,
+            "event_wall_time_s": self.total_wall_ns / 1e9,
+            "elapsed_wall_time_s": (end - self._start_ns) / 1e9,
+            "peak_pending": self.peak_pending,
+            "classes": [s.to_dict() for s in self.by_class()],
+            "instances": [s.to_dict() for s in instances],
+        }
+
+    def write_json(self, path: str, top: Optional[int] = None) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(top), f, indent=2)
+
+    def report_table(self, top: int = 20) -> str:
+        """按类和按实例（前 top 个）的文本表格"""
+        total = self.total_wall_ns or 1
+        lines = [
+            f"htsimpy event profile: {self.total_events} events, "
+            f"{self.total_wall_ns / 1e9:.3f}s in handlers, peak pending {self.peak_pending}",
+        ]
+
+        def section(title: str, rows: List[SourceStats]) -> None:
+            lines.append("")
+            lines.append(f"{title:<40} {'events':>10} {'time(s)':>10} {'%':>6} "
+                         f"{'ns/event':>10} {'peak':>6}")
+            for s in rows:
+                mean = s.wall_ns / s.events if s.events else 0.0
+                lines.append(f"{s.name[:40]:<40} {s.events:>10} {s.wall_ns / 1e9:>10.4f} "
+                             f"{100.0 * s.wall_ns / total:>6.1f} {mean:>10.0f} {s.peak_pending:>6}")
+
+        section("class", self.by_class())
+        section(f"instance (top {top})", self.by_instance()[:top])
+        return "\n".join(lines)
+
+
+def install(eventlist_cls, profiler: EventProfiler) -> None:
+    """把 EventList 的调度类方法替换为带统计的版本"""
+    orig_do_next = eventlist_cls.__dict__["do_next_event"].__func__
+    orig_pending = eventlist_cls.__dict__["source_is_pending"].__func__
+    orig_cancel = eventlist_cls.__dict__["cancel_pending_source"].__func__
+    orig_cancel_time = eventlist_cls.__dict__["cancel_pending_source_by_time"].__func__
+    orig_cancel_handle = eventlist_cls.__dict__["cancel_pending_source_by_handle"].__func__
+    clock = time.perf_counter_ns
+
+    def do_next_event(cls) -> bool:
+        # 先窥视下一个事件的来源，不改变事件表
+        if cls._pending_triggers:
+            src = cls._pending_triggers[-1]
+        elif cls._sorted_times:
+            sources = cls._pending_by_time.get(cls._sorted_times[0])
+            if not sources:
+                # 空时间槽由原方法清理后递归回到这里，本次不计数
+                return orig_do_next(cls)
+            src = sources[0]
+            profiler.record_unscheduled(src)
+        else:
+            return False
+        start = clock()
+        result = orig_do_next(cls)
+        profiler.record_event(src, clock() - start)
+        return result
+
+    def source_is_pending(cls, src, when) -> None:
+        if cls._endtime == 0 or max(when, cls._lasteventtime) < cls._endtime:
+            profiler.record_scheduled(src)
+        orig_pending(cls, src, when)
+
+    def cancel_pending_source(cls, src) -> None:
+        # 只要该源有挂起事件，原方法就会删除其中一个
+        if profiler.is_pending(src):
+            profiler.record_unscheduled(src)
+        orig_cancel(cls, src)
+
+    def cancel_pending_source_by_time(cls, src, when) -> None:
+        orig_cancel_time(cls, src, when)
+        profiler.record_unscheduled(src)
+
+    def cancel_pending_source_by_handle(cls, src, handle) -> None:
+        orig_cancel_handle(cls, src, handle)
+        profiler.record_unscheduled(src)
+
+    eventlist_cls._profiler_originals = {
+        "do_next_event": eventlist_cls.__dict__["do_next_event"],
+        "source_is_pending": eventlist_cls.__dict__["source_is_pending"],
+        "cancel_pending_source": eventlist_cls.__dict__["cancel_pending_source"],
+        "cancel_pending_source_by_time": eventlist_cls.__dict__["cancel_pending_source_by_time"],
+        "cancel_pending_source_by_handle": eventlist_cls.__dict__["cancel_pending_source_by_handle"],
+    }
+    eventlist_cls.do_next_event = classmethod(do_next_event)
+    eventlist_cls.source_is_pending = classmethod(source_is_pending)
+    eventlist_cls.cancel_pending_source = classmethod(cancel_pending_source)
+    eventlist_cls.cancel_pending_source_by_time = classmethod(cancel_pending_source_by_time)
+    eventlist_cls.cancel_pending_source_by_handle = classmethod(cancel_pending_source_by_handle)
+
+
+def uninstall(eventlist_cls) -> None:
+    """恢复 EventList 的原始类方法"""
+    originals = eventlist_cls.__dict__.get("_profiler_originals")
+    if originals is None:
+        return
+    for name, method in originals.items():
+        setattr(eventlist_cls, name, method)
+    del eventlist_cls._profiler_originals
+
+
+def export_at_exit(profiler: EventProfiler, json_path: Optional[str], top: int = 20) -> None:
+    """进程退出时打印表格并写出 JSON"""
+    def _export():
+        profiler.stop()
+        print(profiler.report_table(top))
+        if json_path:
+            profiler.write_json(json_path)
+    atexit.register(_export)
+
+
+def profile_path_from_env() -> Optional[str]:
+    return os.environ.get(PROFILE_ENV) or None
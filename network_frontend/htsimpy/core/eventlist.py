@@ -134,6 +134,8 @@ class EventList:
     _pending_triggers: List[TriggerTarget] = []  # 对应 vector<TriggerTarget*>
     _instance_count: int = 0
     _the_event_list: Optional['EventList'] = None
+    # 事件源剖析器（见 event_profiler.py），None 表示未启用
+    _profiler = None
     
     # 使用字典+列表模拟C++ multimap的行为
     # key是时间戳，value是该时间戳的所有事件源列表
@@ -167,6 +169,12 @@ class EventList:
         
         EventList._the_event_list = self
         EventList._instance_count += 1
+
+        # AS_HTSIM_PROFILE=<json路径> 时自动启用剖析，退出时导出
+        from .event_profiler import profile_path_from_env, export_at_exit
+        json_path = profile_path_from_env()
+        if json_path and EventList._profiler is None:
+            export_at_exit(EventList.enable_profiling(), json_path)
     
     # 禁用拷贝构造函数和赋值运算符
     def __copy__(self):
@@ -174,6 +182,10 @@ class EventList:
     
     def __deepcopy__(self, memo):
         raise RuntimeError("EventList cannot be copied")
+
+    def __reduce__(self):
+        """快照中的引用恢复为当前进程的单例（状态在类成员中，见 checkpoint.py）"""
+        return (EventList.get_the_event_list, ())
     
     @classmethod
     def get_the_event_list(cls) -> 'EventList':
@@ -400,6 +412,39 @@ class EventList:
         """返回待处理事件的总数（用于测试和调试）"""
         return sum(len(sources) for sources in cls._pending_by_time.values())
     
+    @classmethod
+    def enable_profiling(cls, profiler=None):
+        """
+        启用按事件源的剖析（htsim C++ 无对应实现）
+
+        替换调度相关的类方法为带统计的版本；未启用时事件循环没有任何额外开销。
+        返回正在使用的 EventProfiler。
+        """
+        from .event_profiler import EventProfiler, install
+        if cls._profiler is not None:
+            return cls._profiler
+        if profiler is None:
+            profiler = EventProfiler()
+        install(cls, profiler)
+        cls._profiler = profiler
+        return profiler
+
+    @classmethod
+    def disable_profiling(cls):
+        """停止剖析并恢复原始类方法，返回剖析器（未启用时为 None）"""
+        from .event_profiler import uninstall
+        profiler = cls._profiler
+        if profiler is not None:
+            uninstall(cls)
+            profiler.stop()
+            cls._profiler = None
+        return profiler
+
+    @classmethod
+    def profiler(cls):
+        """当前剖析器，未启用时为 None"""
+        return cls._profiler
+
     @classmethod
     def reset(cls) -> None:
         """重置所有静态成员变量（仅用于测试）"""
@@ -16,7 +16,7 @@ Network - 网络核心类
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, List, TypeVar, Generic
+from typing import Optional, List, TypeVar, Generic, Dict, Tuple
 import sys
 from enum import IntEnum
 
@@ -186,6 +186,8 @@ class PacketFlow(Logged):
         self._logger = logger
         self._flow_id = PacketFlow._max_flow_id
         PacketFlow._max_flow_id += 1
+        # 交换机 ECMP 哈希缓存: (交换机盐值, pathid) -> 哈希，随流释放
+        self._ecmp_hashes: Dict[Tuple[int, int], int] = {}
     
     def set_logger(self, logger: TrafficLogger) -> None:
         """
@@ -219,6 +221,7 @@ class PacketFlow(Logged):
             print("Illegal flow ID - manually allocation must be less than dynamic base", file=sys.stderr)
             sys.exit(1)  # 对应 C++ 的 assert(0)
         self._flow_id = id
+        self._ecmp_hashes.clear()
     
     def flow_id(self) -> FlowId:
         """对应 inline flowid_t flow_id() const {return _flow_id;}"""
@@ -0,0 +1,549 @@
+"""
+PDES - 按分区的保守并行离散事件仿真
+
+htsim C++ 中没有对应实现。把一个拓扑按分区（如 FatTree 的 pod）分给多个
+工作进程，每个进程运行完整的建图脚本，但只执行自己拥有的组件的事件:
+- 跨分区的链路必须是 Pipe，Pipe 归接收端所有；发送端看到的是“影子” Pipe，
+  收到的包被放入发往所有者的邮箱
+- 前瞻量 L = 所有跨分区 Pipe 延迟的最小值。每个窗口中各进程执行
+  时间 < GVT + L 的事件，此时任何跨分区包都不会早于窗口结束到达
+- 窗口结束时经共享内存邮箱交换包（两次屏障同步），然后取各进程下一个
+  事件时间的最小值作为新的 GVT；没有空闲窗口，GVT 直接跳到下一个事件
+
+确定性: 串行 EventList 在同一时刻按插入顺序执行事件（与 C++ multimap 一致），
+插入顺序取决于其他分区的包何时被注入，并行时无法复现。工作进程因此安装
+CanonicalScheduler，按 (时间, 事件源 Logged ID, 插入序号) 排序，与分区无关。
+串行参考运行也要先安装它（见 CanonicalScheduler），否则同一时刻的事件顺序
+不同，结果与并行运行不可比。
+
+以下情况不保证确定性:
+- 运行期间才创建的事件源: Logged ID 按创建顺序分配，在不同分区下不同
+- RandomQueue 等运行期间从全局 random 取数的组件: 不同分区下消耗随机数的
+  顺序不同
+应换成建图时创建的、确定性的组件。
+
+用法:
+    def build(workers):
+        ...建拓扑、流...
+        partition = pod_partition(topology, workers)  # datacenter/fat_tree_partition.py
+        partition.assign(src, partition.worker_of(host))
+        return partition, srcs
+
+    def collect(srcs, ctx):
+        return {i: s._last_acked for i, s in enumerate(srcs) if ctx.owns(s)}
+
+    result = run_parallel(build, workers=4, collect=collect)
+"""
+
+import heapq
+import io
+import multiprocessing as mp
+import pickle
+import struct
+import time
+import traceback
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .eventlist import EventList
+from .logger.core import Logged
+from .network import PacketSink
+from .pipe import Pipe
+from .route import Route
+
+INF = float("inf")
+
+# 每个 (发送, 接收) 进程对的邮箱默认容量（字节）
+DEFAULT_MAILBOX_BYTES = 16 << 20
+
+_LENGTH = struct.Struct("<Q")
+
+
+class PdesError(RuntimeError):
+    """并行运行失败（分区不合法、邮箱溢出或工作进程异常）"""
+
+
+class CanonicalScheduler:
+    """
+    与分区无关的事件表: 按 (时间, 事件源 Logged ID, 插入序号) 排序的堆
+
+    安装后替换 EventList 的调度类方法（与 EventProfiler 相同的方式），
+    uninstall 恢复；默认的串行 EventList 不受影响。run_parallel 的工作进程
+    总是安装它。与并行运行对比的串行参考运行:
+
+        EventList.reset()
+        CanonicalScheduler().install(EventList)
+        ...建图...
+        while EventList.do_next_event():
+            pass
+
+    插入序号只区分同一事件源在同一时刻的多个事件，它们谁先执行结果都一样。
+    取消操作只把堆项标记为失效，出堆时跳过。
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []  # [时间, 事件源 ID, 插入序号, 事件源, 有效]
+        self._live: Dict[int, List[list]] = {}  # id(src) -> 有效堆项
+        self._sequence = 0
+
+    def next_time(self) -> float:
+        """下一个事件的时间（有待触发的触发器时为当前时间），事件表为空时为 INF"""
+        if EventList._pending_triggers:
+            return EventList._lasteventtime
+        heap = self._heap
+        while heap and not heap[0][4]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else INF
+
+    def pending_count(self) -> int:
+        return sum(len(entries) for entries in self._live.values())
+
+    def _push(self, src, when) -> None:
+        entry = [when, getattr(src, "_log_id", -1), self._sequence, src, True]
+        self._sequence += 1
+        heapq.heappush(self._heap, entry)
+        self._live.setdefault(id(src), []).append(entry)
+
+    def _kill(self, src, when=None) -> bool:
+        """取消 src 最早的一个挂起事件（when 不为 None 时只取消该时刻的），返回是否找到"""
+        entries = self._live.get(id(src))
+        if not entries:
+            return False
+        if when is None:
+            entry = min(entries)
+        else:
+            entry = next((e for e in entries if e[0] == when), None)
+            if entry is None:
+                return False
+        entry[4] = False
+        entries.remove(entry)
+        if not entries:
+            del self._live[id(src)]
+        return True
+
+    def silence(self, ghosts: List[Any]) -> None:
+        """删除影子事件源（归其他进程所有）已挂起的事件，之后它们的事件什么也不做"""
+        for src in ghosts:
+            while self._kill(src):
+                pass
+            if hasattr(src, "do_next_event"):
+                src.do_next_event = _idle
+
+    def run_until(self, horizon: float) -> int:
+        """执行时间 < horizon 的事件（及其间的触发器），返回执行数"""
+        heap = self._heap
+        triggers = EventList._pending_triggers
+        do_next_event = EventList.do_next_event
+        count = 0
+        while triggers or (heap and heap[0][0] < horizon):
+            if not triggers and not heap[0][4]:
+                heapq.heappop(heap)  # 已取消的事件
+                continue
+            do_next_event()
+            count += 1
+        return count
+
+    def install(self, eventlist_cls) -> None:
+        """替换 EventList 的调度类方法"""
+        sched = self
+        heap = self._heap
+
+        def do_next_event(cls) -> bool:
+            if cls._pending_triggers:
+                cls._pending_triggers.pop().activate()
+                return True
+            while heap:
+                entry = heapq.heappop(heap)
+                if not entry[4]:
+                    continue
+                src = entry[3]
+                entries = sched._live[id(src)]
+                entries.remove(entry)
+                if not entries:
+                    del sched._live[id(src)]
+                assert entry[0] >= cls._lasteventtime
+                cls._lasteventtime = entry[0]
+                src.do_next_event()
+                return True
+            return False
+
+        def source_is_pending(cls, src, when) -> None:
+            # 与 EventList.source_is_pending 相同: 过去的时间按当前时间处理
+            if when < cls._lasteventtime:
+                when = cls._lasteventtime
+            if cls._endtime == 0 or when < cls._endtime:
+                sched._push(src, when)
+
+        def cancel_pending_source(cls, src) -> None:
+            sched._kill(src)
+
+        def cancel_pending_source_by_time(cls, src, when) -> None:
+            sched._kill(src, when)
+
+        def cancel_pending_source_by_handle(cls, src, handle) -> None:
+            sched._kill(src, handle.time)
+
+        def pending_count(cls) -> int:
+            return sched.pending_count()
+
+        eventlist_cls._pdes_originals = {
+            name: eventlist_cls.__dict__[name]
+            for name in ("do_next_event", "source_is_pending", "cancel_pending_source",
+                         "cancel_pending_source_by_time", "cancel_pending_source_by_handle",
+                         "pending_count")
+        }
+        eventlist_cls.do_next_event = classmethod(do_next_event)
+        eventlist_cls.source_is_pending = classmethod(source_is_pending)
+        eventlist_cls.cancel_pending_source = classmethod(cancel_pending_source)
+        eventlist_cls.cancel_pending_source_by_time = classmethod(cancel_pending_source_by_time)
+        eventlist_cls.cancel_pending_source_by_handle = classmethod(cancel_pending_source_by_handle)
+        eventlist_cls.pending_count = classmethod(pending_count)
+
+    @staticmethod
+    def uninstall(eventlist_cls) -> None:
+        """恢复 EventList 的原始类方法"""
+        originals = eventlist_cls.__dict__.get("_pdes_originals")
+        if originals is None:
+            return
+        for name, method in originals.items():
+            setattr(eventlist_cls, name, method)
+        del eventlist_cls._pdes_originals
+
+
+def _idle() -> None:
+    pass
+
+
+class Partition:
+    """
+    组件到工作进程的映射
+
+    未分配的组件在每个进程中都是本地的（每个进程各有一份），适用于只在
+    建图时使用的对象。跨分区的包只能经过用 assign_link 登记的 Pipe。
+    """
+
+    def __init__(self, workers: int):
+        if workers < 1:
+            raise PdesError(f"workers must be >= 1, got {workers}")
+        self.workers = workers
+        self._owner: Dict[int, int] = {}
+        self._objects: List[Any] = []  # 保持对象存活，使 id 不被复用
+        self._boundary: List[Pipe] = []
+
+    def assign(self, component, worker: int) -> None:
+        """把组件分给 worker"""
+        if not 0 <= worker < self.workers:
+            raise PdesError(f"worker {worker} out of range [0, {self.workers})")
+        key = id(component)
+        if key not in self._owner:
+            self._objects.append(component)
+        self._owner[key] = worker
+
+    def assign_link(self, pipe: Pipe, src_worker: int, dst_worker: int) -> None:
+        """登记一条链路: Pipe 归接收端，两端不同时为跨分区链路"""
+        self.assign(pipe, dst_worker)
+        if src_worker != dst_worker:
+            self._boundary.append(pipe)
+
+    def owner(self, component) -> Optional[int]:
+        return self._owner.get(id(component))
+
+    def objects(self) -> List[Any]:
+        return list(self._objects)
+
+    def boundary_links(self) -> List[Pipe]:
+        return list(self._boundary)
+
+    def lookahead(self) -> float:
+        """跨分区链路的最小延迟，没有跨分区链路时为 INF"""
+        if not self._boundary:
+            return INF
+        return min(pipe.delay() for pipe in self._boundary)
+
+
+class WorkerContext:
+    """传给 collect 的工作进程信息"""
+
+    def __init__(self, rank: int, workers: int, partition: Partition):
+        self.rank = rank
+        self.workers = workers
+        self.partition = partition
+
+    def owns(self, component) -> bool:
+        """组件归本进程所有（未分配的组件视为本地）"""
+        owner = self.partition.owner(component)
+        return owner is None or owner == self.rank
+
+
+class PdesResult:
+    """并行运行的结果"""
+
+    def __init__(self, results: List[Any], stats: List[Dict[str, Any]]):
+        self.results = results  # 各进程 collect 的返回值，按 rank 排列
+        self.stats = stats      # 各进程的统计: events, windows, sent, received, now, window_cpu
+
+    @property
+    def now(self) -> int:
+        """所有进程中最后一个事件的时间"""
+        return max(s["now"] for s in self.stats)
+
+    @property
+    def events(self) -> int:
+        return sum(s["events"] for s in self.stats)
+
+    @property
+    def windows(self) -> int:
+        return self.stats[0]["windows"] if self.stats else 0
+
+    @property
+    def messages(self) -> int:
+        return sum(s["sent"] for s in self.stats)
+
+    @property
+    def critical_path(self) -> float:
+        """
+        各窗口中最慢进程的 CPU 时间（秒）之和，不含屏障等待
+
+        即每个进程独占一个核时的运行时间下限；进程多于核时墙钟时间
+        反映不出并行收益，用它估计。
+        """
+        if not self.stats:
+            return 0.0
+        return sum(max(per_window) for per_window in zip(*(s["window_cpu"] for s in self.stats)))
+
+
+class _BoundaryPickler(pickle.Pickler):
+    """建图时创建的对象按引用序列化，各进程中它们的编号一致"""
+
+    def __init__(self, file, refs: Dict[int, int]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._refs = refs
+
+    def persistent_id(self, obj):
+        ref = self._refs.get(id(obj))
+        if ref is not None:
+            return ref
+        if isinstance(obj, Logged):
+            raise pickle.PicklingError(
+                f"{type(obj).__name__} {obj._name!r} was created after setup "
+                f"and cannot cross a partition boundary")
+        return None
+
+
+class _BoundaryUnpickler(pickle.Unpickler):
+    def __init__(self, file, objects: List[Any]):
+        super().__init__(file)
+        self._objects = objects
+
+    def persistent_load(self, ref):
+        return self._objects[ref]
+
+
+def _shared_objects(partition: Partition) -> List[Any]:
+    """
+    建图时创建、各进程中一一对应的对象: Logged 对象、分区中的对象、
+    以及它们属性中的路由（含反向路由），顺序由建图脚本决定
+    """
+    objects: List[Any] = []
+    seen = set()
+
+    def add(obj) -> None:
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            objects.append(obj)
+
+    def add_route(route: Route) -> None:
+        while route is not None and id(route) not in seen:
+            add(route)
+            route = route._reverse
+
+    roots = list(Logged._logged_manager._idmap) + partition.objects()
+    for obj in roots:
+        add(obj)
+    for obj in roots:
+        for value in getattr(obj, "__dict__", {}).values():
+            if isinstance(value, Route):
+                add_route(value)
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    if isinstance(item, Route):
+                        add_route(item)
+            elif isinstance(value, dict):
+                for item in value.values():
+                    if isinstance(item, Route):
+                        add_route(item)
+    return objects
+
+
+def _mailbox_name(prefix: str, src: int, dst: int) -> str:
+    return f"{prefix}_{src}_{dst}"
+
+
+def _worker_main(rank, workers, build, collect, prefix, capacity, barrier,
+                 next_times, results) -> None:
+    mailboxes: List[shared_memory.SharedMemory] = []
+    try:
+        EventList.reset()
+        sched = CanonicalScheduler()
+        sched.install(EventList)
+        partition, roots = build(workers)
+        if partition.workers != workers:
+            raise PdesError(f"build() returned a partition for {partition.workers} workers, "
+                            f"expected {workers}")
+        lookahead = partition.lookahead()
+        if lookahead <= 0:
+            raise PdesError("Cross-partition links need a positive delay")
+
+        shared = _shared_objects(partition)
+        refs = {id(obj): i for i, obj in enumerate(shared)}
+        outboxes: List[list] = [[] for _ in range(workers)]
+
+        # 影子组件: 包只能经影子 Pipe 离开本进程
+        ghosts = []
+        for obj in partition.objects():
+            owner = partition.owner(obj)
+            if owner == rank:
+                continue
+            ghosts.append(obj)
+            if isinstance(obj, Pipe):
+                obj.receivePacket = _forwarder(outboxes[owner], refs[id(obj)])
+            elif isinstance(obj, PacketSink):
+                obj.receivePacket = _misrouted(obj, owner)
+        sched.silence(ghosts)
+
+        for src in range(workers):
+            if src != rank:
+                mailboxes.append(shared_memory.SharedMemory(_mailbox_name(prefix, src, rank)))
+        outgoing = {dst: shared_memory.SharedMemory(_mailbox_name(prefix, rank, dst))
+                    for dst in range(workers) if dst != rank}
+
+        events = windows = sent = received = 0
+        window_cpu: List[float] = []
+        cpu = time.process_time
+        parity = 0
+        next_times[rank] = sched.next_time()
+        barrier.wait()
+        gvt = min(next_times[:workers])
+        while gvt < INF:
+            windows += 1
+            start = cpu()
+            horizon = gvt + lookahead
+            events += sched.run_until(horizon)
+
+            # 阶段 A: 写邮箱
+            for dst, shm in outgoing.items():
+                batch = outboxes[dst]
+                buf = io.BytesIO()
+                _BoundaryPickler(buf, refs).dump(batch)
+                data = buf.getbuffer()
+                if _LENGTH.size + len(data) > capacity:
+                    raise PdesError(f"Mailbox {rank}->{dst} overflow: {len(data)} bytes in one "
+                                    f"window, capacity {capacity}")
+                shm.buf[:_LENGTH.size] = _LENGTH.pack(len(data))
+                shm.buf[_LENGTH.size:_LENGTH.size + len(data)] = data
+                sent += len(batch)
+                batch.clear()
+            busy = cpu() - start
+            barrier.wait()
+
+            # 阶段 B: 读邮箱并以发送时刻注入本地 Pipe
+            start_read = cpu()
+            now = EventList._lasteventtime
+            for shm in mailboxes:
+                (size,) = _LENGTH.unpack_from(shm.buf)
+                payload = io.BytesIO(bytes(shm.buf[_LENGTH.size:_LENGTH.size + size]))
+                for when, ref, pkt in _BoundaryUnpickler(payload, shared).load():
+                    EventList._lasteventtime = when
+                    shared[ref].receivePacket(pkt)
+                    received += 1
+            EventList._lasteventtime = now
+            window_cpu.append(busy + cpu() - start_read)
+
+            # 下一个时间写入双缓冲的一半，避免快的进程覆盖慢的进程尚未读取的值
+            parity ^= 1
+            slot = parity * workers
+            next_times[slot + rank] = sched.next_time()
+            barrier.wait()
+            gvt = min(next_times[slot:slot + workers])
+
+        stats = {"rank": rank, "events": events, "windows": windows, "sent": sent,
+                 "received": received, "now": EventList._lasteventtime,
+                 "lookahead": lookahead, "window_cpu": window_cpu}
+        results.put((rank, None, collect(roots, WorkerContext(rank, workers, partition)), stats))
+    except BaseException:
+        barrier.abort()
+        results.put((rank, traceback.format_exc(), None, None))
+    finally:
+        for shm in mailboxes:
+            shm.close()
+
+
+def _forwarder(outbox: list, ref: int):
+    def receivePacket(packet, virtual_queue=None) -> None:
+        outbox.append((EventList._lasteventtime, ref, packet))
+    return receivePacket
+
+
+def _misrouted(sink, owner: int):
+    def receivePacket(packet, virtual_queue=None) -> None:
+        raise PdesError(f"Packet reached {sink.nodename()} owned by worker {owner} without "
+                        f"crossing a registered link")
+    return receivePacket
+
+
+def run_parallel(build: Callable[[int], Tuple[Partition, Any]], workers: int,
+                 collect: Callable[[Any, WorkerContext], Any],
+                 mailbox_bytes: int = DEFAULT_MAILBOX_BYTES) -> PdesResult:
+    """
+    用 workers 个进程并行运行仿真
+
+    每个进程（fork 启动）调用 build(workers) 建出同样的组件图，返回
+    (Partition, roots)；运行结束后调用 collect(roots, ctx) 取出本进程
+    所有组件的结果。建图必须是确定性的: 各进程的组件创建顺序相同。
+
+    Args:
+        build: 建图函数，在 EventList 已重置的进程中调用
+        workers: 进程数
+        collect: 结果提取函数，返回值需可序列化
+        mailbox_bytes: 每个进程对的邮箱容量，一个窗口内的包超过它时报错
+
+    Returns:
+        PdesResult
+    """
+    ctx = mp.get_context("fork")
+    prefix = f"htsimpy_pdes_{mp.current_process().pid}_{id(build):x}"
+    boxes = [shared_memory.SharedMemory(_mailbox_name(prefix, src, dst), create=True,
+                                        size=mailbox_bytes)
+             for src in range(workers) for dst in range(workers) if src != dst]
+    barrier = ctx.Barrier(workers)
+    next_times = ctx.Array("d", 2 * workers, lock=False)
+    results = ctx.SimpleQueue()
+    procs = [ctx.Process(target=_worker_main,
+                         args=(rank, workers, build, collect, prefix, mailbox_bytes,
+                               barrier, next_times, results))
+             for rank in range(workers)]
+    try:
+        for proc in procs:
+            proc.start()
+        collected: Dict[int, tuple] = {}
+        errors = []
+        for _ in range(workers):
+            rank, error, value, stats = results.get()
+            if error is not None:
+                errors.append(f"worker {rank}:\n{error}")
+            collected[rank] = (value, stats)
+        for proc in procs:
+            proc.join()
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+        for shm in boxes:
+            shm.close()
+            shm.unlink()
+    if errors:
+        # 其他进程因屏障中止而报的错不是根因，只保留首个
+        root = [e for e in errors if "BrokenBarrierError" not in e] or errors
+        raise PdesError(root[0])
+    return PdesResult([collected[r][0] for r in range(workers)],
+                      [collected[r][1] for r in range(workers)])
@@ -148,10 +148,13 @@ class Pipe(EventSource, PacketSink, Drawable):
         if self._next_insert < self._next_pop:
             # 对应 C++ 注释：//   456789*123 和 // NI *, NP 1
             # 将前半部分移动到新空间
+            inflight = self._inflight_v
             for i in range(self._next_insert):
                 # 对应 C++ 中的 _inflight_v.at(_size+i) = _inflight_v.at(i)
                 # 注释说明：move 4-9 into new space (实际是move 0到_next_insert-1)
-                self._inflight_v[old_size + i] = self._inflight_v[i]
+                # C++ 按值拷贝记录；这里交换两个 PktRecord 对象，避免两个槽位共用
+                # 同一个记录、之后写入槽位 i 时覆盖仍在途中的包
+                inflight[old_size + i], inflight[i] = inflight[i], inflight[old_size + i]
             # 对应 C++ 中的 _next_insert += _size
             self._next_insert += old_size
         else:
@@ -21,10 +21,18 @@ C++对应关系:
 - Route::hop_count() -> Route.hop_count()
 - Route::reverse() -> Route.reverse()
 - Route::set_reverse() -> Route.set_reverse()
+- Route(const Route& orig, PacketSink& dst) -> Route.with_destination()
+
+C++中没有对应的扩展:
+- Route.from_hops(): 由跳序列一次性构造路由，供拓扑的路径模板实例化
+- InternedRoute: 不可变路由，跳序列保存为元组，由 RouteInterner 驻留
+- RouteInterner: 每个拓扑一张的路由驻留表，按跳的对象身份查找，
+  相同路径只保留一个对象，反向路由和"追加目的端"派生的路由随路由缓存
 """
 
-from typing import List, Optional, Iterator
+from typing import Dict, Iterable, List, Optional, Iterator, Tuple
 from .network import PacketSink
+from .pipe import Pipe
 
 
 class Route:
@@ -55,11 +63,8 @@ class Route:
             self._hop_count = orig_route.hop_count()  # 先设置为原始值
             self._no_of_paths = orig_route.no_of_paths()
             
-            # C++中的实现方式：预分配空间后逐个赋值
-            self._sinklist = [None] * (orig_route.size() + 1)
-            for i in range(orig_route.size()):
-                self._sinklist[i] = orig_route.at(i)
-            self._sinklist[orig_route.size()] = dst
+            self._sinklist = list(orig_route._sinklist)
+            self._sinklist.append(dst)
             # 对应 C++: _hop_count++; (直接增加，不调用update_hopcount)
             self._hop_count += 1
         elif size is not None:
@@ -135,11 +140,8 @@ class Route:
         # 注释说明不克隆反向路径: /* don't clone the reverse path */
         copy._reverse = self._reverse
         
-        # 对应 C++: copy->_sinklist.resize(_sinklist.size());
-        # 然后逐个赋值: copy->_sinklist[i] = _sinklist[i];
-        copy._sinklist = [None] * len(self._sinklist)
-        for i in range(len(self._sinklist)):
-            copy._sinklist[i] = self._sinklist[i]
+        # 对应 C++: copy->_sinklist = _sinklist（整体拷贝）
+        copy._sinklist = list(self._sinklist)
         
         # C++中没有显式设置_hop_count，是通过直接赋值保持的
         # 但在Python中我们需要显式设置
@@ -147,6 +149,28 @@ class Route:
         
         return copy
     
+    def with_destination(self, dst: PacketSink) -> 'Route':
+        """
+        对应 C++ 中的 Route(const Route& orig, PacketSink& dst)
+        返回在末尾追加 dst 的新路由
+        """
+        return Route(orig_route=self, dst=dst)
+
+    @classmethod
+    def from_hops(cls, hops: Iterable[PacketSink], hop_count: Optional[int] = None) -> 'Route':
+        """
+        由跳序列一次性构造可变路由（C++中没有对应）
+
+        hop_count 已知时（如拓扑的路径模板）直接使用，否则按 Pipe 个数计算，
+        结果与逐个 push_back 相同。
+        """
+        route = cls()
+        route._sinklist = list(hops)
+        if hop_count is None:
+            hop_count = sum(1 for sink in route._sinklist if isinstance(sink, Pipe))
+        route._hop_count = hop_count
+        return route
+
     def set_reverse(self, reverse: 'Route') -> None:
         """
         对应 C++ 中的 void set_reverse(Route* reverse)
@@ -197,7 +221,6 @@ class Route:
         """
         # 检查是否是 Pipe 类型来更新跳数
         # 对应 C++ 中的 dynamic_cast<Pipe*>(sink) != NULL
-        from .pipe import Pipe
         if isinstance(sink, Pipe):
             self._hop_count += 1
     
@@ -262,6 +285,147 @@ class Route:
         return f"Route(path={self._sinklist}, hops={self._hop_count}, path_id={self._path_id}, reverse={self._reverse is not None})"
 
 
+class InternedRoute(Route):
+    """
+    不可变路由 - 由 RouteInterner 创建，多条流共享同一个对象
+
+    跳序列保存为元组，at()/size() 为 O(1)；反向路由在驻留时确定，
+    with_destination() 派生的路由按目的端缓存在本路由上。
+    所有修改操作抛出 TypeError，需要修改时用 clone() 得到可变的 Route。
+    成员放在 __slots__ 中，每条流派生一个路由时也不为其分配属性字典。
+    """
+    
+    __slots__ = ("_sinklist", "_hop_count", "_reverse", "_path_id", "_no_of_paths",
+                 "_table", "_derived", "_derived_index")
+    
+    def __init__(self, table: 'RouteInterner', hops: Tuple[PacketSink, ...],
+                 reverse: Optional[Route], path_id: int, no_of_paths: int, hop_count: int):
+        self._sinklist = hops
+        self._hop_count = hop_count
+        self._reverse = reverse
+        self._path_id = path_id
+        self._no_of_paths = no_of_paths
+        self._table = table
+        # with_destination() 派生的路由，首次派生时创建
+        self._derived: Optional[List['InternedRoute']] = None
+        self._derived_index: Optional[Dict[int, 'InternedRoute']] = None
+    
+    def at(self, n: int) -> PacketSink:
+        return self._sinklist[n]
+    
+    def size(self) -> int:
+        return len(self._sinklist)
+    
+    def with_destination(self, dst: PacketSink) -> 'InternedRoute':
+        """
+        在末尾追加 dst 的路由，同一目的端只派生一次
+        跳数与 C++ Route(orig, dst) 相同，为本路由跳数加一
+        """
+        index = self._derived_index
+        if index is None:
+            # 首次派生，或反序列化后对象身份改变，按派生路由的末跳重建索引
+            if self._derived is None:
+                self._derived = []
+            index = self._derived_index = {id(r._sinklist[-1]): r for r in self._derived}
+        route = index.get(id(dst))
+        if route is None:
+            route = InternedRoute(self._table, self._sinklist + (dst,), self._reverse,
+                                  self._path_id, self._no_of_paths, self._hop_count + 1)
+            self._derived.append(route)
+            index[id(dst)] = route
+            self._table._derived_count += 1
+        return route
+    
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("InternedRoute is immutable, clone() it to modify")
+    
+    push_back = push_at = push_front = add_endpoints = _immutable
+    set_reverse = set_path_id = append = clear = _immutable
+    
+    def __getstate__(self):
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["_derived_index"] = None
+        return state
+    
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+    
+    def __repr__(self) -> str:
+        return f"InternedRoute(path={list(self._sinklist)}, hops={self._hop_count}, path_id={self._path_id}, reverse={self._reverse is not None})"
+
+
+class RouteInterner:
+    """
+    路由驻留表 - 每个拓扑一张
+
+    以 (路径ID, 路径数, 反向路由, 各跳对象身份) 为键，相同路径只创建一个
+    InternedRoute，内存与建立时间随不同路径数而不是流数增长。
+    表持有路由，路由持有各跳对象，键中的对象身份在表存活期间保持有效。
+    """
+    
+    def __init__(self):
+        self._routes: List[InternedRoute] = []
+        self._index: Optional[Dict[tuple, InternedRoute]] = {}
+        self._derived_count = 0
+        self.hits = 0
+    
+    @staticmethod
+    def _key(hops: Tuple[PacketSink, ...], reverse: Optional[Route],
+             path_id: int, no_of_paths: int) -> tuple:
+        return (path_id, no_of_paths, id(reverse)) + tuple(map(id, hops))
+    
+    def intern(self, hops: Iterable[PacketSink], reverse: Optional[Route] = None,
+               path_id: int = 0, no_of_paths: int = 0) -> InternedRoute:
+        """
+        返回跳序列为 hops 的共享路由
+        
+        Args:
+            hops: 依次经过的 PacketSink
+            reverse: 反向路由，应为同一张表驻留的路由
+            path_id: 路径ID
+            no_of_paths: 总路径数
+        """
+        hops = tuple(hops)
+        index = self._index
+        if index is None:
+            index = self._index = {
+                self._key(r._sinklist, r._reverse, r._path_id, r._no_of_paths): r
+                for r in self._routes}
+        key = self._key(hops, reverse, path_id, no_of_paths)
+        route = index.get(key)
+        if route is not None:
+            self.hits += 1
+            return route
+        hop_count = sum(1 for hop in hops if isinstance(hop, Pipe))
+        route = InternedRoute(self, hops, reverse, path_id, no_of_paths, hop_count)
+        self._routes.append(route)
+        index[key] = route
+        return route
+    
+    def intern_route(self, route: Route) -> InternedRoute:
+        """驻留已有的路由（连同其反向路由），已驻留的路由原样返回"""
+        if isinstance(route, InternedRoute):
+            return route
+        reverse = route.reverse()
+        if reverse is not None:
+            reverse = self.intern(reverse._sinklist, None, reverse.path_id(), reverse.no_of_paths())
+        return self.intern(route._sinklist, reverse, route.path_id(), route.no_of_paths())
+    
+    def __len__(self) -> int:
+        """驻留的不同路径数（不含派生路由）"""
+        return len(self._routes)
+    
+    def derived_count(self) -> int:
+        """with_destination() 派生的路由数"""
+        return self._derived_count
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_index"] = None
+        return state
+
+
 # 类型别名 - 对应 C++ 中的 typedef
 # C++: typedef Route route_t;
 route_t = Route
@@ -9,10 +9,11 @@ This module provides data center network simulation components including:
 """
 
 # Core components
-from .topology import Topology
+from .topology import Topology, PathTemplateCache
 from .host import Host
 from .connection_matrix import ConnectionMatrix, Connection, TriggerType
-from .firstfit import FirstFit
+from .firstfit import FirstFit, FlowEntry
+from .flow_counters import FlowCounters, CounterField
 from .constants import HOST_NIC, SWITCH_BUFFER, RANDOM_BUFFER, FEEDER_BUFFER, DEFAULT_BUFFER_SIZE
 
 # Topology implementations
@@ -20,12 +21,14 @@ from .star_topology import StarTopology
 from .fat_tree_topology import FatTreeTopology
 from .vl2_topology import VL2Topology
 from .generic_topology import GenericTopology
+from .compiled_topology import CompiledTopology
 from .bcube_topology import BCubeTopology
 from .dragon_fly_topology import DragonFlyTopology
 from .oversubscribed_fat_tree_topology import OversubscribedFatTreeTopology
 from .camcube_topology import CamCubeTopology
 from .multihomed_fat_tree_topology import MultihomedFatTreeTopology
 from .fat_tree_switch import FatTreeSwitch
+from .fat_tree_partition import pod_partition
 
 # Traffic patterns and control
 from .incast import Incast, IncastPattern, TcpSrcTransfer
@@ -35,23 +38,29 @@ from .subflow_control import SubflowControl, MultipathFlowEntry
 __all__ = [
     # Core
     'Topology',
+    'PathTemplateCache',
     'Host',
     'ConnectionMatrix',
     'Connection',
     'TriggerType',
     'FirstFit',
+    'FlowEntry',
+    'FlowCounters',
+    'CounterField',
     
     # Topologies
     'StarTopology', 
     'FatTreeTopology',
     'VL2Topology',
     'GenericTopology',
+    'CompiledTopology',
     'BCubeTopology',
     'DragonFlyTopology',
     'OversubscribedFatTreeTopology',
     'CamCubeTopology',
     'MultihomedFatTreeTopology',
     'FatTreeSwitch',
+    'pod_partition',
     
     # Traffic patterns
     'Incast',
@@ -67,12 +67,18 @@ class BCubeTopology(Topology):
         # Set BCube parameters
         self._set_params(no_of_nodes, ports_per_switch, no_of_levels)
         
-        # Network components - using 3D structure like C++
-        # Indexed as [server][switch][level]
-        self.pipes_srv_switch: List[List[List[Optional[Pipe]]]] = []
-        self.pipes_switch_srv: List[List[List[Optional[Pipe]]]] = []
-        self.queues_srv_switch: List[List[List[Optional[BaseQueue]]]] = []
-        self.queues_switch_srv: List[List[List[Optional[BaseQueue]]]] = []
+        # Network components - indexed as [server][switch][level] and
+        # [switch][server][level] like C++. A server meets one switch per
+        # level, so the middle index is a dict holding only existing links.
+        self.pipes_srv_switch: List[Dict[int, List[Optional[Pipe]]]] = []
+        self.pipes_switch_srv: List[Dict[int, List[Optional[Pipe]]]] = []
+        self.queues_srv_switch: List[Dict[int, List[Optional[BaseQueue]]]] = []
+        self.queues_switch_srv: List[Dict[int, List[Optional[BaseQueue]]]] = []
+        
+        # Per-server hops of the level-k switch hop: (queue, pipe) up to the
+        # switch and (queue, pipe) down from it, indexed [server][level]
+        self._uplink_hops: List[List[Tuple]] = []
+        self._downlink_hops: List[List[Tuple]] = []
         
         # Priority queues for servers (one per NIC/level)
         self.prio_queues_srv: List[List[Optional[BaseQueue]]] = []
@@ -99,6 +105,8 @@ class BCubeTopology(Topology):
         self._NUM_PORTS = ports_per_switch
         self._NUM_SRV = no_of_nodes
         self._NUM_SW = (self._K + 1) * self._NUM_SRV // self._NUM_PORTS
+        # Server id step of one address digit at each level
+        self._strides = [self._NUM_PORTS ** level for level in range(self._K + 1)]
         
     def init_network(self):
         """Initialize the BCube network topology"""
@@ -109,46 +117,19 @@ class BCubeTopology(Topology):
             host.set_host_id(i)
             self.hosts.append(host)
             
-        # Initialize 3D arrays
+        # Initialize link tables
+        levels = self._K + 1
         for i in range(self._NUM_SRV):
-            srv_switches = []
-            srv_prio = []
-            srv_addr = []
-            
-            for j in range(self._NUM_SW):
-                level_list_q = []
-                level_list_p = []
-                for k in range(self._K + 1):
-                    level_list_q.append(None)
-                    level_list_p.append(None)
-                srv_switches.append(level_list_q)
-                
-            for k in range(self._K + 1):
-                srv_prio.append(None)
-                srv_addr.append(0)
-                
-            self.queues_srv_switch.append([level_list[:] for level_list in srv_switches])
-            self.pipes_srv_switch.append([level_list[:] for level_list in srv_switches])
-            self.prio_queues_srv.append(srv_prio)
-            self.addresses.append(srv_addr)
-            
-        # Initialize switch arrays
-        self.queues_switch_srv = []
-        self.pipes_switch_srv = []
-        for j in range(self._NUM_SW):
-            switch_srvs_q = []
-            switch_srvs_p = []
-            for i in range(self._NUM_SRV):
-                srv_levels_q = []
-                srv_levels_p = []
-                for k in range(self._K + 1):
-                    srv_levels_q.append(None)
-                    srv_levels_p.append(None)
-                switch_srvs_q.append(srv_levels_q)
-                switch_srvs_p.append(srv_levels_p)
-            self.queues_switch_srv.append(switch_srvs_q)
-            self.pipes_switch_srv.append(switch_srvs_p)
+            self.queues_srv_switch.append({})
+            self.pipes_srv_switch.append({})
+            self.prio_queues_srv.append([None] * levels)
+            self.addresses.append([0] * levels)
+            self._uplink_hops.append([None] * levels)
+            self._downlink_hops.append([None] * levels)
             
+        self.queues_switch_srv = [{} for _ in range(self._NUM_SW)]
+        self.pipes_switch_srv = [{} for _ in range(self._NUM_SW)]
+        
         # Compute addresses for each server
         for i in range(self._NUM_SRV):
             self._address_from_srv(i)
@@ -166,11 +147,11 @@ class BCubeTopology(Topology):
                 
                 # Server to switch
                 queue_ss = self._alloc_queue(f"SRV_{i}(level_{k})_SW_{j}")
-                self.queues_srv_switch[i][j][k] = queue_ss
+                self.queues_srv_switch[i].setdefault(j, [None] * levels)[k] = queue_ss
                 
                 pipe_ss = Pipe(self._rtt, self.eventlist)
                 pipe_ss.setName(f"Pipe-SRV_{i}(level_{k})-SW_{j}")
-                self.pipes_srv_switch[i][j][k] = pipe_ss
+                self.pipes_srv_switch[i].setdefault(j, [None] * levels)[k] = pipe_ss
                 
                 if self.logfile:
                     self.logfile.write_name(queue_ss)
@@ -178,16 +159,19 @@ class BCubeTopology(Topology):
                     
                 # Switch to server
                 queue_sw = self._alloc_queue(f"SW_{j}(level_{k})-SRV_{i}")
-                self.queues_switch_srv[j][i][k] = queue_sw
+                self.queues_switch_srv[j].setdefault(i, [None] * levels)[k] = queue_sw
                 
                 pipe_sw = Pipe(self._rtt, self.eventlist)
                 pipe_sw.setName(f"Pipe-SW_{j}(level_{k})-SRV_{i}")
-                self.pipes_switch_srv[j][i][k] = pipe_sw
+                self.pipes_switch_srv[j].setdefault(i, [None] * levels)[k] = pipe_sw
                 
                 if self.logfile:
                     self.logfile.write_name(queue_sw)
                     self.logfile.write_name(pipe_sw)
                     
+                self._uplink_hops[i][k] = (queue_ss, pipe_ss)
+                self._downlink_hops[i][k] = (queue_sw, pipe_sw)
+                    
     def _alloc_src_queue(self, name: str) -> BaseQueue:
         """Allocate a source queue (priority queue for server NICs)"""
         # Using standard Queue for now - can be replaced with PriorityQueue
@@ -286,122 +270,65 @@ class BCubeTopology(Topology):
                 
         return neighbors
         
-    def _bcube_routing(self, src: int, dest: int, permutation: List[int]) -> Tuple[Optional[Route], Optional[int]]:
+    def _level_order(self, first: int, mask: int) -> Tuple[int, ...]:
+        """
+        Levels to correct, in the cyclic descending order starting at first
+
+        This is the dimension permutation of C++ BCubeRouting, restricted to
+        the levels set in mask.
         """
-        BCube routing algorithm
+        levels = self._K + 1
+        order = ((first - m) % levels for m in range(levels))
+        return tuple(level for level in order if mask >> level & 1)
         
+    def _path_template(self, mask: int) -> Tuple[Tuple[bool, int, Tuple[int, ...]], ...]:
+        """
+        Level orders of all paths between servers differing in the levels of mask
+
+        For each level i from K down to 0 there is one path. If the servers
+        differ at i, it is the direct path correcting the levels from i
+        downwards. Otherwise it first goes to a neighbour differing at i
+        only, then corrects the levels from i-1 downwards (level i included).
+
         Returns:
-            Tuple of (route, first_nic_used)
+            Tuple of (direct, first level, level order) per path
         """
-        route = Route()
-        crt_addr = self.addresses[src][:]
-        crt = src
-        first_nic = None
-        
-        # Process dimensions in permutation order
+        template = []
         for i in range(self._K, -1, -1):
-            level = permutation[i]
-            
-            if self.addresses[src][level] != self.addresses[dest][level]:
-                if first_nic is None:
-                    first_nic = level
-                    
-                # Add hop from current server to switch at this level
-                sw_id = self._switch_from_srv(crt, level)
-                
-                queue_out = self.queues_srv_switch[crt][sw_id][level]
-                pipe_out = self.pipes_srv_switch[crt][sw_id][level]
-                
-                if queue_out is None or pipe_out is None:
-                    return None, None
-                    
-                route.push_back(queue_out)
-                route.push_back(pipe_out)
-                
-                # Correct the address digit at this level
-                crt_addr[level] = self.addresses[dest][level]
-                crt = self._srv_from_address(crt_addr)
-                
-                # Add hop from switch to next server
-                queue_in = self.queues_switch_srv[sw_id][crt][level]
-                pipe_in = self.pipes_switch_srv[sw_id][crt][level]
-                
-                if queue_in is None or pipe_in is None:
-                    return None, None
-                    
-                route.push_back(queue_in)
-                route.push_back(pipe_in)
-                
-        return route, first_nic
-        
-    def _dc_routing(self, src: int, dest: int, i: int) -> Optional[Route]:
-        """Disjoint path routing - permutation based on level i"""
-        permutation = [0] * (self._K + 1)
-        m = self._K
-        
-        # Create permutation
-        for j in range(i, i - self._K - 1, -1):
-            permutation[m] = (j + self._K + 1) % (self._K + 1)
-            m -= 1
-            
-        route, nic = self._bcube_routing(src, dest, permutation)
-        if route is None or nic is None:
-            return None
-            
-        # Add source priority queue
-        full_route = Route()
-        full_route.push_back(self.hosts[src])
-        full_route.push_back(self.prio_queues_srv[src][nic])
-        
-        # Add the bcube route
-        for element in route._elements:
-            full_route.push_back(element)
-            
-        full_route.push_back(self.hosts[dest])
-        
-        return full_route
-        
-    def _alt_dc_routing(self, src: int, dest: int, i: int, intermediate: int) -> Optional[Route]:
-        """Alternative routing through an intermediate node"""
-        # First path: src to intermediate (standard permutation)
-        permutation1 = list(range(self._K + 1))
-        route1, nic = self._bcube_routing(src, intermediate, permutation1)
-        
-        if route1 is None or nic is None:
-            return None
-            
-        # Second path: intermediate to dest (shifted permutation)
-        permutation2 = [0] * (self._K + 1)
-        m = self._K
-        
-        for j in range(i - 1, i - 1 - self._K - 1, -1):
-            permutation2[m] = (j + self._K + 1) % (self._K + 1)
-            m -= 1
-            
-        route2, _ = self._bcube_routing(intermediate, dest, permutation2)
-        
-        if route2 is None:
-            return None
-            
-        # Combine paths
-        full_route = Route()
-        full_route.push_back(self.hosts[src])
-        full_route.push_back(self.prio_queues_srv[src][nic])
-        
-        # Add first route
-        for element in route1._elements:
-            full_route.push_back(element)
-            
-        # Add second route
-        for element in route2._elements:
-            full_route.push_back(element)
-            
-        full_route.push_back(self.hosts[dest])
+            if mask >> i & 1:
+                template.append((True, i, self._level_order(i, mask)))
+            else:
+                template.append((False, i, self._level_order(i - 1, mask | 1 << i)))
+        return tuple(template)
         
-        return full_route
+    def _switch_hops(self, hops: List, crt: int, dest: int, order: Tuple[int, ...]) -> int:
+        """
+        Append the hops correcting the address digits of crt in order
+
+        Returns:
+            The server reached (dest if order covers every differing level)
+        """
+        addresses = self.addresses
+        uplinks = self._uplink_hops
+        downlinks = self._downlink_hops
+        dest_addr = addresses[dest]
+        for level in order:
+            nxt = crt + (dest_addr[level] - addresses[crt][level]) * self._strides[level]
+            hops.extend(uplinks[crt][level])
+            hops.extend(downlinks[nxt][level])
+            crt = nxt
+        return crt
         
     def get_bidir_paths(self, src: int, dest: int, reverse: bool) -> List[Route]:
-        """Get bidirectional paths between nodes"""
+        """
+        Get bidirectional paths between nodes
+
+        The level orders of the K+1 paths depend only on which address digits
+        of src and dest differ; they are cached per digit mask in the
+        topology's PathTemplateCache. Server ids along a path follow by
+        arithmetic on the digits, so instantiating a path is a walk over the
+        per-server link tables.
+        """
         if reverse:
             src, dest = dest, src
             
@@ -411,23 +338,28 @@ class BCubeTopology(Topology):
         if src == dest:
             return []
             
-        paths = []
+        src_addr = self.addresses[src]
+        dest_addr = self.addresses[dest]
+        mask = 0
+        for level in range(self._K + 1):
+            if src_addr[level] != dest_addr[level]:
+                mask |= 1 << level
+        template = self.path_templates().get(mask, self._path_template, mask)
         
-        # For each level, generate a path
-        for i in range(self._K, -1, -1):
-            level = i
-            
-            if self.addresses[src][level] != self.addresses[dest][level]:
-                # Direct path possible at this level
-                path = self._dc_routing(src, dest, level)
-                if path:
-                    paths.append(path)
+        paths = []
+        for direct, level, order in template:
+            if direct:
+                hops = [self.hosts[src], self.prio_queues_srv[src][order[0]]]
+                self._switch_hops(hops, src, dest, order)
             else:
-                # Need to route through intermediate node
+                # Route through a random neighbour at this level
                 intermediate = self.get_neighbour(src, level)
-                path = self._alt_dc_routing(src, dest, level, intermediate)
-                if path:
-                    paths.append(path)
+                hops = [self.hosts[src], self.prio_queues_srv[src][level]]
+                self._switch_hops(hops, src, intermediate, (level,))
+                self._switch_hops(hops, intermediate, dest, order)
+            hops.append(self.hosts[dest])
+            # Two pipes per switch hop; hosts and queues around them hold none
+            paths.append(Route.from_hops(hops, (len(hops) - 3) // 2))
                     
         return paths
         
@@ -1,6 +1,7 @@
 """CamCube topology implementation for HTSimPy."""
 
-from typing import List, Optional, Tuple, Dict, Set
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple, Dict, Set
 from .topology import Topology
 from .host import Host
 from ..core import Pipe, EventList, Route, Packet
@@ -28,7 +29,8 @@ class CamCubeTopology(Topology):
         eventlist: EventList,
         queue_type: str = "composite",
         rtt_ps: int = 1000,
-        host_nic_mbps: int = HOST_NIC
+        host_nic_mbps: int = HOST_NIC,
+        max_paths: Optional[int] = None
     ):
         """
         Initialize CamCube topology.
@@ -40,6 +42,8 @@ class CamCubeTopology(Topology):
             queue_type: Type of queue ("random", "composite", "composite_prio")
             rtt_ps: Round-trip time in picoseconds
             host_nic_mbps: Host NIC speed in Mbps
+            max_paths: Keep only the first max_paths shortest paths per
+                pair (all of them if None)
         """
         super().__init__()
         
@@ -55,6 +59,8 @@ class CamCubeTopology(Topology):
             raise ValueError(f"Host NIC speed must be positive, got {host_nic_mbps}")
         if queue_type not in ["random", "composite", "composite_prio"]:
             raise ValueError(f"Invalid queue type: {queue_type}")
+        if max_paths is not None and max_paths <= 0:
+            raise ValueError(f"max_paths must be positive, got {max_paths}")
             
         self.k = k
         self.num_servers = k ** 3
@@ -63,12 +69,14 @@ class CamCubeTopology(Topology):
         self.queue_type = queue_type
         self.rtt = rtt_ps
         self.host_nic_mbps = host_nic_mbps
+        self.max_paths = max_paths
         
         # Network components
         self.pipes: Dict[Tuple[int, int], Pipe] = {}  # (server, direction) -> Pipe
         self.queues: Dict[Tuple[int, int], Queue] = {}  # (server, direction) -> Queue
         self.prio_queues: Dict[Tuple[int, int], Queue] = {}  # Priority queues
         self.addresses: Dict[int, Tuple[int, int, int]] = {}  # server -> (x, y, z)
+        self._neighbours: List[Tuple[int, ...]] = []  # server -> neighbour per direction
         
         # Initialize network
         self._init_network()
@@ -79,13 +87,19 @@ class CamCubeTopology(Topology):
         for srv in range(self.num_servers):
             self.addresses[srv] = self._address_from_srv(srv)
             
+        # Neighbour in each direction: axis for +1, axis + 3 for -1
+        for srv in range(self.num_servers):
+            self._neighbours.append(tuple(
+                self._get_neighbor(srv, direction % 3, direction < 3) for direction in range(6)))
+            
         # Create queues and pipes for each server
         for srv in range(self.num_servers):
             # Each server has 6 connections (±x, ±y, ±z)
             for direction in range(6):
                 # Create priority queue
                 logger = QueueLoggerSampling(1000000, self.eventlist)  # 1ms sampling
-                self.logfile.addLogger(logger)
+                if hasattr(self.logfile, 'addLogger'):
+                    self.logfile.addLogger(logger)
                 
                 prio_queue = self._alloc_src_queue(logger)
                 if hasattr(prio_queue, 'setName'):
@@ -207,114 +221,70 @@ class CamCubeTopology(Topology):
         """Get all paths from src to dest."""
         return self.get_paths_camcube(src, dest)
         
+    def get_bidir_paths(self, src: int, dest: int, reverse: bool) -> List[Route]:
+        """Get paths from src to dest, or from dest to src if reverse."""
+        if reverse:
+            src, dest = dest, src
+        return self.get_paths_camcube(src, dest)
+        
     def get_paths_camcube(self, src: int, dest: int, first: bool = True) -> List[Route]:
         """
         Get CamCube paths using dimensional routing.
         
-        Matches C++ CamCubeTopology::get_paths_camcube logic.
+        Matches the paths and order of C++ CamCubeTopology::get_paths_camcube,
+        which recurses one hop at a time trying X, then Y, then Z. The
+        sequences of directions depend only on the torus offset from src to
+        dest, so they are cached per offset in the topology's
+        PathTemplateCache and walked from src on every call.
+        
+        Args:
+            src: Source server
+            dest: Destination server
+            first: Start each path with the source's priority queue
         """
         if src == dest:
             return []
             
-        paths = []
+        offset = tuple(self.get_distance(src, dest, dimension) for dimension in range(3))
+        template = self.path_templates().get(offset, self._move_template, offset)
         
-        # Get distances in each dimension
-        x_dist, ifx = self.get_distance(src, dest, 0)
-        y_dist, ify = self.get_distance(src, dest, 1)
-        z_dist, ifz = self.get_distance(src, dest, 2)
-        
-        # Build paths by routing in different dimension orders
-        # This matches the C++ recursive approach
-        current_addr = list(self.addresses[src])
+        neighbours = self._neighbours
+        queues = self.queues
+        pipes = self.pipes
+        paths = []
+        for moves in template:
+            hops = [self.prio_queues[(src, moves[0])]] if first else []
+            srv = src
+            for iface in moves:
+                hops.append(queues[(srv, iface)])
+                hops.append(pipes[(srv, iface)])
+                srv = neighbours[srv][iface]
+            paths.append(Route.from_hops(hops, len(moves)))
+        return paths
         
-        # Route in X dimension first
-        if x_dist >= 1:
-            # Move one hop in X direction
-            if ifx < 3:
-                current_addr[0] = (current_addr[0] + 1) % self.k
-            else:
-                current_addr[0] = (current_addr[0] + self.k - 1) % self.k
-                
-            next_srv = self._srv_from_address(current_addr)
-            
-            if next_srv == dest:
-                # Direct path
-                route = Route()
-                if first and (src, ifx) in self.prio_queues:
-                    route.push_back(self.prio_queues[(src, ifx)])
-                route.push_back(self.queues[(src, ifx)])
-                route.push_back(self.pipes[(src, ifx)])
-                paths.append(route)
-            else:
-                # Recurse from next hop
-                sub_paths = self.get_paths_camcube(next_srv, dest, False)
-                for sub_route in sub_paths:
-                    # Prepend current hop to sub_route (matches C++ push_front logic)
-                    sub_route.push_front(self.pipes[(src, ifx)])
-                    sub_route.push_front(self.queues[(src, ifx)])
-                    if first and (src, ifx) in self.prio_queues:
-                        sub_route.push_front(self.prio_queues[(src, ifx)])
-                    paths.append(sub_route)
-                    
-        # Reset for Y dimension
-        current_addr = list(self.addresses[src])
+    def _move_template(self, offset: Tuple[Tuple[int, int], ...]) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Direction sequences of the shortest paths for a torus offset.
         
-        # Route in Y dimension first  
-        if y_dist >= 1:
-            if ify < 3:
-                current_addr[1] = (current_addr[1] + 1) % self.k
-            else:
-                current_addr[1] = (current_addr[1] + self.k - 1) % self.k
-                
-            next_srv = self._srv_from_address(current_addr)
+        Args:
+            offset: (distance, interface) per dimension, as from get_distance()
             
-            if next_srv == dest:
-                route = Route()
-                if first and (src, ify) in self.prio_queues:
-                    route.push_back(self.prio_queues[(src, ify)])
-                route.push_back(self.queues[(src, ify)])
-                route.push_back(self.pipes[(src, ify)])
-                paths.append(route)
-            else:
-                sub_paths = self.get_paths_camcube(next_srv, dest, False)
-                for sub_route in sub_paths:
-                    # Prepend current hop to sub_route (matches C++ push_front logic)
-                    sub_route.push_front(self.pipes[(src, ify)])
-                    sub_route.push_front(self.queues[(src, ify)])
-                    if first and (src, ify) in self.prio_queues:
-                        sub_route.push_front(self.prio_queues[(src, ify)])
-                    paths.append(sub_route)
-                    
-        # Reset for Z dimension
-        current_addr = list(self.addresses[src])
+        Returns:
+            Every interleaving of the per-dimension moves in lexicographic
+            X < Y < Z order, cut at max_paths
+        """
+        return tuple(islice(self._interleavings(offset), self.max_paths))
         
-        # Route in Z dimension first
-        if z_dist >= 1:
-            if ifz < 3:
-                current_addr[2] = (current_addr[2] + 1) % self.k
-            else:
-                current_addr[2] = (current_addr[2] + self.k - 1) % self.k
-                
-            next_srv = self._srv_from_address(current_addr)
-            
-            if next_srv == dest:
-                route = Route()
-                if first and (src, ifz) in self.prio_queues:
-                    route.push_back(self.prio_queues[(src, ifz)])
-                route.push_back(self.queues[(src, ifz)])
-                route.push_back(self.pipes[(src, ifz)])
-                paths.append(route)
-            else:
-                sub_paths = self.get_paths_camcube(next_srv, dest, False)
-                for sub_route in sub_paths:
-                    # Prepend current hop to sub_route (matches C++ push_front logic)
-                    sub_route.push_front(self.pipes[(src, ifz)])
-                    sub_route.push_front(self.queues[(src, ifz)])
-                    if first and (src, ifz) in self.prio_queues:
-                        sub_route.push_front(self.prio_queues[(src, ifz)])
-                    paths.append(sub_route)
-                    
-        return paths
+    def _interleavings(self, remaining: Tuple[Tuple[int, int], ...]) -> Iterator[Tuple[int, ...]]:
+        """Yield the direction sequences covering the remaining moves."""
+        if not any(distance for distance, _ in remaining):
+            yield ()
+            return
+        for dimension, (distance, iface) in enumerate(remaining):
+            if distance:
+                rest = remaining[:dimension] + ((distance - 1, iface),) + remaining[dimension + 1:]
+                for tail in self._interleavings(rest):
+                    yield (iface,) + tail
         
     def _get_neighbor(self, srv: int, dimension: int, positive: bool) -> int:
         """Get neighbor server in given dimension and direction."""
@@ -0,0 +1,320 @@
+"""
+Compiled binary form of GenericTopology files
+
+Parsing a generic topology text file tokenizes every line, parses unit
+strings (bitrates, sizes, delays) and resolves every route element by
+name.  CompiledTopology holds the result of that work as flat columns:
+
+- an interned name table (every distinct name stored once)
+- typed per-object columns (kind, name id, bitrate, size, delay, queue type)
+- the routes as a CSR adjacency: route_offsets[r]:route_offsets[r+1]
+  indexes route_hops, the object ids of route r's path elements
+
+GenericTopology writes it next to the text file after the first
+successful text load and memory-maps it on later loads, so loading a
+large topology is one pass that constructs the objects.  The file is
+keyed by the size and SHA-1 of the text file; a mismatch falls back to
+the text loader, which rewrites it.  Set AS_HTSIM_TOPOLOGY_CACHE=0 to
+disable the compiled files.
+"""
+
+import hashlib
+import mmap
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Environment variable switching compiled topology files on or off
+TOPOLOGY_CACHE_ENV = "AS_HTSIM_TOPOLOGY_CACHE"
+
+# Compiled file written next to the topology text file
+TOPOLOGY_CACHE_SUFFIX = ".simai_topo.bin"
+
+# Format version, bump when the layout changes
+TOPOLOGY_CACHE_VERSION = 1
+
+TOPOLOGY_MAGIC = b"SIMAITOP"
+
+# Object kinds
+KIND_HOST = 0
+KIND_SWITCH = 1
+KIND_QUEUE = 2
+KIND_PIPE = 3
+
+# Queue types
+QUEUE_RANDOM = 0
+QUEUE_BASIC = 1
+
+_HEADER = np.dtype([("magic", "S8"), ("version", "<i8"), ("source_size", "<i8"),
+                    ("source_hash", "S40"), ("sections", "<i8")])
+_SECTION = np.dtype([("name", "S16"), ("dtype", "S8"), ("offset", "<i8"), ("count", "<i8")])
+
+# Column name -> dtype, in file order
+COLUMNS = {
+    "names": "u1",          # UTF-8 name table, names separated by '\n'
+    "kind": "u1",
+    "name_id": "<i4",
+    "bitrate": "<i8",
+    "maxsize": "<i8",
+    "delay": "<i8",
+    "queue_type": "u1",
+    "route_src": "<i4",     # host ids
+    "route_dst": "<i4",
+    "route_offsets": "<i8",
+    "route_hops": "<i4",    # object ids
+}
+
+
+def topology_cache_enabled() -> bool:
+    """Whether compiled topology files are read and written (AS_HTSIM_TOPOLOGY_CACHE)"""
+    return os.getenv(TOPOLOGY_CACHE_ENV, "1").lower() not in ("0", "false", "no")
+
+
+def file_fingerprint(filename: str) -> Tuple[int, str]:
+    """
+    Size and SHA-1 of a topology text file
+
+    Args:
+        filename: Path to the text file
+
+    Returns:
+        (size in bytes, hex digest)
+    """
+    digest = hashlib.sha1()
+    size = 0
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+            size += len(block)
+    return size, digest.hexdigest()
+
+
+class CompiledTopology:
+    """
+    Columnar topology: objects in definition order plus routes in CSR form
+
+    Object ids are positions in the object columns; host ids count hosts
+    only, in the same order.  Route elements are already resolved to
+    object ids, so building the topology needs no name lookups.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            columns: Arrays for every name in COLUMNS
+        """
+        self.columns = columns
+        blob = columns["names"]
+        self.names: List[str] = blob.tobytes().decode("utf-8").split("\n") if len(blob) else []
+
+    @property
+    def num_objects(self) -> int:
+        return len(self.columns["kind"])
+
+    @property
+    def num_routes(self) -> int:
+        return len(self.columns["route_src"])
+
+    def route_hop_counts(self) -> np.ndarray:
+        """Number of pipes on every route, the hop count Route.push_back would count"""
+        offsets = self.columns["route_offsets"]
+        is_pipe = np.concatenate([(self.columns["kind"] == KIND_PIPE)[self.columns["route_hops"]],
+                                  [False]]).astype(np.int64)
+        counts = np.add.reduceat(is_pipe, offsets[:-1]) if self.num_routes else is_pipe[:0]
+        # reduceat yields the element itself for empty ranges
+        return np.where(offsets[1:] > offsets[:-1], counts, 0)
+
+    @staticmethod
+    def cache_path(filename: str) -> str:
+        """Path of the compiled file for a topology text file"""
+        return filename + TOPOLOGY_CACHE_SUFFIX
+
+    @staticmethod
+    def is_compiled(filename: str) -> bool:
+        """Whether a file is a compiled topology rather than text"""
+        try:
+            with open(filename, 'rb') as f:
+                return f.read(len(TOPOLOGY_MAGIC)) == TOPOLOGY_MAGIC
+        except OSError:
+            return False
+
+    def save(self, path: str, source_size: int = 0, source_hash: str = "") -> bool:
+        """
+        Write the compiled file, via a temporary file replaced atomically
+
+        Args:
+            path: Output path
+            source_size: Size of the text file it was compiled from
+            source_hash: SHA-1 of that text file
+
+        Returns:
+            True if written (an unwritable directory only disables caching)
+        """
+        header = np.zeros(1, dtype=_HEADER)
+        header["magic"] = TOPOLOGY_MAGIC
+        header["version"] = TOPOLOGY_CACHE_VERSION
+        header["source_size"] = source_size
+        header["source_hash"] = source_hash.encode("ascii")
+        header["sections"] = len(COLUMNS)
+        sections = np.zeros(len(COLUMNS), dtype=_SECTION)
+        offset = _HEADER.itemsize + sections.nbytes
+        payload = []
+        for i, (name, dtype) in enumerate(COLUMNS.items()):
+            data = np.ascontiguousarray(self.columns[name], dtype=dtype)
+            offset += -offset % 8
+            sections[i] = (name.encode("ascii"), dtype.encode("ascii"), offset, len(data))
+            payload.append((offset, data))
+            offset += data.nbytes
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(header.tobytes())
+                f.write(sections.tobytes())
+                for start, data in payload:
+                    f.write(b"\0" * (start - f.tell()))
+                    f.write(data.tobytes())
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return True
+
+    @classmethod
+    def load(cls, path: str, source_size: Optional[int] = None,
+             source_hash: Optional[str] = None) -> Optional['CompiledTopology']:
+        """
+        Memory-map a compiled file
+
+        Args:
+            path: Compiled file
+            source_size: Expected text file size, None to skip the check
+            source_hash: Expected text file SHA-1, None to skip the check
+
+        Returns:
+            The topology, or None if missing, of another version or stale
+        """
+        try:
+            with open(path, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            header = np.frombuffer(buf, dtype=_HEADER, count=1)[0]
+            if (header["magic"] != TOPOLOGY_MAGIC or
+                    int(header["version"]) != TOPOLOGY_CACHE_VERSION):
+                return None
+            if source_size is not None and int(header["source_size"]) != source_size:
+                return None
+            if source_hash is not None and header["source_hash"].decode("ascii") != source_hash:
+                return None
+            sections = np.frombuffer(buf, dtype=_SECTION, count=int(header["sections"]),
+                                     offset=_HEADER.itemsize)
+            columns = {}
+            for name, dtype, offset, count in sections.tolist():
+                # The arrays keep the mapping alive
+                columns[name.decode("ascii")] = np.frombuffer(
+                    buf, dtype=dtype.decode("ascii"), count=count, offset=offset)
+            if any(name not in columns for name in COLUMNS):
+                return None
+        except (OSError, ValueError, UnicodeDecodeError):
+            return None
+        return cls(columns)
+
+
+class TopologyCompiler:
+    """
+    Accumulates topology definitions into a CompiledTopology
+
+    Names resolve like the text loader's per-kind dictionaries: a later
+    definition of a name replaces the earlier one, and route elements are
+    looked up among queues, then pipes, then switches.
+    """
+
+    def __init__(self):
+        self._name_ids: Dict[str, int] = {}
+        self._kind: List[int] = []
+        self._name_id: List[int] = []
+        self._bitrate: List[int] = []
+        self._maxsize: List[int] = []
+        self._delay: List[int] = []
+        self._queue_type: List[int] = []
+        # name -> host id, and name -> object id for the other kinds
+        self._hosts: Dict[str, int] = {}
+        self._switches: Dict[str, int] = {}
+        self._queues: Dict[str, int] = {}
+        self._pipes: Dict[str, int] = {}
+        self._route_src: List[int] = []
+        self._route_dst: List[int] = []
+        self._route_offsets: List[int] = [0]
+        self._route_hops: List[int] = []
+
+    def _add(self, kind: int, name: str, bitrate: int = 0, maxsize: int = 0,
+             delay: int = 0, queue_type: int = QUEUE_RANDOM) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._name_ids)
+        self._kind.append(kind)
+        self._name_id.append(name_id)
+        self._bitrate.append(bitrate)
+        self._maxsize.append(maxsize)
+        self._delay.append(delay)
+        self._queue_type.append(queue_type)
+        return len(self._kind) - 1
+
+    def add_host(self, name: str) -> None:
+        self._add(KIND_HOST, name)
+        self._hosts[name] = len(self._hosts)
+
+    def add_switch(self, name: str) -> None:
+        self._switches[name] = self._add(KIND_SWITCH, name)
+
+    def add_queue(self, name: str, bitrate: int, maxsize: int, queue_type: int) -> None:
+        self._queues[name] = self._add(KIND_QUEUE, name, bitrate=bitrate, maxsize=maxsize,
+                                       queue_type=queue_type)
+
+    def add_pipe(self, name: str, delay: int) -> None:
+        self._pipes[name] = self._add(KIND_PIPE, name, delay=delay)
+
+    def add_route(self, src_name: str, dst_name: str, elements: List[str]) -> None:
+        """
+        Resolve and append a route; call after all objects are defined
+
+        Raises:
+            ValueError: For unknown hosts or path elements
+        """
+        src = self._hosts.get(src_name)
+        dst = self._hosts.get(dst_name)
+        if src is None or dst is None:
+            raise ValueError(f"Invalid hosts in route: {src_name}, {dst_name}")
+        hops = []
+        for element_name in elements:
+            element = self._queues.get(element_name)
+            if element is None:
+                element = self._pipes.get(element_name)
+            if element is None:
+                element = self._switches.get(element_name)
+            if element is None:
+                raise ValueError(f"Unknown element in route: {element_name}")
+            hops.append(element)
+        self._route_hops.extend(hops)
+        self._route_src.append(src)
+        self._route_dst.append(dst)
+        self._route_offsets.append(len(self._route_hops))
+
+    def compile(self) -> CompiledTopology:
+        names = "\n".join(self._name_ids).encode("utf-8")
+        values = {
+            "names": np.frombuffer(names, dtype=np.uint8),
+            "kind": self._kind,
+            "name_id": self._name_id,
+            "bitrate": self._bitrate,
+            "maxsize": self._maxsize,
+            "delay": self._delay,
+            "queue_type": self._queue_type,
+            "route_src": self._route_src,
+            "route_dst": self._route_dst,
+            "route_offsets": self._route_offsets,
+            "route_hops": self._route_hops,
+        }
+        return CompiledTopology({name: np.asarray(values[name], dtype=dtype)
+                                 for name, dtype in COLUMNS.items()})
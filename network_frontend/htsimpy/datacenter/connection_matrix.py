@@ -2,13 +2,19 @@
 Connection matrix for managing traffic patterns in data center networks
 
 Corresponds to connection_matrix.h/cpp in HTSim C++ implementation
+
+Connections are stored column-wise in growable NumPy arrays (src, dst,
+size, start, flowid, priority and the trigger ids), so pattern generators
+add whole matrices with a handful of vectorized operations and 10k+ host
+matrices persist as a compact .npz file. Connection objects are thin views
+onto one row, created on demand.
 """
 
-import random
-import pickle
-from typing import List, Dict, Optional, Tuple, Set, IO
+from typing import Iterator, List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import random
+import numpy as np
 from ..core.eventlist import EventList
 from .topology import Topology
 from ..core.trigger import (
@@ -19,6 +25,7 @@ from ..core.trigger import (
 
 # Constants
 NO_START = 0xffffffffffffffff  # Indicates connection not started yet
+NO_TRIGGER = -1  # Trigger id column value for "no trigger"
 
 
 class TriggerType(Enum):
@@ -29,18 +36,60 @@ class TriggerType(Enum):
     BARRIER = 3
 
 
-@dataclass
 class Connection:
-    """Represents a connection between two hosts"""
-    src: int
-    dst: int
-    size: int
-    flowid: int
-    send_done_trigger: Optional[int] = None
-    recv_done_trigger: Optional[int] = None
-    trigger: Optional[int] = None
-    start: int = NO_START
-    priority: int = 0
+    """
+    Represents a connection between two hosts
+    
+    A view onto one row of a ConnectionMatrix: reading or assigning an
+    attribute reads or writes the matrix columns. Trigger ids are None when
+    unset.
+    """
+    
+    __slots__ = ("_matrix", "_index")
+    
+    def __init__(self, matrix: 'ConnectionMatrix', index: int):
+        self._matrix = matrix
+        self._index = index
+        
+    def _column(name: str, convert=int):
+        def getter(self):
+            return convert(getattr(self._matrix, name)[self._index])
+        
+        def setter(self, value):
+            getattr(self._matrix, name)[self._index] = value
+        return property(getter, setter)
+        
+    def _trigger_column(name: str):
+        def getter(self):
+            value = int(getattr(self._matrix, name)[self._index])
+            return None if value == NO_TRIGGER else value
+        
+        def setter(self, value):
+            getattr(self._matrix, name)[self._index] = NO_TRIGGER if value is None else value
+        return property(getter, setter)
+    
+    src = _column("_src")
+    dst = _column("_dst")
+    size = _column("_size")
+    flowid = _column("_flowid")
+    start = _column("_start")
+    priority = _column("_priority")
+    trigger = _trigger_column("_trigger")
+    send_done_trigger = _trigger_column("_send_done_trigger")
+    recv_done_trigger = _trigger_column("_recv_done_trigger")
+    
+    del _column, _trigger_column
+    
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, Connection) and
+                self._matrix is other._matrix and self._index == other._index)
+    
+    def __hash__(self) -> int:
+        return hash((id(self._matrix), self._index))
+    
+    def __repr__(self) -> str:
+        return (f"Connection(src={self.src}, dst={self.dst}, size={self.size}, "
+                f"flowid={self.flowid}, start={self.start})")
 
 
 @dataclass
@@ -75,14 +124,43 @@ class ConnectionMatrix:
     - Incast/Outcast patterns
     - Hotspot traffic
     - Custom patterns from files
+    
+    Generators draw from a NumPy Generator, so a matrix built with the same
+    seed is reproducible. Without a seed the Generator is seeded from the
+    random module, so drivers that call random.seed() stay reproducible.
     """
     
-    def __init__(self, n_hosts: int):
+    # Column name -> dtype; every column has one entry per connection
+    COLUMNS = {
+        "_src": np.int64,
+        "_dst": np.int64,
+        "_size": np.int64,
+        "_start": np.uint64,
+        "_flowid": np.int64,
+        "_priority": np.int64,
+        "_trigger": np.int64,
+        "_send_done_trigger": np.int64,
+        "_recv_done_trigger": np.int64,
+    }
+    # Fill value of each column for newly added connections
+    DEFAULTS = {
+        "_size": 0,
+        "_start": NO_START,
+        "_priority": 0,
+        "_trigger": NO_TRIGGER,
+        "_send_done_trigger": NO_TRIGGER,
+        "_recv_done_trigger": NO_TRIGGER,
+    }
+    INITIAL_CAPACITY = 64
+    
+    def __init__(self, n_hosts: int, seed: Optional[int] = None):
         """
         Initialize connection matrix
         
         Args:
             n_hosts: Number of hosts in the datacenter
+            seed: Seed of the generator used by the traffic patterns, None to
+                draw one from the random module
             
         Raises:
             ValueError: If n_hosts is not positive
@@ -91,11 +169,140 @@ class ConnectionMatrix:
             raise ValueError(f"Number of hosts must be positive, got {n_hosts}")
             
         self.N = n_hosts
-        self.connections: Dict[int, List[int]] = {}
-        self.conns: List[Connection] = []
+        self.set_seed(seed)
+        self.n_conns = 0
+        for name, dtype in self.COLUMNS.items():
+            setattr(self, name, np.empty(self.INITIAL_CAPACITY, dtype=dtype))
         self.triggers: Dict[int, TriggerInfo] = {}
         self.failures: List[Failure] = []
         self._next_flowid = 0
+        self._connections: Optional[Dict[int, List[int]]] = None
+        
+    def set_seed(self, seed: Optional[int]) -> None:
+        """Reseed the generator used by the traffic patterns, from the random module if seed is None."""
+        self.rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+        
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    
+    def __len__(self) -> int:
+        return self.n_conns
+        
+    def _reserve(self, count: int) -> None:
+        """Grow the columns to hold count more connections."""
+        needed = self.n_conns + count
+        capacity = len(self._src)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.n_conns] = column[:self.n_conns]
+            setattr(self, name, grown)
+            
+    def add_connections_array(self, src, dst, size=0, start=NO_START) -> slice:
+        """
+        Append connections given as arrays, validated in bulk
+        
+        Args:
+            src: Source host IDs
+            dst: Destination host IDs, same length as src
+            size: Flow sizes in bytes (0 for infinite), scalar or array
+            start: Start times, scalar or array
+            
+        Returns:
+            Slice of the new rows in the columns
+            
+        Raises:
+            ValueError: If a host is out of range or a size is negative
+        """
+        src = np.asarray(src, dtype=np.int64).ravel()
+        dst = np.asarray(dst, dtype=np.int64).ravel()
+        if src.shape != dst.shape:
+            raise ValueError(f"src and dst lengths differ: {len(src)} != {len(dst)}")
+        count = len(src)
+        if count == 0:
+            return slice(self.n_conns, self.n_conns)
+            
+        if src.min() < 0 or src.max() >= self.N:
+            bad = src[(src < 0) | (src >= self.N)][0]
+            raise ValueError(f"Source host {bad} out of range [0, {self.N})")
+        if dst.min() < 0 or dst.max() >= self.N:
+            bad = dst[(dst < 0) | (dst >= self.N)][0]
+            raise ValueError(f"Destination host {bad} out of range [0, {self.N})")
+        size = np.broadcast_to(np.asarray(size, dtype=np.int64), (count,))
+        if size.min() < 0:
+            raise ValueError(f"Flow size cannot be negative, got {size[size < 0][0]}")
+            
+        self._reserve(count)
+        rows = slice(self.n_conns, self.n_conns + count)
+        self._src[rows] = src
+        self._dst[rows] = dst
+        self._size[rows] = size
+        self._start[rows] = start
+        self._flowid[rows] = np.arange(self._next_flowid, self._next_flowid + count)
+        for name in ("_priority", "_trigger", "_send_done_trigger", "_recv_done_trigger"):
+            getattr(self, name)[rows] = self.DEFAULTS[name]
+        self._next_flowid += count
+        self.n_conns += count
+        self._connections = None
+        return rows
+        
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        The columns without copying
+        
+        The views stay valid until connections are added or the matrix is
+        loaded again, both of which may reallocate the columns.
+        
+        Returns:
+            Dict of read-only views keyed by src, dst, size, start, flowid,
+            priority, trigger, send_done_trigger and recv_done_trigger
+        """
+        views = {}
+        for name in self.COLUMNS:
+            view = getattr(self, name)[:self.n_conns]
+            view.flags.writeable = False
+            views[name[1:]] = view
+        return views
+        
+    def iter_flows(self, chunk: int = 4096) -> Iterator[Tuple[int, int, int, int, int]]:
+        """
+        Iterate (flowid, src, dst, size, start) rows without building Connection objects
+        
+        Topologies consume this when they build flows. Rows are converted to
+        Python ints one chunk at a time, so memory stays bounded however
+        large the matrix is.
+        
+        Args:
+            chunk: Rows converted per step
+        """
+        for lo in range(0, self.n_conns, chunk):
+            hi = min(lo + chunk, self.n_conns)
+            yield from zip(self._flowid[lo:hi].tolist(), self._src[lo:hi].tolist(),
+                           self._dst[lo:hi].tolist(), self._size[lo:hi].tolist(),
+                           self._start[lo:hi].tolist())
+            
+    @property
+    def connections(self) -> Dict[int, List[int]]:
+        """Source host -> destination hosts, in insertion order (built on demand)"""
+        if self._connections is None:
+            connections: Dict[int, List[int]] = {}
+            for src, dst in zip(self._src[:self.n_conns].tolist(), self._dst[:self.n_conns].tolist()):
+                if src in connections:
+                    connections[src].append(dst)
+                else:
+                    connections[src] = [dst]
+            self._connections = connections
+        return self._connections
+        
+    @property
+    def conns(self) -> List[Connection]:
+        """All connections as row views"""
+        return [Connection(self, i) for i in range(self.n_conns)]
         
     def add_connection(self, src: int, dest: int, size: int = 0) -> Connection:
         """
@@ -119,20 +326,45 @@ class ConnectionMatrix:
         if size < 0:
             raise ValueError(f"Flow size cannot be negative, got {size}")
             
-        if src not in self.connections:
-            self.connections[src] = []
-        self.connections[src].append(dest)
+        rows = self.add_connections_array([src], [dest], size)
+        return Connection(self, rows.start)
         
-        conn = Connection(
-            src=src,
-            dst=dest,
-            size=size,
-            flowid=self._next_flowid
-        )
-        self._next_flowid += 1
-        self.conns.append(conn)
-        return conn
+    def add_connections_batch(self, connections: List[Tuple[int, int, int]]) -> List[Connection]:
+        """
+        Add multiple connections in batch for performance.
+        
+        Args:
+            connections: List of (src, dest, size) tuples
+            
+        Returns:
+            List of created connections
+        """
+        if not connections:
+            return []
+        src, dst, size = zip(*connections)
+        rows = self.add_connections_array(src, dst, size)
+        return [Connection(self, i) for i in range(rows.start, rows.stop)]
         
+    # ------------------------------------------------------------------
+    # Traffic patterns
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _fix_fixed_points(srcs: np.ndarray, dests: np.ndarray, group: int) -> None:
+        """
+        Remove self-connections from a permutation in place
+        
+        Each fixed point swaps destinations with the next position of its
+        group of the given size (cyclically), which never creates a new one.
+        A permutation has few fixed points, so this loop is short.
+        """
+        for i in np.flatnonzero(dests == srcs).tolist():
+            if dests[i] != srcs[i]:
+                continue
+            base = i - i % group
+            j = base + (i - base + 1) % group
+            dests[i], dests[j] = dests[j], dests[i]
+            
     def set_permutation(self, n_conns: Optional[int] = None) -> None:
         """
         Set up a permutation traffic pattern
@@ -151,20 +383,11 @@ class ConnectionMatrix:
         if n_conns <= 0 or n_conns > self.N:
             raise ValueError(f"n_conns must be in range (0, {self.N}], got {n_conns}")
             
-        # Create a random permutation
-        destinations = list(range(n_conns))
-        random.shuffle(destinations)
-        
-        # Ensure no self-connections
-        for i in range(n_conns):
-            if destinations[i] == i:
-                # Swap with next position
-                j = (i + 1) % n_conns
-                destinations[i], destinations[j] = destinations[j], destinations[i]
-                
-        # Batch add connections for performance
-        connections = [(src, destinations[src], 0) for src in range(n_conns)]
-        self.add_connections_batch(connections)
+        srcs = np.arange(n_conns, dtype=np.int64)
+        destinations = self.rng.permutation(n_conns)
+        if n_conns > 1:
+            self._fix_fixed_points(srcs, destinations, n_conns)
+        self.add_connections_array(srcs, destinations)
                 
     def set_permutation_rack(self, n_conns: int, rack_size: int):
         """
@@ -174,23 +397,15 @@ class ConnectionMatrix:
             n_conns: Number of connections
             rack_size: Size of each rack
         """
-        # Implement rack-aware permutation
-        for rack_id in range(n_conns // rack_size):
-            rack_start = rack_id * rack_size
-            rack_hosts = list(range(rack_start, min(rack_start + rack_size, n_conns)))
-            
-            if len(rack_hosts) > 1:
-                destinations = rack_hosts.copy()
-                random.shuffle(destinations)
-                
-                # Ensure no self-connections within rack
-                for i, src in enumerate(rack_hosts):
-                    if destinations[i] == src:
-                        j = (i + 1) % len(rack_hosts)
-                        destinations[i], destinations[j] = destinations[j], destinations[i]
-                    
-                for i, src in enumerate(rack_hosts):
-                    self.add_connection(src, destinations[i])
+        n_racks = n_conns // rack_size
+        if n_racks == 0 or rack_size < 2:
+            return
+        srcs = np.arange(n_racks * rack_size, dtype=np.int64)
+        # Shuffle within each rack: sort by (rack, random key)
+        keys = self.rng.random(len(srcs))
+        destinations = srcs[np.lexsort((keys, srcs // rack_size))]
+        self._fix_fixed_points(srcs, destinations, rack_size)
+        self.add_connections_array(srcs, destinations)
                     
     def set_random(self, n_conns: int):
         """
@@ -199,15 +414,11 @@ class ConnectionMatrix:
         Args:
             n_conns: Number of random connections to create
         """
-        for _ in range(n_conns):
-            src = random.randint(0, self.N - 1)
-            dst = random.randint(0, self.N - 1)
-            
-            # Avoid self-connections
-            while dst == src:
-                dst = random.randint(0, self.N - 1)
-                
-            self.add_connection(src, dst)
+        src = self.rng.integers(0, self.N, n_conns)
+        # Uniform over the other N-1 hosts: skip over src
+        dst = self.rng.integers(0, self.N - 1, n_conns)
+        dst += dst >= src
+        self.add_connections_array(src, dst)
             
     def set_stride(self, stride: int):
         """
@@ -218,10 +429,10 @@ class ConnectionMatrix:
         Args:
             stride: The stride value
         """
-        for i in range(self.N):
-            dst = (i + stride) % self.N
-            if dst != i:
-                self.add_connection(i, dst)
+        if stride % self.N == 0:
+            return
+        src = np.arange(self.N, dtype=np.int64)
+        self.add_connections_array(src, (src + stride) % self.N)
                 
     def set_incast(self, hosts_per_incast: int, center: int):
         """
@@ -233,14 +444,9 @@ class ConnectionMatrix:
             hosts_per_incast: Number of senders
             center: Destination host ID
         """
-        senders = list(range(self.N))
-        senders.remove(center)  # Remove the center from potential senders
-        
-        # Select random senders
-        selected_senders = random.sample(senders, min(hosts_per_incast, len(senders)))
-        
-        for src in selected_senders:
-            self.add_connection(src, center)
+        senders = np.delete(np.arange(self.N, dtype=np.int64), center)
+        selected_senders = self.rng.choice(senders, min(hosts_per_incast, len(senders)), replace=False)
+        self.add_connections_array(selected_senders, np.full(len(selected_senders), center))
             
     def set_outcast(self, src: int, hosts_per_outcast: int, start_dest: int = 0):
         """
@@ -253,14 +459,16 @@ class ConnectionMatrix:
             hosts_per_outcast: Number of destinations
             start_dest: Starting destination ID
         """
-        destinations = []
-        for i in range(hosts_per_outcast):
-            dst = (start_dest + i) % self.N
-            if dst != src:
-                destinations.append(dst)
-                
-        for dst in destinations:
-            self.add_connection(src, dst)
+        destinations = (start_dest + np.arange(hosts_per_outcast, dtype=np.int64)) % self.N
+        destinations = destinations[destinations != src]
+        self.add_connections_array(np.full(len(destinations), src), destinations)
+            
+    def _all_to_all(self, start: int, end: int) -> None:
+        """Connect every ordered pair of distinct hosts in [start, end)."""
+        hosts = np.arange(start, end, dtype=np.int64)
+        src, dst = np.meshgrid(hosts, hosts, indexing="ij")
+        mask = src != dst
+        self.add_connections_array(src[mask], dst[mask])
             
     def set_many_to_many(self, n_hosts: int):
         """
@@ -271,10 +479,7 @@ class ConnectionMatrix:
         Args:
             n_hosts: Number of hosts in the all-to-all pattern
         """
-        for src in range(n_hosts):
-            for dst in range(n_hosts):
-                if src != dst:
-                    self.add_connection(src, dst)
+        self._all_to_all(0, n_hosts)
                     
     def set_hotspot(self, hosts_per_spot: int, n_hotspots: int):
         """
@@ -288,13 +493,7 @@ class ConnectionMatrix:
         """
         for spot in range(n_hotspots):
             start = spot * hosts_per_spot
-            end = min(start + hosts_per_spot, self.N)
-            
-            # All-to-all within hotspot
-            for src in range(start, end):
-                for dst in range(start, end):
-                    if src != dst:
-                        self.add_connection(src, dst)
+            self._all_to_all(start, min(start + hosts_per_spot, self.N))
                         
     def set_staggered_random(self, topology: Topology, n_conns: int, local_prob: float):
         """
@@ -307,31 +506,44 @@ class ConnectionMatrix:
         """
         # This would need topology-specific implementation
         # For now, just do random with some locality bias
-        for _ in range(n_conns):
-            src = random.randint(0, self.N - 1)
-            
-            if random.random() < local_prob:
-                # Local traffic - pick destination in same "rack"
-                # Assuming simple rack structure
-                rack_size = 40  # Common datacenter rack size
-                rack_id = src // rack_size
-                rack_start = rack_id * rack_size
-                rack_end = min(rack_start + rack_size, self.N)
-                
-                dst = random.randint(rack_start, rack_end - 1)
-                while dst == src:
-                    dst = random.randint(rack_start, rack_end - 1)
-            else:
-                # Remote traffic
-                dst = random.randint(0, self.N - 1)
-                while dst == src:
-                    dst = random.randint(0, self.N - 1)
-                    
-            self.add_connection(src, dst)
+        rack_size = 40  # Common datacenter rack size
+        src = self.rng.integers(0, self.N, n_conns)
+        
+        # Remote traffic: any other host
+        dst = self.rng.integers(0, self.N - 1, n_conns)
+        dst += dst >= src
+        
+        # Local traffic: another host in the same rack
+        rack_start = src - src % rack_size
+        rack_len = np.minimum(rack_start + rack_size, self.N) - rack_start
+        local = (self.rng.random(n_conns) < local_prob) & (rack_len > 1)
+        offset = (self.rng.random(n_conns) * (rack_len - 1)).astype(np.int64)
+        local_dst = rack_start + offset
+        local_dst += local_dst >= src
+        dst[local] = local_dst[local]
+        
+        self.add_connections_array(src, dst)
+        
+    # C++-style aliases used by the example drivers
+    def setPermutation(self, n_conns: Optional[int] = None) -> None:
+        """Alias for set_permutation to match C++ naming."""
+        self.set_permutation(n_conns)
+        
+    def setRandom(self, n_conns: int) -> None:
+        """Alias for set_random to match C++ naming."""
+        self.set_random(n_conns)
+            
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
             
     def save(self, filename: str) -> bool:
         """
-        Save connection matrix to file
+        Save connection matrix to a compressed .npz file
+        
+        The columns are stored as typed arrays, triggers as parallel id,
+        type and count arrays with their flow lists in CSR form, failures as
+        parallel arrays.
         
         Args:
             filename: Output filename
@@ -340,15 +552,26 @@ class ConnectionMatrix:
             True if successful
         """
         try:
+            trigger_ids = list(self.triggers)
+            trigger_flows = [self.triggers[t].flows for t in trigger_ids]
+            data = {
+                name[1:]: getattr(self, name)[:self.n_conns] for name in self.COLUMNS
+            }
+            data.update(
+                N=np.int64(self.N),
+                next_flowid=np.int64(self._next_flowid),
+                trigger_id=np.array(trigger_ids, dtype=np.int64),
+                trigger_type=np.array([self.triggers[t].type.value for t in trigger_ids], dtype=np.int64),
+                trigger_count=np.array([self.triggers[t].count for t in trigger_ids], dtype=np.int64),
+                trigger_flow_offsets=np.cumsum([0] + [len(f) for f in trigger_flows], dtype=np.int64),
+                trigger_flows=np.array([f for flows in trigger_flows for f in flows], dtype=np.int64),
+                failure_switch_type=np.array([f.switch_type for f in self.failures], dtype=np.str_),
+                failure_switch_id=np.array([f.switch_id for f in self.failures], dtype=np.int64),
+                failure_link_id=np.array([f.link_id for f in self.failures], dtype=np.int64),
+            )
+            # Write through a file object so numpy keeps the name as given
             with open(filename, 'wb') as f:
-                data = {
-                    'N': self.N,
-                    'connections': self.connections,
-                    'conns': self.conns,
-                    'triggers': self.triggers,
-                    'failures': self.failures
-                }
-                pickle.dump(data, f)
+                np.savez_compressed(f, **data)
             return True
         except Exception as e:
             print(f"Error saving connection matrix: {e}")
@@ -356,7 +579,7 @@ class ConnectionMatrix:
             
     def load(self, filename: str) -> bool:
         """
-        Load connection matrix from file
+        Load connection matrix from a .npz file written by save
         
         Args:
             filename: Input filename
@@ -365,18 +588,30 @@ class ConnectionMatrix:
             True if successful
         """
         try:
-            with open(filename, 'rb') as f:
-                data = pickle.load(f)
-                self.N = data['N']
-                self.connections = data['connections']
-                self.conns = data['conns']
-                self.triggers = data.get('triggers', {})
-                self.failures = data.get('failures', [])
+            with np.load(filename, allow_pickle=False) as data:
+                self.N = int(data['N'])
+                self.n_conns = len(data['src'])
+                for name, dtype in self.COLUMNS.items():
+                    column = np.empty(max(self.n_conns, self.INITIAL_CAPACITY), dtype=dtype)
+                    column[:self.n_conns] = data[name[1:]]
+                    setattr(self, name, column)
+                self._next_flowid = int(data['next_flowid'])
+                self._connections = None
                 
-                # Update next flow ID
-                if self.conns:
-                    self._next_flowid = max(c.flowid for c in self.conns) + 1
-                    
+                offsets = data['trigger_flow_offsets'].tolist()
+                flows = data['trigger_flows'].tolist()
+                self.triggers = {}
+                for i, (tid, ttype, count) in enumerate(zip(data['trigger_id'].tolist(),
+                                                            data['trigger_type'].tolist(),
+                                                            data['trigger_count'].tolist())):
+                    self.triggers[tid] = TriggerInfo(id=tid, type=TriggerType(ttype), count=count,
+                                                     flows=flows[offsets[i]:offsets[i + 1]])
+                self.failures = [
+                    Failure(switch_type=t, switch_id=s, link_id=l)
+                    for t, s, l in zip(data['failure_switch_type'].tolist(),
+                                       data['failure_switch_id'].tolist(),
+                                       data['failure_link_id'].tolist())
+                ]
             return True
         except Exception as e:
             print(f"Error loading connection matrix: {e}")
@@ -389,46 +624,7 @@ class ConnectionMatrix:
         Returns:
             List of all connections
         """
-        return self.conns.copy()
-        
-    def add_connections_batch(self, connections: List[Tuple[int, int, int]]) -> List[Connection]:
-        """
-        Add multiple connections in batch for performance.
-        
-        Args:
-            connections: List of (src, dest, size) tuples
-            
-        Returns:
-            List of created connections
-        """
-        created_conns = []
-        
-        # Pre-validate all connections
-        for src, dest, size in connections:
-            if not 0 <= src < self.N:
-                raise ValueError(f"Source host {src} out of range [0, {self.N})")
-            if not 0 <= dest < self.N:
-                raise ValueError(f"Destination host {dest} out of range [0, {self.N})")
-            if size < 0:
-                raise ValueError(f"Flow size cannot be negative, got {size}")
-                
-        # Batch create connections
-        for src, dest, size in connections:
-            if src not in self.connections:
-                self.connections[src] = []
-            self.connections[src].append(dest)
-            
-            conn = Connection(
-                src=src,
-                dst=dest,
-                size=size,
-                flowid=self._next_flowid
-            )
-            self._next_flowid += 1
-            self.conns.append(conn)
-            created_conns.append(conn)
-            
-        return created_conns
+        return self.conns
         
     def add_trigger(self, trigger_id: int, trigger_type: TriggerType, 
                     count: int = 0) -> TriggerInfo:
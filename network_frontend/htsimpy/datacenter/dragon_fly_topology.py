@@ -95,11 +95,17 @@ class DragonFlyTopology(Topology):
         # Network components
         self.switches: List[Optional[Switch]] = []
         
-        # 2D arrays for connections
-        self.pipes_host_switch: List[List[Optional[Pipe]]] = []
-        self.pipes_switch_host: List[List[Optional[Pipe]]] = []
-        self.queues_host_switch: List[List[Optional[BaseQueue]]] = []
-        self.queues_switch_host: List[List[Optional[BaseQueue]]] = []
+        # Host-switch links, indexed [host][switch] and [switch][host]; each
+        # host hangs off one switch, so the rows are dicts rather than dense lists
+        self.pipes_host_switch: List[Dict[int, Pipe]] = []
+        self.pipes_switch_host: List[Dict[int, Pipe]] = []
+        self.queues_host_switch: List[Dict[int, BaseQueue]] = []
+        self.queues_switch_host: List[Dict[int, BaseQueue]] = []
+        
+        # Per-host path segments: (host, uplink queue, uplink pipe) and
+        # (downlink queue, downlink pipe, host)
+        self._uplink_hops: List[Tuple] = []
+        self._downlink_hops: List[Tuple] = []
         
         self.pipes_switch_switch: List[List[Optional[Pipe]]] = []
         self.queues_switch_switch: List[List[Optional[BaseQueue]]] = []
@@ -150,16 +156,15 @@ class DragonFlyTopology(Topology):
             for j in range(self._no_of_switches):
                 self.switches[j] = Switch(f"Switch_{j}", self.eventlist)
                 
-        # Initialize 2D arrays
-        self.pipes_host_switch = [[None] * self._no_of_switches 
-                                  for _ in range(self._no_of_nodes)]
-        self.queues_host_switch = [[None] * self._no_of_switches 
-                                   for _ in range(self._no_of_nodes)]
+        # Initialize link tables
+        self.pipes_host_switch = [{} for _ in range(self._no_of_nodes)]
+        self.queues_host_switch = [{} for _ in range(self._no_of_nodes)]
         
-        self.pipes_switch_host = [[None] * self._no_of_nodes 
-                                  for _ in range(self._no_of_switches)]
-        self.queues_switch_host = [[None] * self._no_of_nodes 
-                                   for _ in range(self._no_of_switches)]
+        self.pipes_switch_host = [{} for _ in range(self._no_of_switches)]
+        self.queues_switch_host = [{} for _ in range(self._no_of_switches)]
+        
+        self._uplink_hops = [()] * self._no_of_nodes
+        self._downlink_hops = [()] * self._no_of_nodes
         
         self.pipes_switch_switch = [[None] * self._no_of_switches 
                                     for _ in range(self._no_of_switches)]
@@ -197,6 +202,9 @@ class DragonFlyTopology(Topology):
                     self.logfile.write_name(queue_hs)
                     self.logfile.write_name(pipe_hs)
                     
+                self._uplink_hops[k] = (self.hosts[k], queue_hs, pipe_hs)
+                self._downlink_hops[k] = (queue_sh, pipe_sh, self.hosts[k])
+                
         # Create switch-switch links
         for j in range(self._no_of_switches):
             groupid = j // self._a
@@ -317,7 +325,16 @@ class DragonFlyTopology(Topology):
         return host // (self._a * self._p)
         
     def get_bidir_paths(self, src: int, dest: int, reverse: bool) -> List[Route]:
-        """Get bidirectional paths between nodes"""
+        """
+        Get bidirectional paths between nodes
+
+        The switch part of a path depends only on the (src ToR, dest ToR)
+        pair. It is built once per pair and kept in the topology's
+        PathTemplateCache; each call joins it with the per-host uplink and
+        downlink segments into a fresh Route. Only the minimal path is
+        returned: Valiant paths through intermediate groups are not
+        implemented.
+        """
         if reverse:
             src, dest = dest, src
             
@@ -327,197 +344,58 @@ class DragonFlyTopology(Topology):
         if src == dest:
             return []
             
-        paths = []
-        
         src_tor = self._host_tor(src)
         dest_tor = self._host_tor(dest)
+        hops, pipes = self.path_templates().get((src_tor, dest_tor), self._switch_template,
+                                                src_tor, dest_tor)
+        # The uplink and downlink segments hold one pipe each
+        return [Route.from_hops(self._uplink_hops[src] + hops + self._downlink_hops[dest], pipes + 2)]
         
-        if src_tor == dest_tor:
-            # Same ToR - direct path
-            route = self._build_intra_tor_route(src, dest, src_tor)
-            if route:
-                paths.append(route)
-                
-        elif self._host_group(src) == self._host_group(dest):
-            # Same group - use intra-group link
-            route = self._build_intra_group_route(src, dest, src_tor, dest_tor)
-            if route:
-                paths.append(route)
-                
-        else:
-            # Different groups - need global links
-            
-            # Add direct path if exists
-            direct_route = self._build_inter_group_route(src, dest, src_tor, dest_tor)
-            if direct_route:
-                paths.append(direct_route)
-                
-            # Add indirect paths through other groups (Valiant routing)
-            for p in range(self._no_of_groups):
-                src_group = self._host_group(src)
-                dest_group = self._host_group(dest)
-                
-                if p == src_group or p == dest_group:
-                    continue
-                    
-                indirect_route = self._build_indirect_route(src, dest, src_tor, 
-                                                           dest_tor, p)
-                if indirect_route:
-                    paths.append(indirect_route)
-                    
-        return paths
-        
-    def _build_intra_tor_route(self, src: int, dest: int, tor: int) -> Optional[Route]:
-        """Build route for hosts on same ToR"""
-        route = Route()
-        
-        # Source host to ToR
-        route.push_back(self.hosts[src])
-        
-        queue_hs = self.queues_host_switch[src][tor]
-        pipe_hs = self.pipes_host_switch[src][tor]
-        
-        if not queue_hs or not pipe_hs:
-            return None
-            
-        route.push_back(queue_hs)
-        route.push_back(pipe_hs)
-        
-        # ToR to destination host
-        queue_sh = self.queues_switch_host[tor][dest]
-        pipe_sh = self.pipes_switch_host[tor][dest]
-        
-        if not queue_sh or not pipe_sh:
-            return None
-            
-        route.push_back(queue_sh)
-        route.push_back(pipe_sh)
-        
-        route.push_back(self.hosts[dest])
-        
-        return route
-        
-    def _build_intra_group_route(self, src: int, dest: int, 
-                                src_tor: int, dest_tor: int) -> Optional[Route]:
-        """Build route for hosts in same group"""
-        route = Route()
-        
-        # Source host to source ToR
-        route.push_back(self.hosts[src])
-        
-        queue_hs = self.queues_host_switch[src][src_tor]
-        pipe_hs = self.pipes_host_switch[src][src_tor]
-        
-        if not queue_hs or not pipe_hs:
-            return None
-            
-        route.push_back(queue_hs)
-        route.push_back(pipe_hs)
-        
-        # Source ToR to dest ToR
-        queue_ss = self.queues_switch_switch[src_tor][dest_tor]
-        pipe_ss = self.pipes_switch_switch[src_tor][dest_tor]
-        
-        if not queue_ss or not pipe_ss:
-            return None
-            
-        route.push_back(queue_ss)
-        route.push_back(pipe_ss)
-        
-        # Dest ToR to destination host
-        queue_sh = self.queues_switch_host[dest_tor][dest]
-        pipe_sh = self.pipes_switch_host[dest_tor][dest]
-        
-        if not queue_sh or not pipe_sh:
-            return None
-            
-        route.push_back(queue_sh)
-        route.push_back(pipe_sh)
-        
-        route.push_back(self.hosts[dest])
-        
-        return route
-        
-    def _build_inter_group_route(self, src: int, dest: int,
-                                src_tor: int, dest_tor: int) -> Optional[Route]:
-        """Build direct route between groups"""
-        src_group = self._host_group(src)
-        dest_group = self._host_group(dest)
-        
-        # Find switches with direct link between groups
+    def _global_switches(self, src_group: int, dest_group: int) -> Tuple[int, int]:
+        """Switches at either end of the global link between two groups"""
         if src_group < dest_group:
             src_switch = src_group * self._a + (dest_group - 1) // self._h
             dest_switch = dest_group * self._a + src_group // self._h
         else:
             src_switch = src_group * self._a + dest_group // self._h
             dest_switch = dest_group * self._a + (src_group - 1) // self._h
-            
-        route = Route()
-        route.push_back(self.hosts[src])
-        
-        # Source host to source ToR
-        queue = self.queues_host_switch[src][src_tor]
-        pipe = self.pipes_host_switch[src][src_tor]
-        
-        if not queue or not pipe:
-            return None
-            
-        route.push_back(queue)
-        route.push_back(pipe)
+        return src_switch, dest_switch
         
-        # If source ToR is not the global switch, route to it
-        if src_tor != src_switch:
-            queue = self.queues_switch_switch[src_tor][src_switch]
-            pipe = self.pipes_switch_switch[src_tor][src_switch]
-            
-            if not queue or not pipe:
-                return None
-                
-            route.push_back(queue)
-            route.push_back(pipe)
+    def _switch_template(self, src_tor: int, dest_tor: int) -> Tuple[Tuple, int]:
+        """
+        Switch-to-switch hops from src_tor to dest_tor
+
+        Returns:
+            Tuple of (hops, number of pipes among them)
+        """
+        if src_tor == dest_tor:
+            # Same ToR - straight back down
+            return (), 0
             
-        # Global link between groups
-        queue = self.queues_switch_switch[src_switch][dest_switch]
-        pipe = self.pipes_switch_switch[src_switch][dest_switch]
-        
-        if not queue or not pipe:
-            return None
+        queues = self.queues_switch_switch
+        pipes = self.pipes_switch_switch
+        src_group = src_tor // self._a
+        dest_group = dest_tor // self._a
+        
+        if src_group == dest_group:
+            # Same group - one intra-group link
+            return (queues[src_tor][dest_tor], pipes[src_tor][dest_tor]), 1
             
-        route.push_back(queue)
-        route.push_back(pipe)
-        
-        # If dest switch is not the dest ToR, route to it
+        # Different groups - through the global link, with an intra-group
+        # hop at either end when the ToR is not the global switch
+        src_switch, dest_switch = self._global_switches(src_group, dest_group)
+        switches = [src_tor]
+        if src_tor != src_switch:
+            switches.append(src_switch)
+        switches.append(dest_switch)
         if dest_switch != dest_tor:
-            queue = self.queues_switch_switch[dest_switch][dest_tor]
-            pipe = self.pipes_switch_switch[dest_switch][dest_tor]
+            switches.append(dest_tor)
             
-            if not queue or not pipe:
-                return None
-                
-            route.push_back(queue)
-            route.push_back(pipe)
-            
-        # Dest ToR to destination host
-        queue = self.queues_switch_host[dest_tor][dest]
-        pipe = self.pipes_switch_host[dest_tor][dest]
-        
-        if not queue or not pipe:
-            return None
-            
-        route.push_back(queue)
-        route.push_back(pipe)
-        
-        route.push_back(self.hosts[dest])
-        
-        return route
-        
-    def _build_indirect_route(self, src: int, dest: int,
-                            src_tor: int, dest_tor: int,
-                            intermediate_group: int) -> Optional[Route]:
-        """Build indirect route through an intermediate group (Valiant routing)"""
-        # For simplicity, not implementing full indirect routing
-        # This would require routing src->intermediate->dest
-        return None
+        hops = []
+        for a, b in zip(switches, switches[1:]):
+            hops.append(queues[a][b])
+            hops.append(pipes[a][b])
+        return tuple(hops), len(switches) - 1
         
     def get_neighbours(self, src: int) -> Optional[List[int]]:
         """DragonFly doesn't use direct neighbor concept"""
@@ -188,96 +188,95 @@ def main():
     flow_count = 0
     mptcp_sources = []
     
-    for src, destinations in conn_matrix.connections.items():
-        for dst in destinations:
-            # Get paths if not cached
-            if dst not in net_paths[src]:
-                paths = topology.get_bidir_paths(src, dst, False)
-                net_paths[src][dst] = paths
-                
-            if not net_paths[src][dst]:
-                print(f"Warning: No paths from {src} to {dst}")
-                continue
-                
-            # Create MPTCP source
-            if algo == MultipathTcpAlgorithm.COUPLED_EPSILON:
-                mptcp_src = MultipathTcpSrc(algo, eventlist, None, args.epsilon)
-            else:
-                mptcp_src = MultipathTcpSrc(algo, eventlist, None)
-                
-            mptcp_src.setName(f"mptcp_{src}_to_{dst}")
-            logfile.write_name(mptcp_src)
-            mptcp_sources.append(mptcp_src)
+    for _, src, dst, _, _ in conn_matrix.iter_flows():
+        # Get paths if not cached
+        if dst not in net_paths[src]:
+            paths = topology.get_bidir_paths(src, dst, False)
+            net_paths[src][dst] = paths
             
-            # Register with subflow control
-            if subflow_control:
-                subflow_control.add_flow(src, dst, mptcp_src)
-            
-            # Determine number of subflows
-            num_subflows = min(args.subflows, len(net_paths[src][dst]))
-            print(f"MPTCP flow {src}->{dst}: {num_subflows} initial subflows "
-                  f"(of {len(net_paths[src][dst])} available paths)")
+        if not net_paths[src][dst]:
+            print(f"Warning: No paths from {src} to {dst}")
+            continue
             
-            # Select diverse paths for subflows
-            selected_paths = []
-            if num_subflows == len(net_paths[src][dst]):
-                # Use all paths
-                selected_paths = list(range(len(net_paths[src][dst])))
-            else:
-                # For fat-tree, try to use different upper pod switches
-                # This gives better path diversity
-                path_groups = {}
-                for i, path in enumerate(net_paths[src][dst]):
-                    # Group by intermediate switches (simplified)
-                    key = len(path._elements)  # Group by path length
-                    if key not in path_groups:
-                        path_groups[key] = []
-                    path_groups[key].append(i)
-                    
-                # Select from different groups
-                for group in path_groups.values():
-                    if len(selected_paths) < num_subflows:
-                        selected_paths.append(random.choice(group))
-                        
-                # Fill remaining with random choices
-                while len(selected_paths) < num_subflows:
-                    choice = random.randint(0, len(net_paths[src][dst]) - 1)
-                    if choice not in selected_paths:
-                        selected_paths.append(choice)
+        # Create MPTCP source
+        if algo == MultipathTcpAlgorithm.COUPLED_EPSILON:
+            mptcp_src = MultipathTcpSrc(algo, eventlist, None, args.epsilon)
+        else:
+            mptcp_src = MultipathTcpSrc(algo, eventlist, None)
             
-            # Create subflows
-            for subflow_id, path_idx in enumerate(selected_paths):
-                # Create TCP subflow
-                tcp_src, tcp_sink = create_mptcp_subflow(
-                    src, dst, subflow_id, eventlist, tcp_rtx_scanner, logfile
-                )
-                
-                # Get the selected path
-                chosen_path = net_paths[src][dst][path_idx]
+        mptcp_src.setName(f"mptcp_{src}_to_{dst}")
+        logfile.write_name(mptcp_src)
+        mptcp_sources.append(mptcp_src)
+        
+        # Register with subflow control
+        if subflow_control:
+            subflow_control.add_flow(src, dst, mptcp_src)
+        
+        # Determine number of subflows
+        num_subflows = min(args.subflows, len(net_paths[src][dst]))
+        print(f"MPTCP flow {src}->{dst}: {num_subflows} initial subflows "
+              f"(of {len(net_paths[src][dst])} available paths)")
+        
+        # Select diverse paths for subflows
+        selected_paths = []
+        if num_subflows == len(net_paths[src][dst]):
+            # Use all paths
+            selected_paths = list(range(len(net_paths[src][dst])))
+        else:
+            # For fat-tree, try to use different upper pod switches
+            # This gives better path diversity
+            path_groups = {}
+            for i, path in enumerate(net_paths[src][dst]):
+                # Group by intermediate switches (simplified)
+                key = len(path._elements)  # Group by path length
+                if key not in path_groups:
+                    path_groups[key] = []
+                path_groups[key].append(i)
                 
-                # Create routes
-                route_out = Route()
-                for element in chosen_path._elements:
-                    route_out.push_back(element)
+            # Select from different groups
+            for group in path_groups.values():
+                if len(selected_paths) < num_subflows:
+                    selected_paths.append(random.choice(group))
                     
-                route_in = Route()
-                route_in.push_back(tcp_src)
-                
-                # Add subflow to MPTCP
-                mptcp_src.add_subflow(tcp_src)
-                
-                # Record in subflow control
-                if subflow_control:
-                    subflow_control.add_subflow(mptcp_src, path_idx)
-                
-                # Connect with slight delay between subflows
-                starttime = timeFromMs(subflow_id * 1)
-                tcp_src.connect(route_out, route_in, tcp_sink, starttime)
+            # Fill remaining with random choices
+            while len(selected_paths) < num_subflows:
+                choice = random.randint(0, len(net_paths[src][dst]) - 1)
+                if choice not in selected_paths:
+                    selected_paths.append(choice)
+        
+        # Create subflows
+        for subflow_id, path_idx in enumerate(selected_paths):
+            # Create TCP subflow
+            tcp_src, tcp_sink = create_mptcp_subflow(
+                src, dst, subflow_id, eventlist, tcp_rtx_scanner, logfile
+            )
+            
+            # Get the selected path
+            chosen_path = net_paths[src][dst][path_idx]
+            
+            # Create routes
+            route_out = Route()
+            for element in chosen_path._elements:
+                route_out.push_back(element)
                 
-            # Start the MPTCP flow
-            mptcp_src.startflow()
-            flow_count += 1
+            route_in = Route()
+            route_in.push_back(tcp_src)
             
+            # Add subflow to MPTCP
+            mptcp_src.add_subflow(tcp_src)
+            
+            # Record in subflow control
+            if subflow_control:
+                subflow_control.add_subflow(mptcp_src, path_idx)
+            
+            # Connect with slight delay between subflows
+            starttime = timeFromMs(subflow_id * 1)
+            tcp_src.connect(route_out, route_in, tcp_sink, starttime)
+            
+        # Start the MPTCP flow
+        mptcp_src.startflow()
+        flow_count += 1
+        
     print(f"\nCreated {flow_count} MPTCP flows")
     
     # Run simulation
@@ -198,43 +198,42 @@ def main():
     
     # Create flows
     flow_count = 0
-    for src, destinations in conns.connections.items():
-        for dst in destinations:
-            # Get paths if not cached
-            if dst not in net_paths[src]:
-                paths = topology.get_bidir_paths(src, dst, False)
-                net_paths[src][dst] = paths
-                
-            if not net_paths[src][dst]:
-                print(f"Warning: No path found from {src} to {dst}")
-                continue
-                
-            # Create TCP flow
-            tcp_src, tcp_sink = flow_gen.create_flow(src, dst, args.flowsize)
-            
-            # Choose random path
-            path_choice = random.randint(0, len(net_paths[src][dst]) - 1)
-            chosen_path = net_paths[src][dst][path_choice]
-            
-            # Create routes
-            route_out = Route()
-            route_in = Route()
+    for _, src, dst, _, _ in conns.iter_flows():
+        # Get paths if not cached
+        if dst not in net_paths[src]:
+            paths = topology.get_bidir_paths(src, dst, False)
+            net_paths[src][dst] = paths
             
-            # Build outgoing route
-            for element in chosen_path._elements:
-                route_out.push_back(element)
-                
-            # Build return route
-            route_in.push_back(tcp_src)
+        if not net_paths[src][dst]:
+            print(f"Warning: No path found from {src} to {dst}")
+            continue
             
-            # Add random start time (0-10ms)
-            starttime = random.randint(0, timeFromMs(10))
-            
-            # Connect
-            tcp_src.connect(route_out, route_in, tcp_sink, starttime)
-            
-            flow_count += 1
+        # Create TCP flow
+        tcp_src, tcp_sink = flow_gen.create_flow(src, dst, args.flowsize)
+        
+        # Choose random path
+        path_choice = random.randint(0, len(net_paths[src][dst]) - 1)
+        chosen_path = net_paths[src][dst][path_choice]
+        
+        # Create routes
+        route_out = Route()
+        route_in = Route()
+        
+        # Build outgoing route
+        for element in chosen_path._elements:
+            route_out.push_back(element)
             
+        # Build return route
+        route_in.push_back(tcp_src)
+        
+        # Add random start time (0-10ms)
+        starttime = random.randint(0, timeFromMs(10))
+        
+        # Connect
+        tcp_src.connect(route_out, route_in, tcp_sink, starttime)
+        
+        flow_count += 1
+        
     print(f"Created {flow_count} flows")
     
     # Add queue samplers
@@ -177,41 +177,40 @@ def run_workload(topology: Topology, eventlist: EventList,
     flow_count = 0
     tcp_sources = []
     
-    for src, destinations in conn_matrix.connections.items():
-        for dst in destinations:
-            # Get paths
-            paths = topology.get_bidir_paths(src, dst, False)
-            if not paths:
-                continue
-                
-            # Create TCP flow
-            tcp_src = TcpSrc(None, None, eventlist)
-            tcp_sink = TcpSink()
-            
-            tcp_src.setName(f"tcp_{src}_to_{dst}")
-            tcp_sink.setName(f"tcp_sink_{src}_to_{dst}")
-            
-            logfile.write_name(tcp_src)
-            logfile.write_name(tcp_sink)
-            
-            tcp_rtx_scanner.registerTcp(tcp_src)
-            tcp_sources.append(tcp_src)
-            
-            # Choose shortest path
-            shortest = min(paths, key=lambda p: len(p._elements))
-            
-            # Create routes
-            route_out = Route()
-            for element in shortest._elements:
-                route_out.push_back(element)
-                
-            route_in = Route()
-            route_in.push_back(tcp_src)
+    for _, src, dst, _, _ in conn_matrix.iter_flows():
+        # Get paths
+        paths = topology.get_bidir_paths(src, dst, False)
+        if not paths:
+            continue
             
-            # Connect
-            tcp_src.connect(route_out, route_in, tcp_sink, 0)
-            flow_count += 1
+        # Create TCP flow
+        tcp_src = TcpSrc(None, None, eventlist)
+        tcp_sink = TcpSink()
+        
+        tcp_src.setName(f"tcp_{src}_to_{dst}")
+        tcp_sink.setName(f"tcp_sink_{src}_to_{dst}")
+        
+        logfile.write_name(tcp_src)
+        logfile.write_name(tcp_sink)
+        
+        tcp_rtx_scanner.registerTcp(tcp_src)
+        tcp_sources.append(tcp_src)
+        
+        # Choose shortest path
+        shortest = min(paths, key=lambda p: len(p._elements))
+        
+        # Create routes
+        route_out = Route()
+        for element in shortest._elements:
+            route_out.push_back(element)
             
+        route_in = Route()
+        route_in.push_back(tcp_src)
+        
+        # Connect
+        tcp_src.connect(route_out, route_in, tcp_sink, 0)
+        flow_count += 1
+        
     # Collect initial metrics
     start_time = eventlist.now()
     
@@ -0,0 +1,71 @@
+"""
+Pod partitioning of a fat-tree for parallel execution (core/pdes.py)
+
+No C++ counterpart. Reads the components of a built FatTreeTopology and
+assigns them to workers; the topology itself knows nothing about partitions.
+"""
+
+from ..core.pdes import Partition
+from .fat_tree_topology import FatTreeTopology
+
+
+def pod_partition(topology: FatTreeTopology, workers: int) -> Partition:
+    """Partition the fat-tree by pod for parallel execution.
+
+    Pods are split into contiguous blocks, pod p going to worker
+    p * workers // k, and core switches are dealt round-robin. Every
+    queue belongs to the switch or host that feeds it and every pipe to
+    the switch or host it delivers to, so only agg<->core pipes cross
+    partitions and the lookahead is the core-tier link latency.
+
+    Args:
+        topology: Fat-tree to partition
+        workers: Number of worker processes, at most k for every worker to own a pod
+
+    Returns:
+        Partition covering hosts, switches, queues and pipes
+    """
+    k = topology.k
+    half = k // 2
+    part = Partition(workers)
+
+    def pod_worker(pod: int) -> int:
+        return pod * workers // k
+
+    def assign_all(items, worker: int) -> None:
+        for item in items:
+            part.assign(item, worker)
+
+    for host_id, host in enumerate(topology.hosts):
+        part.assign(host, pod_worker(topology.HOST_POD(host_id)))
+    for tor_id, switch in enumerate(topology.switches_lp):
+        part.assign(switch, pod_worker(tor_id // half))
+    for agg_id, switch in enumerate(topology.switches_up):
+        part.assign(switch, pod_worker(topology.AGG_SWITCH_POD_ID(agg_id)))
+    for core_id, switch in enumerate(topology.switches_c):
+        part.assign(switch, core_id % workers)
+
+    for tor_id in range(len(topology.switches_lp)):
+        w = pod_worker(tor_id // half)
+        for srv in range(topology._no_of_nodes):
+            assign_all(topology.queues_nlp_ns[tor_id][srv], w)
+            assign_all(topology.queues_ns_nlp[srv][tor_id], w)
+            for pipe in topology.pipes_nlp_ns[tor_id][srv] + topology.pipes_ns_nlp[srv][tor_id]:
+                part.assign_link(pipe, w, w)
+        for agg_id in range(len(topology.switches_up)):
+            assign_all(topology.queues_nlp_nup[tor_id][agg_id], w)
+            assign_all(topology.queues_nup_nlp[agg_id][tor_id], w)
+            for pipe in topology.pipes_nlp_nup[tor_id][agg_id] + topology.pipes_nup_nlp[agg_id][tor_id]:
+                part.assign_link(pipe, w, w)
+
+    for agg_id in range(len(topology.switches_up)):
+        agg_w = pod_worker(topology.AGG_SWITCH_POD_ID(agg_id))
+        for core_id in range(len(topology.switches_c)):
+            core_w = core_id % workers
+            assign_all(topology.queues_nup_nc[agg_id][core_id], agg_w)
+            assign_all(topology.queues_nc_nup[core_id][agg_id], core_w)
+            for pipe in topology.pipes_nup_nc[agg_id][core_id]:
+                part.assign_link(pipe, agg_w, core_w)
+            for pipe in topology.pipes_nc_nup[core_id][agg_id]:
+                part.assign_link(pipe, core_w, agg_w)
+    return part
@@ -3,6 +3,7 @@
 from typing import Dict, List, Optional, Set, Tuple, Callable
 from enum import IntEnum
 from ..core import Packet, Route, EventList, Pipe
+from ..core.checkpoint import register_static
 from ..queues.base_queue import BaseQueue
 from ..core.switch import Switch
 from ..packets.tcp_packet import TcpPacket
@@ -58,6 +59,9 @@ class FatTreeSwitch(Switch):
     _speculative_threshold_fraction: float = 0.25
     _port_flow_counts: Dict[BaseQueue, int] = {}
     
+    # Use the compiled FIB fast path for hash-based strategies (see compile_fib)
+    _use_compiled_fib: bool = True
+    
     # Function pointer for adaptive routing comparison (matches C++ fn)
     fn: Callable = None  # Will be set to one of the compare functions
     
@@ -105,6 +109,11 @@ class FatTreeSwitch(Switch):
         self._last_choice = 0
         self._packets: Set[Packet] = set()
         self._fib = RouteTable()  # FIB for routing
+        # Compiled FIB, indexed by destination ToR: egress routes, or None
+        # when the destination hangs off this switch (host routes)
+        self._fib_hops: Optional[List[Optional[Tuple[Route, ...]]]] = None
+        self._fib_entries: Optional[List[Optional[List[FibEntry]]]] = None
+        self._host_tor: Optional[List[int]] = None
         self._ports: List[BaseQueue] = []  # Switch ports
         
         # Create internal pipe for switch delay with callback
@@ -155,6 +164,30 @@ class FatTreeSwitch(Switch):
         """
         Determine next hop for packet based on routing strategy.
         
+        With a compiled FIB and a hash-based strategy (NIX, ECMP, or the ECMP
+        half of RR_ECMP) this is two list lookups and a cached per-flow hash,
+        choosing the same hop as the dynamic path. Adaptive, flowlet and
+        round-robin routing, and switches without a compiled FIB, take the
+        dynamic path.
+        """
+        hops_by_tor = self._fib_hops
+        if hops_by_tor is not None and self._use_compiled_fib:
+            strategy = self._strategy
+            if (strategy <= RoutingStrategy.ECMP or
+                    (strategy == RoutingStrategy.RR_ECMP and self._type != SwitchType.TOR)):
+                dest = pkt.dst()
+                hops = hops_by_tor[self._host_tor[dest]]
+                if hops is None:
+                    return self._get_host_route(pkt, dest)
+                if len(hops) == 1:
+                    return hops[0]
+                return hops[self._ecmp_index(pkt, len(hops))]
+        return self._get_next_hop_dynamic(pkt, ingress_port)
+        
+    def _get_next_hop_dynamic(self, pkt: Packet, ingress_port: Optional[BaseQueue]) -> Optional[Route]:
+        """
+        Determine next hop for packet based on routing strategy.
+        
         Matches C++ FatTreeSwitch::getNextHop logic.
         """
         # Get destination
@@ -173,6 +206,10 @@ class FatTreeSwitch(Switch):
         elif hasattr(self, '_fib') and isinstance(self._fib, dict) and dest in self._fib:
             # Support dictionary-style FIB
             available_hops = [self._fib[dest]]
+        if available_hops is None and self._fib_entries is not None:
+            available_hops = self._fib_entries[self._host_tor[dest]]
+            if available_hops is None:
+                return self._get_host_route(pkt, dest)
         
         if not available_hops:
             return None
@@ -260,6 +297,112 @@ class FatTreeSwitch(Switch):
         # C++ code assumes FibEntry has getEgressPort() method
         return available_hops[ecmp_choice].get_egress_port()
         
+    def _get_host_route(self, pkt: Packet, dest: int) -> Optional[Route]:
+        """Route to a directly attached host, from add_host_port."""
+        fe = self._fib.get_host_route(dest, pkt.flow_id())
+        return fe.get_egress_port() if fe is not None else None
+        
+    def _ecmp_index(self, pkt: Packet, n: int) -> int:
+        """ECMP choice among n hops for the compiled FIB fast path.
+        
+        Same choice as the dynamic path, _freebsd_hash(flow_id, pathid, salt)
+        % n. The hash is cached on the PacketFlow per (salt, pathid), so the
+        cache holds one entry per switch on the flow's paths and goes away
+        with the flow.
+        """
+        flow = pkt.flow()
+        hashes = flow._ecmp_hashes
+        key = (self._hash_salt, pkt.pathid())
+        h = hashes.get(key)
+        if h is None:
+            h = hashes[key] = self._freebsd_hash(flow.flow_id(), key[1], self._hash_salt)
+        return h % n
+        
+    def _link_entries(self, queues: List[BaseQueue], pipes: List[Pipe],
+                      direction: PacketDirection) -> List[FibEntry]:
+        """FIB entries for every link of a bundle: queue, pipe, next switch."""
+        entries = []
+        for queue, pipe in zip(queues, pipes):
+            route = Route()
+            route.push_back(queue)
+            route.push_back(pipe)
+            route.push_back(queue.getRemoteEndpoint())
+            entries.append(FibEntry(route, 1, direction))
+        return entries
+        
+    def compile_fib(self, host_tor: List[int]) -> None:
+        """
+        Materialize this switch's FIB after topology construction.
+        
+        Builds, for every destination ToR, the list of equal-cost egress
+        routes (what C++ getNextHop adds to the FIB lazily on the first
+        packet per destination), from the links the topology actually wired.
+        Upward routes are shared by all non-local destinations. Destinations
+        attached to this ToR map to None and use host routes.
+        
+        Args:
+            host_tor: ToR switch id of every host
+        """
+        ft = self._ft
+        n_tor = len(ft.switches_lp)
+        tors_per_pod = ft._tor_switches_per_pod
+        # Hosts beyond the wired ToRs are unreachable and map to None as well
+        entries: List[Optional[List[FibEntry]]] = [None] * max(n_tor, max(host_tor, default=-1) + 1)
+        
+        if self._type == SwitchType.TOR:
+            pod = self._id // tors_per_pod
+            up = []
+            for agg in range(ft.MIN_POD_AGG_SWITCH(pod), ft.MAX_POD_AGG_SWITCH(pod) + 1):
+                up += self._link_entries(ft.queues_nlp_nup[self._id][agg],
+                                         ft.pipes_nlp_nup[self._id][agg], PacketDirection.UPWARD)
+            self.add_upward_routes(up)
+            for tor in range(n_tor):
+                if tor != self._id:
+                    entries[tor] = up
+        elif self._type == SwitchType.AGG:
+            pod = ft.AGG_SWITCH_POD_ID(self._id)
+            up = []
+            for core in range(len(ft.switches_c)):
+                up += self._link_entries(ft.queues_nup_nc[self._id][core],
+                                         ft.pipes_nup_nc[self._id][core], PacketDirection.UPWARD)
+            self.add_upward_routes(up)
+            for tor in range(n_tor):
+                if tor // tors_per_pod == pod:
+                    entries[tor] = self._link_entries(ft.queues_nup_nlp[self._id][tor],
+                                                      ft.pipes_nup_nlp[self._id][tor],
+                                                      PacketDirection.DOWNWARD)
+                else:
+                    entries[tor] = up
+        else:
+            down_per_pod = []
+            for pod in range(ft.NPOD):
+                down = []
+                for agg in range(ft.MIN_POD_AGG_SWITCH(pod), ft.MAX_POD_AGG_SWITCH(pod) + 1):
+                    down += self._link_entries(ft.queues_nc_nup[self._id][agg],
+                                               ft.pipes_nc_nup[self._id][agg], PacketDirection.DOWNWARD)
+                down_per_pod.append(down)
+            for tor in range(n_tor):
+                entries[tor] = down_per_pod[tor // tors_per_pod]
+        
+        # Routes shared between destinations share one tuple
+        hops_of: Dict[int, Tuple[Route, ...]] = {}
+        hops: List[Optional[Tuple[Route, ...]]] = [None] * len(entries)
+        for tor, fib_entries in enumerate(entries):
+            if fib_entries is None:
+                continue
+            if id(fib_entries) not in hops_of:
+                hops_of[id(fib_entries)] = tuple(e.get_egress_port() for e in fib_entries)
+            hops[tor] = hops_of[id(fib_entries)]
+        
+        self._fib_entries = entries
+        self._fib_hops = hops
+        self._host_tor = host_tor
+        
+    @classmethod
+    def set_use_compiled_fib(cls, enabled: bool) -> None:
+        """Enable or disable the compiled FIB fast path for all switches."""
+        cls._use_compiled_fib = enabled
+        
     def _select_route(self, pkt: Packet, routes: List[FibEntry]) -> int:
         """Select route index based on routing strategy."""
         if not routes:
@@ -708,4 +851,10 @@ class FatTreeSwitch(Switch):
         # Add logger for each port/queue
         for port in self._ports:
             if hasattr(port, 'add_logger'):
-                port.add_logger(logfile, sample_period)
\ No newline at end of file
+                port.add_logger(logfile, sample_period)
+
+
+# 静态成员随仿真快照保存
+register_static(FatTreeSwitch, "_strategy", "_ar_fraction", "_ar_sticky", "_sticky_delta",
+                "_ecn_threshold_fraction", "_speculative_threshold_fraction",
+                "_port_flow_counts", "_use_compiled_fib")
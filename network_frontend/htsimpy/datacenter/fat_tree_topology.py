@@ -15,6 +15,7 @@ RANDOM_BUFFER = 3     # Random buffer size in packets
 from ..core.route import Route
 from ..core.pipe import Pipe
 from ..core.eventlist import EventList
+from ..core.checkpoint import register_static
 from ..core.logger.logfile import Logfile
 from ..core.logger.queue import QueueLoggerFactory
 from ..queues.random_queue import RandomQueue
@@ -253,6 +254,15 @@ class FatTreeTopology(Topology):
         # Create all links
         self._create_links()
         
+        # Materialize per-switch forwarding tables
+        self.compile_fibs()
+        
+    def compile_fibs(self) -> None:
+        """Compile the FIB of every switch, see FatTreeSwitch.compile_fib."""
+        self.host_tor = [self.HOST_POD_SWITCH(host) for host in range(self._no_of_nodes)]
+        for switch in self.switches_lp + self.switches_up + self.switches_c:
+            switch.compile_fib(self.host_tor)
+        
     def _init_connection_arrays(self):
         """Initialize 3D arrays for pipes and queues"""
         k = self.k
@@ -375,7 +385,8 @@ class FatTreeTopology(Topology):
             agg_in_pod = agg_id % (k // 2)
             
             for core_group in range(k // 2):
-                core_id = agg_in_pod * (k // 2) + core_group
+                # Matches C++ and get_bidir_paths: core = podpos + _agg_switches_per_pod * l
+                core_id = agg_in_pod + (k // 2) * core_group
                 
                 # Create bundle of links
                 bundle_size = self._bundlesize[2]  # CORE_TIER is index 2
@@ -439,7 +450,8 @@ class FatTreeTopology(Topology):
             agg_in_pod = agg_id % (k // 2)
             
             for core_group in range(k // 2):
-                core_id = agg_in_pod * (k // 2) + core_group
+                # Matches C++ and get_bidir_paths: core = podpos + _agg_switches_per_pod * l
+                core_id = agg_in_pod + (k // 2) * core_group
                 
                 for b in range(len(self.queues_nup_nc[agg_id][core_id])):
                     # Add ports to switches
@@ -1299,4 +1311,9 @@ class FatTreeTopology(Topology):
         
     def AGG_SWITCH_POD_ID(self, agg_switch_id: int) -> int:
         """Convert an aggregation switch ID to a pod ID."""
-        return agg_switch_id // self._agg_switches_per_pod
\ No newline at end of file
+        return agg_switch_id // self._agg_switches_per_pod
+
+
+# 静态成员随仿真快照保存
+register_static(FatTreeTopology, "_tiers", "_link_latencies", "_switch_latencies",
+                "_hosts_per_pod", "_bundlesize", "_tier_params")
@@ -5,39 +5,60 @@ Corresponds to firstfit.h/cpp in HTSim C++ implementation
 """
 
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+
+import numpy as np
+
 from ..core.eventlist import EventList, EventSource
 from ..core.route import Route
 from ..queues.base_queue import BaseQueue
 from ..protocols.tcp import TcpSrc
+from .flow_counters import CounterField, FlowCounters, shared_flow_table
+
+# Initial path cost in the C++ allocator; a path is only chosen below it
+MAX_PATH_COST = 10000000
 
 
-@dataclass
 class FlowEntry:
     """Information about a flow for FirstFit allocation"""
-    byte_counter: int
-    allocated: int
-    src: int
-    dest: int
-    route: Optional[Route]
-    
+
+    byte_counter = CounterField()
+    allocated = CounterField()
+
+    def __init__(self, byte_counter: int, allocated: int, src: int, dest: int,
+                 route: Optional[Route]):
+        self.byte_counter = byte_counter
+        self.allocated = allocated
+        self.src = src
+        self.dest = dest
+        self.route = route
+
+    def __repr__(self) -> str:
+        return (f"FlowEntry(byte_counter={self.byte_counter}, allocated={self.allocated}, "
+                f"src={self.src}, dest={self.dest}, route={self.route!r})")
+
 
 class FirstFit(EventSource):
     """
     FirstFit path allocation algorithm
-    
+
     This algorithm periodically scans flows and reallocates paths
     to balance load across the network. It's a simple greedy
     algorithm that fits flows into the least loaded paths.
+
+    Byte counters and allocation flags are NumPy columns (one row per
+    flow) and queue allocation counts are an array indexed by queue id,
+    updated when a path is assigned or released.  A scan compares all
+    flows against the threshold at once and only walks the paths of the
+    flows that cross it.
     """
-    
-    def __init__(self, 
+
+    def __init__(self,
                  scan_period: int,
                  eventlist: EventList,
                  net_paths: Optional[List[List[List[Route]]]] = None):
         """
         Initialize FirstFit allocator
-        
+
         Args:
             scan_period: Period between scans in picoseconds
             eventlist: The event list
@@ -47,142 +68,154 @@ class FirstFit(EventSource):
         self._scan_period = scan_period
         self._eventlist = eventlist
         self.net_paths = net_paths
-        
+
         # Flow tracking
         self.flow_counters: Dict[TcpSrc, FlowEntry] = {}
-        
-        # Queue allocations tracking
-        self.path_allocations: Dict[BaseQueue, int] = {}
-        
+        self._flows: List[TcpSrc] = []
+        self._entries: List[FlowEntry] = []
+        self._counters = FlowCounters({"byte_counter": np.int64, "allocated": np.int64})
+        # Rows of the flows in their shared FlowStateTable; None when stale,
+        # False when the flows do not share one
+        self._flow_rows = None
+
+        # Queue allocations: queue -> id, id -> number of allocated flows.
+        # Id 0 is a padding slot whose count stays 0.
+        self._queue_ids: Dict[BaseQueue, int] = {}
+        self._loads = np.zeros(64, dtype=np.int64)
+        self._route_queues: Dict[Route, np.ndarray] = {}
+        self._path_queues: Dict[Tuple[int, int], Tuple[List[Route], int, np.ndarray]] = {}
+
         # Threshold for reallocation (bytes)
         # C++ uses: threshold = (int)(timeAsSec(_scanPeriod) * HOST_NIC * 100)
         # Convert scan_period from ps to seconds, multiply by HOST_NIC bps * 100
         from .constants import HOST_NIC
         self.threshold = int((scan_period / 1e12) * HOST_NIC * 100)
-        
+
         # Start the periodic scanning
         if scan_period > 0:
-            self._eventlist.source_queue().insert_at_time(self, scan_period)
-            
+            self._eventlist.source_is_pending_rel(self, scan_period)
+
     def do_next_event(self):
         """
         Handle the next event - perform path reallocation scan
         """
         self.run()
-        
+
         # Schedule next scan
         if self._scan_period > 0:
-            self._eventlist.source_queue().insert_at_time(
-                self, 
-                self._eventlist.now() + self._scan_period
-            )
-            
+            self._eventlist.source_is_pending_rel(self, self._scan_period)
+
     def run(self):
         """
         Run the FirstFit allocation algorithm
-        
+
         This scans all flows and reallocates paths if needed
         based on current traffic patterns.
-        
+
         Matches C++ FirstFit::run() logic.
         """
-        # First pass: remove flows that are below threshold
-        for tcp_src, flow_entry in self.flow_counters.items():
-            # Get current byte count - C++ uses _last_acked
-            if hasattr(tcp_src, '_last_acked'):
-                current_counter = tcp_src._last_acked
-            elif hasattr(tcp_src, 'get_last_acked'):
-                current_counter = tcp_src.get_last_acked()
-            else:
-                current_counter = 0
-                
-            delta = current_counter - flow_entry.byte_counter
-            
-            # Remove allocation if flow is allocated and delta is below threshold
-            if flow_entry.allocated and delta < self.threshold:
-                # Remove from path allocations
-                flow_entry.allocated = 0
-                
-                if flow_entry.route:
-                    # C++ iterates route elements at positions 1,3,5... (queues)
-                    for i in range(1, len(flow_entry.route._sinklist), 2):
-                        element = flow_entry.route._sinklist[i]
-                        if isinstance(element, BaseQueue) and element in self.path_allocations:
-                            self.path_allocations[element] -= 1
-                            
-        # Second pass: allocate flows that are above threshold
-        for tcp_src, flow_entry in self.flow_counters.items():
-            # Get current byte count
-            if hasattr(tcp_src, '_last_acked'):
-                current_counter = tcp_src._last_acked
-            elif hasattr(tcp_src, 'get_last_acked'):
-                current_counter = tcp_src.get_last_acked()
-            else:
-                current_counter = 0
-                
-            delta = current_counter - flow_entry.byte_counter
-            flow_entry.byte_counter = current_counter
-            
-            # Speed up detection for negative deltas (C++ logic)
-            if delta < 0:
-                flow_entry.byte_counter = 0
-                delta = current_counter
-                
-            # Allocate if not allocated and delta is above threshold
-            if not flow_entry.allocated and delta > self.threshold:
-                best_route_idx = -1
-                best_cost = 10000000  # Match C++ initial value
-                
-                if (self.net_paths and 
-                    flow_entry.src < len(self.net_paths) and
-                    flow_entry.dest < len(self.net_paths[flow_entry.src])):
-                    
-                    paths = self.net_paths[flow_entry.src][flow_entry.dest]
-                    
-                    # Find path with minimum maximum queue allocation
-                    for p, route in enumerate(paths):
-                        current_cost = 0
-                        
-                        # Check queue allocations along the path
-                        # C++ checks positions 1,3,5... (queues)
-                        for i in range(1, len(route._sinklist), 2):
-                            element = route._sinklist[i]
-                            if isinstance(element, BaseQueue):
-                                queue_alloc = self.path_allocations.get(element, 0)
-                                if queue_alloc > current_cost:
-                                    current_cost = queue_alloc
-                                    
-                        if current_cost < best_cost:
-                            best_cost = current_cost
-                            best_route_idx = p
-                            
-                    if best_route_idx >= 0:
-                        # Set allocated flag
-                        flow_entry.allocated = 1
-                        
-                        # Create new route (C++ copies and adds sink)
-                        new_route = paths[best_route_idx]
-                        
-                        # Update TCP source route
-                        if hasattr(tcp_src, 'replace_route'):
-                            tcp_src.replace_route(new_route)
-                        elif hasattr(tcp_src, 'update_route'):
-                            tcp_src.update_route(new_route)
-                            
-                        flow_entry.route = new_route
-                        
-                        # Update path allocations
-                        for i in range(1, len(new_route._sinklist), 2):
-                            element = new_route._sinklist[i]
-                            if isinstance(element, BaseQueue):
-                                if element not in self.path_allocations:
-                                    self.path_allocations[element] = 0
-                                self.path_allocations[element] += 1
-                            
+        if not self._flows:
+            return
+        current = self._current_bytes()
+        byte_counter = self._counters.column("byte_counter")
+        allocated = self._counters.column("allocated")
+        delta = current - byte_counter
+
+        # First pass: remove allocated flows that are below threshold
+        for i in np.flatnonzero((allocated != 0) & (delta < self.threshold)).tolist():
+            allocated[i] = 0
+            route = self._entries[i].route
+            if route is not None:
+                np.subtract.at(self._loads, self._route_queue_ids(route), 1)
+
+        # Speed up detection for negative deltas (C++ logic)
+        negative = delta < 0
+        delta = np.where(negative, current, delta)
+        byte_counter[:] = np.where(negative, 0, current)
+
+        # Second pass: allocate flows that are above threshold, in flow order
+        # (each allocation changes the queue counts seen by the next flow)
+        for i in np.flatnonzero((allocated == 0) & (delta > self.threshold)).tolist():
+            self._allocate(self._flows[i], self._entries[i])
+
+    def _current_bytes(self) -> np.ndarray:
+        """Current _last_acked of every flow, in registration order"""
+        if self._flow_rows is None:
+            table = shared_flow_table(self._flows)
+            self._flow_rows = table.rows(self._flows) if table is not None else False
+        if self._flow_rows is False:
+            return np.fromiter((getattr(src, '_last_acked', 0) for src in self._flows),
+                               dtype=np.int64, count=len(self._flows))
+        return self._flows[0]._flow_table.column("last_acked")[self._flow_rows]
+
+    def _allocate(self, tcp_src: TcpSrc, flow_entry: FlowEntry) -> None:
+        """Move a flow onto the path whose most loaded queue is least loaded"""
+        if not (self.net_paths and
+                flow_entry.src < len(self.net_paths) and
+                flow_entry.dest < len(self.net_paths[flow_entry.src])):
+            return
+        paths = self.net_paths[flow_entry.src][flow_entry.dest]
+        if not paths:
+            return
+
+        # Cost of a path is the largest allocation count of its queues;
+        # argmin picks the first cheapest path like the C++ strict '<'
+        costs = self._loads[self._path_queue_ids(flow_entry.src, flow_entry.dest, paths)].max(axis=1)
+        best_route_idx = int(np.argmin(costs))
+        if costs[best_route_idx] >= MAX_PATH_COST:
+            return
+
+        # Set allocated flag
+        flow_entry.allocated = 1
+
+        # Create new route (C++ copies and adds sink)
+        new_route = paths[best_route_idx]
+
+        # Update TCP source route
+        if hasattr(tcp_src, 'replace_route'):
+            tcp_src.replace_route(new_route)
+        elif hasattr(tcp_src, 'update_route'):
+            tcp_src.update_route(new_route)
+
+        flow_entry.route = new_route
+
+        # Update path allocations
+        np.add.at(self._loads, self._route_queue_ids(new_route), 1)
+
+    def _queue_id(self, queue: BaseQueue) -> int:
+        queue_id = self._queue_ids.get(queue)
+        if queue_id is None:
+            queue_id = len(self._queue_ids) + 1
+            self._queue_ids[queue] = queue_id
+            if queue_id == len(self._loads):
+                self._loads = np.concatenate([self._loads, np.zeros(len(self._loads), dtype=np.int64)])
+        return queue_id
+
+    def _route_queue_ids(self, route: Route) -> np.ndarray:
+        """Ids of the queues of a route (C++ checks positions 1,3,5...)"""
+        ids = self._route_queues.get(route)
+        if ids is None:
+            ids = np.array([self._queue_id(element) for element in route._sinklist[1::2]
+                            if isinstance(element, BaseQueue)], dtype=np.int64)
+            self._route_queues[route] = ids
+        return ids
+
+    def _path_queue_ids(self, src: int, dest: int, paths: List[Route]) -> np.ndarray:
+        """Queue ids of every path between src and dest, padded with id 0"""
+        cached = self._path_queues.get((src, dest))
+        if cached is not None and cached[0] is paths and cached[1] == len(paths):
+            return cached[2]
+        rows = [self._route_queue_ids(route) for route in paths]
+        matrix = np.zeros((len(rows), max(1, max(len(r) for r in rows))), dtype=np.int64)
+        for p, ids in enumerate(rows):
+            matrix[p, :len(ids)] = ids
+        self._path_queues[(src, dest)] = (paths, len(paths), matrix)
+        return matrix
+
     def add_flow(self, src: int, dest: int, flow: TcpSrc):
         """
         Add a flow to be managed by FirstFit
-        
+
         Args:
             src: Source host ID
             dest: Destination host ID
@@ -195,7 +228,7 @@ class FirstFit(EventSource):
             route = flow.get_route()
         else:
             route = None
-            
+
         # Create flow entry matching C++ constructor
         flow_entry = FlowEntry(
             byte_counter=0,
@@ -204,33 +237,47 @@ class FirstFit(EventSource):
             dest=dest,
             route=route
         )
-        
+
+        old_entry = self.flow_counters.get(flow)
+        if old_entry is not None:
+            row = old_entry._counter_row
+            self._counters.add(flow_entry, row)
+            self._entries[row] = flow_entry
+        else:
+            self._counters.add(flow_entry)
+            self._flows.append(flow)
+            self._entries.append(flow_entry)
+            self._flow_rows = None
         self.flow_counters[flow] = flow_entry
-        
+
     def add_queue(self, queue: BaseQueue):
         """
         Add a queue to track allocations
-        
+
         Args:
             queue: Queue to track
         """
-        if queue not in self.path_allocations:
-            self.path_allocations[queue] = 0
-            
+        self._queue_id(queue)
+
+    @property
+    def path_allocations(self) -> Dict[BaseQueue, int]:
+        """Number of allocated flows per tracked queue"""
+        return {queue: int(self._loads[queue_id]) for queue, queue_id in self._queue_ids.items()}
+
     def get_path_allocations(self) -> Dict[BaseQueue, int]:
         """
         Get current path allocations
-        
+
         Returns:
             Dictionary of queue to allocated bytes
         """
-        return self.path_allocations.copy()
-        
+        return self.path_allocations
+
     def set_threshold(self, threshold: int):
         """
         Set the threshold for flow reallocation
-        
+
         Args:
             threshold: Threshold in bytes
         """
-        self.threshold = threshold
\ No newline at end of file
+        self.threshold = threshold
@@ -0,0 +1,128 @@
+"""
+Incremental per-flow counters for the periodic datacenter scanners
+
+FirstFit and SubflowControl compare every flow's progress against a
+threshold once per scan period.  FlowCounters keeps their per-flow
+fields (byte counter at the last scan, allocation flag, subflow count)
+in NumPy columns indexed by registration order, so a scan is one
+vectorized comparison and Python code only runs for the flows that
+cross the threshold.
+
+Entry objects (FlowEntry, MultipathFlowEntry) stay the public view of a
+flow: their CounterField attributes read and write the flow's row once
+the entry has been added to a FlowCounters.
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from ..protocols.flow_state import FlowStateTable
+
+
+class CounterField:
+    """
+    Entry attribute stored in a FlowCounters column
+
+    Before the entry is added to a FlowCounters the value lives in the
+    instance dictionary; afterwards it is read from and written to the
+    entry's row of the column with the same name.
+    """
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        counters = obj.__dict__.get("_counters")
+        if counters is None:
+            return obj.__dict__[self.name]
+        return counters._columns[self.name].item(obj._counter_row)
+
+    def __set__(self, obj, value) -> None:
+        counters = obj.__dict__.get("_counters")
+        if counters is None:
+            obj.__dict__[self.name] = value
+        else:
+            counters._columns[self.name][obj._counter_row] = value
+
+
+class FlowCounters:
+    """
+    Growable NumPy columns with one row per registered flow
+
+    Rows are allocated in registration order and never reused, so row
+    order matches the insertion order of the scanner's flow dictionary.
+    """
+
+    def __init__(self, columns: Dict[str, type], capacity: int = 64):
+        """
+        Args:
+            columns: Column name -> NumPy dtype.  Columns named after a
+                CounterField of the entry class are bound to that field.
+            capacity: Initial number of rows
+        """
+        self._capacity = max(1, capacity)
+        self._size = 0
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(self._capacity, dtype=dtype) for name, dtype in columns.items()
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, entry, row: Optional[int] = None) -> int:
+        """
+        Allocate a row for an entry and bind its CounterField attributes
+
+        Args:
+            entry: Flow entry; current field values are copied into the row
+            row: Existing row to reuse (the flow was registered again)
+
+        Returns:
+            Row index of the entry
+        """
+        if row is None:
+            if self._size == self._capacity:
+                self._capacity *= 2
+                for name, col in self._columns.items():
+                    grown = np.zeros(self._capacity, dtype=col.dtype)
+                    grown[:self._size] = col[:self._size]
+                    self._columns[name] = grown
+            row = self._size
+            self._size += 1
+        for name, col in self._columns.items():
+            if isinstance(getattr(type(entry), name, None), CounterField):
+                col[row] = entry.__dict__.pop(name)
+        entry._counters = self
+        entry._counter_row = row
+        return row
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        View of a column over the allocated rows
+
+        The view is invalidated when the table grows; do not keep it
+        across add() calls.
+        """
+        return self._columns[name][:self._size]
+
+
+def shared_flow_table(srcs: Iterable) -> Optional[FlowStateTable]:
+    """
+    Return the FlowStateTable shared by every source, or None
+
+    Args:
+        srcs: TcpSrc / MultipathTcpSrc instances
+
+    Returns:
+        The common table if all sources are attached to the same one
+    """
+    table = None
+    for src in srcs:
+        src_table = getattr(src, "_flow_table", None)
+        if src_table is None or (table is not None and src_table is not table):
+            return None
+        table = src_table
+    return table
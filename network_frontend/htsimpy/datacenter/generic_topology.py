@@ -5,6 +5,7 @@ Corresponds to generic_topology.h/cpp in HTSim C++ implementation
 Loads arbitrary topologies from configuration files.
 """
 
+import gc
 import re
 from typing import List, Optional, Dict, TextIO
 from ..core.route import Route
@@ -17,6 +18,10 @@ from ..core.switch import Switch
 from .topology import Topology
 from .host import Host
 from .constants import QueueType, PACKET_SIZE
+from .compiled_topology import (
+    CompiledTopology, TopologyCompiler, file_fingerprint, topology_cache_enabled,
+    KIND_HOST, KIND_SWITCH, KIND_QUEUE, QUEUE_RANDOM, QUEUE_BASIC,
+)
 
 
 class GenericTopology(Topology):
@@ -25,19 +30,24 @@ class GenericTopology(Topology):
     
     Supports loading arbitrary network topologies defined in text files.
     Format supports hosts, switches, queues, and pipes with flexible connectivity.
+    Parsed files are cached in compiled form (see compiled_topology).
     """
     
-    def __init__(self, logfile: Logfile, eventlist: EventList):
+    def __init__(self, logfile: Logfile, eventlist: EventList, use_cache: Optional[bool] = None):
         """
         Initialize generic topology
         
         Args:
             logfile: Logfile for logging
             eventlist: Event list
+            use_cache: Read and write compiled topology files next to the
+                text files; None follows AS_HTSIM_TOPOLOGY_CACHE (default on)
         """
         super().__init__()
         self._logfile = logfile
         self._eventlist = eventlist
+        self._use_cache = topology_cache_enabled() if use_cache is None else use_cache
+        self._unit_cache: Dict[tuple, int] = {}
         
         # Network components
         self._hosts: List[Host] = []
@@ -63,6 +73,12 @@ class GenericTopology(Topology):
         """
         Load topology from configuration file
         
+        Text files are compiled into a CompiledTopology (one text pass,
+        routes resolved once all objects are known) and the objects are
+        built from it.  The compiled form is written next to the text
+        file and memory-mapped on later loads of the unchanged file.
+        A compiled file can also be passed directly.
+        
         Args:
             filename: Path to topology file
             
@@ -70,29 +86,47 @@ class GenericTopology(Topology):
             True if successful, False otherwise
         """
         try:
-            # Two-pass loading like C++ implementation
-            # Pass 1: Create all objects
-            with open(filename, 'r') as f:
-                if not self._load_pass(f, 1):
+            if CompiledTopology.is_compiled(filename):
+                compiled = CompiledTopology.load(filename)
+                if compiled is None:
+                    print(f"Error loading topology: unsupported compiled file {filename}")
                     return False
-                    
-            # Pass 2: Connect objects
+                self._build(compiled)
+                return True
+
+            source_size = source_hash = None
+            if self._use_cache:
+                source_size, source_hash = file_fingerprint(filename)
+                compiled = CompiledTopology.load(CompiledTopology.cache_path(filename),
+                                                 source_size, source_hash)
+                if compiled is not None:
+                    self._build(compiled)
+                    return True
+
             with open(filename, 'r') as f:
-                if not self._load_pass(f, 2):
-                    return False
-                    
+                compiled = self._compile(f)
+            if compiled is None:
+                return False
+            if self._use_cache:
+                compiled.save(CompiledTopology.cache_path(filename), source_size, source_hash)
+            self._build(compiled)
             return True
         except Exception as e:
             print(f"Error loading topology: {e}")
             return False
             
-    def _load_pass(self, f: TextIO, pass_num: int) -> bool:
+    def _compile(self, f: TextIO) -> Optional[CompiledTopology]:
         """
-        Load topology in a specific pass
+        Parse a topology text file into a CompiledTopology
         
-        Pass 1: Create objects
-        Pass 2: Connect objects
+        Objects are recorded in one pass; routes are kept with their line
+        numbers and resolved at the end, since they may name objects
+        defined further down.  Unit strings repeat across lines, so each
+        distinct one is parsed once.
         """
+        compiler = TopologyCompiler()
+        routes = []
+        self._unit_cache = {}
         line_num = 0
         
         for line in f:
@@ -112,177 +146,160 @@ class GenericTopology(Topology):
             
             try:
                 if keyword == 'host':
-                    self._parse_host(tokens, pass_num)
+                    self._parse_host(tokens, compiler)
                 elif keyword == 'switch':
-                    self._parse_switch(tokens, pass_num)
+                    self._parse_switch(tokens, compiler)
                 elif keyword == 'queue':
-                    self._parse_queue(tokens, pass_num)
+                    self._parse_queue(tokens, compiler)
                 elif keyword == 'pipe':
-                    self._parse_pipe(tokens, pass_num)
+                    self._parse_pipe(tokens, compiler)
                 elif keyword == 'route':
-                    if pass_num == 2:
-                        self._parse_route(tokens)
+                    if len(tokens) < 4:
+                        raise ValueError("Route requires source, destination, and path elements")
+                    routes.append((line_num, tokens))
                 else:
                     print(f"Unknown keyword '{keyword}' at line {line_num}")
                     
             except Exception as e:
                 print(f"Error parsing line {line_num}: {e}")
-                return False
+                return None
                 
-        return True
+        for line_num, tokens in routes:
+            try:
+                compiler.add_route(tokens[1], tokens[2], tokens[3:])
+            except Exception as e:
+                print(f"Error parsing line {line_num}: {e}")
+                return None
+                
+        return compiler.compile()
         
-    def _parse_host(self, tokens: List[str], pass_num: int):
-        """Parse host definition"""
-        if pass_num != 1:
-            return
+    def _build(self, compiled: CompiledTopology):
+        """
+        Create the objects and routes of a compiled topology in one pass
+        
+        Everything created here stays referenced by the topology, so the
+        cyclic garbage collector is paused instead of repeatedly scanning
+        the growing object graph.
+        
+        Args:
+            compiled: Topology compiled from text or memory-mapped from disk
+        """
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._build_objects(compiled)
+        finally:
+            if gc_enabled:
+                gc.enable()
+                
+    def _build_objects(self, compiled: CompiledTopology):
+        """Construct hosts, switches, queues, pipes and routes in definition order"""
+        columns = compiled.columns
+        names = compiled.names
+        objects = []
+        
+        for kind, name_id, bitrate, maxsize, delay, queue_type in zip(
+                columns["kind"].tolist(), columns["name_id"].tolist(),
+                columns["bitrate"].tolist(), columns["maxsize"].tolist(),
+                columns["delay"].tolist(), columns["queue_type"].tolist()):
+            name = names[name_id]
+            if kind == KIND_HOST:
+                obj = Host(name)
+                obj.set_host_id(self._no_of_hosts)
+                self._hosts.append(obj)
+                self._host_map[name] = obj
+                self._no_of_hosts += 1
+            elif kind == KIND_SWITCH:
+                obj = Switch(name, self._eventlist)
+                self._switches.append(obj)
+                self._switch_map[name] = obj
+                self._no_of_switches += 1
+            elif kind == KIND_QUEUE:
+                queue_class = RandomQueue if queue_type == QUEUE_RANDOM else Queue
+                obj = queue_class(
+                    bitrate=bitrate,
+                    maxsize=maxsize,
+                    eventlist=self._eventlist,
+                    logger=None
+                )
+                obj.setName(name)
+                self._queues.append(obj)
+                self._queue_map[name] = obj
+            else:
+                obj = Pipe(delay, self._eventlist)
+                obj.setName(name)
+                self._pipes.append(obj)
+                self._pipe_map[name] = obj
+            objects.append(obj)
             
+            if self._logfile:
+                self._logfile.write_name(obj)
+                
+        offsets = columns["route_offsets"].tolist()
+        hops = list(map(objects.__getitem__, columns["route_hops"].tolist()))
+        hop_counts = compiled.route_hop_counts().tolist()
+        hosts = self._hosts
+        routes = self._routes
+        for r, (src, dst) in enumerate(zip(columns["route_src"].tolist(),
+                                            columns["route_dst"].tolist())):
+            route = Route.from_hops([hosts[src], *hops[offsets[r]:offsets[r + 1]], hosts[dst]],
+                                    hop_counts[r])
+            
+            # Store route
+            key = (src, dst)
+            if key not in routes:
+                routes[key] = []
+            routes[key].append(route)
+            
+    def _parse_host(self, tokens: List[str], compiler: TopologyCompiler):
+        """Parse host definition"""
         if len(tokens) < 2:
             raise ValueError("Host requires name")
             
-        name = tokens[1]
-        
-        # Create host
-        host = Host(name)
-        host.set_host_id(self._no_of_hosts)
-        
-        self._hosts.append(host)
-        self._host_map[name] = host
-        self._no_of_hosts += 1
-        
-        if self._logfile:
-            self._logfile.write_name(host)
+        compiler.add_host(tokens[1])
             
-    def _parse_switch(self, tokens: List[str], pass_num: int):
+    def _parse_switch(self, tokens: List[str], compiler: TopologyCompiler):
         """Parse switch definition"""
-        if pass_num != 1:
-            return
-            
         if len(tokens) < 2:
             raise ValueError("Switch requires name")
             
-        name = tokens[1]
-        
-        # Create switch
-        switch = Switch(name, self._eventlist)
-        
-        self._switches.append(switch)
-        self._switch_map[name] = switch
-        self._no_of_switches += 1
-        
-        if self._logfile:
-            self._logfile.write_name(switch)
+        compiler.add_switch(tokens[1])
             
-    def _parse_queue(self, tokens: List[str], pass_num: int):
+    def _parse_queue(self, tokens: List[str], compiler: TopologyCompiler):
         """
         Parse queue definition
         Format: queue <name> <bitrate> <size> [type]
         """
-        if pass_num != 1:
-            return
-            
         if len(tokens) < 4:
             raise ValueError("Queue requires name, bitrate, and size")
             
-        name = tokens[1]
-        bitrate = self._parse_bitrate(tokens[2])
-        size = self._parse_size(tokens[3])
+        bitrate = self._parse_unit(self._parse_bitrate, tokens[2])
+        size = self._parse_unit(self._parse_size, tokens[3])
         
-        # Optional queue type
+        # Optional queue type; anything but "random" is a basic queue
         qtype = tokens[4] if len(tokens) > 4 else "random"
+        queue_type = QUEUE_RANDOM if qtype.lower() == "random" else QUEUE_BASIC
         
-        # Create queue based on type
-        if qtype.lower() == "random":
-            queue = RandomQueue(
-                bitrate=bitrate,
-                maxsize=size,
-                eventlist=self._eventlist,
-                logger=None
-            )
-        else:
-            # Default to basic queue
-            queue = Queue(
-                bitrate=bitrate,
-                maxsize=size,
-                eventlist=self._eventlist,
-                logger=None
-            )
-            
-        queue.setName(name)
-        
-        self._queues.append(queue)
-        self._queue_map[name] = queue
-        
-        if self._logfile:
-            self._logfile.write_name(queue)
+        compiler.add_queue(tokens[1], bitrate, size, queue_type)
             
-    def _parse_pipe(self, tokens: List[str], pass_num: int):
+    def _parse_pipe(self, tokens: List[str], compiler: TopologyCompiler):
         """
         Parse pipe definition
         Format: pipe <name> <delay>
         """
-        if pass_num != 1:
-            return
-            
         if len(tokens) < 3:
             raise ValueError("Pipe requires name and delay")
             
-        name = tokens[1]
-        delay = self._parse_time(tokens[2])
-        
-        # Create pipe
-        pipe = Pipe(delay, self._eventlist)
-        pipe.setName(name)
-        
-        self._pipes.append(pipe)
-        self._pipe_map[name] = pipe
-        
-        if self._logfile:
-            self._logfile.write_name(pipe)
+        compiler.add_pipe(tokens[1], self._parse_unit(self._parse_time, tokens[2]))
+        
+    def _parse_unit(self, parse, s: str) -> int:
+        """Parse a unit string with parse, once per distinct string and parser"""
+        key = (parse.__name__, s)
+        value = self._unit_cache.get(key)
+        if value is None:
+            value = self._unit_cache[key] = parse(s)
+        return value
             
-    def _parse_route(self, tokens: List[str]):
-        """
-        Parse route definition
-        Format: route <src_host> <dst_host> <element1> <element2> ...
-        """
-        if len(tokens) < 4:
-            raise ValueError("Route requires source, destination, and path elements")
-            
-        src_name = tokens[1]
-        dst_name = tokens[2]
-        
-        # Find source and destination hosts
-        src_host = self._find_host(src_name)
-        dst_host = self._find_host(dst_name)
-        
-        if not src_host or not dst_host:
-            raise ValueError(f"Invalid hosts in route: {src_name}, {dst_name}")
-            
-        # Build route
-        route = Route()
-        route.push_back(src_host)
-        
-        # Add path elements
-        for i in range(3, len(tokens)):
-            element_name = tokens[i]
-            
-            # Try to find element in queues, pipes, switches
-            element = (self._find_queue(element_name) or
-                      self._find_pipe(element_name) or
-                      self._find_switch(element_name))
-                      
-            if not element:
-                raise ValueError(f"Unknown element in route: {element_name}")
-                
-            route.push_back(element)
-            
-        route.push_back(dst_host)
-        
-        # Store route
-        key = (src_host.get_host_id(), dst_host.get_host_id())
-        if key not in self._routes:
-            self._routes[key] = []
-        self._routes[key].append(route)
-        
     def _find_host(self, name: str) -> Optional[Host]:
         """Find host by name"""
         return self._host_map.get(name)
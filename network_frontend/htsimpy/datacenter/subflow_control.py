@@ -7,9 +7,13 @@ Dynamically manages MPTCP subflows based on network conditions.
 
 import random
 from typing import Dict, List, Optional, Set, TYPE_CHECKING
+
+import numpy as np
+
 from ..core.eventlist import EventSource, EventList
 from ..core.route import Route
 from ..core.logger.logfile import Logfile
+from .flow_counters import CounterField, FlowCounters, shared_flow_table
 
 if TYPE_CHECKING:
     from ..protocols.multipath_tcp import MultipathTcpSrc
@@ -21,6 +25,8 @@ class MultipathFlowEntry:
     Tracks information about a multipath flow
     """
     
+    byte_counter = CounterField()
+    
     def __init__(self, byte_counter: int, src: int, dest: int):
         """
         Initialize flow entry
@@ -52,6 +58,12 @@ class SubflowControl(EventSource):
     - Adds subflows when throughput is below threshold
     - Ensures path diversity (no duplicate paths)
     - Supports fat-tree specific path selection
+    
+    Byte counters, subflow counts and path counts are NumPy columns (one
+    row per flow).  When every flow is backed by the same FlowStateTable
+    the total bytes of all connections come from one vectorized group sum,
+    and each scan only runs Python code for the flows below the threshold
+    that can still take a subflow.
     """
     
     def __init__(self,
@@ -84,6 +96,14 @@ class SubflowControl(EventSource):
         
         # Flow tracking
         self._flow_counters: Dict['MultipathTcpSrc', MultipathFlowEntry] = {}
+        self._flows: List['MultipathTcpSrc'] = []
+        self._entries: List[MultipathFlowEntry] = []
+        # Path count 0 means net_paths had no entry yet and is re-read
+        self._counters = FlowCounters({"byte_counter": np.int64, "subflows": np.int64,
+                                       "paths": np.int64})
+        # Groups of the flows in their shared FlowStateTable; None when stale,
+        # False when the flows do not share one
+        self._flow_groups = None
         
         # Calculate throughput threshold
         # If flow achieves less than this in scan period, add subflow
@@ -98,12 +118,12 @@ class SubflowControl(EventSource):
         self._total_scans = 0
         
         # Schedule first scan
-        self.eventlist.sourceIsPendingRel(self, self._scan_period)
+        self._eventlist.source_is_pending_rel(self, self._scan_period)
         
-    def doNextEvent(self):
+    def do_next_event(self):
         """Handle next event - run periodic scan"""
         self.run()
-        self.eventlist.sourceIsPendingRel(self, self._scan_period)
+        self._eventlist.source_is_pending_rel(self, self._scan_period)
         
     def add_flow(self, src: int, dest: int, flow: 'MultipathTcpSrc'):
         """
@@ -114,7 +134,19 @@ class SubflowControl(EventSource):
             dest: Destination node ID
             flow: MPTCP source to monitor
         """
-        self._flow_counters[flow] = MultipathFlowEntry(0, src, dest)
+        entry = MultipathFlowEntry(0, src, dest)
+        old_entry = self._flow_counters.get(flow)
+        if old_entry is not None:
+            row = self._counters.add(entry, old_entry._counter_row)
+            self._entries[row] = entry
+        else:
+            row = self._counters.add(entry)
+            self._flows.append(flow)
+            self._entries.append(entry)
+            self._flow_groups = None
+        self._flow_counters[flow] = entry
+        self._counters.column("subflows")[row] = 0
+        self._counters.column("paths")[row] = self._path_count(entry)
         
     def add_subflow(self, flow: 'MultipathTcpSrc', choice: int, 
                    structure: int = -1):
@@ -131,6 +163,7 @@ class SubflowControl(EventSource):
             
         entry = self._flow_counters[flow]
         entry.subflows.append(choice)
+        self._counters.column("subflows")[entry._counter_row] = len(entry.subflows)
         
         if structure != -1:
             entry.structure.append(structure)
@@ -138,25 +171,46 @@ class SubflowControl(EventSource):
     def run(self):
         """Run periodic scan of all flows"""
         self._total_scans += 1
+        if not self._flows:
+            return
         
-        for mtcp, entry in self._flow_counters.items():
-            # Get current byte count
-            current_counter = mtcp.compute_total_bytes()
-            delta = current_counter - entry.byte_counter
-            
-            # Check if this is not the first measurement
-            counts = entry.byte_counter != 0
-            
-            # Update counter
-            entry.byte_counter = current_counter
-            
-            # Check if we should add a subflow
-            if (counts and 
-                delta < self._threshold and
-                len(entry.subflows) < self._max_subflows and
-                len(entry.subflows) < len(self._net_paths.get(entry.src, {}).get(entry.dest, []))):
-                
-                self._add_new_subflow(mtcp, entry)
+        # Get current byte counts
+        current = self._current_bytes()
+        byte_counter = self._counters.column("byte_counter")
+        subflows = self._counters.column("subflows")
+        paths = self._counters.column("paths")
+        delta = current - byte_counter
+        
+        # Not the first measurement, below threshold, and room for a subflow
+        candidates = ((byte_counter != 0) & (delta < self._threshold) &
+                      (subflows < self._max_subflows) & ((subflows < paths) | (paths == 0)))
+        
+        # Update counters
+        byte_counter[:] = current
+        
+        for i in np.flatnonzero(candidates).tolist():
+            entry = self._entries[i]
+            if paths[i] == 0:
+                paths[i] = self._path_count(entry)
+                if subflows[i] >= paths[i]:
+                    continue
+            self._add_new_subflow(self._flows[i], entry)
+    
+    def _current_bytes(self) -> np.ndarray:
+        """Total bytes of every flow (compute_total_bytes), in registration order"""
+        if self._flow_groups is None:
+            table = shared_flow_table(self._flows)
+            groups = None
+            if table is not None:
+                groups = np.array([mtcp.flow_group() for mtcp in self._flows], dtype=np.int64)
+            self._flow_groups = groups if groups is not None and (groups >= 0).all() else False
+        if self._flow_groups is False:
+            return np.fromiter((mtcp.compute_total_bytes() for mtcp in self._flows),
+                               dtype=np.int64, count=len(self._flows))
+        return self._flows[0]._flow_table.group_total_bytes()[self._flow_groups]
+    
+    def _path_count(self, entry: MultipathFlowEntry) -> int:
+        return len(self._net_paths.get(entry.src, {}).get(entry.dest, []))
                 
     def _add_new_subflow(self, mtcp: 'MultipathTcpSrc', 
                         entry: MultipathFlowEntry):
@@ -187,10 +241,11 @@ class SubflowControl(EventSource):
         # Record the choice
         entry.subflows.append(choice)
         entry.active_subflows.append(tcp_src)
+        self._counters.column("subflows")[entry._counter_row] = len(entry.subflows)
         
         # Create routes
         route_out = Route()
-        for element in paths[choice]._elements:
+        for element in paths[choice]:
             route_out.push_back(element)
         route_out.push_back(tcp_snk)
         
@@ -198,18 +253,18 @@ class SubflowControl(EventSource):
         route_in.push_back(tcp_src)
         
         # Add random start delay
-        extra_start_time = self.eventlist.now() + self._scan_period + \
+        extra_start_time = self._eventlist.now() + self._scan_period + \
                           int(random.random() * self._scan_period / 1000)
         
         # Join multipath connection
-        mtcp.add_subflow(tcp_src)
+        mtcp.addSubflow(tcp_src)
         tcp_src.connect(route_out, route_in, tcp_snk, extra_start_time)
         
         self._total_subflows_added += 1
         
         print(f"Added subflow {len(entry.subflows)} between "
               f"{entry.src} and {entry.dest} at "
-              f"{self.eventlist.now() / 1e9:.3f} ms")
+              f"{self._eventlist.now() / 1e9:.3f} ms")
               
     def _find_unused_path(self, entry: MultipathFlowEntry, 
                          num_paths: int) -> Optional[int]:
@@ -4,11 +4,73 @@ Base topology class for data center networks
 Corresponds to topology.h in HTSim C++ implementation
 """
 
+import os
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
-from ..core.route import Route
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+from ..core.route import Route, InternedRoute, RouteInterner
 from ..core.logger.logfile import Logfile
 
+# Environment variable overriding the path template cache capacity
+PATH_CACHE_ENV = "AS_HTSIM_PATH_CACHE"
+DEFAULT_PATH_CACHE_SIZE = 1 << 16
+
+
+class PathTemplateCache:
+    """
+    Bounded LRU of path templates keyed by an arithmetic pattern
+
+    Topologies whose paths are fully determined by a small key (ToR pair,
+    differing address digits, torus offset) build the hop sequence for a key
+    once and instantiate fresh Routes from it on every request. Least
+    recently used templates are dropped once the capacity is reached.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Args:
+            capacity: Maximum number of templates kept; defaults to
+                AS_HTSIM_PATH_CACHE or DEFAULT_PATH_CACHE_SIZE. 0 disables caching.
+        """
+        if capacity is None:
+            capacity = int(os.environ.get(PATH_CACHE_ENV, DEFAULT_PATH_CACHE_SIZE))
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+
+    def get(self, key: Hashable, build: Callable[..., Any], *args) -> Any:
+        """
+        Template for key, built with build(*args) on a miss
+
+        Args:
+            key: Pattern the template depends on
+            build: Template constructor, only called on a miss
+            *args: Arguments passed to build
+
+        Returns:
+            The cached or newly built template
+        """
+        entries = self._entries
+        template = entries.get(key)
+        if template is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return template
+        self.misses += 1
+        template = build(*args)
+        if self.capacity > 0:
+            entries[key] = template
+            if len(entries) > self.capacity:
+                entries.popitem(last=False)
+        return template
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class Topology(ABC):
     """
@@ -48,6 +110,56 @@ class Topology(ABC):
         """
         pass
     
+    def route_table(self) -> RouteInterner:
+        """
+        Route interning table shared by everything built on this topology
+
+        Returns:
+            The topology's RouteInterner, created on first use
+        """
+        table = getattr(self, "_route_table", None)
+        if table is None:
+            table = self._route_table = RouteInterner()
+        return table
+
+    def path_templates(self) -> PathTemplateCache:
+        """
+        Path template cache of this topology
+
+        Returns:
+            The topology's PathTemplateCache, created on first use
+        """
+        cache = getattr(self, "_path_templates", None)
+        if cache is None:
+            cache = self._path_templates = PathTemplateCache()
+        return cache
+
+    def get_shared_paths(self, src: int, dest: int, reverse: bool = True) -> List[InternedRoute]:
+        """
+        Interned version of get_bidir_paths, cached per (src, dest, reverse)
+
+        Every flow between the same pair gets the same immutable Route
+        objects (reverse routes included); append the flow's sink with
+        with_destination() instead of copying the hops.
+
+        Args:
+            src: Source node ID
+            dest: Destination node ID
+            reverse: Whether to attach the reverse path (dest to src)
+
+        Returns:
+            List of shared routes
+        """
+        cache = getattr(self, "_shared_paths", None)
+        if cache is None:
+            cache = self._shared_paths = {}
+        paths = cache.get((src, dest, reverse))
+        if paths is None:
+            table = self.route_table()
+            paths = [table.intern_route(route) for route in self.get_bidir_paths(src, dest, reverse)]
+            cache[(src, dest, reverse)] = paths
+        return paths
+
     @abstractmethod
     def get_neighbours(self, src: int) -> Optional[List[int]]:
         """
@@ -5,13 +5,13 @@ Corresponds to vl2_topology.h/cpp in HTSim C++ implementation
 Implements the VL2 architecture from Microsoft Research.
 """
 
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from ..core.route import Route
 from ..core.pipe import Pipe
 from ..core.eventlist import EventList
 from ..core.logger.logfile import Logfile
 from ..queues.random_queue import RandomQueue
-from ..queues.base_queue import BaseQueue
+from ..queues.base_queue import BaseQueue, Queue
 from .topology import Topology
 from .firstfit import FirstFit
 from .host import Host
@@ -106,6 +106,10 @@ class VL2Topology(Topology):
         # Hosts
         self.hosts: List[Host] = []
         
+        # Per-host path segments: (queue, pipe) up to the ToR and down from it
+        self._uplink_hops: List[Tuple] = []
+        self._downlink_hops: List[Tuple] = []
+        
         # Initialize the network
         self.init_network()
         
@@ -180,6 +184,11 @@ class VL2Topology(Topology):
                 self.pipes_ns_nt[s][t] = Pipe(self._rtt, self.eventlist)
                 self.queues_ns_nt[s][t] = self._create_queue(f"Queue-ns-nt-{s}-{t}")
                 
+        for host in range(self._no_of_nodes):
+            tor, server = self.HOST_TOR(host), self.HOST_TOR_ID(host)
+            self._uplink_hops.append((self.queues_ns_nt[server][tor], self.pipes_ns_nt[server][tor]))
+            self._downlink_hops.append((self.queues_nt_ns[tor][server], self.pipes_nt_ns[tor][server]))
+                
     def _create_queue(self, name: str, speed_multiplier: int = 1) -> RandomQueue:
         """Create a queue with standard parameters"""
         queue = RandomQueue(
@@ -187,7 +196,7 @@ class VL2Topology(Topology):
             maxsize=(SWITCH_BUFFER + RANDOM_BUFFER) * 1500 * 8,  # Convert packets to bits
             eventlist=self.eventlist,
             logger=None,
-            drop_threshold=RANDOM_BUFFER * 1500 * 8
+            drop=RANDOM_BUFFER * 1500 * 8
         )
         queue.setName(name)
         
@@ -211,94 +220,71 @@ class VL2Topology(Topology):
         """
         Get bidirectional paths between hosts in VL2
         
-        Matches C++ VL2Topology::get_paths implementation
+        Matches C++ VL2Topology::get_paths implementation. The switch hops
+        of the 4*NI paths depend only on the (src ToR, dest ToR) pair and are
+        cached per pair in the topology's PathTemplateCache; each call adds a
+        fresh feeder queue and the hosts' ToR links.
         """
         if reverse:
             src, dest = dest, src
             
-        paths = []
+        src_tor, dest_tor = self.HOST_TOR(src), self.HOST_TOR(dest)
+        segments = self.path_templates().get((src_tor, dest_tor), self._switch_template,
+                                             src_tor, dest_tor)
+        uplink = self._uplink_hops[src]
+        downlink = self._downlink_hops[dest]
+        # One pipe in each ToR link, four between ToRs
+        hop_count = 2 if src_tor == dest_tor else 6
         
-        # Special case: same ToR switch
-        if self.HOST_TOR(src) == self.HOST_TOR(dest):
+        paths = []
+        for segment in segments:
             # Create PQueue (feeder buffer) as in C++
-            from ..queues.base_queue import Queue
             pqueue = Queue(
-                service_rate=CORE_TO_HOST * HOST_NIC * 1000000,  # Convert to bps
-                max_size=FEEDER_BUFFER * 1500 * 8,
+                bitrate=CORE_TO_HOST * HOST_NIC * 1000000,  # Convert to bps
+                maxsize=FEEDER_BUFFER * 1500 * 8,
                 eventlist=self.eventlist,
                 logger=None
             )
             pqueue.setName(f"PQueue_{src}_{dest}")
+            paths.append(Route.from_hops((pqueue,) + uplink + segment + downlink, hop_count))
             
-            route = Route()
-            route.push_back(pqueue)
-            
-            # Server to ToR
-            route.push_back(self.queues_ns_nt[self.HOST_TOR_ID(src)][self.HOST_TOR(src)])
-            route.push_back(self.pipes_ns_nt[self.HOST_TOR_ID(src)][self.HOST_TOR(src)])
-            
-            # ToR to server
-            route.push_back(self.queues_nt_ns[self.HOST_TOR(dest)][self.HOST_TOR_ID(dest)])
-            route.push_back(self.pipes_nt_ns[self.HOST_TOR(dest)][self.HOST_TOR_ID(dest)])
-            
-            paths.append(route)
-            return paths
+        return paths
+        
+    def _switch_template(self, src_tor: int, dest_tor: int) -> Tuple[Tuple, ...]:
+        """
+        Hops between the ToR links of every path from src_tor to dest_tor
+
+        Returns:
+            One hop tuple per path: empty within a ToR, otherwise
+            ToR -> aggregation -> intermediate -> aggregation -> ToR
+        """
+        if src_tor == dest_tor:
+            # Special case: same ToR switch
+            return ((),)
             
-        # General case: different ToR switches
-        # C++ creates 4*NI paths
+        # General case: C++ creates 4*NI paths, i//4 selects the intermediate switch
+        segments = []
         for i in range(4 * self.NI):
-            # Create PQueue (feeder buffer) as in C++
-            from ..queues.base_queue import Queue
-            pqueue = Queue(
-                service_rate=CORE_TO_HOST * HOST_NIC * 1000000,  # Convert to bps
-                max_size=FEEDER_BUFFER * 1500 * 8,
-                eventlist=self.eventlist,
-                logger=None
-            )
-            pqueue.setName(f"PQueue_{src}_{dest}")
-            
-            route = Route()
-            route.push_back(pqueue)
-            
-            # Server to ToR switch
-            route.push_back(self.queues_ns_nt[self.HOST_TOR_ID(src)][self.HOST_TOR(src)])
-            route.push_back(self.pipes_ns_nt[self.HOST_TOR_ID(src)][self.HOST_TOR(src)])
-            
             # Choose aggregation switch for source
             if i < 2 * self.NI:
-                agg_switch = self.TOR_AGG1(self.HOST_TOR(src))
+                agg_switch = self.TOR_AGG1(src_tor)
             else:
-                agg_switch = self.TOR_AGG2(self.HOST_TOR(src))
+                agg_switch = self.TOR_AGG2(src_tor)
                 
-            # ToR to aggregation
-            route.push_back(self.queues_nt_na[self.HOST_TOR(src)][agg_switch])
-            route.push_back(self.pipes_nt_na[self.HOST_TOR(src)][agg_switch])
-            
-            # Aggregation to intermediate (i//4 selects the intermediate switch)
-            route.push_back(self.queues_na_ni[agg_switch][i // 4])
-            route.push_back(self.pipes_na_ni[agg_switch][i // 4])
-            
             # Choose aggregation switch for destination
             if i % NT2A == 0:
-                agg_switch_2 = self.TOR_AGG1(self.HOST_TOR(dest))
+                agg_switch_2 = self.TOR_AGG1(dest_tor)
             else:
-                agg_switch_2 = self.TOR_AGG2(self.HOST_TOR(dest))
+                agg_switch_2 = self.TOR_AGG2(dest_tor)
                 
-            # Intermediate to aggregation
-            route.push_back(self.queues_ni_na[i // 4][agg_switch_2])
-            route.push_back(self.pipes_ni_na[i // 4][agg_switch_2])
-            
-            # Aggregation to ToR
-            route.push_back(self.queues_na_nt[agg_switch_2][self.HOST_TOR(dest)])
-            route.push_back(self.pipes_na_nt[agg_switch_2][self.HOST_TOR(dest)])
-            
-            # ToR to server
-            route.push_back(self.queues_nt_ns[self.HOST_TOR(dest)][self.HOST_TOR_ID(dest)])
-            route.push_back(self.pipes_nt_ns[self.HOST_TOR(dest)][self.HOST_TOR_ID(dest)])
-            
-            paths.append(route)
-            
-        return paths
+            inter = i // 4
+            segments.append((
+                self.queues_nt_na[src_tor][agg_switch], self.pipes_nt_na[src_tor][agg_switch],
+                self.queues_na_ni[agg_switch][inter], self.pipes_na_ni[agg_switch][inter],
+                self.queues_ni_na[inter][agg_switch_2], self.pipes_ni_na[inter][agg_switch_2],
+                self.queues_na_nt[agg_switch_2][dest_tor], self.pipes_na_nt[agg_switch_2][dest_tor],
+            ))
+        return tuple(segments)
         
     def _build_vl2_route(self, src_host: int, dst_host: int,
                         src_tor: int, dst_tor: int,
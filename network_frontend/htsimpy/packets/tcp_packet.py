@@ -16,6 +16,7 @@ C++对应关系:
 
 from typing import Optional, List
 from ..core.network import PacketFlow, Route, Packet, PacketDB, PacketType, PacketPriority
+from ..core.checkpoint import register_static
 import sys
 
 # 对应 C++ 中的类型定义
@@ -297,4 +298,8 @@ class TcpAck(Packet):
             优先级（高优先级）
         """
         return PacketPriority.PRIO_HI
-    
+
+
+# 包池随仿真快照保存，恢复后在途包仍可归还到同一个池
+register_static(TcpPacket, "_packetdb")
+register_static(TcpAck, "_packetdb")
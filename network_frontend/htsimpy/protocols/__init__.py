@@ -12,9 +12,11 @@ the different protocol files in htsim:
 - hpcc.py: 对应 hpcc.h/cpp
 - strack.py: 对应 strack.h/cpp
 - dctcp.py: DCTCP实现 (基于tcp扩展)
+- flow_state.py: TCP/DCTCP/MPTCP 源端的列式状态表
 """
 
 from .base_protocol import BaseProtocol
+from .flow_state import FlowStateTable
 from .tcp import TcpSrc, TcpSink, TcpRtxTimerScanner
 from .multipath_tcp import (
     MultipathTcpSrc, MultipathTcpSink,
@@ -23,15 +25,16 @@ from .multipath_tcp import (
 from .dctcp import DCTCPSrc, DCTCPSink, ECN_ECHO
 from .ndp import (
     NdpSrc, NdpSink, NdpPacket, NdpAck, NdpNack, NdpPull,
-    NdpRTSPacer, RouteStrategy, FeedbackType
+    NdpRTSPacer, NdpPullPacer, RouteStrategy, FeedbackType
 )
 
 __all__ = [
     'BaseProtocol',
+    'FlowStateTable',
     'TcpSrc', 'TcpSink', 'TcpRtxTimerScanner',
     'MultipathTcpSrc', 'MultipathTcpSink',
     'UNCOUPLED', 'FULLY_COUPLED', 'COUPLED_INC', 'COUPLED_TCP', 'COUPLED_EPSILON',
     'DCTCPSrc', 'DCTCPSink', 'ECN_ECHO',
     'NdpSrc', 'NdpSink', 'NdpPacket', 'NdpAck', 'NdpNack', 'NdpPull',
-    'NdpRTSPacer', 'RouteStrategy', 'FeedbackType',
+    'NdpRTSPacer', 'NdpPullPacer', 'RouteStrategy', 'FeedbackType',
 ]
\ No newline at end of file
@@ -20,7 +20,8 @@ C++对应关系:
 """
 
 from typing import Optional
-from .tcp import TcpSrc, TcpSink
+from .tcp import TcpSrc, TcpSink, RTX_GUARDED_HOOKS
+from .flow_state import FlowStateTable, TCP_COLUMNS, DCTCP_COLUMNS
 from ..core.network import Packet
 from ..core.eventlist import EventList
 from ..core.logger.tcp import TcpLogger
@@ -59,10 +60,13 @@ class DCTCPSrc(TcpSrc):
     };
     """
     
+    _flow_columns = TCP_COLUMNS + DCTCP_COLUMNS
+    
     def __init__(self, 
                  logger: Optional[TcpLogger] = None,
                  traffic_logger: Optional[TrafficLogger] = None,
-                 eventlist: Optional[EventList] = None):
+                 eventlist: Optional[EventList] = None,
+                 flow_table: Optional[FlowStateTable] = None):
         """
         初始化DCTCP源端 - 对应 C++ DCTCPSrc::DCTCPSrc()
         
@@ -80,15 +84,19 @@ class DCTCPSrc(TcpSrc):
             logger: TCP日志记录器
             traffic_logger: 流量日志记录器
             eventlist: 事件列表
+            flow_table: 可选的列式流状态表，默认不启用；逐包路径变慢，只在扫描和
+                聚合开销占主导时划算，见 TcpSrc
         """
         # 调用父类TcpSrc的构造函数
-        super().__init__(logger, traffic_logger, eventlist)
+        super().__init__(logger, traffic_logger, eventlist, flow_table)
         
         # DCTCP特有成员变量 - 对应C++私有成员
         self._pkts_seen = 0      # uint32_t _pkts_seen - 看到的包数
         self._pkts_marked = 0    # uint32_t _pkts_marked - 被标记的包数
         self._alfa = 0.0         # double _alfa - DCTCP的α参数
-        self._past_cwnd = 2 * Packet.data_packet_size()  # uint32_t _past_cwnd
+        self._past_cwnd = 0      # uint32_t _past_cwnd
+        self._window_pkts = 0    # 观察窗口的ACK数，见 _set_past_cwnd()
+        self._set_past_cwnd(2 * Packet.data_packet_size())
         
         # 设置RTO为10ms - 对应 _rto = timeFromMs(10)
         self._rto = timeFromMs(10)
@@ -125,7 +133,52 @@ class DCTCPSrc(TcpSrc):
             self._ssthresh = self._mSrc.deflate_window(self._cwnd, self._mss)
         
         # 记录当前窗口大小
-        self._past_cwnd = self._cwnd
+        self._set_past_cwnd(self._cwnd)
+    
+    def _set_past_cwnd(self, cwnd: int) -> None:
+        """
+        开始新的观察窗口: 记录 _past_cwnd，并换算成窗口结束所需的ACK数
+        
+        C++ 每个ACK判断 _pkts_seen * _mss >= _past_cwnd；_mss 在构造后不变，
+        该条件等价于 _pkts_seen >= ceil(_past_cwnd / _mss)，这里每个窗口算一次。
+        
+        Args:
+            cwnd: 窗口开始时的拥塞窗口（字节）
+        """
+        self._past_cwnd = cwnd
+        self._window_pkts = -(-cwnd // self._mss)
+    
+    def _end_observation_window(self) -> None:
+        """
+        观察窗口结束 - 每个窗口（约一个RTT）更新一次α并收缩窗口
+        
+        浮点运算与 C++ 的表达式逐项相同，因此窗口轨迹与逐ACK计算一致。
+        """
+        # 计算标记比例，_pkts_seen 至少为1
+        f = self._pkts_marked / self._pkts_seen
+        
+        # 更新α参数 - EWMA with g=1/16
+        # _alfa = 15.0/16.0 * _alfa + 1.0/16.0 * f
+        alfa = (15.0 / 16.0) * self._alfa + (1.0 / 16.0) * f
+        self._alfa = alfa
+        
+        # 重置计数器
+        self._pkts_seen = 0
+        self._pkts_marked = 0
+        
+        # 基于α调整拥塞窗口
+        if alfa > 0:
+            # DCTCP公式: cwnd = cwnd * (1 - α/2)，确保窗口不小于MSS
+            cwnd = int(self._cwnd * (1 - alfa / 2))
+            if cwnd < self._mss:
+                cwnd = self._mss
+            self._cwnd = cwnd
+            
+            # 更新慢启动阈值
+            self._ssthresh = cwnd
+        
+        # 记录当前窗口大小
+        self._set_past_cwnd(self._cwnd)
     
     def receivePacket(self, pkt: Packet) -> None:
         """
@@ -136,6 +189,8 @@ class DCTCPSrc(TcpSrc):
         2. 每RTT更新一次α参数
         3. 基于α调整拥塞窗口
         
+        第2、3步在 _end_observation_window() 中每个观察窗口执行一次。
+        
         void DCTCPSrc::receivePacket(Packet& pkt) 
         {
             _pkts_seen++;
@@ -171,11 +226,12 @@ class DCTCPSrc(TcpSrc):
             TcpSrc::receivePacket(pkt);
         }
         """
-        # 增加看到的包计数
-        self._pkts_seen += 1
+        # 每个ACK只做整数计数；α和窗口收缩在观察窗口结束时计算一次
+        seen = self._pkts_seen + 1
+        self._pkts_seen = seen
         
         # 检查ECN标记 - 对应 if (pkt.flags() & ECN_ECHO)
-        if hasattr(pkt, 'flags') and (pkt.flags() & ECN_ECHO):
+        if pkt._flags & ECN_ECHO:
             self._pkts_marked += 1
             
             # 退出慢启动，因为我们正在造成拥塞
@@ -183,39 +239,8 @@ class DCTCPSrc(TcpSrc):
                 self._ssthresh = self._cwnd
         
         # 每RTT更新一次窗口 - 对应 if (_pkts_seen * _mss >= _past_cwnd)
-        if self._pkts_seen * self._mss >= self._past_cwnd:
-            # 计算标记比例
-            if self._pkts_seen > 0:
-                f = self._pkts_marked / self._pkts_seen
-            else:
-                f = 0.0
-            
-            # 更新α参数 - EWMA with g=1/16
-            # _alfa = 15.0/16.0 * _alfa + 1.0/16.0 * f
-            self._alfa = (15.0 / 16.0) * self._alfa + (1.0 / 16.0) * f
-            
-            # 重置计数器
-            self._pkts_seen = 0
-            self._pkts_marked = 0
-            
-            # 基于α调整拥塞窗口
-            if self._alfa > 0:
-                # DCTCP公式: cwnd = cwnd * (1 - α/2)
-                self._cwnd = int(self._cwnd * (1 - self._alfa / 2))
-                
-                # 确保窗口不小于MSS
-                if self._cwnd < self._mss:
-                    self._cwnd = self._mss
-                
-                # 更新慢启动阈值
-                self._ssthresh = self._cwnd
-            
-            # 记录当前窗口大小
-            self._past_cwnd = self._cwnd
-            
-            # 调试输出（可选）
-            # print(f"DCTCP UPDATE: time={timeAsMs(self._eventlist.now()):.3f}ms "
-            #       f"cwnd={self._cwnd} alfa={self._alfa:.4f} marked_ratio={f:.4f}")
+        if seen >= self._window_pkts:
+            self._end_observation_window()
         
         # 调用父类的receivePacket处理其他逻辑
         super().receivePacket(pkt)
@@ -258,6 +283,10 @@ class DCTCPSrc(TcpSrc):
         return f"DCTCPSrc[id={self.get_id()}, cwnd={self._cwnd}, alfa={self._alfa:.4f}]"
 
 
+# DCTCPSrc.rtx_timer_hook 只调用 TcpSrc 的实现
+RTX_GUARDED_HOOKS.add(DCTCPSrc.rtx_timer_hook)
+
+
 class DCTCPSink(TcpSink):
     """
     DCTCP接收端实现
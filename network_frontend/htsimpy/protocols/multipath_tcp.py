@@ -55,7 +55,9 @@ C++对应关系:
 import math
 import random
 from typing import List, Optional, Union
+import numpy as np
 from .tcp import TcpSrc, TcpSink
+from .flow_state import FlowStateTable
 from ..core.network import PacketSink, Packet
 from ..core.eventlist import EventSource
 from ..core.logger.tcp import MultipathTcpLogger
@@ -159,7 +161,8 @@ class MultipathTcpSrc(PacketSink, EventSource):
     class MultipathTcpSrc : public PacketSink, public EventSource
     """
     
-    def __init__(self, cc_type: int, eventlist, logger: Optional[MultipathTcpLogger] = None, rwnd: int = 1000):
+    def __init__(self, cc_type: int, eventlist, logger: Optional[MultipathTcpLogger] = None, rwnd: int = 1000,
+                 flow_table: Optional[FlowStateTable] = None):
         """
         初始化多路径TCP源端 - 对应 C++ MultipathTcpSrc::MultipathTcpSrc()
         
@@ -171,6 +174,9 @@ class MultipathTcpSrc(PacketSink, EventSource):
             eventlist: 事件调度器 (EventList& ev)
             logger: MPTCP日志记录器 (MultipathTcpLogger* logger)
             rwnd: 接收窗口大小 (int rwnd = 1000)
+            flow_table: 可选的列式流状态表；连接在表中分配一个组号，
+                子流必须接入同一张表，见 FlowStateTable.group_*。默认不启用：
+                逐包路径变慢，只在子流扫描和耦合聚合开销占主导时划算
         """
         EventSource.__init__(self, eventlist, "MTCP")
         PacketSink.__init__(self)
@@ -186,14 +192,17 @@ class MultipathTcpSrc(PacketSink, EventSource):
         # 对应 C++ 中的 list<TcpSrc*> _subflows
         self._subflows: List[TcpSrc] = []
         
+        self._flow_table = flow_table
+        self._flow_group = flow_table.new_group() if flow_table is not None else -1
+        
         # 对应 C++ MODEL_RECEIVE_WINDOW 条件编译部分
         if MODEL_RECEIVE_WINDOW:
             self._highest_sent = 0     # uint64_t _highest_sent
             self._last_acked = 0       # uint64_t _last_acked
             self._receive_window = rwnd * 1000  # uint64_t _receive_window
             
-            # 对应 C++ bool _packets_mapped[100000][4]
-            self._packets_mapped = [[False for _ in range(4)] for _ in range(100000)]
+            # 对应 C++ bool _packets_mapped[100000][4]，第一次 getDataSeq 时分配（400KB）
+            self._packets_mapped: Optional[np.ndarray] = None
             
             # 对应 C++ simtime_picosec _last_reduce[4]
             self._last_reduce = [0 for _ in range(4)]
@@ -214,11 +223,21 @@ class MultipathTcpSrc(PacketSink, EventSource):
             subflow->_subflow_id = _subflows.size()-1;
             subflow->joinMultipathConnection(this);
         }
+        
+        连接接入流状态表时，子流加入连接的组。
         """
+        if self._flow_table is not None:
+            if subflow._flow_table is not self._flow_table:
+                raise ValueError("subflow must be attached to the connection's flow state table")
+            self._flow_table.set_group(subflow, self._flow_group)
         self._subflows.append(subflow)
         subflow._subflow_id = len(self._subflows) - 1
         subflow.joinMultipathConnection(self)
     
+    def flow_group(self) -> int:
+        """连接在流状态表中的组号，未接入时为 -1"""
+        return self._flow_group
+    
     def receivePacket(self, pkt: Packet) -> None:
         """
         接收数据包 - 精确对应 C++ MultipathTcpSrc::receivePacket()
@@ -266,6 +285,9 @@ class MultipathTcpSrc(PacketSink, EventSource):
         """
         if not MODEL_RECEIVE_WINDOW:
             return (0, 0)
+        
+        if self._packets_mapped is None:
+            self._packets_mapped = np.zeros((100000, 4), dtype=np.bool_)
             
         # 对应 C++ if (_last_acked+_receive_window > _highest_sent)
         if self._last_acked + self._receive_window > self._highest_sent:
@@ -275,10 +297,9 @@ class MultipathTcpSrc(PacketSink, EventSource):
             self._highest_sent += 1000
             
             # 清空映射表
-            for j in range(4):
-                self._packets_mapped[pos][j] = False
+            self._packets_mapped[pos] = False
                 
-            self._packets_mapped[pos][subflow._subflow_id] = True
+            self._packets_mapped[pos, subflow._subflow_id] = True
             
             return (1, seq)
         else:
@@ -291,7 +312,7 @@ class MultipathTcpSrc(PacketSink, EventSource):
                 slow_subflow_id = -1
                 
                 for j in range(4):
-                    if self._packets_mapped[pos][j]:
+                    if self._packets_mapped[pos, j]:
                         if slow_subflow_id < 0:
                             slow_subflow_id = j
                         else:
@@ -322,8 +343,8 @@ class MultipathTcpSrc(PacketSink, EventSource):
                 while packet < self._highest_sent:
                     pos = (packet // 1000) % 100000
                     
-                    if not self._packets_mapped[pos][subflow._subflow_id]:
-                        self._packets_mapped[pos][subflow._subflow_id] = True
+                    if not self._packets_mapped[pos, subflow._subflow_id]:
+                        self._packets_mapped[pos, subflow._subflow_id] = True
                         return (1, packet)
                         
                     packet += 1000
@@ -16,6 +16,7 @@ NDP特点：
 - NdpPull: Pull包
 - NdpAck/NdpNack: 确认包
 - NdpRTSPacer: RTS步调器
+- NdpPullPacer: 链路级PULL步调器，按时隙批量发送PULL
 
 C++对应关系完整映射
 """
@@ -25,13 +26,16 @@ from enum import Enum
 from abc import ABC, abstractmethod
 import random
 import math
+import os
 
-from ..core.network import Packet, PacketSink, PacketFlow
+from ..core.network import Packet, PacketSink, PacketFlow, PacketDB, PacketPriority
 from ..core.eventlist import EventList, EventSource
+from ..core.checkpoint import register_static
 from ..core.route import Route
 from ..core.trigger import TriggerTarget, Trigger
 from ..core.logger.base import Logger
 from ..packets.base_packet import BasePacket
+from ..queues.fair_prio_queue import FairPullQueue
 
 # ============================================================================
 # 常量定义 - 对应 ndp.h
@@ -42,6 +46,10 @@ DEFAULT_RTO_MIN = 5000  # 最小RTO界限（微秒）
 NDP_PACKET_SCATTER = True
 RECORD_PATH_LENS = True
 DEBUG_PATH_STATS = True
+# 控制包（ACK/NACK/PULL）大小
+NDP_CONTROL_SIZE = 64
+# 每个步调时隙发送的PULL数，覆盖NdpPullPacer的默认值1
+PULL_BATCH_ENV = "AS_HTSIM_NDP_PULL_BATCH"
 
 # 路由策略枚举 - 对应 ndp.h: enum RouteStrategy
 class RouteStrategy(Enum):
@@ -135,15 +143,43 @@ class NdpPacket(BasePacket):
         """剥离负载，只保留头部"""
         self._is_header = True
         self._size = 64  # NDP header size
+        
+    def priority(self) -> PacketPriority:
+        """对应 C++ NdpPacket::priority() - 被裁剪的头部走高优先级"""
+        return PacketPriority.PRIO_HI if self._is_header else PacketPriority.PRIO_LO
 
 class NdpAck(NdpPacket):
     """NDP ACK包 - 对应 ndppacket.h: class NdpAck"""
     
+    # 对应 C++ static PacketDB<NdpAck> _packetdb
+    _packetdb = None
+    
     def __init__(self):
         super().__init__()
         self._type = self.NDPACK
         self._size = 64  # ACK size
         
+    @staticmethod
+    def newpkt(flow: PacketFlow, route: Optional[Route], ackno: int,
+               cumulative_ack: int, path_id: int) -> 'NdpAck':
+        """从对象池分配ACK - 对应 C++ NdpAck::newpkt()"""
+        if NdpAck._packetdb is None:
+            NdpAck._packetdb = PacketDB()
+        p = NdpAck._packetdb.allocPacket(NdpAck)
+        p.set_route(flow, route, NDP_CONTROL_SIZE, ackno)
+        p._ackno = ackno
+        p._cumulative_ack = cumulative_ack
+        p._path_id = path_id
+        return p
+        
+    def free(self) -> None:
+        """回收到对象池 - 对应 C++ NdpAck::free()"""
+        NdpAck._packetdb.freePacket(self)
+        
+    def priority(self) -> PacketPriority:
+        """对应 C++ NdpAck::priority()"""
+        return PacketPriority.PRIO_HI
+        
     @property 
     def ackno(self) -> int:
         return self._ackno
@@ -163,11 +199,34 @@ class NdpAck(NdpPacket):
 class NdpNack(NdpPacket):
     """NDP NACK包 - 对应 ndppacket.h: class NdpNack"""
     
+    # 对应 C++ static PacketDB<NdpNack> _packetdb
+    _packetdb = None
+    
     def __init__(self):
         super().__init__()
         self._type = self.NDPNACK
         self._size = 64  # NACK size
         
+    @staticmethod
+    def newpkt(flow: PacketFlow, route: Optional[Route], ackno: int,
+               path_id: int) -> 'NdpNack':
+        """从对象池分配NACK - 对应 C++ NdpNack::newpkt()"""
+        if NdpNack._packetdb is None:
+            NdpNack._packetdb = PacketDB()
+        p = NdpNack._packetdb.allocPacket(NdpNack)
+        p.set_route(flow, route, NDP_CONTROL_SIZE, ackno)
+        p._ackno = ackno
+        p._path_id = path_id
+        return p
+        
+    def free(self) -> None:
+        """回收到对象池 - 对应 C++ NdpNack::free()"""
+        NdpNack._packetdb.freePacket(self)
+        
+    def priority(self) -> PacketPriority:
+        """对应 C++ NdpNack::priority()"""
+        return PacketPriority.PRIO_LO
+        
     @property
     def ackno(self) -> int:
         return self._ackno
@@ -179,12 +238,36 @@ class NdpNack(NdpPacket):
 class NdpPull(NdpPacket):
     """NDP PULL包 - 对应 ndppacket.h: class NdpPull"""
     
+    # 对应 C++ static PacketDB<NdpPull> _packetdb
+    _packetdb = None
+    
     def __init__(self):
         super().__init__()
         self._type = self.NDPPULL
         self._size = 64  # PULL size
         self._cumulative_ack = 0
         
+    @staticmethod
+    def newpkt(flow: PacketFlow, route: Optional[Route], pullno: int,
+               cumulative_ack: int) -> 'NdpPull':
+        """从对象池分配PULL - 对应 C++ NdpPull::newpkt()"""
+        if NdpPull._packetdb is None:
+            NdpPull._packetdb = PacketDB()
+        p = NdpPull._packetdb.allocPacket(NdpPull)
+        p.set_route(flow, route, NDP_CONTROL_SIZE, pullno)
+        p._pullno = pullno
+        p._pacerno = 0
+        p._cumulative_ack = cumulative_ack
+        return p
+        
+    def free(self) -> None:
+        """回收到对象池 - 对应 C++ NdpPull::free()"""
+        NdpPull._packetdb.freePacket(self)
+        
+    def priority(self) -> PacketPriority:
+        """对应 C++ NdpPull::priority()"""
+        return PacketPriority.PRIO_HI
+        
     @property
     def pullno(self) -> int:
         return self._pullno
@@ -258,6 +341,123 @@ class NdpRTSPacer:
         # TODO: 实现完整的pacer逻辑
         return self.get_next_pacer_no()
 
+# ============================================================================
+# NDP Pull Pacer - 对应 ndp.h: class NdpPullPacer
+# ============================================================================
+
+class NdpPullPacer(EventSource):
+    """
+    链路级PULL步调器 - 对应 ndp.h: class NdpPullPacer
+    
+    一个接收端主机的所有NdpSink共享一个步调器，PULL按接收链路速率发出，
+    每个数据包的排空时间放行一个PULL。待发PULL按流放在FairPullQueue中，
+    各接收端之间轮询。
+    
+    每个步调时隙放行 pulls_per_slot 个PULL，时隙长度为
+    pulls_per_slot 个排空时间，只调度一个事件，PULL的平均速率和轮询顺序不变。
+    pulls_per_slot=1 时与C++逐PULL调度完全相同；大于1时同一时隙的PULL
+    在时隙开始时一起发出，incast规模的仿真事件数相应减少。
+    """
+    
+    def __init__(self, eventlist: EventList, linkspeed: int,
+                 pull_rate_modifier: float = 1.0,
+                 pulls_per_slot: Optional[int] = None):
+        """
+        对应 C++ NdpPullPacer::NdpPullPacer(EventList& event, linkspeed_bps linkspeed,
+                                           double pull_rate_modifier)
+        
+        Args:
+            eventlist: 事件调度器
+            linkspeed: 接收链路速度（bps）
+            pull_rate_modifier: PULL速率系数，大于1时PULL发得更快
+            pulls_per_slot: 每个时隙放行的PULL数，None时读取环境变量
+                AS_HTSIM_NDP_PULL_BATCH（默认1）
+        """
+        EventSource.__init__(self, eventlist, "ndp_pacer")
+        if pulls_per_slot is None:
+            pulls_per_slot = int(os.getenv(PULL_BATCH_ENV, "1"))
+        if pulls_per_slot < 1:
+            raise ValueError("pulls_per_slot must be at least 1")
+        self._pulls_per_slot = pulls_per_slot
+        
+        # 对应 C++ _packet_drain_time
+        self._packet_drain_time = int(
+            Packet.data_packet_size() * 8 * 10**12 / linkspeed / pull_rate_modifier)
+        self._slot_time = self._packet_drain_time * pulls_per_slot
+        
+        self._pull_queue = FairPullQueue()  # 按接收端轮询的待发PULL
+        self._last_pull = 0   # 当前时隙的开始时间，对应 C++ _last_pull
+        # 当前时隙已放行的PULL数；与C++一样，时刻0所在的时隙视为已用完
+        self._slot_sent = pulls_per_slot
+        self._pacer_no = 0    # 已放行的PULL数，对应 C++ _pacer_no
+        self._log_me = False
+        
+    def sendPacket(self, pull: NdpPull, rcvd_pacer_no: int, receiver: 'NdpSink') -> None:
+        """
+        请求发送一个PULL - 对应 C++ NdpPullPacer::sendPacket()
+        
+        当前时隙还有余量且没有排队的PULL时立即发送，否则排队，
+        队列由空变为非空时调度当前时隙结束时的事件。
+        """
+        if self._pull_queue.empty():
+            now = self._eventlist.now()
+            if now > self._last_pull + self._slot_time:
+                # 开始新时隙
+                self._last_pull = now
+                self._slot_sent = 0
+            if self._slot_sent < self._pulls_per_slot:
+                self._slot_sent += 1
+                self._send(pull)
+                return
+            self._eventlist.source_is_pending(self, self._last_pull + self._slot_time)
+        self._pull_queue.enqueue(pull)
+        
+    def do_next_event(self) -> None:
+        """
+        一个时隙放行最多 pulls_per_slot 个PULL - 对应 C++ NdpPullPacer::doNextEvent()
+        """
+        self._last_pull = self._eventlist.now()
+        self._slot_sent = 0
+        queue = self._pull_queue
+        while self._slot_sent < self._pulls_per_slot and not queue.empty():
+            self._slot_sent += 1
+            self._send(queue.dequeue())
+        if not queue.empty():
+            self._eventlist.source_is_pending_rel(self, self._slot_time)
+            
+    def _send(self, pull: NdpPull) -> None:
+        pull._pacerno = self._pacer_no
+        self._pacer_no += 1
+        if pull.route() is not None:
+            pull.sendOn()
+        else:
+            # 接收端没有回程路由（未连接），PULL无处可去
+            pull.free()
+            
+    def release_pulls(self, flow_id: int) -> None:
+        """丢弃某条流排队中的PULL（流结束时）- 对应 C++ NdpPullPacer::release_pulls()"""
+        kept = []
+        while not self._pull_queue.empty():
+            pull = self._pull_queue.dequeue()
+            if pull.flow_id() == flow_id:
+                pull.free()
+            else:
+                kept.append(pull)
+        for pull in kept:
+            self._pull_queue.enqueue(pull)
+            
+    def pending_pulls(self) -> int:
+        """排队中的PULL数"""
+        return self._pull_queue.size()
+        
+    def pacer_no(self) -> int:
+        """已放行的PULL数"""
+        return self._pacer_no
+        
+    def log_me(self) -> None:
+        """调试日志 - void log_me()"""
+        self._log_me = True
+
 # ============================================================================
 # NDP源端 - 对应 ndp.h: class NdpSrc
 # ============================================================================
@@ -460,20 +660,32 @@ class NdpSrc(PacketSink, EventSource, TriggerTarget):
     def doNextEvent(self) -> None:
         """
         处理下一个事件 - virtual void doNextEvent()
+        
+        NdpSrc 唯一的事件是 connect() 登记的流开始时间，到达时开始发送。
+        重传超时不经过事件表，由扫描器周期调用 rtx_timer_hook() 检查；
+        若以后为本源登记其他事件，需要在这里区分事件类型。
         """
-        # TODO: 实现完整的事件处理逻辑
-        pass
+        self.startflow()
+        
+    def do_next_event(self) -> None:
+        """EventList 调度入口"""
+        self.doNextEvent()
         
     def receivePacket(self, pkt: Packet) -> None:
         """
         接收包处理 - virtual void receivePacket(Packet& pkt)
+        
+        控制包处理完后回收到对象池（对应 C++ 中的 pkt.free()）
         """
         if isinstance(pkt, NdpPull):
             self.processPull(pkt)
+            pkt.free()
         elif isinstance(pkt, NdpAck):
             self.processAck(pkt)
+            pkt.free()
         elif isinstance(pkt, NdpNack):
             self.processNack(pkt)
+            pkt.free()
         elif isinstance(pkt, NdpPacket) and pkt._type == NdpPacket.NDP:
             if self._rts:
                 self.processRTS(pkt)
@@ -728,9 +940,14 @@ class NdpSink(PacketSink, EventSource):
     """
     
     def __init__(self,
-                 eventlist: Optional[EventList] = None):
+                 eventlist: Optional[EventList] = None,
+                 pacer: Optional[NdpPullPacer] = None):
         """
-        初始化NDP接收端 - 对应 C++ NdpSink::NdpSink()
+        初始化NDP接收端 - 对应 C++ NdpSink::NdpSink(EventList& ev, NdpPullPacer* pacer)
+        
+        Args:
+            eventlist: 事件调度器
+            pacer: 接收端主机共享的PULL步调器，None时PULL直接发出
         """
         EventSource.__init__(self, eventlist, "ndpsink")
         PacketSink.__init__(self)
@@ -738,6 +955,9 @@ class NdpSink(PacketSink, EventSource):
         self._nodename = "ndpsink"
         self._src = None
         self._route = None
+        self._pacer = pacer
+        self._flow = PacketFlow(None)
+        self._pull_no = 0  # 已请求的PULL数，对应 C++ _pull_no
         
         # 接收缓冲区和重排序
         self._cumulative_ack = 0
@@ -754,10 +974,13 @@ class NdpSink(PacketSink, EventSource):
         """
         self._src = src
         self._route = route
+        self._flow = src._flow
         
     def receivePacket(self, pkt: Packet) -> None:
         """
         接收包处理 - virtual void receivePacket(Packet& pkt)
+        
+        每个到达的包（完整的或被裁剪成头部的）都为发送端换来一个PULL
         """
         if isinstance(pkt, NdpPacket):
             if pkt.is_header():
@@ -768,6 +991,7 @@ class NdpSink(PacketSink, EventSource):
                 self._packets_received += 1
                 # 处理数据包
                 self.process_data_packet(pkt)
+            self.send_pull()
                 
     def process_data_packet(self, pkt: NdpPacket) -> None:
         """处理数据包"""
@@ -783,8 +1007,6 @@ class NdpSink(PacketSink, EventSource):
         elif seqno > self._cumulative_ack + 1:
             # 乱序到达
             self._received.append(seqno)
-            # 发送Pull请求
-            self.send_pull()
         else:
             # 重复包，忽略
             pass
@@ -796,28 +1018,28 @@ class NdpSink(PacketSink, EventSource):
         
     def send_ack(self, seqno: int, path_id: int) -> None:
         """发送ACK"""
-        ack = NdpAck()
-        ack.ackno = seqno
-        ack.cumulative_ack = self._cumulative_ack
-        ack.set_path_id(path_id)
-        # TODO: 通过路由发送ACK
-        # self._route.sendOn(ack)
+        self._send_control(NdpAck.newpkt(self._flow, self._route, seqno,
+                                         self._cumulative_ack, path_id))
         
     def send_nack(self, seqno: int, path_id: int) -> None:
         """发送NACK"""
-        nack = NdpNack()
-        nack.ackno = seqno
-        nack.set_path_id(path_id)
-        # TODO: 通过路由发送NACK
-        # self._route.sendOn(nack)
+        self._send_control(NdpNack.newpkt(self._flow, self._route, seqno, path_id))
         
     def send_pull(self) -> None:
-        """发送PULL请求"""
-        pull = NdpPull()
-        pull.pullno = self._cumulative_ack + 1
-        pull.cumulative_ack = self._cumulative_ack
-        # TODO: 通过路由发送PULL
-        # self._route.sendOn(pull)
+        """发送PULL请求，有步调器时由步调器按链路速率放行"""
+        self._pull_no += 1
+        pull = NdpPull.newpkt(self._flow, self._route, self._pull_no, self._cumulative_ack)
+        if self._pacer is not None:
+            self._pacer.sendPacket(pull, 0, self)
+        else:
+            self._send_control(pull)
+            
+    def _send_control(self, pkt: NdpPacket) -> None:
+        """沿回程路由发出控制包，未连接时直接回收"""
+        if self._route is not None:
+            pkt.sendOn()
+        else:
+            pkt.free()
         
     def nodename(self) -> str:
         """获取节点名"""
@@ -831,8 +1053,12 @@ class NdpSink(PacketSink, EventSource):
     # EventSource接口实现
     def doNextEvent(self) -> None:
         """处理下一个事件"""
-        # TODO: 实现定期发送Pull的逻辑
+        # PULL由NdpPullPacer定时放行，接收端本身没有定时事件
         pass
+        
+    def do_next_event(self) -> None:
+        """EventList 调度入口"""
+        self.doNextEvent()
 
 # ============================================================================
 # NDP日志器 - 对应 loggertypes.h: class NdpLogger
@@ -873,9 +1099,18 @@ __all__ = [
     'NdpNack',
     'NdpPull',
     'NdpRTSPacer',
+    'NdpPullPacer',
     'RouteStrategy',
     'FeedbackType',
     'ReceiptEvent',
     'NdpLogger',
     'TrafficLogger',
-]
\ No newline at end of file
+]
+
+
+# 静态成员随仿真快照保存
+register_static(NdpSrc, "_global_rto_count", "_min_rto", "_route_strategy",
+                "_path_entropy_size", "_global_node_count", "_rtt_hist")
+register_static(NdpAck, "_packetdb")
+register_static(NdpNack, "_packetdb")
+register_static(NdpPull, "_packetdb")
@@ -9,6 +9,10 @@ TCP Protocol Implementation
 - TcpSink: TCP接收端，对应C++的TcpSink
 - TcpRtxTimerScanner: TCP重传定时器扫描器
 
+TcpSrc 可以通过 flow_table 参数把数值状态放进 FlowStateTable（见 flow_state.py），
+扫描器在所有源端共享同一张表时向量化筛选到期的定时器。该表需显式启用，
+逐包处理会变慢，只适合扫描和聚合开销占主导的仿真。
+
 C++对应关系:
 - TcpSrc::TcpSrc() -> TcpSrc.__init__()
 - TcpSrc::connect() -> TcpSrc.connect()
@@ -24,6 +28,7 @@ from ..core.route import Route
 from ..packets.tcp_packet import TcpPacket, TcpAck
 from ..core.logger.traffic import TrafficLogger
 from ..core.logger.tcp import TcpLogger
+from .flow_state import FlowStateTable, TCP_COLUMNS
 import sys
 
 if TYPE_CHECKING:
@@ -42,7 +47,13 @@ class TcpSrc(PacketSink, EventSource):
     实现TCP协议的发送端功能，完全按照 C++ 版本复现
     """
     
-    def __init__(self, logger, pktlogger, eventlist):
+    # 可放入 FlowStateTable 的字段
+    _flow_columns = TCP_COLUMNS
+    # 未接入流状态表时的默认值
+    _flow_table: Optional[FlowStateTable] = None
+    _flow_row = -1
+    
+    def __init__(self, logger, pktlogger, eventlist, flow_table: Optional[FlowStateTable] = None):
         """
         初始化TCP源端 - 对应 C++ TcpSrc::TcpSrc()
         
@@ -50,7 +61,13 @@ class TcpSrc(PacketSink, EventSource):
             logger: TCP日志记录器
             pktlogger: 流量日志记录器
             eventlist: 事件调度器
+            flow_table: 可选的列式流状态表，数值字段存放在表中的一行。默认不启用：
+                逐包路径每个事件慢 1.2~1.9 倍，只有重传扫描、聚合量计算占主导的
+                大规模仿真才划算
         """
+        # 必须在设置任何字段之前接入
+        if flow_table is not None:
+            flow_table.attach(self)
         EventSource.__init__(self, eventlist, "tcp")
         PacketSink.__init__(self)
         
@@ -670,12 +687,16 @@ class TcpSrc(PacketSink, EventSource):
         """
         self._paths = []
         for route in paths:
-            t = Route(route)
-            t.push_back(self._sink)
-            self._paths.append(t)
+            # 对应 C++ new Route(*rt, *_sink)
+            self._paths.append(route.with_destination(self._sink))
         self.DUPACK_TH = 3 + len(paths)
 
 
+# rtx_timer_hook 与 TcpSrc.rtx_timer_hook 前置判断相同的实现，
+# 扫描器可以用 FlowStateTable.rtx_due() 跳过不会产生效果的调用
+RTX_GUARDED_HOOKS = {TcpSrc.rtx_timer_hook}
+
+
 class TcpSink(PacketSink, DataReceiver):
     """
     TCP接收端 - 对应 tcp.h/cpp 中的 TcpSink 类
@@ -893,9 +914,8 @@ class TcpSink(PacketSink, DataReceiver):
         """
         self._paths = []
         for route in paths:
-            t = Route(route)
-            t.push_back(self._src)
-            self._paths.append(t)
+            # 对应 C++ new Route(*rt, *_src)
+            self._paths.append(route.with_destination(self._src))
 
 
 class TcpRtxTimerScanner(EventSource):
@@ -903,8 +923,14 @@ class TcpRtxTimerScanner(EventSource):
     TCP重传定时器扫描器 - 对应 tcp.h/cpp 中的 TcpRtxTimerScanner 类
     
     定期扫描所有TCP源的重传定时器
+    
+    所有源端共享同一张 FlowStateTable 且钩子都在 RTX_GUARDED_HOOKS 中时，
+    先对整张表向量化判断到期的定时器，只对到期的源端按登记顺序调用钩子。
     """
     
+    # 登记源端的行号；None 表示需要重新计算，False 表示不能向量化
+    _rows = None
+    
     def __init__(self, scanPeriod: int, eventlist):
         """
         初始化重传定时器扫描器 - 对应 C++ TcpRtxTimerScanner::TcpRtxTimerScanner()
@@ -928,6 +954,20 @@ class TcpRtxTimerScanner(EventSource):
             tcpsrc: TCP源端对象
         """
         self._tcps.append(tcpsrc)
+        self._rows = None
+    
+    def _scan_rows(self):
+        """登记源端在共享流状态表中的行号，不能向量化时返回 False"""
+        if self._rows is None:
+            tcps = self._tcps
+            table = tcps[0]._flow_table if tcps else None
+            if table is not None and all(
+                    tcpsrc._flow_table is table and type(tcpsrc).rtx_timer_hook in RTX_GUARDED_HOOKS
+                    for tcpsrc in tcps):
+                self._rows = table.rows(tcps)
+            else:
+                self._rows = False
+        return self._rows
     
     def do_next_event(self) -> None:
         """
@@ -935,8 +975,14 @@ class TcpRtxTimerScanner(EventSource):
         """
         now = self._eventlist.now()
         
-        for tcpsrc in self._tcps:
-            tcpsrc.rtx_timer_hook(now, self._scanPeriod)
+        rows = self._scan_rows()
+        if rows is False:
+            for tcpsrc in self._tcps:
+                tcpsrc.rtx_timer_hook(now, self._scanPeriod)
+        else:
+            tcps = self._tcps
+            for i in tcps[0]._flow_table.rtx_due(rows, now).tolist():
+                tcps[i].rtx_timer_hook(now, self._scanPeriod)
         
         # 调度下一次扫描
         self._eventlist.source_is_pending_rel(self, self._scanPeriod)
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Active flow ring - O(1) round-robin bookkeeping for per-flow queues
+
+Used by CompositeQueue and FairPullQueue. Every flow with queued packets owns
+a node holding its packet deque; nodes are linked in a circular doubly-linked
+list in activation order and a cursor walks the ring. Activating, serving,
+advancing and deactivating a flow are all O(1), independent of how many flows
+are active.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional
+
+from ..core.network import Packet
+
+
+class FlowNode:
+    """Ring node of one active flow"""
+
+    __slots__ = ("flow_id", "packets", "size", "prev", "next")
+
+    def __init__(self, flow_id: int):
+        self.flow_id = flow_id
+        self.packets: Deque[Packet] = deque()
+        self.size = 0  # Queued size in bits, maintained by the owning queue
+        self.prev: 'FlowNode' = self
+        self.next: 'FlowNode' = self
+
+
+class ActiveFlowRing:
+    """
+    Circular list of active flows with a round-robin cursor
+
+    head is the oldest active flow, so new flows are linked in just before it
+    (at the end of the activation order). current is the flow to serve next.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[int, FlowNode] = {}
+        self.head: Optional[FlowNode] = None
+        self.current: Optional[FlowNode] = None
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __bool__(self) -> bool:
+        return self.head is not None
+
+    def __iter__(self) -> Iterator[FlowNode]:
+        """Iterate active flows in activation order"""
+        node = self.head
+        for _ in range(len(self._nodes)):
+            yield node
+            node = node.next
+
+    def get(self, flow_id: int) -> Optional[FlowNode]:
+        """Get the node of an active flow, None if the flow is not active"""
+        return self._nodes.get(flow_id)
+
+    def activate(self, flow_id: int) -> FlowNode:
+        """Link a new flow in at the end of the activation order"""
+        node = FlowNode(flow_id)
+        self._nodes[flow_id] = node
+        head = self.head
+        if head is None:
+            self.head = node
+            self.current = node
+        else:
+            tail = head.prev
+            node.prev = tail
+            node.next = head
+            tail.next = node
+            head.prev = node
+        return node
+
+    def deactivate(self, node: FlowNode) -> None:
+        """Unlink a flow; a cursor or head on it moves on to the next flow"""
+        del self._nodes[node.flow_id]
+        if node.next is node:
+            self.head = None
+            self.current = None
+            return
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        if self.head is node:
+            self.head = node.next
+        if self.current is node:
+            self.current = node.next
+
+    def advance(self) -> None:
+        """Move the cursor to the next flow"""
+        if self.current is not None:
+            self.current = self.current.next
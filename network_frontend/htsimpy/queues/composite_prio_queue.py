@@ -4,16 +4,24 @@ Composite Priority Queue - Implementation for HTSimPy
 Corresponds to CompositePrioQueue in compositeprioqueue.h/cpp
 A composite queue that transforms packets into headers when there is no space 
 and services headers with priority.
+
+Invariant checks (check_queued) run only when CHECK_INVARIANTS is set, which
+follows __debug__ by default, so `python -O` runs the queue in production
+mode. Diagnostics go through the htsimpy global logger at DEBUG level.
 """
 
 from .base_queue import Queue
 from ..core.eventlist import EventList
-from ..core.logger import QueueLogger, TrafficLogger
+from ..core.logger import QueueLogger, TrafficLogger, LogLevel, get_global_logger
 from ..core.network import Packet, PacketType
-from typing import Optional, List
+from collections import deque
+from typing import Deque, Optional
 from enum import IntEnum
 import random
 
+def _log(level: LogLevel, message: str) -> None:
+    get_global_logger().log(level, "CompositePrioQueue", message)
+
 
 class QueueType(IntEnum):
     """Queue type constants - matches C++ defines"""
@@ -33,14 +41,24 @@ class CompositePrioQueue(Queue):
     Services high priority (headers) and low priority (data) with configurable ratio
     """
     
+    # Run check_queued after every queue operation; off in production mode
+    CHECK_INVARIANTS = __debug__
+    
     def __init__(self, bitrate: int, maxsize: int, eventlist: EventList,
-                 logger: Optional[QueueLogger] = None):
+                 logger: Optional[QueueLogger] = None,
+                 check_invariants: Optional[bool] = None):
         """
         Initialize composite priority queue
         
         Corresponds to CompositePrioQueue constructor in compositeprioqueue.cpp
+        
+        Args:
+            check_invariants: Verify the path length bookkeeping after every
+                operation, None to use CHECK_INVARIANTS
         """
         super().__init__(bitrate, maxsize, eventlist, logger)
+        self._check_invariants = (CompositePrioQueue.CHECK_INVARIANTS
+                                  if check_invariants is None else check_invariants)
         
         # Service ratios
         self._ratio_high = 10  # High priority service ratio
@@ -59,6 +77,7 @@ class CompositePrioQueue(Queue):
         
         # Path length tracking
         self._enqueued_path_lens = [0] * (MAX_PATH_LEN + 1)
+        self._total_path_lens_queued = 0  # Sum of _enqueued_path_lens, kept only for the invariant checks
         self._max_path_len_queued = 0
         self._max_path_len_seen = 0
         
@@ -69,9 +88,9 @@ class CompositePrioQueue(Queue):
         # Currently serving
         self._serv = QueueType.QUEUE_INVALID
         
-        # Queues
-        self._enqueued_low: List[Packet] = []   # Low priority queue
-        self._enqueued_high: List[Packet] = []  # High priority queue
+        # Queues - front is the newest packet, back is served first
+        self._enqueued_low: Deque[Packet] = deque()   # Low priority queue
+        self._enqueued_high: Deque[Packet] = deque()  # High priority queue
         
         # Set node name
         self._nodename = f"compqueue({bitrate//1000000}Mb/s,{maxsize}bytes)"
@@ -132,11 +151,11 @@ class CompositePrioQueue(Queue):
                     assert self._enqueued_low
                     
                     if pkt.path_len() < self._max_path_len_queued:
-                        print(f"Trim1 {pkt.path_len()} max {self._max_path_len_queued}")
+                        _log(LogLevel.DEBUG, f"Trim1 {pkt.path_len()} max {self._max_path_len_queued}")
                         self._trim_low_priority_packet(pkt.path_len())
                     else:
                         # Same path length, coin flip said to drop queued packet
-                        print(f"Trim2 {pkt.path_len()} max {self._max_path_len_queued}")
+                        _log(LogLevel.DEBUG, f"Trim2 {pkt.path_len()} max {self._max_path_len_queued}")
                         self._trim_low_priority_packet(pkt.path_len() - 1)
                 
                 assert self._queuesize_low + pkt.size() <= self._maxsize
@@ -151,7 +170,7 @@ class CompositePrioQueue(Queue):
                 return
             else:
                 # Strip packet - low priority queue is full
-                print(f"B [ {len(self._enqueued_low)} {len(self._enqueued_high)} ] STRIP")
+                _log(LogLevel.DEBUG, f"B [ {len(self._enqueued_low)} {len(self._enqueued_high)} ] STRIP")
                 pkt.strip_payload()
                 self._stripped += 1
                 pkt.flow().logTraffic(pkt, self, TrafficLogger.TrafficEvent.PKT_TRIM)
@@ -166,13 +185,13 @@ class CompositePrioQueue(Queue):
             if self._logger:
                 self._logger.logQueue(self, QueueLogger.QueueEvent.PKT_DROP, pkt)
             pkt.flow().logTraffic(pkt, self, TrafficLogger.TrafficEvent.PKT_DROP)
-            print(f"D[ {len(self._enqueued_low)} {len(self._enqueued_high)} ] DROP {pkt.flow_id()}")
+            _log(LogLevel.DEBUG, f"D[ {len(self._enqueued_low)} {len(self._enqueued_high)} ] DROP {pkt.flow_id()}")
             pkt.free()
             self._num_drops += 1
             return
         
         # Enqueue header in high priority queue
-        self._enqueued_high.insert(0, pkt)  # push_front
+        self._enqueued_high.appendleft(pkt)  # push_front
         self._queuesize_high += pkt.size()
         
         if self._serv == QueueType.QUEUE_INVALID:
@@ -249,7 +268,7 @@ class CompositePrioQueue(Queue):
         
         Corresponds to CompositePrioQueue::enqueue_packet
         """
-        self._enqueued_low.insert(0, pkt)  # push_front
+        self._enqueued_low.appendleft(pkt)  # push_front
         self._queuesize_low += pkt.size()
         
         if self._max_path_len_queued < pkt.path_len():
@@ -258,7 +277,9 @@ class CompositePrioQueue(Queue):
                 self._max_path_len_seen = self._max_path_len_queued
         
         self._enqueued_path_lens[pkt.path_len()] += 1
-        self._check_queued()
+        if self._check_invariants:
+            self._total_path_lens_queued += 1
+            self._check_queued()
     
     def _dequeue_low_packet(self) -> Packet:
         """
@@ -275,12 +296,15 @@ class CompositePrioQueue(Queue):
         path_len = pkt.path_len()
         assert self._enqueued_path_lens[path_len] > 0
         self._enqueued_path_lens[path_len] -= 1
+        if self._check_invariants:
+            self._total_path_lens_queued -= 1
         
         if path_len == self._max_path_len_queued and self._enqueued_path_lens[path_len] == 0:
             # We just dequeued the last packet with the longest path len
             self._find_max_path_len_queued()
         
-        self._check_queued()
+        if self._check_invariants:
+            self._check_queued()
         return pkt
     
     def _dequeue_high_packet(self) -> Packet:
@@ -300,10 +324,11 @@ class CompositePrioQueue(Queue):
         elif pkt.type() == PacketType.NDPPULL:
             self._num_pulls += 1
         else:
-            print(f"Hdr: type={pkt.type()}")
+            _log(LogLevel.DEBUG, f"Hdr: type={pkt.type()}")
             self._num_headers += 1
         
-        self._check_queued()
+        if self._check_invariants:
+            self._check_queued()
         return pkt
     
     def _find_max_path_len_queued(self) -> None:
@@ -321,13 +346,16 @@ class CompositePrioQueue(Queue):
                 self._max_path_len_queued = i
                 return
         
-        self._check_queued()
+        if self._check_invariants:
+            self._check_queued()
     
     def _check_queued(self) -> None:
         """
         Verify queue consistency
         
-        Corresponds to CompositePrioQueue::check_queued
+        Corresponds to CompositePrioQueue::check_queued. Only called when
+        invariant checks are enabled; it also cross-checks the incremental
+        bucket total against the buckets.
         """
         maxpath = 0
         total_queued = 0
@@ -338,6 +366,7 @@ class CompositePrioQueue(Queue):
                 total_queued += self._enqueued_path_lens[i]
         
         assert maxpath == self._max_path_len_queued
+        assert total_queued == self._total_path_lens_queued
         assert total_queued <= 8
     
     def _trim_low_priority_packet(self, prio: int) -> None:
@@ -354,22 +383,26 @@ class CompositePrioQueue(Queue):
             c += 1
             if pkt.path_len() > prio:
                 # Found packet to trim
-                booted_pkt = self._enqueued_low.pop(i)
+                booted_pkt = pkt
+                del self._enqueued_low[i]
                 self._queuesize_low -= booted_pkt.size()
                 
                 # Update priority housekeeping
                 path_len = booted_pkt.path_len()
                 assert self._enqueued_path_lens[path_len] > 0
                 self._enqueued_path_lens[path_len] -= 1
+                if self._check_invariants:
+                    self._total_path_lens_queued -= 1
                 
                 if path_len == self._max_path_len_queued and self._enqueued_path_lens[path_len] == 0:
                     # We just removed the last packet with the longest path len
                     self._find_max_path_len_queued()
                 
-                self._check_queued()
+                if self._check_invariants:
+                    self._check_queued()
                 
-                print(f"C [ {len(self._enqueued_low)} {len(self._enqueued_high)} ] STRIP")
-                print(f"Arriving: {prio} booted: {booted_pkt.path_len()} posn: {c}")
+                _log(LogLevel.DEBUG, f"C [ {len(self._enqueued_low)} {len(self._enqueued_high)} ] STRIP")
+                _log(LogLevel.DEBUG, f"Arriving: {prio} booted: {booted_pkt.path_len()} posn: {c}")
                 
                 booted_pkt.strip_payload()
                 
@@ -383,18 +416,19 @@ class CompositePrioQueue(Queue):
                 else:
                     self._stripped += 1
                     booted_pkt.flow().logTraffic(booted_pkt, self, TrafficLogger.TrafficEvent.PKT_TRIM)
-                    self._enqueued_high.insert(0, booted_pkt)  # push_front
+                    self._enqueued_high.appendleft(booted_pkt)  # push_front
                     self._queuesize_high += booted_pkt.size()
                     if self._logger:
                         self._logger.logQueue(self, QueueLogger.QueueEvent.PKT_TRIM, booted_pkt)
                 
-                self._check_queued()
+                if self._check_invariants:
+                    self._check_queued()
                 return
         
         # Should not reach here
-        print(f"FAIL!, can't find packet with less than {prio}")
+        _log(LogLevel.ERROR, f"FAIL!, can't find packet with less than {prio}")
         for pkt in self._enqueued_low:
-            print(f"pathlen: {pkt.path_len()}")
+            _log(LogLevel.ERROR, f"pathlen: {pkt.path_len()}")
         for c in range(self._max_path_len_seen + 1):
-            print(f"len: {c} count: {self._enqueued_path_lens[c]}")
+            _log(LogLevel.ERROR, f"len: {c} count: {self._enqueued_path_lens[c]}")
         assert False, "Failed to find packet to trim"
\ No newline at end of file
@@ -1,10 +1,11 @@
 """Composite queue implementation for HTSimPy."""
 
-from typing import Optional, Dict, List
+from typing import Optional, Dict
 from ..core import Packet, EventList, EventSource
 from ..core.logger import Logger
 from .base_queue import BaseQueue
 from .fifo_queue import FIFOQueue
+from .active_flow_ring import ActiveFlowRing
 
 
 class CompositeQueue(BaseQueue):
@@ -12,7 +13,9 @@ class CompositeQueue(BaseQueue):
     Composite queue that maintains per-flow sub-queues.
     
     Each flow gets its own FIFO queue, and flows are served
-    in round-robin fashion to ensure fairness.
+    in round-robin fashion to ensure fairness. Active flows live in an
+    ActiveFlowRing, so enqueue, dequeue and flow removal are O(1)
+    regardless of the number of flows.
     """
     
     def __init__(
@@ -35,10 +38,7 @@ class CompositeQueue(BaseQueue):
         self._service_rate = service_rate
         self._maxsize = max_size
         self._queuesize = 0  # Current size in bits
-        self._flow_queues: Dict[int, List[Packet]] = {}  # flow_id -> packet list
-        self._flow_sizes: Dict[int, int] = {}  # flow_id -> total size in bits
-        self._active_flows: List[int] = []  # List of flows with packets
-        self._current_flow_idx = 0  # For round-robin
+        self._active_flows = ActiveFlowRing()  # Flows with packets, round-robin cursor
         self._total_packets = 0
         
     def _get_flow_id(self, pkt: Packet) -> int:
@@ -76,14 +76,13 @@ class CompositeQueue(BaseQueue):
         flow_id = self._get_flow_id(pkt)
         
         # Create flow queue if needed
-        if flow_id not in self._flow_queues:
-            self._flow_queues[flow_id] = []
-            self._flow_sizes[flow_id] = 0
-            self._active_flows.append(flow_id)
+        flow = self._active_flows.get(flow_id)
+        if flow is None:
+            flow = self._active_flows.activate(flow_id)
             
         # Add packet to flow queue
-        self._flow_queues[flow_id].append(pkt)
-        self._flow_sizes[flow_id] += pkt_size
+        flow.packets.append(pkt)
+        flow.size += pkt_size
         
         # Update global state
         self._queuesize += pkt_size
@@ -109,45 +108,29 @@ class CompositeQueue(BaseQueue):
         if self._total_packets == 0 or not self._active_flows:
             return None
             
-        # Find next non-empty flow
-        attempts = 0
-        while attempts < len(self._active_flows):
-            flow_id = self._active_flows[self._current_flow_idx]
+        # Active flows always hold packets, so the cursor is the next flow to serve
+        flow = self._active_flows.current
+        pkt = flow.packets.popleft()
+        pkt_size = pkt.size() * 8
+        
+        # Update flow state
+        flow.size -= pkt_size
+        if not flow.packets:
+            # Remove empty flow, the cursor moves on to the next flow
+            self._active_flows.deactivate(flow)
+        else:
+            # Move to next flow for fairness
+            self._active_flows.advance()
             
-            if flow_id in self._flow_queues and self._flow_queues[flow_id]:
-                # Get packet from this flow
-                pkt = self._flow_queues[flow_id].pop(0)
-                pkt_size = pkt.size() * 8
-                
-                # Update flow state
-                self._flow_sizes[flow_id] -= pkt_size
-                if not self._flow_queues[flow_id]:
-                    # Remove empty flow
-                    del self._flow_queues[flow_id]
-                    del self._flow_sizes[flow_id]
-                    self._active_flows.remove(flow_id)
-                    # Adjust index if needed
-                    if self._current_flow_idx >= len(self._active_flows):
-                        self._current_flow_idx = 0
-                else:
-                    # Move to next flow for fairness
-                    self._current_flow_idx = (self._current_flow_idx + 1) % len(self._active_flows)
-                    
-                # Update global state
-                self._queuesize -= pkt_size
-                self._total_packets -= 1
-                
-                # Log dequeue
-                if self._logger:
-                    self._logger.log_packet_dequeue(pkt, self._queuesize)
-                    
-                return pkt
-                
-            # Try next flow
-            self._current_flow_idx = (self._current_flow_idx + 1) % len(self._active_flows)
-            attempts += 1
+        # Update global state
+        self._queuesize -= pkt_size
+        self._total_packets -= 1
+        
+        # Log dequeue
+        if self._logger:
+            self._logger.log_packet_dequeue(pkt, self._queuesize)
             
-        return None
+        return pkt
         
     def num_packets(self) -> int:
         """Get total number of packets in queue."""
@@ -160,8 +143,8 @@ class CompositeQueue(BaseQueue):
     def get_flow_stats(self) -> Dict[int, int]:
         """Get packet count per flow."""
         stats = {}
-        for flow_id, packets in self._flow_queues.items():
-            stats[flow_id] = len(packets)
+        for flow in self._active_flows:
+            stats[flow.flow_id] = len(flow.packets)
         return stats
         
     def queuesize(self) -> int:
@@ -202,10 +185,8 @@ class CompositeQueue(BaseQueue):
         """Schedule the next packet dequeue event."""
         if self._total_packets > 0 and self._active_flows:
             # Get next packet to estimate service time
-            flow_id = self._active_flows[self._current_flow_idx]
-            if flow_id in self._flow_queues and self._flow_queues[flow_id]:
-                pkt = self._flow_queues[flow_id][0]  # Peek at next packet
-                service_time = (pkt.size() * 8 * 10**12) // self._service_rate
-                
-                # Schedule dequeue event
-                self._eventlist.sourceIsPending(self, service_time)
\ No newline at end of file
+            pkt = self._active_flows.current.packets[0]  # Peek at next packet
+            service_time = (pkt.size() * 8 * 10**12) // self._service_rate
+            
+            # Schedule dequeue event
+            self._eventlist.sourceIsPending(self, service_time)
\ No newline at end of file
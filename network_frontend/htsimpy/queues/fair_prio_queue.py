@@ -8,10 +8,10 @@ Uses FairPullQueue for round-robin fairness between flows at each priority level
 from .base_queue import BaseQueue, Queue
 from ..core.eventlist import EventList
 from ..core.logger import QueueLogger, TrafficLogger
-from ..core.circular_buffer import CircularBuffer
 from ..core.network import Packet, PacketType, PacketPriority, PacketSink
 from typing import Optional, Dict, List
 from enum import IntEnum
+from .active_flow_ring import ActiveFlowRing
 
 
 class QueuePriority(IntEnum):
@@ -33,14 +33,14 @@ class FairPullQueue:
     """
     Fair pull queue for packets - provides round-robin fairness between flows
     Corresponds to FairPullQueue<Packet> in fairpullqueue.h/cpp
+    
+    Per-flow packets are kept in deques linked into an ActiveFlowRing, so
+    enqueue, dequeue and removal of drained flows are O(1).
     """
     
     def __init__(self):
         """Initialize fair pull queue"""
-        self._queue_map: Dict[int, CircularBuffer[Packet]] = {}  # flow_id -> queue
-        self._current_queue_key: Optional[int] = None  # Current flow_id being served
-        self._flow_keys: List[int] = []  # List of flow IDs for round-robin
-        self._current_index: int = 0  # Index in flow_keys
+        self._flows = ActiveFlowRing()  # Flows with packets, cursor is the flow served next
         self._pull_count: int = 0
         self._preferred_flow: int = -1  # int64_t in C++, -1 means no preference
     
@@ -52,12 +52,12 @@ class FairPullQueue:
         flow_id = pkt.flow_id()
         
         # Find or create queue for this flow
-        if flow_id not in self._queue_map:
-            self._queue_map[flow_id] = CircularBuffer[Packet]()
-            self._flow_keys.append(flow_id)
+        flow = self._flows.get(flow_id)
+        if flow is None:
+            flow = self._flows.activate(flow_id)
         
         # Add packet to the flow's queue
-        self._queue_map[flow_id].push(pkt)
+        flow.packets.append(pkt)
         self._pull_count += 1
     
     def dequeue(self) -> Optional[Packet]:
@@ -68,40 +68,18 @@ class FairPullQueue:
         if self._pull_count == 0:
             return None
         
-        # Round-robin through flows
-        start_index = self._current_index
-        while True:
-            if not self._flow_keys:
-                return None
-                
-            # Get current flow's queue
-            flow_id = self._flow_keys[self._current_index]
-            if flow_id in self._queue_map:
-                queue = self._queue_map[flow_id]
-                if not queue.empty():
-                    # Found a non-empty queue
-                    packet = queue.pop()
-                    self._pull_count -= 1
-                    
-                    # Move to next flow for fairness
-                    self._current_index = (self._current_index + 1) % len(self._flow_keys)
-                    
-                    # Clean up empty queues
-                    if queue.empty():
-                        del self._queue_map[flow_id]
-                        self._flow_keys.remove(flow_id)
-                        if self._current_index >= len(self._flow_keys) and self._flow_keys:
-                            self._current_index = 0
-                    
-                    return packet
-            
-            # Move to next flow
-            self._current_index = (self._current_index + 1) % len(self._flow_keys)
-            
-            # Avoid infinite loop
-            if self._current_index == start_index:
-                # We've checked all flows
-                return None
+        # Active flows always hold packets, serve the flow under the cursor
+        flow = self._flows.current
+        packet = flow.packets.popleft()
+        self._pull_count -= 1
+        
+        # Clean up empty queues, otherwise move to next flow for fairness
+        if flow.packets:
+            self._flows.advance()
+        else:
+            self._flows.deactivate(flow)
+        
+        return packet
     
     def empty(self) -> bool:
         """Check if queue is empty"""
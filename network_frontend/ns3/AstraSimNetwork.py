@@ -329,6 +329,8 @@ from typing import Dict, List
 
 from system.sys import Sys
 from workload.workload import Workload
+from workload.workload_parser import WorkloadParser
+from system.rank_equivalence import RankEquivalence
 
 # user_param structure (same as C++ struct user_param)
 class user_param:
@@ -435,11 +437,28 @@ def main(args):
     from .common import configure_ns3_logging
     configure_ns3_logging()
     
+    # Symmetric-rank deduplication: simulate one representative Sys per class
+    from . import entry
+    simulated_ranks = list(range(nodes_num))
+    if RankEquivalence.enabled_from_env():
+        record = WorkloadParser().load_record(user_params.workload)
+        header = record.header if record is not None else {}
+        equivalence = RankEquivalence.detect(
+            nodes_num, gpu_num, common.gpus_per_server,
+            header.get("model_parallel_npu_group", 1),
+            header.get("expert_parallel_npu_group", 1),
+            header.get("pipeline_model_parallelism", 1))
+        entry.rank_equivalence = equivalence
+        simulated_ranks = equivalence.representatives
+        print(f"Rank deduplication: simulating {equivalence.num_classes} "
+              f"representatives for {nodes_num} nodes "
+              f"(lower bound: traffic of the other ranks is not simulated)")
+    
     # Create networks and systems (same structure as C++)
     networks: List[ASTRASimNetwork] = []
     systems: List[Sys] = []
     
-    for j in range(nodes_num):
+    def build(j: int) -> None:
         # Create network like C++ version
         network = ASTRASimNetwork(j, 0)
         networks.append(network)
@@ -476,9 +495,23 @@ def main(args):
         
         systems.append(system)
     
+    for j in simulated_ranks:
+        build(j)
+    
+    # Flow-model messages carry the original sender and flow id and cannot be mirrored
+    if entry.rank_equivalence is not None and systems and not RankEquivalence.can_mirror(systems[0]):
+        print("Rank deduplication disabled: NcclFlowModel flow tags cannot be mirrored")
+        entry.rank_equivalence = None
+        for j in range(nodes_num):
+            if j not in simulated_ranks:
+                build(j)
+        order = sorted(range(len(systems)), key=lambda i: systems[i].id)
+        networks[:] = [networks[i] for i in order]
+        systems[:] = [systems[i] for i in order]
+    
     # Fire workloads like C++ version
-    for i in range(nodes_num):
-        systems[i].workload.fire()
+    for system in systems:
+        system.workload.fire()
     
     print("Starting NS3 simulator...")
     
@@ -498,6 +531,7 @@ def main(args):
     # In C++: MpiInterface::Disable();
     
     cleanup_hash_maps()
+    entry.rank_equivalence = None
     return 0
 
 if __name__ == "__main__":
@@ -22,6 +22,7 @@ from .common import (
     GPUType, NVswitchs, SetConfig, SetupNetwork, ReadConf
 )
 from system.AstraNetworkAPI import NcclFlowTag, SimRequest
+from system.rank_equivalence import RankEquivalence
 
 # Constants (same as C++)
 _QPS_PER_CONNECTION_ = 1
@@ -72,6 +73,10 @@ received_chunksize: Dict[Tuple[int, Tuple[int, int]], int] = {}
 # sent_chunksize: map<pair<int, pair<int, int>>, uint64_t>
 sent_chunksize: Dict[Tuple[int, Tuple[int, int]], int] = {}
 
+# Rank equivalence classes when only one representative Sys per class is simulated
+# (set by main() when AS_RANK_DEDUP is enabled, None otherwise)
+rank_equivalence: Optional['RankEquivalence'] = None
+
 # Thread synchronization (for thread safety like C++)
 _hash_map_lock = threading.RLock()
 
@@ -380,6 +385,12 @@ def notify_receiver_receive_data(sender_node: int, receiver_node: int,
     """
     NcclLog, NcclLogLevel = get_mock_nccl_log()
     
+    # Data arriving at a non-simulated rank is mirrored onto its class representative.
+    # The flow tag is left as is: dedup is refused for NcclFlowModel jobs, whose
+    # receivers read the sender and flow id from it (RankEquivalence.can_mirror)
+    if rank_equivalence is not None:
+        sender_node, receiver_node = rank_equivalence.mirror(sender_node, receiver_node)
+    
     with _hash_map_lock:
         if NcclLogLevel:
             NcclLog.writeLog(NcclLogLevel.DEBUG,
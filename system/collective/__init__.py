@@ -6,6 +6,7 @@ from .all_to_all import AllToAll
 from .double_binary_tree_allreduce import DoubleBinaryTreeAllReduce
 from .halving_doubling import HalvingDoubling
 from .nccl_tree_flow_model import NcclTreeFlowModel
+from .cost_model import CollectiveCostModel
 
 __all__ = [
     'Algorithm',
@@ -13,5 +14,6 @@ __all__ = [
     'AllToAll', 
     'DoubleBinaryTreeAllReduce',
     'HalvingDoubling',
-    'NcclTreeFlowModel'
+    'NcclTreeFlowModel',
+    'CollectiveCostModel'
 ] 
\ No newline at end of file
@@ -1,14 +1,15 @@
 # Collective communication algorithm base class - corresponds to collective/Algorithm.hh/cc in SimAI
 
-from typing import Optional, TYPE_CHECKING
+from typing import Optional, Tuple, TYPE_CHECKING
 from abc import ABC, abstractmethod
 from enum import Enum
-from ..common import ComType, EventType
+from ..common import ComType, EventType, StreamState
 from ..callable import Callable, CallData
 
 if TYPE_CHECKING:
     from ..base_stream import BaseStream
     from ..topology.logical_topology import LogicalTopology
+    from .cost_model import CollectiveCostModel
 
 
 class Algorithm(Callable, ABC):
@@ -42,6 +43,10 @@ class Algorithm(Callable, ABC):
         self.comType: ComType = ComType.None_
         self.enabled: bool = True
         self.layer_num: int = layer_num
+        
+        # Analytical fast path - set by Sys when the collective cost model is on
+        self.cost_model: Optional['CollectiveCostModel'] = None
+        self.cost_model_dimension: int = 0
     
     @abstractmethod
     def run(self, event: EventType, data: CallData) -> None:
@@ -68,8 +73,45 @@ class Algorithm(Callable, ABC):
             event_type: Type of event
             data: Associated call data
         """
-        # Default implementation - can be overridden by subclasses
-        pass
+        # The only event an algorithm registers for itself is the completion
+        # of an analytically modelled phase
+        if self.cost_model is not None and event_type == EventType.General:
+            self.exit()
+    
+    def get_cost_model_terms(self) -> Tuple[int, float]:
+        """Critical-path terms of this phase for the analytical cost model
+        
+        Returns:
+            (communication rounds, bytes sent by this node over the phase)
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no closed-form cost model")
+    
+    def use_cost_model(self, cost_model: 'CollectiveCostModel', dimension: int) -> None:
+        """Complete this phase from the cost model instead of simulating its messages
+        
+        Args:
+            cost_model: Cost model providing the completion time
+            dimension: Dimension this phase runs on
+        """
+        self.cost_model = cost_model
+        self.cost_model_dimension = dimension
+    
+    def run_cost_model(self, event: EventType, data: CallData) -> None:
+        """Run the phase through the analytical cost model
+        
+        On StreamInit the completion time is computed in closed form and a
+        single completion event is registered; no packets are created.
+        
+        Args:
+            event: Event type
+            data: Call data
+        """
+        if event != EventType.StreamInit:
+            return
+        if self.stream.state in [StreamState.Created, StreamState.Ready]:
+            self.stream.change_state(StreamState.Executing)
+        delay = self.cost_model.completion_time(self, self.cost_model_dimension)
+        self.stream.owner.register_event(self, EventType.General, None, delay)
     
     def exit(self) -> None:
         """Exit the algorithm and proceed to next vnet baseline"""
@@ -116,6 +116,9 @@ class AllToAll(Ring):
             event: Event type
             data: Call data
         """
+        if self.cost_model is not None:
+            self.run_cost_model(event, data)
+            return
         if event == EventType.General:
             self.free_packets += 1
             
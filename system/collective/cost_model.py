@@ -0,0 +1,136 @@
+# Closed-form collective cost model - analytical fast path for the collective algorithms
+
+from typing import List, Optional, TYPE_CHECKING
+import math
+import os
+from ..common import Tick, CLOCK_PERIOD
+
+if TYPE_CHECKING:
+    from .algorithm import Algorithm
+    from ..sys import Sys
+
+
+class CollectiveCostModel:
+    """Alpha-beta/LogGP cost model for collective phases
+
+    Instead of stepping through every packet of a collective phase, an
+    algorithm reports how many communication rounds lie on its critical path
+    and how many bytes a node pushes through its link over the whole phase
+    (see Algorithm.get_cost_model_terms). The completion time is then
+
+        rounds * alpha + max(rounds * g, bytes / BW[dim])
+
+    where alpha = L + 2o is the per-message latency, g is the minimum gap
+    between two consecutive messages and BW[dim] is the bandwidth of the
+    physical dimension the phase runs on.
+
+    The drivers build Sys without a system input file, so the model is
+    switched on with AS_COLLECTIVE_COST_MODEL=1. NcclFlowModel (the default
+    implementation) has no closed form. AS_COLLECTIVE_IMPLEMENTATION selects
+    the all-reduce/all-gather/reduce-scatter implementation (same strings as
+    all-reduce-implementation:, e.g. ring, halvingDoubling, doubleBinaryTree).
+    The analytical backend never generates collective phases, so the model
+    only takes effect on the packet-level backends.
+    """
+
+    # Fallback link bandwidth in GB/s, used when neither the network backend
+    # nor the system input (G:) provides one
+    DEFAULT_BW = 100.0
+
+    def __init__(self, alpha: float, gap: float, dim_BW: List[float]):
+        """Initialize cost model
+
+        Args:
+            alpha: Per-message latency in ticks
+            gap: Minimum gap between consecutive messages in ticks
+            dim_BW: Bandwidth per dimension in GB/s (bytes per ns)
+        """
+        self.alpha = alpha
+        self.gap = gap
+        self.dim_BW = dim_BW[:]
+
+    @staticmethod
+    def enabled_from_env() -> bool:
+        """Whether the cost model is requested through AS_COLLECTIVE_COST_MODEL (off by default)"""
+        return os.getenv("AS_COLLECTIVE_COST_MODEL", "0").lower() in ("1", "true", "yes")
+
+    @staticmethod
+    def implementation_from_env() -> Optional[str]:
+        """Collective implementation requested through AS_COLLECTIVE_IMPLEMENTATION, if any"""
+        return os.getenv("AS_COLLECTIVE_IMPLEMENTATION") or None
+
+    @classmethod
+    def from_sys(cls, sys: 'Sys') -> 'CollectiveCostModel':
+        """Build the cost model from the LogGP inputs and dimension bandwidths of a system
+
+        Bandwidths are taken per dimension from the network backend, exactly
+        like OfflineGreedy does. Dimensions the backend reports no bandwidth
+        for fall back to 1/G (if G: is set) or DEFAULT_BW.
+
+        Args:
+            sys: System owning the collectives
+
+        Returns:
+            Cost model for this system
+        """
+        alpha = sys.inp_L + 2 * sys.inp_o
+        if alpha <= 0:
+            alpha = sys.communication_delay
+
+        if sys.inp_G > 0:
+            fallback_BW = CLOCK_PERIOD / sys.inp_G
+        else:
+            fallback_BW = cls.DEFAULT_BW
+
+        dims = sys.physical_dims if sys.dim_to_break == -1 else sys.logical_broken_dims
+        dim_BW = []
+        for i in range(len(dims)):
+            physical_dim = i
+            if sys.dim_to_break != -1 and i > sys.dim_to_break:
+                physical_dim = i - 1
+            bw = sys.NI.get_BW_at_dimension(physical_dim) if sys.NI else None
+            dim_BW.append(bw if bw is not None and bw > 0 else fallback_BW)
+
+        return cls(alpha, sys.inp_g, dim_BW)
+
+    def get_BW_at_dimension(self, dim: int) -> float:
+        """Get bandwidth of a dimension in GB/s
+
+        Args:
+            dim: Dimension index
+
+        Returns:
+            Bandwidth of the dimension
+        """
+        if 0 <= dim < len(self.dim_BW):
+            return self.dim_BW[dim]
+        return self.DEFAULT_BW
+
+    def phase_time(self, rounds: int, total_bytes: float, dim: int) -> Tick:
+        """Completion time of a phase from its critical-path terms
+
+        Args:
+            rounds: Number of sequential communication rounds
+            total_bytes: Bytes sent by a node over the whole phase
+            dim: Dimension the phase runs on
+
+        Returns:
+            Completion time in ticks
+        """
+        if rounds <= 0:
+            return 0
+        transfer = total_bytes / self.get_BW_at_dimension(dim) / CLOCK_PERIOD
+        return Tick(math.ceil(rounds * self.alpha + max(rounds * self.gap, transfer)))
+
+    def completion_time(self, algorithm: 'Algorithm', dim: int) -> Tick:
+        """Completion time of a collective algorithm instance
+
+        Args:
+            algorithm: Collective algorithm of the phase
+            dim: Dimension the phase runs on
+
+        Returns:
+            Completion time in ticks
+        """
+        rounds, total_bytes = algorithm.get_cost_model_terms()
+        return self.phase_time(rounds, total_bytes, dim)
@@ -1,7 +1,8 @@
 # DoubleBinaryTreeAllReduce collective algorithm - corresponds to collective/DoubleBinaryTreeAllReduce.hh/cc in SimAI
 
-from typing import TYPE_CHECKING
+from typing import Tuple, TYPE_CHECKING
 from enum import Enum
+import math
 from .algorithm import Algorithm
 from ..common import ComType, EventType
 from ..callable import CallData
@@ -65,6 +66,26 @@ class DoubleBinaryTreeAllReduce(Algorithm):
         if boost_mode:
             self.enabled = tree.is_enabled(id)
     
+    def get_cost_model_terms(self) -> Tuple[int, float]:
+        """Critical-path terms of this phase for the analytical cost model
+        
+        The data climbs the tree to the root and is broadcast back down, one
+        level per round. The data is pipelined in chunks and the two trees
+        each carry half of it. The bytes a node puts on its link therefore
+        match the all-reduce bound: data_size * (1 - 1/n) for the reduce pass
+        and as much again for the broadcast pass. They do not grow with the
+        tree depth.
+        
+        Returns:
+            (communication rounds, bytes sent by this node over the phase)
+        """
+        nodes = self.logicalTopology.get_num_of_nodes_in_dimension(0)
+        if nodes <= 1:
+            return 0, 0.0
+        depth = int(math.ceil(math.log2(nodes + 1)))
+        rounds = 2 * (depth - 1)
+        return rounds, 2.0 * self.data_size * (nodes - 1) / nodes
+    
     def run(self, event: EventType, data: CallData) -> None:
         """Run the DoubleBinaryTreeAllReduce algorithm
         
@@ -72,6 +93,9 @@ class DoubleBinaryTreeAllReduce(Algorithm):
             event: Event type
             data: Call data
         """
+        if self.cost_model is not None:
+            self.run_cost_model(event, data)
+            return
         # Leaf node states
         if (self.state == self.State.Begin and 
             self.type == "Leaf"):  # leaf.1
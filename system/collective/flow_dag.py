@@ -0,0 +1,154 @@
+# Flow DAG - compiled dependency graph of the NcclTreeFlowModel flow models
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+FlowKey = Tuple[int, int]  # (channel_id, flow_id)
+
+
+def _field(flow: Any, name: str, default: Any) -> Any:
+    """Read a flow model field from a dict or a SingleFlow"""
+    if isinstance(flow, dict):
+        return flow.get(name, default)
+    return getattr(flow, name, default)
+
+
+class RankFlowView:
+    """The part of a FlowDag that one rank sends or receives
+
+    All index lists refer to FlowDag positions and keep the key order of the
+    flow model map, which is the order NcclTreeFlowModel used to scan it in.
+    """
+
+    def __init__(self, dag: 'FlowDag', rank: int):
+        src, dest = dag.src, dag.dest
+        self.rank = rank
+        local = np.flatnonzero((src == rank) | (dest == rank))
+        self.local: List[int] = local.tolist()
+        self.sends: List[int] = np.flatnonzero(src == rank).tolist()
+        self.recvs: List[int] = np.flatnonzero(dest == rank).tolist()
+
+        sends = np.asarray(self.sends, dtype=np.int64)
+        root_mask = dag.indegree[sends] == 0
+        first_chunk = dag.chunk[sends] == 0
+        # Roots sent at StreamInit, per channel; later chunks wait for their QP
+        self.roots: Dict[int, List[int]] = {}
+        self.waiting_roots: Dict[int, List[int]] = {}
+        for i, is_first in zip(sends[root_mask].tolist(), first_chunk[root_mask].tolist()):
+            target = self.roots if is_first else self.waiting_roots
+            target.setdefault(dag.channels[i], []).append(i)
+        # First-chunk flows with parents, which post their receives at StreamInit
+        self.recv_ready: List[int] = sends[~root_mask & first_chunk].tolist()
+
+        # Outgoing flows per channel, received flows per (channel, sender)
+        self.stream_count: Dict[int, int] = {}
+        for i in self.sends:
+            channel = dag.channels[i]
+            self.stream_count[channel] = self.stream_count.get(channel, 0) + 1
+        self.free_packets: Dict[Tuple[int, int], int] = {}
+        for i in self.recvs:
+            key = (dag.channels[i], dag.src_list[i])
+            self.free_packets[key] = self.free_packets.get(key, 0) + 1
+
+        # Child adjacency restricted to flows this rank sends
+        self.children: Dict[int, Tuple[int, ...]] = {}
+        edge_parent, edge_child = dag.edge_parent, dag.edge_child
+        mine = src[edge_child] == rank
+        grouped: Dict[int, List[int]] = {}
+        for p, c in zip(edge_parent[mine].tolist(), edge_child[mine].tolist()):
+            grouped.setdefault(p, []).append(c)
+        for p, cs in grouped.items():
+            self.children[p] = tuple(cs)
+
+
+class FlowDag:
+    """Flow models compiled into a dependency DAG
+
+    Each flow gets a dense index in the key order of the flow model map. Its
+    endpoints, channel and chunk are held in integer arrays, its parents
+    become an indegree vector and its children a CSR adjacency
+    (child_ptr/child_idx) built from the parent_flow_id lists of the same
+    channel. Per-rank views are derived from these arrays once and cached,
+    so every rank handed the same flow model map shares one compiled DAG.
+    """
+
+    # Compiled DAGs kept alive for reuse, least recently used dropped first
+    CACHE_SIZE = 32
+    _cache: 'OrderedDict[int, Tuple[Any, FlowDag]]' = OrderedDict()
+
+    def __init__(self, flow_models: Dict[FlowKey, Any]):
+        self.keys: List[FlowKey] = list(flow_models.keys())
+        self.flows: List[Any] = list(flow_models.values())
+        self.index: Dict[FlowKey, int] = {key: i for i, key in enumerate(self.keys)}
+        n = len(self.keys)
+
+        self.src_list = [_field(f, 'src', -1) for f in self.flows]
+        self.channels = [_field(f, 'channel_id', 0) for f in self.flows]
+        self.flow_ids = [_field(f, 'flow_id', key[1]) for f, key in zip(self.flows, self.keys)]
+        self.src = np.array(self.src_list, dtype=np.int64).reshape(n)
+        self.dest = np.array([_field(f, 'dest', -1) for f in self.flows], dtype=np.int64).reshape(n)
+        self.chunk = np.array([_field(f, 'chunk_id', 0) for f in self.flows], dtype=np.int64).reshape(n)
+
+        parents: List[int] = []
+        children: List[int] = []
+        indegree = np.zeros(n, dtype=np.int64)
+        for i, (flow, channel) in enumerate(zip(self.flows, self.channels)):
+            parent_ids = _field(flow, 'parent_flow_id', None) or ()
+            indegree[i] = len(parent_ids)
+            for parent_id in parent_ids:
+                p = self.index.get((channel, parent_id))
+                if p is not None:
+                    parents.append(p)
+                    children.append(i)
+        self.indegree = indegree
+        self.edge_parent = np.array(parents, dtype=np.int64)
+        self.edge_child = np.array(children, dtype=np.int64)
+
+        order = np.argsort(self.edge_parent, kind='stable')
+        self.child_idx = self.edge_child[order]
+        self.child_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_parent, minlength=n), out=self.child_ptr[1:])
+
+        self._views: Dict[int, RankFlowView] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def children_of(self, i: int) -> np.ndarray:
+        """Indices of the flows that depend on flow i"""
+        return self.child_idx[self.child_ptr[i]:self.child_ptr[i + 1]]
+
+    def view(self, rank: int) -> RankFlowView:
+        """Roots, counters and child lists of one rank, compiled on first use"""
+        view = self._views.get(rank)
+        if view is None:
+            view = self._views[rank] = RankFlowView(self, rank)
+        return view
+
+    @classmethod
+    def compile(cls, flow_models: Dict[FlowKey, Any]) -> 'FlowDag':
+        """Compiled DAG of a flow model map, shared by every caller passing the same map
+
+        Args:
+            flow_models: Map (channel_id, flow_id) -> flow model (dict or SingleFlow)
+
+        Returns:
+            The cached FlowDag if this map was compiled before
+        """
+        key = id(flow_models)
+        entry = cls._cache.get(key)
+        if entry is not None and entry[0] is flow_models and len(entry[1]) == len(flow_models):
+            cls._cache.move_to_end(key)
+            return entry[1]
+        dag = cls(flow_models)
+        # The cache holds the map itself so its id cannot be reused while cached
+        cls._cache[key] = (flow_models, dag)
+        if len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return dag
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._cache.clear()
@@ -1,6 +1,6 @@
 # HalvingDoubling collective algorithm - corresponds to collective/HalvingDoubling.hh/cc in SimAI
 
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 import math
 import sys
 from .algorithm import Algorithm
@@ -148,6 +148,23 @@ class HalvingDoubling(Algorithm):
         else:
             return self.logicalTopology.Direction.Anticlockwise
     
+    def get_cost_model_terms(self) -> Tuple[int, float]:
+        """Critical-path terms of this phase for the analytical cost model
+        
+        Reduce-Scatter halves the message every round (n/2 + n/4 + ...), All-Gather
+        doubles it and All-Reduce runs both back to back.
+        
+        Returns:
+            (communication rounds, bytes sent by this node over the phase)
+        """
+        steps = int(math.log2(self.nodes_in_ring))
+        fraction = (self.nodes_in_ring - 1) / self.nodes_in_ring
+        if self.comType == ComType.All_Reduce:
+            return 2 * steps, 2.0 * self.data_size * fraction
+        elif self.comType == ComType.All_Gather:
+            return steps, float(self.data_size) * (self.nodes_in_ring - 1)
+        return steps, self.data_size * fraction
+    
     def run(self, event: EventType, data: CallData) -> None:
         """Run the HalvingDoubling algorithm
         
@@ -155,6 +172,9 @@ class HalvingDoubling(Algorithm):
             event: Event type
             data: Call data
         """
+        if self.cost_model is not None:
+            self.run_cost_model(event, data)
+            return
         if event == EventType.General:
             self.free_packets += 1
             self.ready()
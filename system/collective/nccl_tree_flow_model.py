@@ -5,6 +5,7 @@ import threading
 import time
 from collections import defaultdict, deque
 from .algorithm import Algorithm
+from .flow_dag import FlowDag
 from ..common import ComType, EventType, InjectionPolicy, StreamState
 from ..callable import CallData
 
@@ -17,6 +18,12 @@ class NcclTreeFlowModel(Algorithm):
     
     Corresponds to collective/NcclTreeFlowModel.hh/cc in SimAI
     Advanced flow model with tree-based communication patterns
+
+    The flow models are compiled once into a FlowDag shared by all ranks
+    handed the same map. Each rank copies the DAG indegree vector and
+    keeps running counts of the channels with outstanding sends and the
+    (channel, sender) pairs with outstanding receives, so completion checks
+    are O(1) and a received packet only visits its local children.
     """
     
     # Class variable for critical section synchronization
@@ -78,7 +85,11 @@ class NcclTreeFlowModel(Algorithm):
         self._stream_count: Dict[int, int] = defaultdict(int)
         self.packets: Dict[Tuple[int, int], List[Dict]] = defaultdict(list)
         self.free_packets: Dict[Tuple[int, int], int] = defaultdict(int)
-        self.indegree_mapping: Dict[int, int] = {}
+        self.indegree: List[int] = []
+        self.busy_channels = 0       # channels with _stream_count > 0
+        self.pending_receives = 0    # (channel, sender) pairs with free_packets != 0
+        self._dag: Optional[FlowDag] = None
+        self._view = None
         self.inprocessing_indegree: Dict[int, int] = {}
         self.zero_latency_packets: Dict[int, int] = {}
         self.non_zero_latency_packets: Dict[int, int] = {}
@@ -134,32 +145,38 @@ class NcclTreeFlowModel(Algorithm):
         Args:
             ptr_flow_models: Flow models dictionary
         """
-        for f_key, f_value in ptr_flow_models.items():
-            if f_value.get('dest') == self.id:
-                channel_src_pair = (f_value['channel_id'], f_value['src'])
-                self.free_packets[channel_src_pair] += 1
-                self._flow_models[f_key] = f_value
-                self.recv_packets += 1
-            
-            if f_value.get('src') == self.id:
-                qp_key = (f_value['channel_id'], (f_value['src'], f_value['dest']))
-                if qp_key not in self.pQps['peer_qps']:
-                    self.pQps['peer_qps'][qp_key] = 1
-                
-                with self._g_flow_inCriticalSection:
-                    self._stream_count[f_value['channel_id']] += 1
-                
-                self._flow_models[f_key] = f_value
-                self.send_packets += 1
+        dag = FlowDag.compile(ptr_flow_models)
+        view = dag.view(self.id)
+        self._dag = dag
+        self._view = view
+        
+        for i in view.local:
+            self._flow_models[dag.keys[i]] = dag.flows[i]
+        for i in view.sends:
+            qp_key = (dag.channels[i], (self.id, int(dag.dest[i])))
+            if qp_key not in self.pQps['peer_qps']:
+                self.pQps['peer_qps'][qp_key] = 1
+        
+        with self._g_flow_inCriticalSection:
+            self._stream_count.update(view.stream_count)
+            self.free_packets.update(view.free_packets)
+            self.busy_channels = sum(1 for count in view.stream_count.values() if count)
+            self.pending_receives = sum(1 for count in view.free_packets.values() if count)
+        self.send_packets = len(view.sends)
+        self.recv_packets = len(view.recvs)
     
     def _init_indegree_mapping(self) -> None:
         """Initialize indegree mapping for flow dependencies"""
-        for flow_key, flow_value in self._flow_models.items():
-            if flow_value.get('src') != self.id:
-                continue
-            flow_id = flow_key[1]
-            parent_flow_ids = flow_value.get('parent_flow_id', [])
-            self.indegree_mapping[flow_id] = len(parent_flow_ids)
+        if self._dag is not None:
+            self.indegree = self._dag.indegree.tolist()
+    
+    @property
+    def indegree_mapping(self) -> Dict[int, int]:
+        """Remaining parent count of every flow this rank sends, by flow_id"""
+        if self._dag is None:
+            return {}
+        flow_ids = self._dag.flow_ids
+        return {flow_ids[i]: self.indegree[i] for i in self._view.sends}
     
     def get_non_zero_latency_packets(self) -> int:
         """Get number of non-zero latency packets
@@ -193,51 +210,63 @@ class NcclTreeFlowModel(Algorithm):
             # Update free packets
             sender_node = flow_tag.get('sender_node', 0)
             with self._g_flow_inCriticalSection:
-                self.free_packets[(channel_id, sender_node)] -= 1
+                key = (channel_id, sender_node)
+                before = self.free_packets[key]
+                self.free_packets[key] = before - 1
+                if before == 0:
+                    self.pending_receives += 1
+                elif before == 1:
+                    self.pending_receives -= 1
                 
                 # Check if all streams are finished
-                all_finished = all(count == 0 for count in self._stream_count.values())
+                all_finished = self.busy_channels == 0
             
             if all_finished:
                 self._ready(channel_id, -1)
                 self._iteratable(channel_id)
                 return
             
-            # Process next flows
-            for next_flow_id in next_flow_list:
-                if next_flow_id in self.indegree_mapping:
-                    with self._g_flow_inCriticalSection:
-                        if self.indegree_mapping[next_flow_id] > 0:
-                            self.indegree_mapping[next_flow_id] -= 1
-                            if self.indegree_mapping[next_flow_id] == 0:
-                                flow_model = self._flow_models.get((channel_id, next_flow_id))
-                                if flow_model:
-                                    self._insert_packets(channel_id, next_flow_id)
+            # Process next flows: the DAG children this rank sends
+            if self._dag is None:
+                return
+            received = self._dag.index.get((channel_id, received_flow_id))
+            if received is not None:
+                next_flows = self._view.children.get(received, ())
+            else:
+                # Flow unknown to the DAG, fall back to the list carried by the packet
+                index = self._dag.index
+                next_flows = [index[(channel_id, f)] for f in next_flow_list
+                              if (channel_id, f) in index]
+            indegree = self.indegree
+            src = self._dag.src_list
+            for i in next_flows:
+                if src[i] != self.id:
+                    continue
+                with self._g_flow_inCriticalSection:
+                    if indegree[i] > 0:
+                        indegree[i] -= 1
+                        if indegree[i] == 0:
+                            self._insert_packets(channel_id, self._dag.flow_ids[i])
             
         elif event == EventType.StreamInit:
             # Initialize streams
             self.start_time = time.time()
             
+            if self._dag is None:
+                return
+            dag = self._dag
+            view = self._view
             for i in range(self.parallel_reduce):
                 self._init_recv_ready()
                 
                 for j in range(self.m_channels):
-                    for flow_key, flow_model in self._flow_models.items():
-                        if flow_model.get('src') != self.id:
-                            continue
-                        
-                        parent_list = flow_model.get('parent_flow_id', [])
-                        if len(parent_list) == 0 and flow_model['channel_id'] == j:
-                            if flow_model.get('chunk_id', 0) == 0:
-                                qp_key = (flow_model['channel_id'], 
-                                         (flow_model['src'], flow_model['dest']))
-                                self.pQps['peer_qps'][qp_key] = 0
-                                self._insert_packets(j, flow_model['flow_id'])
-                            else:
-                                qp_key = (flow_model['channel_id'],
-                                         (flow_model['src'], flow_model['dest']))
-                                self.pQps['peer_waiting_tasks'][qp_key].append(
-                                    flow_model['flow_id'])
+                    for k in view.roots.get(j, ()):
+                        qp_key = (j, (self.id, int(dag.dest[k])))
+                        self.pQps['peer_qps'][qp_key] = 0
+                        self._insert_packets(j, dag.flow_ids[k])
+                    for k in view.waiting_roots.get(j, ()):
+                        qp_key = (j, (self.id, int(dag.dest[k])))
+                        self.pQps['peer_waiting_tasks'][qp_key].append(dag.flow_ids[k])
         
         elif event == EventType.PacketSentFinshed:
             # Handle packet sent finished event
@@ -268,23 +297,11 @@ class NcclTreeFlowModel(Algorithm):
         Returns:
             True if successful
         """
-        recv_ready_flows: Dict[Tuple[int, List], List[int]] = defaultdict(list)
-        
-        for flow_key, flow_model in self._flow_models.items():
-            if flow_model.get('src') != self.id:
-                continue
-            if flow_model.get('chunk_id', 0) != 0:
-                continue
-            if not flow_model.get('parent_flow_id', []):
-                continue
-            
-            key = (flow_model['channel_id'], tuple(flow_model.get('prev', [])))
-            recv_ready_flows[key].append(flow_model['flow_id'])
-        
-        # Process receive ready flows
-        for key, flow_ids in recv_ready_flows.items():
-            for flow_id in flow_ids:
-                self._recv_ready(key[0], flow_id)
+        if self._dag is None:
+            return True
+        dag = self._dag
+        for i in self._view.recv_ready:
+            self._recv_ready(dag.channels[i], dag.flow_ids[i])
         
         return True
     
@@ -333,6 +350,8 @@ class NcclTreeFlowModel(Algorithm):
         with self._g_flow_inCriticalSection:
             if self._stream_count[channel_id] > 0:
                 self._stream_count[channel_id] -= 1
+                if self._stream_count[channel_id] == 0:
+                    self.busy_channels -= 1
             
             if (self._stream_count[channel_id] == 0 and 
                 self.stream.state != StreamState.Dead):
@@ -361,8 +380,8 @@ class NcclTreeFlowModel(Algorithm):
             True if can continue, False otherwise
         """
         with self._g_flow_inCriticalSection:
-            all_channel_finished = all(count == 0 for count in self._stream_count.values())
-            all_packets_freed = all(count == 0 for count in self.free_packets.values())
+            all_channel_finished = self.busy_channels == 0
+            all_packets_freed = self.pending_receives == 0
         
         if all_channel_finished and all_packets_freed:
             self.exit()
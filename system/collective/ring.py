@@ -1,6 +1,6 @@
 # Ring collective algorithm - corresponds to collective/Ring.hh/cc in SimAI
 
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 import threading
 from .algorithm import Algorithm
 from ..common import ComType, EventType, InjectionPolicy, StreamState
@@ -133,6 +133,18 @@ class Ring(Algorithm):
         """
         return (self.nodes_in_ring - 1) * self.parallel_reduce * 1
     
+    def get_cost_model_terms(self) -> Tuple[int, float]:
+        """Critical-path terms of this phase for the analytical cost model
+        
+        Every one of the stream_count messages carries msg_size bytes and up
+        to parallel_reduce of them are in flight at once.
+        
+        Returns:
+            (communication rounds, bytes sent by this node over the phase)
+        """
+        rounds = -(-self.stream_count // max(self.parallel_reduce, 1))
+        return rounds, float(self.stream_count) * self.msg_size
+    
     def run(self, event: EventType, data: CallData) -> None:
         """Run the ring algorithm
         
@@ -140,6 +152,9 @@ class Ring(Algorithm):
             event: Event type
             data: Call data
         """
+        if self.cost_model is not None:
+            self.run_cost_model(event, data)
+            return
         if event == EventType.General:
             self.free_packets += 1
             self.ready()
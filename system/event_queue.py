@@ -0,0 +1,120 @@
+# Event queue - per-Sys storage of registered events, replaces the dict-of-lists in Sys
+
+import heapq
+from typing import Dict, List, Optional
+from .callable import Callable, CallData
+from .common import EventType, Tick
+
+
+class EventRecord:
+    """A registered (callable, event, data) triple
+
+    Records are recycled through the owning EventQueue's free list, so steady
+    state registration allocates nothing.
+    """
+
+    __slots__ = ("callable", "event", "data")
+
+    def __init__(self):
+        self.callable: Optional[Callable] = None
+        self.event: EventType = EventType.NONE
+        self.data: Optional[CallData] = None
+
+
+class EventQueue:
+    """Events of one Sys, bucketed by tick
+
+    Buckets live in a dict keyed by tick; a min-heap of the pending ticks
+    gives the dispatch order. Each tick is pushed to the heap exactly once,
+    when its bucket is created, and the caller is told so it can schedule
+    exactly one CallEvents callback into the network backend for that tick.
+    """
+
+    # Records allocated up front, the free list grows on demand beyond this
+    PREALLOCATED_RECORDS = 1024
+
+    def __init__(self, preallocate: int = PREALLOCATED_RECORDS):
+        """Initialize event queue
+
+        Args:
+            preallocate: Number of event records to allocate up front
+        """
+        self.buckets: Dict[Tick, List[EventRecord]] = {}
+        self.ticks: List[Tick] = []
+        self.free_records: List[EventRecord] = [EventRecord() for _ in range(preallocate)]
+        self.events_dispatched = 0
+
+    def __len__(self) -> int:
+        """Number of ticks with pending events"""
+        return len(self.buckets)
+
+    def __contains__(self, tick: Tick) -> bool:
+        return tick in self.buckets
+
+    def push(self, tick: Tick, callable_obj: Callable, event: EventType, data: CallData) -> bool:
+        """Register an event at a tick
+
+        Args:
+            tick: Tick to fire at
+            callable_obj: Callable to invoke
+            event: Event type passed to the callable
+            data: Call data passed to the callable
+
+        Returns:
+            True if this is the first event of the tick, i.e. the caller has
+            to schedule a CallEvents callback for it
+        """
+        record = self.free_records.pop() if self.free_records else EventRecord()
+        record.callable = callable_obj
+        record.event = event
+        record.data = data
+
+        bucket = self.buckets.get(tick)
+        if bucket is None:
+            self.buckets[tick] = [record]
+            heapq.heappush(self.ticks, tick)
+            return True
+        bucket.append(record)
+        return False
+
+    def next_tick(self) -> Optional[Tick]:
+        """Earliest tick with pending events, None if empty"""
+        return self.ticks[0] if self.ticks else None
+
+    def dispatch(self, tick: Tick) -> int:
+        """Invoke every event registered at or before a tick, in tick order
+
+        Events registered for the tick being dispatched while it is being
+        dispatched are appended to the live bucket and run in the same pass,
+        like iterating the std::list in Sys::call_events.
+
+        Args:
+            tick: Current tick
+
+        Returns:
+            Number of events invoked
+        """
+        count = 0
+        ticks = self.ticks
+        buckets = self.buckets
+        free_records = self.free_records
+        while ticks and ticks[0] <= tick:
+            current = ticks[0]
+            bucket = buckets[current]
+            i = 0
+            while i < len(bucket):
+                record = bucket[i]
+                i += 1
+                callable_obj, event, data = record.callable, record.event, record.data
+                record.callable = None
+                record.data = None
+                free_records.append(record)
+                try:
+                    callable_obj.call(event, data)
+                except Exception as e:
+                    print(f"Warning! a callable is removed before call: {e}")
+            del buckets[current]
+            heapq.heappop(ticks)
+            count += i
+        self.events_dispatched += count
+        return count
@@ -1,6 +1,7 @@
 # Simple memory model - corresponds to memory/SimpleMemory.hh/cc in SimAI
 
-from typing import Dict, List, Optional, Any
+import heapq
+from typing import Dict, List, Optional, Any, Tuple
 from ..common import Tick
 
 
@@ -30,7 +31,12 @@ class MemoryRequest:
 
 
 class MemoryBank:
-    """Memory bank representation"""
+    """Memory bank representation
+
+    pending_requests is a min-heap of (-priority, arrival_time, sequence,
+    request) entries: higher priority first, then earlier arrival, then
+    issue order.
+    """
     
     def __init__(self, bank_id: int, capacity: int, bandwidth: float):
         """Initialize memory bank
@@ -44,26 +50,50 @@ class MemoryBank:
         self.capacity = capacity
         self.bandwidth = bandwidth
         self.current_utilization = 0.0
-        self.pending_requests: List[MemoryRequest] = []
+        self.pending_requests: List[Tuple[int, Tick, int, MemoryRequest]] = []
         self.active_request: Optional[MemoryRequest] = None
         self.total_accesses = 0
         self.total_bytes_transferred = 0
+        self.sequence = 0
+
+    def push(self, request: MemoryRequest) -> None:
+        """Queue a request behind those of higher priority or earlier arrival"""
+        heapq.heappush(self.pending_requests,
+                       (-request.priority, request.arrival_time, self.sequence, request))
+        self.sequence += 1
+
+    def pop(self) -> Optional[MemoryRequest]:
+        """Next request to serve, None when nothing is pending"""
+        if not self.pending_requests:
+            return None
+        return heapq.heappop(self.pending_requests)[3]
 
 
 class SimpleMemory:
     """Simple memory model implementation
     
     Corresponds to memory/SimpleMemory.hh/cc in SimAI
+
+    Event driven: every busy bank has one entry (completion_time, bank_id)
+    in a global heap, and advance_time retires all completions due up to
+    the new time in order, starting each bank's next request at the moment
+    the previous one finished. Completed requests are indexed by request ID
+    and only the most recent completed_retention of them are kept.
     """
     
+    # Completed requests kept for is_request_complete/get_request_latency
+    DEFAULT_COMPLETED_RETENTION = 1 << 20
+    
     def __init__(self, total_capacity: int = 1024*1024*1024, 
-                 num_banks: int = 4, bandwidth_per_bank: float = 1000.0):
+                 num_banks: int = 4, bandwidth_per_bank: float = 1000.0,
+                 completed_retention: Optional[int] = DEFAULT_COMPLETED_RETENTION):
         """Initialize simple memory model
         
         Args:
             total_capacity: Total memory capacity in bytes
             num_banks: Number of memory banks
             bandwidth_per_bank: Bandwidth per bank in bytes per tick
+            completed_retention: Completed requests to keep, None keeps all
         """
         self.total_capacity = total_capacity
         self.num_banks = num_banks
@@ -95,7 +125,11 @@ class SimpleMemory:
         
         # Queue management
         self.request_queue: List[MemoryRequest] = []
-        self.completed_requests: List[MemoryRequest] = []
+        self.completion_heap: List[Tuple[Tick, int]] = []  # (completion_time, bank_id)
+        self.outstanding: Dict[int, MemoryRequest] = {}    # pending or active, by request ID
+        self.completed_requests: Dict[int, MemoryRequest] = {}
+        self.completed_retention = completed_retention
+        self.total_completed = 0
     
     def read(self, address: int, size: int, priority: int = 0) -> int:
         """Initiate a memory read operation
@@ -112,6 +146,7 @@ class SimpleMemory:
         request = MemoryRequest(request_id, address, size, True, priority)
         request.arrival_time = self.current_time
         
+        self.outstanding[request_id] = request
         self._schedule_request(request)
         self.total_requests += 1
         self.total_read_requests += 1
@@ -135,6 +170,7 @@ class SimpleMemory:
         request.arrival_time = self.current_time
         request.data = data
         
+        self.outstanding[request_id] = request
         self._schedule_request(request)
         self.total_requests += 1
         self.total_write_requests += 1
@@ -160,13 +196,8 @@ class SimpleMemory:
         bank_id = self._get_bank_for_address(request.address)
         bank = self.banks[bank_id]
         
-        # Add to bank's pending requests
-        bank.pending_requests.append(request)
-        
-        # Sort by priority and arrival time
-        bank.pending_requests.sort(
-            key=lambda r: (-r.priority, r.arrival_time)
-        )
+        # Add to bank's pending requests, ordered by priority and arrival time
+        bank.push(request)
         
         # Process requests if bank is idle
         self._process_bank_requests(bank)
@@ -193,12 +224,10 @@ class SimpleMemory:
         if bank.active_request is not None:
             return
         
-        # If no pending requests, return
-        if not bank.pending_requests:
+        # Get next request, return if none is pending
+        request = bank.pop()
+        if request is None:
             return
-        
-        # Get next request
-        request = bank.pending_requests.pop(0)
         bank.active_request = request
         
         # Calculate completion time
@@ -249,30 +278,33 @@ class SimpleMemory:
             request: Memory request
             bank: Memory bank
         """
-        # In a real simulation, this would schedule an event
-        # For now, we'll mark it as ready to complete
-        pass
+        heapq.heappush(self.completion_heap, (request.completion_time, bank.bank_id))
     
     def advance_time(self, new_time: Tick) -> None:
         """Advance simulation time and process completions
         
+        Retires every request that completes up to new_time, in completion
+        order (bank ID breaks ties). A bank starts its next request at the
+        completion time of the previous one, so O(k log n) for k completions.
+        
         Args:
             new_time: New simulation time
         """
-        self.current_time = new_time
+        heap = self.completion_heap
+        banks = self.banks
+        while heap and heap[0][0] <= new_time:
+            completion_time, bank_id = heapq.heappop(heap)
+            bank = banks[bank_id]
+            self.current_time = max(self.current_time, completion_time)
+            
+            # Complete the request
+            self._complete_request(bank.active_request, bank)
+            bank.active_request = None
+            
+            # Process next request
+            self._process_bank_requests(bank)
         
-        # Check for completed requests
-        for bank in self.banks:
-            if (bank.active_request and 
-                bank.active_request.completion_time and
-                bank.active_request.completion_time <= self.current_time):
-                
-                # Complete the request
-                self._complete_request(bank.active_request, bank)
-                bank.active_request = None
-                
-                # Process next request
-                self._process_bank_requests(bank)
+        self.current_time = max(self.current_time, new_time)
     
     def _complete_request(self, request: MemoryRequest, bank: MemoryBank) -> None:
         """Complete a memory request
@@ -295,8 +327,13 @@ class SimpleMemory:
             latency = self.current_time - request.arrival_time
             self._update_average_latency(latency)
         
-        # Add to completed requests
-        self.completed_requests.append(request)
+        # Index the completed request, dropping the oldest beyond the retention cap
+        self.outstanding.pop(request.request_id, None)
+        completed = self.completed_requests
+        completed[request.request_id] = request
+        self.total_completed += 1
+        if self.completed_retention is not None and len(completed) > self.completed_retention:
+            del completed[next(iter(completed))]
     
     def _update_average_latency(self, latency: Tick) -> None:
         """Update average latency statistics
@@ -318,9 +355,9 @@ class SimpleMemory:
             request_id: Request ID to check
             
         Returns:
-            True if request is complete
+            True if request is complete, including requests beyond the retention cap
         """
-        return any(req.request_id == request_id for req in self.completed_requests)
+        return 0 < request_id <= self.next_request_id and request_id not in self.outstanding
     
     def get_request_latency(self, request_id: int) -> Optional[Tick]:
         """Get latency for a completed request
@@ -329,12 +366,12 @@ class SimpleMemory:
             request_id: Request ID
             
         Returns:
-            Request latency, or None if not found or not complete
+            Request latency, or None if not found, not complete or no longer retained
         """
-        for request in self.completed_requests:
-            if request.request_id == request_id and request.completion_time:
-                return request.completion_time - request.arrival_time
-        return None
+        request = self.completed_requests.get(request_id)
+        if request is None or request.completion_time is None:
+            return None
+        return request.completion_time - request.arrival_time
     
     def get_memory_utilization(self) -> float:
         """Get overall memory utilization
@@ -370,7 +407,7 @@ class SimpleMemory:
             'average_latency': self.average_latency,
             'memory_utilization': self.get_memory_utilization(),
             'pending_requests': sum(len(bank.pending_requests) for bank in self.banks),
-            'completed_requests': len(self.completed_requests)
+            'completed_requests': self.total_completed
         }
     
     def reset(self) -> None:
@@ -382,6 +419,7 @@ class SimpleMemory:
             bank.total_accesses = 0
             bank.total_bytes_transferred = 0
             bank.current_utilization = 0.0
+            bank.sequence = 0
         
         # Reset statistics
         self.total_requests = 0
@@ -393,7 +431,10 @@ class SimpleMemory:
         
         # Reset queues
         self.request_queue.clear()
+        self.completion_heap.clear()
+        self.outstanding.clear()
         self.completed_requests.clear()
+        self.total_completed = 0
         self.memory_map.clear()
         
         # Reset time
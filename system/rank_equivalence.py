@@ -0,0 +1,202 @@
+# Rank equivalence classes - simulate one representative Sys per class of symmetric ranks
+
+import os
+from typing import List, Tuple, TYPE_CHECKING
+
+from .common import CollectiveImplementationType
+
+if TYPE_CHECKING:
+    from .sys import Sys
+
+
+class RankEquivalence:
+    """Equivalence classes of NPUs that behave identically in a symmetric job
+
+    Every NPU of a pipeline stage runs the same workload on the same kind of
+    server, so within a stage the ranks only differ by their position. The
+    position is decomposed into mixed-radix digits (rank inside the TP group,
+    rank inside the EP group, DP index), and the group of symmetries is the
+    product of the cyclic groups over those digits. One representative per
+    stage (position 0) is simulated; a message the representative sends to a
+    peer at position p is mirrored into the message the representative itself
+    receives from position -p, which is exact as long as the configuration is
+    symmetric. Nodes past the GPUs (NVSwitches) are always their own class.
+
+    When the configuration is not symmetric every rank is its own class, so
+    deduplication degrades to simulating every NPU.
+
+    Limits of the approximation:
+    - Mirroring is exact only when the traffic pattern of the job is invariant
+      under the group. A ring over the whole class is (radices [1, n]).
+      Halving-doubling, or a ring over several TP digits, is not.
+    - Only the representatives inject traffic. On a packet-level backend the
+      result is therefore a lower bound. Switch links shared with
+      non-simulated ranks carry less load, and even a representative's own
+      host links lose the traffic of its peers (e.g. their ACKs). The gap is
+      small when all ranks hang off one switch and grows with the cross
+      traffic (see examples/rank_dedup_check.py). Deduplication stays opt-in
+      (AS_RANK_DEDUP).
+    - NcclFlowModel messages cannot be mirrored. Their flow tag carries the
+      original sender, receiver and flow id, and the receiver indexes its
+      per-channel state with them. can_mirror() refuses such systems.
+    """
+
+    def __init__(self, num_nodes: int, num_gpus: int, stage_size: int, radices: List[int]):
+        """Initialize rank equivalence
+
+        Args:
+            num_nodes: Number of simulated nodes (GPUs followed by NVSwitches)
+            num_gpus: Number of GPUs
+            stage_size: GPUs per equivalence class, 1 disables deduplication
+            radices: Mixed-radix decomposition of a position inside a class,
+                least significant first; their product is stage_size
+        """
+        self.num_nodes = num_nodes
+        self.num_gpus = num_gpus
+        self.stage_size = stage_size
+        self.radices = radices[:]
+
+    @classmethod
+    def detect(cls, num_nodes: int, num_gpus: int, gpus_per_server: int,
+               model_parallel_npu_group: int = 1, expert_parallel_npu_group: int = 1,
+               pipeline_model_parallelism: int = 1) -> 'RankEquivalence':
+        """Detect equivalence classes from the topology and the parallelism policy
+
+        Args:
+            num_nodes: Number of simulated nodes (physical_dims)
+            num_gpus: Number of GPUs (all_gpus)
+            gpus_per_server: GPUs per server
+            model_parallel_npu_group: TP group size
+            expert_parallel_npu_group: EP group size
+            pipeline_model_parallelism: Number of pipeline stages
+
+        Returns:
+            Equivalence classes, one class per rank if the job is not symmetric
+        """
+        tp = max(model_parallel_npu_group, 1)
+        ep = max(expert_parallel_npu_group, 1)
+        pp = max(pipeline_model_parallelism, 1)
+
+        if not cls._is_symmetric(num_gpus, gpus_per_server, tp, ep, pp):
+            return cls(num_nodes, num_gpus, 1, [1])
+
+        stage_size = num_gpus // pp
+        radices = [tp]
+        rest = stage_size // tp
+        if ep > 1 and rest % ep == 0:
+            radices.append(ep)
+            rest //= ep
+        radices.append(rest)
+        return cls(num_nodes, num_gpus, stage_size, radices)
+
+    @staticmethod
+    def _is_symmetric(num_gpus: int, gpus_per_server: int, tp: int, ep: int, pp: int) -> bool:
+        """Check that servers, pipeline stages and TP/EP groups tile the GPUs evenly"""
+        if num_gpus <= 0 or gpus_per_server <= 0 or num_gpus % gpus_per_server != 0:
+            return False
+        if num_gpus % pp != 0:
+            return False
+        stage_size = num_gpus // pp
+        if stage_size % gpus_per_server != 0 and gpus_per_server % stage_size != 0:
+            return False
+        for group in (tp, ep):
+            if stage_size % group != 0:
+                return False
+            if group % gpus_per_server != 0 and gpus_per_server % group != 0:
+                return False
+        return True
+
+    @staticmethod
+    def enabled_from_env() -> bool:
+        """Whether deduplication is requested through AS_RANK_DEDUP (off by default)"""
+        return os.getenv("AS_RANK_DEDUP", "0").lower() in ("1", "true", "yes")
+
+    @staticmethod
+    def can_mirror(system: 'Sys') -> bool:
+        """Whether the messages of a system can be mirrored onto a representative
+
+        Args:
+            system: Any simulated system of the job (all share the same inputs)
+
+        Returns:
+            False if a collective of the system uses NcclFlowModel
+        """
+        for implementations in (system.all_reduce_implementation_per_dimension,
+                                system.reduce_scatter_implementation_per_dimension,
+                                system.all_gather_implementation_per_dimension,
+                                system.all_to_all_implementation_per_dimension):
+            for implementation in implementations:
+                if implementation.type == CollectiveImplementationType.NcclFlowModel:
+                    return False
+        return True
+
+    @property
+    def num_classes(self) -> int:
+        """Number of equivalence classes"""
+        return self.num_gpus // self.stage_size + (self.num_nodes - self.num_gpus)
+
+    @property
+    def representatives(self) -> List[int]:
+        """Ranks that are simulated, one per class, in ascending order"""
+        reps = list(range(0, self.num_gpus, self.stage_size))
+        reps.extend(range(self.num_gpus, self.num_nodes))
+        return reps
+
+    def class_of(self, rank: int) -> int:
+        """Get the equivalence class of a rank"""
+        if rank >= self.num_gpus:
+            return self.num_gpus // self.stage_size + (rank - self.num_gpus)
+        return rank // self.stage_size
+
+    def representative(self, rank: int) -> int:
+        """Get the representative of the class of a rank"""
+        if rank >= self.num_gpus:
+            return rank
+        return rank - rank % self.stage_size
+
+    def is_representative(self, rank: int) -> bool:
+        """Check whether a rank is simulated"""
+        return self.representative(rank) == rank
+
+    def _negate_position(self, position: int) -> int:
+        """Inverse of a position in the product of cyclic groups over the radices"""
+        result = 0
+        weight = 1
+        for radix in self.radices:
+            digit = position % radix
+            position //= radix
+            result += ((radix - digit) % radix) * weight
+            weight *= radix
+        return result
+
+    def mirror(self, src: int, dst: int) -> Tuple[int, int]:
+        """Mirror a message onto the representative of its receiver
+
+        A representative sending to a non-simulated peer at position p of its
+        class stands for the message the peer's representative receives from
+        position -p of the sender's class.
+
+        Args:
+            src: Sending rank
+            dst: Receiving rank
+
+        Returns:
+            (mirrored source, representative receiving the message)
+        """
+        if dst >= self.num_gpus or src >= self.num_gpus or self.is_representative(dst):
+            return src, dst
+        position = dst % self.stage_size
+        mirrored_src = self.representative(src) + self._add_positions(
+            src % self.stage_size, self._negate_position(position))
+        return mirrored_src, self.representative(dst)
+
+    def _add_positions(self, a: int, b: int) -> int:
+        """Digit-wise sum of two positions in the product of cyclic groups"""
+        result = 0
+        weight = 1
+        for radix in self.radices:
+            result += ((a % radix + b % radix) % radix) * weight
+            a //= radix
+            b //= radix
+            weight *= radix
+        return result
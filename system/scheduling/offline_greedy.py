@@ -1,6 +1,6 @@
 # Offline greedy scheduler - corresponds to scheduling/OfflineGreedy.hh/cc in SimAI
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Tuple
 import math
 from ..common import Tick, ComType, InterDimensionScheduling
 
@@ -40,6 +40,12 @@ class OfflineGreedy:
     schedule_consumer: Dict[int, int] = {}
     global_chunk_size: Dict[int, int] = {}
     
+    # 共享调度备忘表：(chunk大小, 维度大小, 带宽, 通信类型, 负载状态...) -> (维度顺序, chunk大小, 新负载状态)
+    schedule_memo: Dict[tuple, Tuple[Tuple[int, ...], Optional[int], Tuple[Tuple[int, float], ...]]] = {}
+    MEMO_CAPACITY = 1 << 16
+    memo_hits = 0
+    memo_misses = 0
+    
     def __init__(self, sys):
         """初始化离线贪心调度器
         
@@ -68,6 +74,10 @@ class OfflineGreedy:
                     self.dim_BW[i] = sys.NI.get_BW_at_dimension(i)
                 self.dim_elapsed_time.append(DimElapsedTime(i))
         
+        # 备忘表键中的配置部分
+        self.dim_size_key = tuple(self.dim_size)
+        self.dim_BW_key = tuple(self.dim_BW)
+        
         # 打印配置信息（仅在节点0上）
         if sys.id == 0:
             print("Themis is configured with the following parameters:")
@@ -168,6 +178,158 @@ class OfflineGreedy:
         if comm_type == ComType.All_Reduce:
             comm_type = ComType.Reduce_Scatter
         
+        order, grant = self.lookup_schedule(
+            remaining_data_size, recommended_chunk_size,
+            dimensions_involved, inter_dim_scheduling, comm_type
+        )
+        
+        if grant is not None:
+            granted = min(remaining_data_size, grant)
+            self.global_chunk_size[chunk_id] = granted
+            remaining_data_size -= granted
+        
+        result = list(order)
+        self.chunk_schedule[chunk_id] = result[:]
+        self.schedule_consumer[chunk_id] = 1
+        remaining_data_size_ref[0] = remaining_data_size
+        
+        return result
+    
+    def _loads(self) -> Tuple[Tuple[int, float], ...]:
+        """当前负载状态快照：按当前排列顺序的(维度编号, 耗时)"""
+        return tuple((dim.dim_num, dim.elapsed_time) for dim in self.dim_elapsed_time)
+    
+    def _set_loads(self, loads: Tuple[Tuple[int, float], ...]) -> None:
+        """恢复负载状态快照（DimElapsedTime对象可互换，直接覆盖字段）"""
+        for dim, (dim_num, elapsed_time) in zip(self.dim_elapsed_time, loads):
+            dim.dim_num = dim_num
+            dim.elapsed_time = elapsed_time
+    
+    def lookup_schedule(
+        self,
+        remaining_data_size: int,
+        recommended_chunk_size: int,
+        dimensions_involved: List[bool],
+        inter_dim_scheduling: InterDimensionScheduling,
+        comm_type: ComType
+    ) -> Tuple[Tuple[int, ...], Optional[int]]:
+        """查备忘表得到一个chunk的维度顺序，未命中时计算并记录
+        
+        贪心调度是有状态的：结果取决于之前的chunk累积的维度负载，所以键里
+        除了chunk大小、维度大小、带宽和通信类型，还包含当前负载状态。命中时
+        直接把负载状态切换到记录的结果状态，与重新计算完全一致。
+        剩余数据量只通过min(剩余, 推荐chunk大小)影响调度，键里只放这个值。
+        
+        Args:
+            remaining_data_size: 剩余数据大小
+            recommended_chunk_size: 推荐的chunk大小
+            dimensions_involved: 涉及的维度标志
+            inter_dim_scheduling: 维度间调度策略
+            comm_type: 通信类型（All_Reduce已转换为Reduce_Scatter）
+            
+        Returns:
+            (维度顺序, 未截断的chunk大小)，后者为None表示没有分配数据
+        """
+        key = (
+            recommended_chunk_size,
+            min(remaining_data_size, recommended_chunk_size),
+            self.dim_size_key,
+            self.dim_BW_key,
+            tuple(dimensions_involved),
+            inter_dim_scheduling,
+            comm_type,
+            self._loads()
+        )
+        entry = self.schedule_memo.get(key)
+        if entry is not None:
+            OfflineGreedy.memo_hits += 1
+            self._set_loads(entry[2])
+            return entry[0], entry[1]
+        
+        OfflineGreedy.memo_misses += 1
+        order, grant = self._schedule_chunk(
+            remaining_data_size, recommended_chunk_size,
+            dimensions_involved, inter_dim_scheduling, comm_type
+        )
+        if len(self.schedule_memo) >= self.MEMO_CAPACITY:
+            self.schedule_memo.clear()
+        self.schedule_memo[key] = (tuple(order), grant, self._loads())
+        return tuple(order), grant
+    
+    def precompute(self, collectives: Iterable[Tuple[ComType, int, List[bool]]]) -> int:
+        """批量预计算工作负载会发起的每个集合通信的全部chunk调度
+        
+        从重置后的负载开始，按generate_collective的切分方式逐个chunk查表，
+        把结果填进备忘表，运行时同样大小的集合通信全部命中。完成后恢复原负载。
+        
+        Args:
+            collectives: (通信类型, 数据大小, 涉及的维度标志)序列
+            
+        Returns:
+            新计算的调度数
+        """
+        inter_dim_scheduling = self.sys.inter_dimension_scheduling
+        saved_loads = self._loads()
+        misses = OfflineGreedy.memo_misses
+        seen = set()
+        
+        for comm_type, size, dimensions_involved in collectives:
+            if size <= 0 or comm_type in (ComType.None_, ComType.All_to_All):
+                continue
+            if comm_type == ComType.All_Reduce:
+                comm_type = ComType.Reduce_Scatter
+            key = (comm_type, size, tuple(dimensions_involved))
+            if key in seen:
+                continue
+            seen.add(key)
+            
+            recommended_chunk_size = self.sys.determine_chunk_size(size, comm_type)
+            self.reset_loads()
+            remaining_data_size = size
+            while remaining_data_size > 0:
+                _, grant = self.lookup_schedule(
+                    remaining_data_size, recommended_chunk_size,
+                    dimensions_involved, inter_dim_scheduling, comm_type
+                )
+                if grant is None:
+                    break
+                remaining_data_size -= min(remaining_data_size, grant)
+        
+        self._set_loads(saved_loads)
+        return OfflineGreedy.memo_misses - misses
+    
+    def precompute_workload(self, workload) -> int:
+        """预计算工作负载中所有层的前向、输入梯度、权重梯度通信
+        
+        Args:
+            workload: Workload对象
+            
+        Returns:
+            新计算的调度数
+        """
+        collectives = []
+        for layer in workload.layers:
+            collectives.append((layer.fwd_pass_comm_type, layer.fwd_pass_comm_size,
+                                layer.fwd_pass_comm_involved_dimensions))
+            collectives.append((layer.input_grad_comm_type, layer.input_grad_comm_size,
+                                layer.input_grad_comm_involved_dimensions))
+            collectives.append((layer.weight_grad_comm_type, layer.weight_grad_comm_size,
+                                layer.weight_grad_comm_involved_dimensions))
+        return self.precompute(collectives)
+    
+    def _schedule_chunk(
+        self,
+        remaining_data_size: int,
+        recommended_chunk_size: int,
+        dimensions_involved: List[bool],
+        inter_dim_scheduling: InterDimensionScheduling,
+        comm_type: ComType
+    ) -> Tuple[List[int], Optional[int]]:
+        """在当前负载上贪心计算一个chunk的维度顺序并更新负载
+        
+        Returns:
+            (维度顺序, 未截断的chunk大小)，后者为None表示没有分配数据
+        """
         # 排序维度耗时
         self.dim_elapsed_time.sort()
         
@@ -178,10 +340,10 @@ class OfflineGreedy:
         result = []
         chunk_size = recommended_chunk_size
         chunk_size_calculated = False
+        grant = None
         
         if inter_dim_scheduling == InterDimensionScheduling.OfflineGreedy:
-            self.global_chunk_size[chunk_id] = min(remaining_data_size, chunk_size)
-            remaining_data_size -= min(remaining_data_size, chunk_size)
+            grant = chunk_size
         
         dim_elapsed_time_pointer = -1
         
@@ -228,12 +390,8 @@ class OfflineGreedy:
                 if chunk_size < recommended_chunk_size:
                     # 使用默认顺序
                     result = list(range(len(self.dim_elapsed_time)))
-                    self.global_chunk_size[chunk_id] = min(remaining_data_size, recommended_chunk_size)
+                    grant = recommended_chunk_size
                     chunk_size = min(remaining_data_size, recommended_chunk_size)
-                    remaining_data_size -= min(remaining_data_size, recommended_chunk_size)
-                    
-                    self.chunk_schedule[chunk_id] = result[:]
-                    self.schedule_consumer[chunk_id] = 1
                     
                     # 重新排序
                     my_reordered = [None] * len(self.dim_elapsed_time)
@@ -268,11 +426,9 @@ class OfflineGreedy:
                             )
                             chunk_size *= self.dim_size[my_dim]
                     
-                    remaining_data_size_ref[0] = remaining_data_size
-                    return result
+                    return result, grant
                 else:
-                    self.global_chunk_size[chunk_id] = min(remaining_data_size, chunk_size)
-                    remaining_data_size -= min(remaining_data_size, chunk_size)
+                    grant = chunk_size
             
             # OfflineGreedy逻辑
             elif (inter_dim_scheduling == InterDimensionScheduling.OfflineGreedy and
@@ -311,8 +467,6 @@ class OfflineGreedy:
                 if diff_size < (recommended_chunk_size // 16):
                     # 使用默认顺序
                     result = list(range(len(self.dim_elapsed_time)))
-                    self.chunk_schedule[chunk_id] = result[:]
-                    self.schedule_consumer[chunk_id] = 1
                     
                     # 重新排序
                     my_reordered = [None] * len(self.dim_elapsed_time)
@@ -347,8 +501,7 @@ class OfflineGreedy:
                             )
                             chunk_size *= self.dim_size[my_dim]
                     
-                    remaining_data_size_ref[0] = remaining_data_size
-                    return result
+                    return result, grant
             
             # 正常调度逻辑
             result.append(dim.dim_num)
@@ -368,8 +521,4 @@ class OfflineGreedy:
                 )
                 chunk_size *= self.dim_size[dim.dim_num]
         
-        self.chunk_schedule[chunk_id] = result[:]
-        self.schedule_consumer[chunk_id] = 1
-        remaining_data_size_ref[0] = remaining_data_size
-        
-        return result 
\ No newline at end of file
+        return result, grant 
\ No newline at end of file
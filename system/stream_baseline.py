@@ -54,6 +54,11 @@ class StreamBaseline(BaseStream):
         # 设置初始化标志
         self.initialized = True
         
+        # 已初始化的流排在所属队列中所有未初始化的流之前
+        active_streams = getattr(self.owner, 'active_Streams', None)
+        if active_streams and self.current_queue_id in active_streams:
+            active_streams[self.current_queue_id].promote(self)
+        
         # 记录last_init时间 - 对应C++版本的Sys::boostedTick()
         if hasattr(self.owner, 'boosted_tick'):
             self.last_init = self.owner.boosted_tick()
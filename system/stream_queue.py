@@ -0,0 +1,108 @@
+# Stream queue - indexed replacement for the std::list<BaseStream*> queues of Sys
+
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
+from .base_stream import BaseStream
+
+
+class StreamQueue:
+    """Streams ordered by priority, indexed by stream_num
+
+    Backs Sys.ready_list and the per-queue lists of Sys.active_Streams. A
+    min-heap holds [priority, sequence, stream] entries, where the sequence
+    number breaks priority ties in insertion order, and a dict maps each
+    stream_num to its heap entry. Push and pop are O(log n); membership and
+    removal are O(1), since removal only clears the entry and the heap skips
+    dead entries lazily.
+    """
+
+    # Rebuild the heap when dead entries outnumber live ones by this factor
+    COMPACT_RATIO = 2
+    COMPACT_MIN_DEAD = 64
+
+    def __init__(self):
+        self.heap: List[list] = []
+        self.entries: Dict[int, list] = {}
+        self.sequence = 0
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
+
+    def __contains__(self, stream: BaseStream) -> bool:
+        return stream.stream_num in self.entries
+
+    def __iter__(self) -> Iterator[BaseStream]:
+        """Iterate live streams in priority order"""
+        for entry in sorted(e for e in self.heap if e[2] is not None):
+            yield entry[2]
+
+    def push(self, stream: BaseStream, priority: Tuple = ()) -> None:
+        """Insert a stream; among equal priorities earlier pushes come first
+
+        Args:
+            stream: Stream to insert, replacing any entry with the same stream_num
+            priority: Sort key, smaller is served first
+        """
+        self.remove(stream)
+        entry = [priority, self.sequence, stream]
+        self.sequence += 1
+        self.entries[stream.stream_num] = entry
+        heapq.heappush(self.heap, entry)
+
+    def remove(self, stream: BaseStream) -> bool:
+        """Remove a stream by stream_num
+
+        Returns:
+            True if the stream was queued
+        """
+        entry = self.entries.pop(stream.stream_num, None)
+        if entry is None:
+            return False
+        entry[2] = None
+        self.dead += 1
+        if self.dead > self.COMPACT_MIN_DEAD and self.dead > self.COMPACT_RATIO * len(self.entries):
+            self.heap = [e for e in self.heap if e[2] is not None]
+            heapq.heapify(self.heap)
+            self.dead = 0
+        return True
+
+    def promote(self, stream: BaseStream) -> bool:
+        """Move a stream ahead of every stream whose key starts with True
+
+        Sys.insert_stream leads SmallestFirst and LessRemainingPhaseFirst keys
+        with (not initialized); an initialized stream is re-keyed here with its
+        original sequence number, so it keeps its place among initialized
+        streams and nothing inserted later sorts in front of it.
+
+        Returns:
+            True if the stream was queued
+        """
+        entry = self.entries.get(stream.stream_num)
+        if entry is None or not entry[0] or entry[0][0] is False:
+            return entry is not None
+        priority, sequence = (False,) + entry[0][1:], entry[1]
+        self.remove(stream)
+        entry = [priority, sequence, stream]
+        self.entries[stream.stream_num] = entry
+        heapq.heappush(self.heap, entry)
+        return True
+
+    def front(self) -> Optional[BaseStream]:
+        """Highest-priority stream, None when empty"""
+        heap = self.heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+            self.dead -= 1
+        return heap[0][2] if heap else None
+
+    def pop(self) -> Optional[BaseStream]:
+        """Remove and return the highest-priority stream, None when empty"""
+        stream = self.front()
+        if stream is not None:
+            heapq.heappop(self.heap)
+            del self.entries[stream.stream_num]
+        return stream
@@ -27,6 +27,11 @@ from .queue_levels import QueueLevels
 from .topology.logical_topology import LogicalTopology
 from .topology.basic_logical_topology import BasicLogicalTopology
 from .scheduling.offline_greedy import OfflineGreedy
+from .collective.cost_model import CollectiveCostModel
+from .event_queue import EventQueue
+from .stream_queue import StreamQueue
+from .basic_event_handler_data import BasicEventHandlerData
+from .mock_nccl_log import MockNcclLog, NcclLogLevel
 from .common import CollectiveImplementation
 from .mock_nccl_comm import MockNcclComm
 from .AstraNetworkAPI import SimRequest as sim_request, TimeSpec as timespec_t
@@ -153,6 +158,7 @@ class Sys(Callable):
         self.memBus: Optional[MemBus] = None
         self.vLevels: Optional[QueueLevels] = None
         self.offline_greedy: Optional[OfflineGreedy] = None
+        self.collective_cost_model: Optional[CollectiveCostModel] = None
         
         # System state variables
         self.finished_workloads = 0
@@ -219,6 +225,7 @@ class Sys(Callable):
         self.inp_G = 0.0
         self.inp_model_shared_bus = 0
         self.inp_boost_mode = 0
+        self.inp_collective_cost_model = 0
         self.model_shared_bus = False
         
         # Collections implementations (will be initialized in post_process_inputs)
@@ -228,13 +235,13 @@ class Sys(Callable):
         self.all_to_all_implementation_per_dimension: List[CollectiveImplementation] = []
         
         # Data structures
-        self.ready_list: List[BaseStream] = []
+        self.ready_list = StreamQueue()
         self.running_list: List[StreamBaseline] = []  # PHY_MTP
-        self.active_Streams: Dict[int, List[BaseStream]] = {}
+        self.active_Streams: Dict[int, StreamQueue] = {}
         self.stream_priorities: Dict[int, List[int]] = {}
         self.registered_for_finished_stream_event: List[Callable] = []
         self.logical_topologies: Dict[str, LogicalTopology] = {}
-        self.event_queue: Dict[Tick, List[Tuple[Callable, EventType, CallData]]] = {}
+        self.event_queue = EventQueue()
         self.pending_sends: Dict[Tuple[int, int], List[SimSendCaller]] = {}
         self.is_there_pending_sends: Dict[Tuple[int, int], bool] = {}
         
@@ -262,6 +269,13 @@ class Sys(Callable):
         self.inp_reduce_scatter_implementation = "NcclFlowModel"
         self.inp_all_to_all_implementation = "NcclFlowModel"
         self.inp_collective_optimization = "baseline"
+        implementation = CollectiveCostModel.implementation_from_env()
+        if implementation:
+            self.inp_all_reduce_implementation = implementation
+            self.inp_all_gather_implementation = implementation
+            self.inp_reduce_scatter_implementation = implementation
+        if CollectiveCostModel.enabled_from_env():
+            self.inp_collective_cost_model = 1
         
         # Post process inputs (like in C++)
         result = self.post_process_inputs()
@@ -289,7 +303,7 @@ class Sys(Callable):
                 self.total_nodes *= physical_dims[current_dim]
             
             for j in range(queues_per_dim[current_dim]):
-                self.active_Streams[element] = []
+                self.active_Streams[element] = StreamQueue()
                 self.stream_priorities[element] = []
                 element += 1
 
@@ -369,6 +383,17 @@ class Sys(Callable):
         if (self.inter_dimension_scheduling == InterDimensionScheduling.OfflineGreedy or
             self.inter_dimension_scheduling == InterDimensionScheduling.OfflineGreedyFlex):
             self.offline_greedy = OfflineGreedy(self)
+            # 只有节点0计算调度，提前填好整个工作负载的调度备忘表
+            if self.id == 0:
+                self.offline_greedy.precompute_workload(self.workload)
+
+        # Initialize closed-form collective cost model if requested
+        if self.inp_collective_cost_model == 1:
+            self.collective_cost_model = CollectiveCostModel.from_sys(self)
+            if self.analytical_mode and self.id == 0:
+                MockNcclLog.getInstance().writeLog(
+                    NcclLogLevel.WARNING,
+                    "collective cost model has no effect on the analytical backend: it does not generate collective phases")
 
         self.initialized = True
 
@@ -415,9 +440,7 @@ class Sys(Callable):
         """Register zero latency event - corresponds to Sys::zero_latecy_register_event"""
         mycycles = 0
         current_tick = self.boostedTick() + mycycles
-        if current_tick not in self.event_queue:
-            self.event_queue[current_tick] = []
-        self.event_queue[current_tick].append((callable_obj, event, callData))
+        self.event_queue.push(current_tick, callable_obj, event, callData)
         self.pending_events += 1
 
     def register_event(self, callable_obj: Callable, event: EventType,
@@ -434,28 +457,16 @@ class Sys(Callable):
         Returns:
             bool: True if the counter should be cleared (simulating C++ reference behavior)
         """
-        should_schedule = False
         current_tick = self.boostedTick() + cycles
         
-        # 添加日志
-        from system.mock_nccl_log import MockNcclLog, NcclLogLevel
-        log = MockNcclLog.getInstance()
-        log.writeLog(NcclLogLevel.INFO, f"try_register_event EventType {event} at tick {current_tick}")
-        
-        # 关键修复：所有事件都通过event_queue处理，对应C++版本
-        if current_tick not in self.event_queue:
-            self.event_queue[current_tick] = []
-            should_schedule = True
-            
-        self.event_queue[current_tick].append((callable_obj, event, callData))
+        # 所有事件都通过event_queue处理，对应C++版本；每个tick只在首次注册时调度一次CallEvents
+        should_schedule = self.event_queue.push(current_tick, callable_obj, event, callData)
         self.pending_events += 1
         
         # 调度CallEvents事件到AnaSim，对应C++版本
         if should_schedule and self.NI:
             tmp = self.generate_time(int(cycles))
-            from system.basic_event_handler_data import BasicEventHandlerData
             data = BasicEventHandlerData(self, EventType.CallEvents)
-            log.writeLog(NcclLogLevel.INFO, f"调度CallEvents到AnaSim，延迟: {cycles}")
             self.NI.sim_schedule(tmp, Sys.handleEvent, data)
         
         # 返回True表示调用者应该清零counter，模拟C++版本的 cycles = 0 行为
@@ -468,16 +479,7 @@ class Sys(Callable):
         if current_tick not in self.event_queue:
             return
             
-        events_to_process = self.event_queue[current_tick][:]
-        for callable_obj, event, call_data in events_to_process:
-            try:
-                self.pending_events -= 1
-                callable_obj.call(event, call_data)
-            except Exception as e:
-                print(f"Warning! a callable is removed before call: {e}")
-                
-        if current_tick in self.event_queue:
-            del self.event_queue[current_tick]
+        self.pending_events -= self.event_queue.dispatch(current_tick)
             
         # Check exit conditions exactly like C++
         if (self.finished_workloads == 1 and 
@@ -600,6 +602,11 @@ class Sys(Callable):
                 self.inp_boost_mode = int(float(value))
             except ValueError:
                 return False
+        elif var == "collective-cost-model:":
+            try:
+                self.inp_collective_cost_model = int(float(value))
+            except ValueError:
+                return False
         elif var == "intra-dimension-scheduling:":
             if value == "FIFO":
                 self.intra_dimension_scheduling = IntraDimensionScheduling.FIFO
@@ -790,44 +797,37 @@ class Sys(Callable):
         """Insert stream into running list - corresponds to Sys::insert_into_running_list (PHY_MTP)"""
         self.running_list.append(stream)
 
-    def insert_stream(self, queue: List[BaseStream], baseStream: BaseStream) -> None:
-        """Insert stream into queue - corresponds to Sys::insert_stream"""
-        # Note: C++ version takes std::list<BaseStream*>* queue (pointer to list)
-        # Determine insertion position based on scheduling strategy
-        insert_pos = len(queue)
-        
-        if self.intra_dimension_scheduling == IntraDimensionScheduling.FIFO:
-            # FIFO: insert at end
-            insert_pos = len(queue)
-        elif self.intra_dimension_scheduling == IntraDimensionScheduling.SmallestFirst:
-            # Smallest first: sort by data size
-            for i, stream in enumerate(queue):
-                if not stream.initialized and hasattr(stream, 'my_current_phase'):
-                    if (hasattr(baseStream, 'my_current_phase') and 
-                        stream.my_current_phase.init_data_size > baseStream.my_current_phase.init_data_size):
-                        insert_pos = i
-                        break
+    def insert_stream(self, queue: StreamQueue, baseStream: BaseStream) -> None:
+        """Insert stream into queue - corresponds to Sys::insert_stream
+
+        The C++ version scans the list for the insert position. Here the
+        position is expressed as a priority key and the queue keeps the
+        streams ordered in O(log n):
+        - FIFO/RG: insertion order
+        - SmallestFirst: smaller first-phase data size first, ties in insertion order
+        - LessRemainingPhaseFirst: fewer remaining phases first, ties newest first
+
+        As in the C++ scan, a new stream never goes ahead of an initialized
+        one: both keys lead with (not initialized), and StreamBaseline.init()
+        promotes a queued stream once it starts running.
+        """
+        if self.intra_dimension_scheduling == IntraDimensionScheduling.SmallestFirst:
+            if hasattr(baseStream, 'my_current_phase'):
+                priority = (not baseStream.initialized, baseStream.my_current_phase.init_data_size)
+            else:
+                priority = (not baseStream.initialized, math.inf)
         elif self.intra_dimension_scheduling == IntraDimensionScheduling.LessRemainingPhaseFirst:
-            # Less remaining phases first
-            for i, stream in enumerate(queue):
-                if not stream.initialized:
-                    if len(stream.phases_to_go) < len(baseStream.phases_to_go):
-                        continue
-                    else:
-                        insert_pos = i
-                        break
-        
-        queue.insert(insert_pos, baseStream)
+            priority = (not baseStream.initialized, len(baseStream.phases_to_go), -queue.sequence)
+        else:
+            priority = ()
+        queue.push(baseStream, priority)
 
     def schedule(self, num: int) -> None:
         """Schedule streams - corresponds to Sys::schedule"""
-        ready_list_size = len(self.ready_list)
-        counter = min(num, ready_list_size)
+        counter = min(num, len(self.ready_list))
         
-        while counter > 0 and len(self.ready_list) > 0:
-            stream = self.ready_list[0]
-            if hasattr(stream, 'phases_to_go') and len(stream.phases_to_go) > 0:
-                top_vn = stream.phases_to_go[0].queue_id
+        while counter > 0 and self.ready_list:
+            stream = self.ready_list.pop()
                 
             # Cast to StreamBaseline as in C++ version
             self.proceed_to_next_vnet_baseline(stream)
@@ -835,7 +835,6 @@ class Sys(Callable):
             if hasattr(stream, 'current_queue_id') and stream.current_queue_id == -1:
                 self.sys_panic("should not happen!")
                 
-            self.ready_list.pop(0)
             self.first_phase_streams += 1
             self.total_running_streams += 1
             counter -= 1
@@ -872,14 +871,7 @@ class Sys(Callable):
             stream.my_current_phase.enabled):
             queue_id = stream.my_current_phase.queue_id
             if queue_id in self.active_Streams:
-                target = self.active_Streams[queue_id]
-                # Find and remove this stream from the active list
-                for i, active_stream in enumerate(target):
-                    if (hasattr(active_stream, 'stream_num') and 
-                        hasattr(stream, 'stream_num') and
-                        active_stream.stream_num == stream.stream_num):
-                        target.pop(i)
-                        break
+                self.active_Streams[queue_id].remove(stream)
         
         # If no more phases, clean up and delete stream
         if len(stream.phases_to_go) == 0:
@@ -940,8 +932,7 @@ class Sys(Callable):
             self.scheduler_unit.notify_stream_removed(previous_vnet, running_time)
         
         # Handle PHY_MTP specific logic
-        if self.ready_list and stream in self.ready_list:
-            self.ready_list.remove(stream)
+        self.ready_list.remove(stream)
         
         self.first_phase_streams += 1
         self.total_running_streams += 1
@@ -1124,21 +1115,16 @@ class Sys(Callable):
         if arg is None:
             return
             
-        # 对应C++版本的实现
-        from system.mock_nccl_log import MockNcclLog, NcclLogLevel
-        log = MockNcclLog.getInstance()
-        
         # 获取事件处理数据
         ehd = arg  # BasicEventHandlerData
         node = ehd.node  # Sys实例
         event = ehd.event  # EventType
         
         if event == EventType.CallEvents:
-            log.writeLog(NcclLogLevel.DEBUG, "Sys::handleEvent EventType::CallEvents")
             # 关键：调用node的iterate方法，这会处理call_events
             node.iterate()
         else:
-            log.writeLog(NcclLogLevel.WARNING, f"未处理的事件类型: {event}") 
+            MockNcclLog.getInstance().writeLog(NcclLogLevel.WARNING, f"未处理的事件类型: {event}")
 
     def generate_time(self, cycles: int) -> timespec_t:
         """Generate time - corresponds to Sys::generate_time"""
@@ -1251,10 +1237,12 @@ class Sys(Callable):
                 # Offline greedy scheduling
                 if self.offline_greedy:
                     prev_size = size
+                    size_ref = [size]
                     dim_mapper = self.offline_greedy.get_chunk_scheduling(
-                        self.stream_counter, size, recommended_chunk_size,
+                        self.stream_counter, size_ref, recommended_chunk_size,
                         dimensions_involved, self.inter_dimension_scheduling, collective_type
                     )
+                    size = size_ref[0]
                     chunk_size = prev_size - size
             
             # Reduce remaining size
@@ -1286,7 +1274,8 @@ class Sys(Callable):
                         collective_type, layer_num,
                         topology.get_basic_topology_at_dimension(mapped_dim, collective_type),
                         tmp, queue_id, direction, InjectionPolicy.Normal,
-                        implementation_per_dimension[mapped_dim], self.boost_mode
+                        implementation_per_dimension[mapped_dim], self.boost_mode,
+                        mapped_dim
                     )
                     phases.append(phase)
                     tmp = phase.final_data_size
@@ -1307,7 +1296,8 @@ class Sys(Callable):
                         ComType.Reduce_Scatter, layer_num,
                         topology.get_basic_topology_at_dimension(mapped_dim, ComType.Reduce_Scatter),
                         tmp, queue_id, direction, InjectionPolicy.Normal,
-                        implementation_per_dimension[mapped_dim], self.boost_mode
+                        implementation_per_dimension[mapped_dim], self.boost_mode,
+                        mapped_dim
                     )
                     phases.append(phase)
                     tmp = phase.final_data_size
@@ -1327,7 +1317,8 @@ class Sys(Callable):
                         ComType.All_Gather, layer_num,
                         topology.get_basic_topology_at_dimension(mapped_dim, ComType.All_Gather),
                         tmp, queue_id, direction, InjectionPolicy.Normal,
-                        implementation_per_dimension[mapped_dim], self.boost_mode
+                        implementation_per_dimension[mapped_dim], self.boost_mode,
+                        mapped_dim
                     )
                     phases.append(phase)
                     tmp = phase.final_data_size
@@ -1359,8 +1350,14 @@ class Sys(Callable):
                                   topology: BasicLogicalTopology, data_size: int,
                                   queue_id: int, direction: Any, injection_policy: InjectionPolicy,
                                   collective_implementation: CollectiveImplementation,
-                                  boost_mode: bool) -> CollectivePhase:
-        """Generate collective phase - corresponds to Sys::generate_collective_phase"""
+                                  boost_mode: bool, dimension: int = 0) -> CollectivePhase:
+        """Generate collective phase - corresponds to Sys::generate_collective_phase
+        
+        When the collective cost model is enabled (collective-cost-model: 1 or
+        AS_COLLECTIVE_COST_MODEL=1), the Ring, Direct, HalvingDoubling and
+        DoubleBinaryTree implementations complete after a closed-form delay
+        instead of simulating every message.
+        """
         # Create appropriate collective implementation based on type
         if collective_implementation.type == CollectiveImplementationType.Ring:
             from .collective.ring import Ring
@@ -1433,6 +1430,10 @@ class Sys(Callable):
             )
         else:
             self.sys_panic(f"Unknown collective implementation type: {collective_implementation.type}")
+        
+        if (self.collective_cost_model is not None and
+            collective_implementation.type != CollectiveImplementationType.NcclFlowModel):
+            collective_impl.use_cost_model(self.collective_cost_model, dimension)
             
         return CollectivePhase(self, queue_id, collective_impl)
 
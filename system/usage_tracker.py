@@ -2,102 +2,143 @@
 
 from typing import List, Tuple
 from .common import Tick
-import sys
+import numpy as np
 
 class Usage:
     """Usage class for tracking usage periods - corresponds to Usage.hh"""
-    
+
     def __init__(self, level: int, start: Tick, end: Tick):
         """Constructor - corresponds to Usage::Usage"""
         self.level = level
         self.start = start
         self.end = end
 
-class CSVWriter:
-    """CSV Writer placeholder"""
-    pass
-
 class UsageTracker:
-    """Usage tracker class - corresponds to UsageTracker.hh in SimAI"""
-    
+    """Usage tracker class - corresponds to UsageTracker.hh in SimAI
+
+    Closed usage periods are stored run-length encoded in two growable NumPy
+    arrays: the start tick and the level of every run. A run ends where the
+    next one starts and the last run ends at last_tick. Consecutive periods
+    with the same level are merged into one run, so recording a level change
+    costs O(1) amortized and no per-change objects are allocated.
+    """
+
+    # Initial capacity of the run arrays, doubled whenever they fill up
+    INITIAL_CAPACITY = 64
+
     def __init__(self, levels: int):
         """Constructor - corresponds to UsageTracker::UsageTracker"""
         self.levels = levels
         self.current_level = 0
         self.last_tick = 0
-        self.usage: List[Usage] = []
-    
+        self.run_starts = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self.run_levels = np.empty(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.run_count = 0
+
+    def _close_period(self, current_tick: Tick) -> None:
+        """Close the period [last_tick, current_tick) at current_level"""
+        n = self.run_count
+        if n > 0 and self.run_levels[n - 1] == self.current_level:
+            # Same level as the previous run, which now extends to current_tick
+            return
+        if n == len(self.run_starts):
+            self.run_starts = np.resize(self.run_starts, 2 * n)
+            self.run_levels = np.resize(self.run_levels, 2 * n)
+        self.run_starts[n] = self.last_tick
+        self.run_levels[n] = self.current_level
+        self.run_count = n + 1
+
+    @property
+    def usage(self) -> List[Usage]:
+        """Closed usage periods as Usage objects, equal consecutive levels merged"""
+        n = self.run_count
+        starts = self.run_starts[:n].tolist()
+        levels = self.run_levels[:n].tolist()
+        ends = starts[1:] + [self.last_tick]
+        return [Usage(level, start, end) for level, start, end in zip(levels, starts, ends)]
+
     def increase_usage(self) -> None:
         """Increase usage - corresponds to UsageTracker::increase_usage"""
         if self.current_level < self.levels - 1:
             # Import here to avoid circular import
             from .sys import Sys
             current_tick = Sys.boostedTick()
-            u = Usage(self.current_level, self.last_tick, current_tick)
-            self.usage.append(u)
+            self._close_period(current_tick)
             self.current_level += 1
             self.last_tick = current_tick
-    
+
     def decrease_usage(self) -> None:
         """Decrease usage - corresponds to UsageTracker::decrease_usage"""
         if self.current_level > 0:
             # Import here to avoid circular import
             from .sys import Sys
             current_tick = Sys.boostedTick()
-            u = Usage(self.current_level, self.last_tick, current_tick)
-            self.usage.append(u)
+            self._close_period(current_tick)
             self.current_level -= 1
             self.last_tick = current_tick
-    
+
     def set_usage(self, level: int) -> None:
         """Set usage level - corresponds to UsageTracker::set_usage"""
         if self.current_level != level:
             # Import here to avoid circular import
             from .sys import Sys
             current_tick = Sys.boostedTick()
-            u = Usage(self.current_level, self.last_tick, current_tick)
-            self.usage.append(u)
+            self._close_period(current_tick)
             self.current_level = level
             self.last_tick = current_tick
-    
+
     def report(self, writer, offset: int) -> None:
-        """Report usage - corresponds to UsageTracker::report"""
-        col = offset * 3
-        row = 1
-        for a in self.usage:
-            writer.write_cell(row, col, str(a.start))
-            writer.write_cell(row, col + 1, str(a.level))
-            row += 1
-        return
-    
+        """Report usage - corresponds to UsageTracker::report
+
+        The (start, level) columns of all runs are written in one call.
+        """
+        n = self.run_count
+        if n == 0:
+            return
+        block = np.empty((n, 2), dtype=object)
+        block[:, 0] = [str(int(t)) if t.is_integer() else str(t) for t in self.run_starts[:n].tolist()]
+        block[:, 1] = [str(l) for l in self.run_levels[:n].tolist()]
+        writer.write_block(1, offset * 3, block)
+
+    def percentage_matrix(self, cycles: int) -> np.ndarray:
+        """Utilization percentage per fixed window of cycles
+
+        Integrates level over time with a cumulative sum over the runs and
+        samples it at every window boundary. Only complete windows up to the
+        end of the last closed period are reported.
+
+        Returns:
+            (windows, 2) array of (window end tick, percentage)
+        """
+        n = self.run_count
+        if n == 0:
+            return np.empty((0, 2), dtype=np.float64)
+        starts = self.run_starts[:n]
+        levels = self.run_levels[:n].astype(np.float64)
+        ends = np.append(starts[1:], self.last_tick)
+
+        windows = int(self.last_tick // cycles)
+        if windows <= 0:
+            return np.empty((0, 2), dtype=np.float64)
+        boundaries = np.arange(windows + 1, dtype=np.float64) * cycles
+
+        # activity[t] = integral of level over [0, t)
+        cumulative = np.concatenate(([0.0], np.cumsum(levels * (ends - starts))))
+        run = np.clip(np.searchsorted(starts, boundaries, side='right') - 1, 0, n - 1)
+        covered = np.clip(boundaries - starts[run], 0.0, ends[run] - starts[run])
+        activity = cumulative[run] + levels[run] * covered
+        activity[boundaries < starts[0]] = 0.0
+
+        total_activity_possible = (self.levels - 1) * cycles
+        result = np.empty((windows, 2), dtype=np.float64)
+        result[:, 0] = boundaries[1:]
+        result[:, 1] = np.diff(activity) / total_activity_possible * 100
+        return result
+
     def report_percentage(self, cycles: int) -> List[Tuple[int, float]]:
         """Report percentage - corresponds to UsageTracker::report_percentage"""
         self.decrease_usage()
         self.increase_usage()
-        
-        total_activity_possible = (self.levels - 1) * cycles
-        usage_pointer = 0
-        current_activity = 0
-        period_start = 0
-        period_end = cycles
-        result: List[Tuple[int, float]] = []
-        
-        while usage_pointer < len(self.usage):
-            current_usage = self.usage[usage_pointer]
-            begin = max(period_start, current_usage.start)
-            end = min(period_end, current_usage.end)
-            
-            assert begin <= end
-            
-            current_activity += ((end - begin) * current_usage.level)
-            
-            if current_usage.end >= period_end:
-                percentage = (float(current_activity) / total_activity_possible) * 100
-                result.append((period_end, percentage))
-                period_start += cycles
-                period_end += cycles
-                current_activity = 0
-            else:
-                usage_pointer += 1
-        
-        return result
+
+        matrix = self.percentage_matrix(cycles)
+        return [(int(end), percentage) for end, percentage in matrix.tolist()]
@@ -2,12 +2,14 @@
 
 from .workload_base import Workload
 from .workload_parser import WorkloadParser
+from .workload_cache import WorkloadCache
 from .workload_iterators import WorkloadIterators
 from .workload_reporting import WorkloadReporting
 
 __all__ = [
     'Workload',
     'WorkloadParser', 
+    'WorkloadCache',
     'WorkloadIterators',
     'WorkloadReporting'
 ] 
\ No newline at end of file
@@ -65,6 +65,27 @@ class CSVWriter:
         self.df.iat[row, column] = data
         self.df.to_csv(self.file_path, index=False)
 
+    def write_block(self, row: int, column: int, data):
+        """
+        一次写入以(row, column)为左上角的整块二维数据，只落盘一次
+        """
+        if self._closed:
+            return
+
+        if not self.initialized or self.df is None:
+            # 尝试加载
+            if os.path.exists(self.file_path):
+                self.df = pd.read_csv(self.file_path, header=0)
+                self.df.index = range(len(self.df))
+                self.initialized = True
+            else:
+                raise RuntimeError("CSV文件未初始化")
+
+        rows = len(data)
+        cols = len(data[0]) if rows else 0
+        self.df.iloc[row:row + rows, column:column + cols] = data
+        self.df.to_csv(self.file_path, index=False)
+
     def write_line(self, data: str):
         """
         以追加方式写入一整行字符串（与C++一致）
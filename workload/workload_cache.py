@@ -0,0 +1,206 @@
+# Workload二进制缓存 - 为WorkloadParser提供预编译的工作负载表
+#
+# AICB生成的工作负载文件会被成千上万次仿真重复解析，而各次运行之间只有
+# comm_scale/compute_scale不同。本模块把解码后的并行策略、头部参数和层表
+# 以未缩放的原始数值写入工作负载文件旁边的 .npz 文件，后续运行直接按需加载，
+# 缩放因子在构造Layer时再乘上。
+#
+# 缓存由源文件内容的哈希和WORKLOAD_CACHE_VERSION共同校验，任一不匹配即视为失效，
+# 解析器会回退到文本解析并重新生成缓存。设置环境变量 AS_WORKLOAD_CACHE=0 可关闭缓存。
+
+import hashlib
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 缓存格式版本，修改缓存布局时递增
+WORKLOAD_CACHE_VERSION = 1
+
+# 缓存文件后缀，缓存文件与工作负载文件位于同一目录
+WORKLOAD_CACHE_SUFFIX = ".simai_cache.npz"
+
+# 头部整型参数，顺序即缓存中header_ints数组的列顺序
+HEADER_INT_FIELDS = (
+    "model_parallel_npu_group",
+    "expert_parallel_npu_group",
+    "pipeline_model_parallelism",
+    "vpp",
+    "ga",
+    "all_gpus",
+    "pp_commsize",
+    "dlrm_last_bottom_layer",
+)
+
+# 层表整型列，顺序即缓存中layer_ints矩阵的列顺序
+LAYER_INT_FIELDS = (
+    "depen",
+    "fp_compute_time",
+    "fp_comm_size",
+    "ig_compute_time",
+    "ig_comm_size",
+    "wg_compute_time",
+    "wg_comm_size",
+    "wg_update_time",
+)
+
+
+class WorkloadRecord:
+    """解码后的工作负载表 - 文本解析和缓存加载的共同产物，不含缩放因子"""
+
+    def __init__(self, run_type: str, header: Dict[str, int],
+                checkpoints: List[int], checkpoint_initiates: List[int],
+                layer_ids: List[str], layer_ints: List[List[int]],
+                comm_types: List[List[str]], specific_parallelism: List[str]):
+        """
+        Args:
+            run_type: 第一行的并行策略字符串
+            header: 头部整型参数，键见HEADER_INT_FIELDS
+            checkpoints: 检查点层编号
+            checkpoint_initiates: 发起fwd_in_bckwd的层编号
+            layer_ids: 每层的名称
+            layer_ints: 每层的整型字段，列见LAYER_INT_FIELDS
+            comm_types: 每层的 (fp, ig, wg) 通信类型字符串
+            specific_parallelism: 每层的特定并行策略字符串，没有时为空串
+        """
+        self.run_type = run_type
+        self.header = header
+        self.checkpoints = checkpoints
+        self.checkpoint_initiates = checkpoint_initiates
+        self.layer_ids = layer_ids
+        self.layer_ints = layer_ints
+        self.comm_types = comm_types
+        self.specific_parallelism = specific_parallelism
+
+    @property
+    def size(self) -> int:
+        """层数"""
+        return len(self.layer_ids)
+
+
+class WorkloadCache:
+    """工作负载缓存 - 负责 .npz 缓存文件的读写和校验"""
+
+    # 进程内的记录表，ns3等后端每个NPU都会构造一次Workload，同一文件只需加载一次
+    _records: Dict[str, WorkloadRecord] = {}
+    # 进程内的文件哈希表，键为 (绝对路径, 大小, 修改时间)，文件未变时不再重复读取计算
+    _hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Args:
+            enabled: 是否启用缓存，None时读取环境变量AS_WORKLOAD_CACHE（默认启用）
+        """
+        if enabled is None:
+            enabled = os.getenv("AS_WORKLOAD_CACHE", "1").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+
+    @staticmethod
+    def cache_path(name: str) -> str:
+        """返回工作负载文件对应的缓存文件路径"""
+        return name + WORKLOAD_CACHE_SUFFIX
+
+    @classmethod
+    def file_hash(cls, name: str) -> str:
+        """计算工作负载文件内容的哈希，同一进程中文件大小和修改时间不变时直接复用"""
+        st = os.stat(name)
+        key = (os.path.abspath(name), st.st_size, st.st_mtime_ns)
+        source_hash = cls._hashes.get(key)
+        if source_hash is None:
+            digest = hashlib.sha1()
+            with open(name, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            source_hash = cls._hashes[key] = digest.hexdigest()
+        return source_hash
+
+    def load(self, name: str, source_hash: str) -> Optional[WorkloadRecord]:
+        """
+        加载缓存，缓存不存在、版本不符或哈希不符时返回None
+
+        Args:
+            name: 工作负载文件名
+            source_hash: 工作负载文件当前的哈希
+
+        Returns:
+            缓存中的工作负载表
+        """
+        if not self.enabled:
+            return None
+        record = WorkloadCache._records.get(source_hash)
+        if record is not None:
+            return record
+
+        path = self.cache_path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if (int(data["version"]) != WORKLOAD_CACHE_VERSION or
+                        str(data["source_hash"]) != source_hash):
+                    return None
+                header_ints = data["header_ints"].tolist()
+                record = WorkloadRecord(
+                    run_type=str(data["run_type"]),
+                    header=dict(zip(HEADER_INT_FIELDS, header_ints)),
+                    checkpoints=data["checkpoints"].tolist(),
+                    checkpoint_initiates=data["checkpoint_initiates"].tolist(),
+                    layer_ids=data["layer_ids"].tolist(),
+                    layer_ints=data["layer_ints"].tolist(),
+                    comm_types=data["comm_types"].tolist(),
+                    specific_parallelism=data["specific_parallelism"].tolist(),
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+        WorkloadCache._records[source_hash] = record
+        return record
+
+    def store(self, name: str, source_hash: str, record: WorkloadRecord) -> bool:
+        """
+        写入缓存，先写临时文件再原子替换，避免并发运行读到半个文件
+
+        Args:
+            name: 工作负载文件名
+            source_hash: 工作负载文件的哈希
+            record: 解码后的工作负载表
+
+        Returns:
+            是否写入成功（目录不可写等情况下返回False，不影响仿真）
+        """
+        if not self.enabled:
+            return False
+        WorkloadCache._records[source_hash] = record
+
+        n = record.size
+        path = self.cache_path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    version=np.int64(WORKLOAD_CACHE_VERSION),
+                    source_hash=np.str_(source_hash),
+                    run_type=np.str_(record.run_type),
+                    header_ints=np.array(
+                        [record.header[field] for field in HEADER_INT_FIELDS], dtype=np.int64),
+                    checkpoints=np.array(record.checkpoints, dtype=np.int64),
+                    checkpoint_initiates=np.array(record.checkpoint_initiates, dtype=np.int64),
+                    layer_ids=np.array(record.layer_ids, dtype=np.str_),
+                    layer_ints=np.array(record.layer_ints, dtype=np.int64).reshape(
+                        n, len(LAYER_INT_FIELDS)),
+                    comm_types=np.array(record.comm_types, dtype=np.str_).reshape(n, 3),
+                    specific_parallelism=np.array(record.specific_parallelism, dtype=np.str_),
+                )
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return True
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空进程内的记录表和文件哈希表"""
+        cls._records.clear()
+        cls._hashes.clear()
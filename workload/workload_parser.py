@@ -3,6 +3,9 @@
 # - bool Workload::initialize_workload(std::string name)
 # - ParallelismPolicy Workload::decode_parallelsim(std::string parallelism)
 # - std::map<std::string, std::vector<bool>> Workload::decode_involved_dimensions(ParallelismPolicy policy, int model_parallel_npu_group)
+#
+# 文本解析结果会写入工作负载文件旁的二进制缓存（见workload_cache.py），
+# 后续运行命中缓存时跳过文本解析，只在创建层时应用comm_scale/compute_scale。
 
 from typing import List, Dict, Any, Optional, Tuple
 import os
@@ -11,14 +14,20 @@ import sys
 from system.common import ComType
 from .parallelism_policy import ParallelismPolicy
 from .layer import Layer
+from .workload_cache import WorkloadCache, WorkloadRecord, HEADER_INT_FIELDS
 
 
 class WorkloadParser:
     """工作负载解析器 - 负责解析工作负载文件和初始化层"""
     
-    def __init__(self):
-        """初始化解析器"""
-        pass
+    def __init__(self, cache: Optional[WorkloadCache] = None):
+        """
+        初始化解析器
+        
+        Args:
+            cache: 工作负载缓存，None时按环境变量AS_WORKLOAD_CACHE创建
+        """
+        self.cache = cache if cache is not None else WorkloadCache()
     
     def initialize_workload(self, workload, name: str) -> bool:
         """
@@ -32,120 +41,117 @@ class WorkloadParser:
         Returns:
             是否初始化成功
         """
+        record = self.load_record(name)
+        if record is None:
+            return False
+        return self.apply_record(workload, record)
+    
+    def load_record(self, name: str) -> Optional[WorkloadRecord]:
+        """
+        获取工作负载表：缓存命中时跳过文本解析，否则解析文本并写入缓存
+        
+        Args:
+            name: 工作负载文件名
+            
+        Returns:
+            解码后的工作负载表，文件为空时返回None
+        """
+        if not self.cache.enabled:
+            return self.parse_text(name)
+        
+        source_hash = self.cache.file_hash(name)
+        record = self.cache.load(name, source_hash)
+        if record is not None:
+            return record
+        
+        record = self.parse_text(name)
+        if record is not None and self.decode_parallelism(record.run_type) != ParallelismPolicy.None_:
+            self.cache.store(name, source_hash, record)
+        return record
+    
+    def parse_text(self, name: str) -> Optional[WorkloadRecord]:
+        """
+        解析工作负载文本文件，结果不含缩放因子
+        
+        Args:
+            name: 工作负载文件名
+            
+        Returns:
+            解码后的工作负载表，文件为空时返回None
+        """
         with open(name, 'r') as in_file:
             # 读取第一行获取并行策略
             first_line = in_file.readline().strip()
             tokens = first_line.split()
             
             if not tokens:
-                return False
+                return None
             
-            workload.parallelism_policy = self.decode_parallelism(tokens[0])
-            workload.run_type = tokens[0]
+            run_type = tokens[0]
+            policy = self.decode_parallelism(run_type)
+            header = dict.fromkeys(HEADER_INT_FIELDS, 0)
+            checkpoints = []
+            checkpoint_initiates = []
             
             # 解析Transformer相关参数
-            if (workload.parallelism_policy == ParallelismPolicy.TransformerFwdInBckwd or
-                workload.parallelism_policy == ParallelismPolicy.Transformer):
+            if (policy == ParallelismPolicy.TransformerFwdInBckwd or
+                policy == ParallelismPolicy.Transformer):
                 
                 # 解析基本参数
                 for i in range(1, len(tokens), 2):
                     if i + 1 >= len(tokens):
                         break
                     if tokens[i] == "model_parallel_NPU_group:":
-                        workload.model_parallel_npu_group = int(tokens[i + 1])
+                        header["model_parallel_npu_group"] = int(tokens[i + 1])
                     elif tokens[i] == "ep:":
-                        workload.expert_parallel_npu_group = int(tokens[i + 1])
+                        header["expert_parallel_npu_group"] = int(tokens[i + 1])
                     elif tokens[i] == "pp:":
-                        workload.pipeline_model_parallelism = int(tokens[i + 1])
+                        header["pipeline_model_parallelism"] = int(tokens[i + 1])
                     elif tokens[i] == "vpp:":
-                        workload.vpp = int(tokens[i + 1])
+                        header["vpp"] = int(tokens[i + 1])
                     elif tokens[i] == "ga:":
-                        workload.ga = int(tokens[i + 1])
+                        header["ga"] = int(tokens[i + 1])
                     elif tokens[i] == "all_gpus:":
-                        workload.all_gpus = int(tokens[i + 1])
-                    elif tokens[i] == "pp_comm" or tokens[i] == "pp_comm:":
-                        workload.pp_commsize = int(tokens[i + 1])
+                        header["all_gpus"] = int(tokens[i + 1])
                 
                 # 解析检查点信息（仅对TransformerFwdInBckwd）
-                if workload.parallelism_policy == ParallelismPolicy.TransformerFwdInBckwd:
-                    if workload.generator.id == 0:
-                        print("checkpoints layers are: ", end="")
-                    
+                if policy == ParallelismPolicy.TransformerFwdInBckwd:
                     for i in range(1, len(tokens), 2):
                         if i + 1 >= len(tokens):
                             break
                         if tokens[i] == "checkpoints:":
-                            account = int(tokens[i + 1])
-                            j = 2
-                            while account > 0:
-                                if i + j < len(tokens):
-                                    layer = int(tokens[i + j])
-                                    workload.checkpoints[layer] = True
-                                    if workload.generator.id == 0:
-                                        print(f"{layer}, ", end="")
-                                j += 1
-                                account -= 1
+                            checkpoints.extend(self._parse_layer_list(tokens, i))
                         elif tokens[i] == "checkpoint_initiates:":
-                            if workload.generator.id == 0:
-                                print("\nlayers initiating fwd_in_bckwd are: ", end="")
-                            account = int(tokens[i + 1])
-                            j = 2
-                            while account > 0:
-                                if i + j < len(tokens):
-                                    layer = int(tokens[i + j])
-                                    workload.need_checkpoint_initiation[layer] = True
-                                    if workload.generator.id == 0:
-                                        print(f"{layer}, ", end="")
-                                j += 1
-                                account -= 1
-                            if workload.generator.id == 0:
-                                print()
+                            checkpoint_initiates.extend(self._parse_layer_list(tokens, i))
             
             # 解析DLRM相关参数
-            elif (workload.parallelism_policy == ParallelismPolicy.DLRM or
-                workload.parallelism_policy == ParallelismPolicy.DLRMEnhanced):
+            elif (policy == ParallelismPolicy.DLRM or
+                policy == ParallelismPolicy.DLRMEnhanced):
                 for i in range(1, len(tokens), 2):
                     if i + 1 >= len(tokens):
                         break
                     if tokens[i] == "DLRM_LAST_BOTTOM_LAYER:":
-                        workload.dlrm_last_bottom_layer = int(tokens[i + 1])
-                
-                if workload.generator.id == 0:
-                    print(f"****************** info: DLRM workload last bottom layer is: {workload.dlrm_last_bottom_layer}")
+                        header["dlrm_last_bottom_layer"] = int(tokens[i + 1])
             
-            elif workload.parallelism_policy == ParallelismPolicy.None_:
-                print("无法解码工作负载并行化策略")
-                return False
+            elif policy == ParallelismPolicy.None_:
+                # 无法解码的策略不读取层表，由apply_record报告错误
+                return WorkloadRecord(run_type, header, [], [], [], [], [], [])
             
             # 解析pp_comm参数
             for i in range(1, len(tokens), 2):
                 if i + 1 >= len(tokens):
                     break
                 if tokens[i] == "pp_comm" or tokens[i] == "pp_comm:":
-                    workload.pp_commsize = int(tokens[i + 1])
-            
-            if workload.generator.id == 0:
-                print(f"pp_commize: {workload.pp_commsize}")
-            
-            # 验证参数
-            if workload.generator.id == 0:
-                if (workload.model_parallel_npu_group == 0 or workload.expert_parallel_npu_group == 0 or 
-                    workload.pipeline_model_parallelism == 0 or workload.vpp == 0 or workload.ga == 0 or 
-                    workload.all_gpus == 0 or 
-                    (workload.pipeline_model_parallelism != 1 and workload.pp_commsize == 0) or
-                    (workload.pipeline_model_parallelism == 1 and workload.pp_commsize != 0)):
-                    print("*****Warning: Input workload format mismatch. It may cause simulation error. Please use the latest AICB to generate.*****")
+                    header["pp_commsize"] = int(tokens[i + 1])
             
             # 读取层数
             second_line = in_file.readline().strip()
             lines = int(second_line)
-            workload.size = lines
             
-            # 获取涉及维度
-            general_involved_dimensions = self.decode_involved_dimensions(
-                workload.parallelism_policy, workload.model_parallel_npu_group, workload.generator)
-            
-            # 创建层
+            layer_ids = []
+            layer_ints = []
+            comm_types = []
+            specific_parallelism = []
             for i in range(lines):
                 # 读取层信息
                 layer_data = in_file.readline().strip().split()
@@ -153,80 +159,180 @@ class WorkloadParser:
                     print(f"this layer data is not valid: {layer_data}")
                     sys.exit(1)
                 
-                layer_id = layer_data[0]
-                depen = int(layer_data[1])
-                fp_compute_time = int(layer_data[2])
-                fp_comm_type_s = layer_data[3]
-                fp_comm_size = int(layer_data[4])
-                ig_compute_time = int(layer_data[5])
-                ig_comm_type_s = layer_data[6]
-                ig_comm_size = int(layer_data[7])
-                wg_compute_time = int(layer_data[8])
-                wg_comm_type_s = layer_data[9]
-                wg_comm_size = int(layer_data[10])
-                wg_update_time = int(layer_data[11])
-                
-                # 解析通信类型
-                fp_comm_type, fp_group_type = self._parse_comm_type(fp_comm_type_s)
-                ig_comm_type, ig_group_type = self._parse_comm_type(ig_comm_type_s)
-                wg_comm_type, wg_group_type = self._parse_comm_type(wg_comm_type_s)
-                
-                # 确定特定并行策略
-                specific_policy = ParallelismPolicy.None_
-                selected_involved_dimensions = general_involved_dimensions
-                
-                # 处理自定义混合并行
-                if workload.parallelism_policy == ParallelismPolicy.HybridCustomized:
-                    if len(layer_data) > 12:
-                        specific_parallelism = layer_data[12]
-                        specific_policy = self.decode_parallelism(specific_parallelism)
-                
-                # 处理DLRM特殊情况
-                if ((workload.parallelism_policy == ParallelismPolicy.DLRM or
-                    workload.parallelism_policy == ParallelismPolicy.DLRMEnhanced) and i == 0):
-                    specific_policy = ParallelismPolicy.All
-                
-                if specific_policy != ParallelismPolicy.None_:
-                    selected_involved_dimensions = self.decode_involved_dimensions(
-                        specific_policy, workload.model_parallel_npu_group, workload.generator)
-                
-                # 创建层对象
-                layer = Layer(
-                    layer_id, i, workload.generator, workload,
-                    fp_compute_time * workload.generator.compute_scale,
-                    fp_comm_type, fp_group_type,
-                    fp_comm_size * workload.generator.comm_scale,
-                    selected_involved_dimensions["fwd"],
-                    ig_compute_time * workload.generator.compute_scale,
-                    ig_comm_type, ig_group_type,
-                    ig_comm_size * workload.generator.comm_scale,
-                    selected_involved_dimensions["ig"],
-                    wg_compute_time * workload.generator.compute_scale,
-                    wg_comm_type, wg_group_type,
-                    wg_comm_size * workload.generator.comm_scale,
-                    selected_involved_dimensions["wg"],
-                    wg_update_time,  # 对应C++版本的weight_grad_update_time
-                    specific_policy
-                )
-                
-                # 设置检查点属性
-                if i in workload.checkpoints:
-                    layer.is_checkpoint = True
-                if i in workload.need_checkpoint_initiation:
-                    layer.needs_fwd_in_bckwd_initiation = True
-                
-                workload.layers.append(layer)
-                
-                if workload.generator.id == 0:
-                    print(f"id: {layer_id}, depen: {depen}, wg_comp_time: {wg_compute_time}")
+                layer_ids.append(layer_data[0])
+                layer_ints.append([
+                    int(layer_data[1]),   # depen
+                    int(layer_data[2]),   # fp_compute_time
+                    int(layer_data[4]),   # fp_comm_size
+                    int(layer_data[5]),   # ig_compute_time
+                    int(layer_data[7]),   # ig_comm_size
+                    int(layer_data[8]),   # wg_compute_time
+                    int(layer_data[10]),  # wg_comm_size
+                    int(layer_data[11]),  # wg_update_time
+                ])
+                comm_types.append([layer_data[3], layer_data[6], layer_data[9]])
+                specific_parallelism.append(layer_data[12] if len(layer_data) > 12 else "")
             
-            if workload.generator.id == 0:
-                print(f"type: {workload.run_type}, num passes: {workload.total_pass}, "
-                        f"lines: {lines}, compute scale: {workload.generator.compute_scale}, "
-                        f"comm scale: {workload.generator.comm_scale}")
+            return WorkloadRecord(run_type, header, checkpoints, checkpoint_initiates,
+                                layer_ids, layer_ints, comm_types, specific_parallelism)
+    
+    def apply_record(self, workload, record: WorkloadRecord) -> bool:
+        """
+        将工作负载表应用到工作负载对象上并创建层，缩放因子在此处应用
+        
+        Args:
+            workload: 工作负载对象
+            record: 解码后的工作负载表
             
-            return True
-                
+        Returns:
+            是否初始化成功
+        """
+        workload.parallelism_policy = self.decode_parallelism(record.run_type)
+        workload.run_type = record.run_type
+        is_first = workload.generator.id == 0
+        
+        if workload.parallelism_policy == ParallelismPolicy.None_:
+            print("无法解码工作负载并行化策略")
+            return False
+        
+        header = record.header
+        workload.model_parallel_npu_group = header["model_parallel_npu_group"]
+        workload.expert_parallel_npu_group = header["expert_parallel_npu_group"]
+        workload.pipeline_model_parallelism = header["pipeline_model_parallelism"]
+        workload.vpp = header["vpp"]
+        workload.ga = header["ga"]
+        workload.all_gpus = header["all_gpus"]
+        workload.pp_commsize = header["pp_commsize"]
+        workload.dlrm_last_bottom_layer = header["dlrm_last_bottom_layer"]
+        
+        # 设置检查点信息（仅对TransformerFwdInBckwd）
+        if workload.parallelism_policy == ParallelismPolicy.TransformerFwdInBckwd:
+            for layer in record.checkpoints:
+                workload.checkpoints[layer] = True
+            for layer in record.checkpoint_initiates:
+                workload.need_checkpoint_initiation[layer] = True
+            if is_first:
+                print("checkpoints layers are: ", end="")
+                for layer in record.checkpoints:
+                    print(f"{layer}, ", end="")
+                print("\nlayers initiating fwd_in_bckwd are: ", end="")
+                for layer in record.checkpoint_initiates:
+                    print(f"{layer}, ", end="")
+                print()
+        
+        elif (workload.parallelism_policy == ParallelismPolicy.DLRM or
+            workload.parallelism_policy == ParallelismPolicy.DLRMEnhanced):
+            if is_first:
+                print(f"****************** info: DLRM workload last bottom layer is: {workload.dlrm_last_bottom_layer}")
+        
+        if is_first:
+            print(f"pp_commize: {workload.pp_commsize}")
+        
+        # 验证参数
+        if is_first:
+            if (workload.model_parallel_npu_group == 0 or workload.expert_parallel_npu_group == 0 or 
+                workload.pipeline_model_parallelism == 0 or workload.vpp == 0 or workload.ga == 0 or 
+                workload.all_gpus == 0 or 
+                (workload.pipeline_model_parallelism != 1 and workload.pp_commsize == 0) or
+                (workload.pipeline_model_parallelism == 1 and workload.pp_commsize != 0)):
+                print("*****Warning: Input workload format mismatch. It may cause simulation error. Please use the latest AICB to generate.*****")
+        
+        lines = record.size
+        workload.size = lines
+        compute_scale = workload.generator.compute_scale
+        comm_scale = workload.generator.comm_scale
+        
+        # 获取涉及维度
+        general_involved_dimensions = self.decode_involved_dimensions(
+            workload.parallelism_policy, workload.model_parallel_npu_group, workload.generator)
+        
+        # 创建层
+        for i in range(lines):
+            layer_id = record.layer_ids[i]
+            (depen, fp_compute_time, fp_comm_size, ig_compute_time, ig_comm_size,
+            wg_compute_time, wg_comm_size, wg_update_time) = record.layer_ints[i]
+            fp_comm_type_s, ig_comm_type_s, wg_comm_type_s = record.comm_types[i]
+            
+            # 解析通信类型
+            fp_comm_type, fp_group_type = self._parse_comm_type(fp_comm_type_s)
+            ig_comm_type, ig_group_type = self._parse_comm_type(ig_comm_type_s)
+            wg_comm_type, wg_group_type = self._parse_comm_type(wg_comm_type_s)
+            
+            # 确定特定并行策略
+            specific_policy = ParallelismPolicy.None_
+            selected_involved_dimensions = general_involved_dimensions
+            
+            # 处理自定义混合并行
+            if workload.parallelism_policy == ParallelismPolicy.HybridCustomized:
+                if record.specific_parallelism[i]:
+                    specific_policy = self.decode_parallelism(record.specific_parallelism[i])
+            
+            # 处理DLRM特殊情况
+            if ((workload.parallelism_policy == ParallelismPolicy.DLRM or
+                workload.parallelism_policy == ParallelismPolicy.DLRMEnhanced) and i == 0):
+                specific_policy = ParallelismPolicy.All
+            
+            if specific_policy != ParallelismPolicy.None_:
+                selected_involved_dimensions = self.decode_involved_dimensions(
+                    specific_policy, workload.model_parallel_npu_group, workload.generator)
+            
+            # 创建层对象
+            layer = Layer(
+                layer_id, i, workload.generator, workload,
+                fp_compute_time * compute_scale,
+                fp_comm_type, fp_group_type,
+                fp_comm_size * comm_scale,
+                selected_involved_dimensions["fwd"],
+                ig_compute_time * compute_scale,
+                ig_comm_type, ig_group_type,
+                ig_comm_size * comm_scale,
+                selected_involved_dimensions["ig"],
+                wg_compute_time * compute_scale,
+                wg_comm_type, wg_group_type,
+                wg_comm_size * comm_scale,
+                selected_involved_dimensions["wg"],
+                wg_update_time,  # 对应C++版本的weight_grad_update_time
+                specific_policy
+            )
+            
+            # 设置检查点属性
+            if i in workload.checkpoints:
+                layer.is_checkpoint = True
+            if i in workload.need_checkpoint_initiation:
+                layer.needs_fwd_in_bckwd_initiation = True
+            
+            workload.layers.append(layer)
+            
+            if is_first:
+                print(f"id: {layer_id}, depen: {depen}, wg_comp_time: {wg_compute_time}")
+        
+        if is_first:
+            print(f"type: {workload.run_type}, num passes: {workload.total_pass}, "
+                    f"lines: {lines}, compute scale: {compute_scale}, "
+                    f"comm scale: {comm_scale}")
+        
+        return True
+    
+    def _parse_layer_list(self, tokens: List[str], i: int) -> List[int]:
+        """
+        解析头部中 "checkpoints: N l1 l2 ..." 形式的层编号列表
+        
+        Args:
+            tokens: 第一行的token列表
+            i: 列表关键字所在位置
+            
+        Returns:
+            层编号列表
+        """
+        layers = []
+        account = int(tokens[i + 1])
+        j = 2
+        while account > 0:
+            if i + j < len(tokens):
+                layers.append(int(tokens[i + j]))
+            j += 1
+            account -= 1
+        return layers
 
     def decode_parallelism(self, parallelism: str) -> ParallelismPolicy:
         """